@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+import re
+import time
+import bisect
+import sqlite3
+import logging
+import threading
+import utils
+from send_queue import PRIORITY_NORMAL
+
+logger = logging.getLogger(__name__)
+
+# Desteklenen semboller (utils'teki kur/fiyat kaynaklarıyla eşleşir)
+SUPPORTED_SYMBOLS = (
+    'USD/TRY', 'EUR/TRY', 'GBP/TRY', 'USD/EUR', 'EUR/USD',
+    'BTC/USD', 'BTC/TRY', 'BTC/EUR'
+)
+
+# Telegram global limiti saniyede ~30 mesaj; biraz pay bırakıyoruz
+NOTIFY_BATCH_SIZE = 25
+NOTIFY_BATCH_INTERVAL = 1.0
+MAX_ALERTS_PER_USER = 20
+
+ALERT_PATTERN = re.compile(r'^\s*(\S+)\s*([<>])\s*([\d.,]+)\s*$')
+
+
+def normalize_symbol(raw):
+    """Sembolü 'USD/TRY' biçimine getir"""
+    symbol = raw.strip().upper().replace('-', '/').replace('_', '/')
+    if symbol == 'BTC':
+        symbol = 'BTC/USD'
+    elif '/' not in symbol and len(symbol) == 6:
+        symbol = f"{symbol[:3]}/{symbol[3:]}"
+    return symbol if symbol in SUPPORTED_SYMBOLS else None
+
+
+def parse_number(raw):
+    """'35,5' veya '60,000' gibi sayıları float'a çevir"""
+    value = raw.strip()
+    if ',' in value and '.' not in value and value.count(',') == 1 and len(value.split(',')[1]) != 3:
+        value = value.replace(',', '.')
+    else:
+        value = value.replace(',', '')
+    return float(value)
+
+
+def parse_alert(text):
+    """'USD/TRY > 35' ifadesini (sembol, yön, eşik) olarak ayrıştır"""
+    match = ALERT_PATTERN.match(text or '')
+    if not match:
+        return None
+    symbol = normalize_symbol(match.group(1))
+    if not symbol:
+        return None
+    try:
+        threshold = parse_number(match.group(3))
+    except ValueError:
+        return None
+    return symbol, match.group(2), threshold
+
+
+def fetch_price(symbol):
+    """Sembolün güncel fiyatını utils üzerinden al"""
+    base, quote = symbol.split('/')
+    if base == 'BTC':
+        return utils.get_bitcoin_price(quote)
+    return utils.get_exchange_rate(base, quote)
+
+
+class ThresholdIndex:
+    """Tek bir sembol için sıralı eşik yapısı.
+
+    '>' alarmları, fiyat eşiğin üstüne çıktığında; '<' alarmları fiyat
+    eşiğin altına indiğinde tetiklenir. Her iki liste de eşiğe göre sıralı
+    tutulur, böylece bir fiyat tick'inde tetiklenen alarmlar bisect ile
+    O(log n + k) sürede bulunur.
+    """
+
+    def __init__(self):
+        self.above_keys, self.above_ids = [], []
+        self.below_keys, self.below_ids = [], []
+
+    def __len__(self):
+        return len(self.above_ids) + len(self.below_ids)
+
+    def _lists(self, direction):
+        if direction == '>':
+            return self.above_keys, self.above_ids
+        return self.below_keys, self.below_ids
+
+    def add(self, direction, threshold, alert_id):
+        keys, ids = self._lists(direction)
+        pos = bisect.bisect_right(keys, threshold)
+        keys.insert(pos, threshold)
+        ids.insert(pos, alert_id)
+
+    def remove(self, direction, threshold, alert_id):
+        keys, ids = self._lists(direction)
+        pos = bisect.bisect_left(keys, threshold)
+        while pos < len(keys) and keys[pos] == threshold:
+            if ids[pos] == alert_id:
+                del keys[pos]
+                del ids[pos]
+                return True
+            pos += 1
+        return False
+
+    def pop_crossed(self, price):
+        """Fiyatın geçtiği alarmları indeksten çıkar ve id'lerini döndür"""
+        # eşik < fiyat olan '>' alarmları listenin başında
+        cut = bisect.bisect_left(self.above_keys, price)
+        crossed = self.above_ids[:cut]
+        del self.above_keys[:cut]
+        del self.above_ids[:cut]
+
+        # eşik > fiyat olan '<' alarmları listenin sonunda
+        cut = bisect.bisect_right(self.below_keys, price)
+        crossed.extend(self.below_ids[cut:])
+        del self.below_keys[cut:]
+        del self.below_ids[cut:]
+        return crossed
+
+
+class AlertManager:
+    def __init__(self, bot, db_path, send_queue=None, shared=False):
+        self.bot = bot
+        self.send_queue = send_queue
+        self.db_path = db_path
+        # Çoklu süreç modunda alarmlar başka süreçlerde de eklenip silinebilir
+        self.shared = shared
+        self.lock = threading.RLock()
+        self.indexes = {}
+        self.alerts = {}
+        # Belleğin yansıttığı son değişiklik sürümü (price_alert_meta.version)
+        self.version = 0
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._init_db()
+        self._load_active_alerts()
+
+    def _init_db(self):
+        """Alarm tablosunu oluştur"""
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS price_alerts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    chat_id INTEGER NOT NULL,
+                    symbol TEXT NOT NULL,
+                    direction TEXT NOT NULL,
+                    threshold REAL NOT NULL,
+                    active INTEGER NOT NULL DEFAULT 1,
+                    created_at REAL NOT NULL,
+                    triggered_at REAL,
+                    triggered_price REAL
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_price_alerts_active ON price_alerts (active, symbol)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_price_alerts_user ON price_alerts (user_id, active)"
+            )
+            # Her yazma sayacı artırır ve satıra yazar; süreçler sadece yeni sürümleri okur
+            columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(price_alerts)")}
+            if 'version' not in columns:
+                self.conn.execute("ALTER TABLE price_alerts ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_price_alerts_version ON price_alerts (version)"
+            )
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS price_alert_meta (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)"
+            )
+            self.conn.execute("INSERT OR IGNORE INTO price_alert_meta (id, version) VALUES (1, 0)")
+
+    def _load_active_alerts(self):
+        """Aktif alarmları belleğe, sembol bazlı indekslere yükle"""
+        with self.lock:
+            # Sürüm satırlardan önce okunur; arada gelen değişiklik sonraki refresh'te tekrar uygulanır
+            self.version = self._current_version()
+            rows = self.conn.execute(
+                "SELECT id, user_id, chat_id, symbol, direction, threshold FROM price_alerts WHERE active = 1"
+            ).fetchall()
+            for row in rows:
+                self._index_alert(dict(row))
+        logger.info("%s aktif fiyat alarmı yüklendi", len(rows))
+
+    def _current_version(self):
+        return self.conn.execute("SELECT version FROM price_alert_meta WHERE id = 1").fetchone()[0]
+
+    def _bump_version(self):
+        """Açık yazma işleminde sürümü artır ve yeni sürümü döndür.
+
+        İşlemin ilk yazması olmalı: SQLite yazıcıları sıraya koyduğundan
+        sürümler commit sırasıyla artar ve refresh hiçbir değişikliği atlamaz.
+        """
+        self.conn.execute("UPDATE price_alert_meta SET version = version + 1 WHERE id = 1")
+        return self._current_version()
+
+    def _advance(self, version):
+        # Araya başka süreç girmediyse kendi yazmamızı tekrar okumaya gerek yok
+        if version == self.version + 1:
+            self.version = version
+
+    def refresh(self):
+        """Diğer süreçlerin değişikliklerini uygula; sadece son görülen sürümden yenileri okunur"""
+        with self.lock:
+            version = self._current_version()
+            if version == self.version:
+                return
+            rows = self.conn.execute(
+                "SELECT id, user_id, chat_id, symbol, direction, threshold, active FROM price_alerts "
+                "WHERE version > ?", (self.version,)
+            ).fetchall()
+            for row in rows:
+                alert = self.alerts.get(row['id'])
+                if row['active'] and alert is None:
+                    alert = dict(row)
+                    del alert['active']
+                    self._index_alert(alert)
+                elif not row['active'] and alert is not None:
+                    self.indexes[alert['symbol']].remove(alert['direction'], alert['threshold'], alert['id'])
+                    del self.alerts[alert['id']]
+            self.version = version
+
+    def _index_alert(self, alert):
+        self.alerts[alert['id']] = alert
+        index = self.indexes.get(alert['symbol'])
+        if index is None:
+            index = self.indexes[alert['symbol']] = ThresholdIndex()
+        index.add(alert['direction'], alert['threshold'], alert['id'])
+
+    def add_alert(self, user_id, chat_id, symbol, direction, threshold):
+        """Yeni fiyat alarmı ekle"""
+        try:
+            if self.shared:
+                self.refresh()
+            with self.lock:
+                active = sum(1 for a in self.alerts.values() if a['user_id'] == user_id)
+                if active >= MAX_ALERTS_PER_USER:
+                    return f"❌ En fazla {MAX_ALERTS_PER_USER} aktif alarm kurabilirsin."
+
+                with self.conn:
+                    version = self._bump_version()
+                    cursor = self.conn.execute(
+                        "INSERT INTO price_alerts (user_id, chat_id, symbol, direction, threshold, created_at, version) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (user_id, chat_id, symbol, direction, threshold, time.time(), version)
+                    )
+                self._advance(version)
+                alert_id = cursor.lastrowid
+                self._index_alert({
+                    'id': alert_id,
+                    'user_id': user_id,
+                    'chat_id': chat_id,
+                    'symbol': symbol,
+                    'direction': direction,
+                    'threshold': threshold
+                })
+            return f"✅ Alarm #{alert_id} kuruldu: {symbol} {direction} {threshold:,.4f}"
+        except Exception as e:
+            logger.error("Alarm ekleme hatası: %s", e)
+            return f"❌ Alarm ekleme hatası: {str(e)}"
+
+    def delete_alert(self, user_id, alert_id):
+        """Kullanıcının alarmını sil"""
+        try:
+            if self.shared:
+                self.refresh()
+            with self.lock:
+                alert = self.alerts.get(alert_id)
+                if not alert or alert['user_id'] != user_id:
+                    return f"❌ #{alert_id} numaralı aktif alarm bulunamadı."
+
+                with self.conn:
+                    version = self._bump_version()
+                    self.conn.execute("UPDATE price_alerts SET active = 0, version = ? WHERE id = ?", (version, alert_id))
+                self._advance(version)
+                self.indexes[alert['symbol']].remove(alert['direction'], alert['threshold'], alert_id)
+                del self.alerts[alert_id]
+            return f"✅ Alarm #{alert_id} silindi."
+        except Exception as e:
+            logger.error("Alarm silme hatası: %s", e)
+            return f"❌ Alarm silme hatası: {str(e)}"
+
+    def list_alerts(self, user_id):
+        """Kullanıcının aktif alarmlarını listele"""
+        if self.shared:
+            self.refresh()
+        with self.lock:
+            alerts = [a for a in self.alerts.values() if a['user_id'] == user_id]
+        return sorted(alerts, key=lambda a: a['id'])
+
+    def process_tick(self, symbol, price):
+        """Bir fiyat tick'inde geçilen alarmları bul, kapat ve döndür"""
+        with self.lock:
+            index = self.indexes.get(symbol)
+            if not index:
+                return []
+            crossed_ids = index.pop_crossed(price)
+            if not crossed_ids:
+                return []
+            candidates = [self.alerts.pop(alert_id) for alert_id in crossed_ids]
+
+            # Sadece hâlâ aktif olan satırlar tetiklenir; başka süreçte silinen alarm bildirilmez
+            now = time.time()
+            triggered = []
+            with self.conn:
+                version = self._bump_version()
+                for alert in candidates:
+                    cursor = self.conn.execute(
+                        "UPDATE price_alerts SET active = 0, triggered_at = ?, triggered_price = ?, version = ? "
+                        "WHERE id = ? AND active = 1",
+                        (now, price, version, alert['id'])
+                    )
+                    if cursor.rowcount:
+                        triggered.append(alert)
+            self._advance(version)
+
+        for alert in triggered:
+            alert['price'] = price
+        return triggered
+
+    def check_prices(self):
+        """Aktif alarmı olan sembollerin fiyatlarını çek ve alarmları değerlendir"""
+        if self.shared:
+            self.refresh()
+        with self.lock:
+            symbols = [symbol for symbol, index in self.indexes.items() if len(index)]
+
+        triggered = []
+        for symbol in symbols:
+            try:
+                price = fetch_price(symbol)
+                if price is None:
+                    continue
+                triggered.extend(self.process_tick(symbol, price))
+            except Exception as e:
+                logger.error("Alarm fiyat kontrol hatası (%s): %s", symbol, e)
+
+        if triggered:
+            self.notify(triggered)
+        return len(triggered)
+
+    def notify(self, triggered):
+        """Tetiklenen alarmları Telegram limitlerine uygun gruplar halinde gönder"""
+        # Aynı sohbete giden alarmlar tek mesajda birleştirilir (sohbet başına 1 mesaj/sn)
+        by_chat = {}
+        for alert in triggered:
+            by_chat.setdefault(alert['chat_id'], []).append(alert)
+
+        messages = []
+        for chat_id, alerts in by_chat.items():
+            lines = ["🔔 *Fiyat Alarmı!*\n"]
+            for alert in alerts:
+                lines.append(
+                    f"#{alert['id']} {alert['symbol']} {alert['direction']} {alert['threshold']:,.4f}"
+                    f" → şu an {alert['price']:,.4f}"
+                )
+            messages.append((chat_id, "\n".join(lines)))
+
+        # Gönderim kuyruğu varsa hız limitlerini o uygular
+        if self.send_queue and self.send_queue.running:
+            for chat_id, text in messages:
+                self.send_queue.send_message(chat_id, text, priority=PRIORITY_NORMAL, parse_mode='Markdown')
+            return
+
+        for start in range(0, len(messages), NOTIFY_BATCH_SIZE):
+            if start:
+                time.sleep(NOTIFY_BATCH_INTERVAL)
+            for chat_id, text in messages[start:start + NOTIFY_BATCH_SIZE]:
+                try:
+                    self.bot.send_message(chat_id, text, parse_mode='Markdown')
+                except Exception as e:
+                    logger.error("Alarm bildirimi hatası (%s): %s", chat_id, e)
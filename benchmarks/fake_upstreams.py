@@ -0,0 +1,544 @@
+# -*- coding: utf-8 -*-
+"""Yük testi için yerel sahte Telegram, OpenAI, GitHub ve Render sunucuları.
+
+Her servis kendi portunda bir WebServer üzerinde çalışır ve botun
+kullandığı uç noktalara gerçekçi biçimde yanıt verir. Her istek için
+ayarlanabilir gecikme (ortalama + sapma) ve hata oranı uygulanır; hata
+enjeksiyonunda servislerin gerçek hata yanıtları (429, 5xx) döner.
+"""
+import os
+import sys
+import json
+import time
+import base64
+import random
+import hashlib
+import threading
+from collections import Counter
+from urllib.parse import parse_qs, unquote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from web_server import WebServer, json_response
+
+# 1x1 şeffaf PNG (görsel indirme senaryosu için)
+PIXEL_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+ISO_DATE = "2024-05-01T12:00:00Z"
+
+
+class FakeService:
+    """Ortak gecikme, hata enjeksiyonu ve istek sayımı"""
+
+    name = 'fake'
+
+    def __init__(self, latency_ms=0, jitter_ms=0, error_rate=0.0, seed=0):
+        self.latency = latency_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.calls = Counter()
+        self.errors = Counter()
+        self.lock = threading.Lock()
+        self.server = None
+        self.url = None
+
+    def start(self):
+        self.server = WebServer(host='127.0.0.1', port=0)
+        for method in ('GET', 'POST', 'PUT', 'PATCH', 'DELETE'):
+            self.server.prefix_route(method, '/', self._handle)
+        self.server.start()
+        self.url = f"http://127.0.0.1:{self.server.httpd.server_address[1]}"
+        return self
+
+    def stop(self):
+        if self.server is not None:
+            self.server.stop()
+
+    def _handle(self, request):
+        with self.random_lock:
+            delay = max(0.0, self.random.gauss(self.latency, self.jitter)) if self.jitter else self.latency
+            fail = self.random.random() < self.error_rate
+        if delay:
+            time.sleep(delay)
+        endpoint = self.endpoint_name(request)
+        with self.lock:
+            self.calls[endpoint] += 1
+            if fail:
+                self.errors[endpoint] += 1
+        if fail:
+            return self.error_response(request)
+        return self.handle(request)
+
+    def endpoint_name(self, request):
+        return f"{request.method} {request.path}"
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    def error_response(self, request):
+        return json_response(500, {'message': 'Injected failure'})
+
+    def reset(self):
+        with self.lock:
+            self.calls.clear()
+            self.errors.clear()
+
+    def get_stats(self):
+        with self.lock:
+            return {'calls': sum(self.calls.values()), 'errors': sum(self.errors.values()),
+                    'endpoints': dict(self.calls.most_common(8))}
+
+
+def blob_sha(content):
+    """git blob SHA (RepoSync'in yerelde hesapladığıyla aynı)"""
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def _params(request):
+    """Sorgu dizesi ve form gövdesindeki parametreler (telebot ikisini de kullanır)"""
+    params = {key: values[-1] for key, values in request.query.items()}
+    content_type = request.headers.get('Content-Type') or ''
+    if request.body and content_type.startswith('application/x-www-form-urlencoded'):
+        params.update({key: values[-1] for key, values in parse_qs(request.body.decode('utf-8')).items()})
+    elif request.body and content_type.startswith('application/json'):
+        params.update(request.json() or {})
+    return params
+
+
+class FakeTelegram(FakeService):
+    """Bot API: gönderim metotları mesaj nesnesi, diğerleri True döndürür"""
+
+    name = 'telegram'
+    MESSAGE_METHODS = ('sendmessage', 'sendphoto', 'senddocument', 'sendaudio', 'sendvoice',
+                       'editmessagetext', 'sendvideo', 'sendanimation')
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.message_id = 0
+        self.sent = Counter()
+
+    def endpoint_name(self, request):
+        return request.path.rsplit('/', 1)[-1]
+
+    def handle(self, request):
+        method = request.path.rsplit('/', 1)[-1].lower()
+        params = _params(request)
+        if method == 'getme':
+            return self._ok({'id': 1, 'is_bot': True, 'first_name': 'ReisBot', 'username': 'reisbot_bench'})
+        if method in self.MESSAGE_METHODS:
+            chat_id = int(params.get('chat_id') or 0)
+            with self.lock:
+                self.message_id += 1
+                message_id = self.message_id
+                self.sent[chat_id] += 1
+            return self._ok({
+                'message_id': message_id, 'date': int(time.time()),
+                'chat': {'id': chat_id, 'type': 'private'},
+                'from': {'id': 1, 'is_bot': True, 'first_name': 'ReisBot'},
+                'text': params.get('text', ''),
+            })
+        if method == 'getupdates':
+            return self._ok([])
+        return self._ok(True)
+
+    def error_response(self, request):
+        return json_response(429, {
+            'ok': False, 'error_code': 429,
+            'description': 'Too Many Requests: retry after 1',
+            'parameters': {'retry_after': 1},
+        })
+
+    @staticmethod
+    def _ok(result):
+        return json_response(200, {'ok': True, 'result': result})
+
+    def reset(self):
+        super().reset()
+        with self.lock:
+            self.sent.clear()
+
+
+class FakeOpenAI(FakeService):
+    """Chat completions ve görsel üretimi (görsel URL'si bu sunucudan indirilir)"""
+
+    name = 'openai'
+
+    def handle(self, request):
+        path = request.path
+        if path.endswith('/chat/completions'):
+            body = request.json() or {}
+            prompt = (body.get('messages') or [{}])[-1].get('content', '')
+            answer = f"Sahte yanıt: {prompt[:80]} " + "lorem ipsum " * 20
+            return json_response(200, {
+                'id': 'chatcmpl-bench', 'object': 'chat.completion', 'created': int(time.time()),
+                'model': body.get('model', 'gpt-3.5-turbo'),
+                'choices': [{'index': 0, 'finish_reason': 'stop',
+                             'message': {'role': 'assistant', 'content': answer}}],
+                'usage': {'prompt_tokens': len(prompt) // 4, 'completion_tokens': 60,
+                          'total_tokens': len(prompt) // 4 + 60},
+            })
+        if path.endswith('/images/generations'):
+            return json_response(200, {'created': int(time.time()), 'data': [{'url': f"{self.url}/files/image.png"}]})
+        if path.startswith('/files/'):
+            return 200, {'Content-Type': 'image/png'}, PIXEL_PNG
+        return json_response(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+
+    def error_response(self, request):
+        return json_response(429, {'error': {'message': 'Rate limit reached', 'type': 'rate_limit_exceeded'}})
+
+
+class FakeGitHub(FakeService):
+    """PyGithub'ın kullandığı REST uç noktaları; oluşturulan repo ve dosyalar bellekte tutulur"""
+
+    name = 'github'
+    OWNER = 'bench'
+
+    def __init__(self, *args, repos=20, files=12, commits=40, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.repos = {}
+        self.seed_counts = (repos, files, commits)
+        for index in range(repos):
+            self._create_repo(f"repo-{index}", files, commits)
+
+    def _create_repo(self, name, files=0, commits=0):
+        # trees: ağaç sha -> dosyalar, commit_trees: commit sha -> (ağaç sha, ebeveyn)
+        repo = {'files': {}, 'commits': [], 'blobs': {}, 'trees': {}, 'commit_trees': {}}
+        for index in range(files):
+            path = f"src/module_{index}.py" if index % 3 else f"file_{index}.py"
+            content = f"# {name} {path}\n" + "print('reis')\n" * (index + 1)
+            repo['files'][path] = (blob_sha(content), content)
+        for index in range(commits):
+            repo['commits'].append((hashlib.sha1(f"{name}{index}".encode()).hexdigest(), f"Commit {index}"))
+        self.repos[name] = repo
+        return repo
+
+    def endpoint_name(self, request):
+        parts = request.path.strip('/').split('/')
+        return f"{request.method} /{'/'.join(parts[:1] + parts[3:4])}"
+
+    def _repo_url(self, name):
+        return f"{self.url}/repos/{self.OWNER}/{name}"
+
+    def _repo_json(self, name):
+        return {
+            'id': abs(hash(name)) % 10 ** 8, 'name': name, 'full_name': f"{self.OWNER}/{name}",
+            'owner': {'login': self.OWNER, 'id': 1, 'url': f"{self.url}/users/{self.OWNER}"},
+            'private': False, 'description': f"{name} açıklaması", 'size': 120, 'language': 'Python',
+            'created_at': ISO_DATE, 'updated_at': ISO_DATE, 'pushed_at': ISO_DATE, 'default_branch': 'main',
+            'url': self._repo_url(name), 'html_url': f"https://github.com/{self.OWNER}/{name}",
+        }
+
+    def _content_json(self, name, path, with_content=True):
+        sha, content = self.repos[name]['files'][path]
+        item = {
+            'type': 'file', 'name': path.rsplit('/', 1)[-1], 'path': path, 'sha': sha, 'size': len(content),
+            'url': f"{self._repo_url(name)}/contents/{path}",
+            'download_url': f"{self.url}/raw/{name}/{path}",
+            'html_url': f"https://github.com/{self.OWNER}/{name}/blob/main/{path}",
+        }
+        if with_content:
+            item.update(encoding='base64', content=base64.b64encode(content.encode()).decode())
+        return item
+
+    def _commit_json(self, name, sha, message):
+        author = {'name': 'Bench', 'email': 'bench@example.com', 'date': ISO_DATE}
+        return {
+            'sha': sha, 'url': f"{self._repo_url(name)}/commits/{sha}",
+            'html_url': f"https://github.com/{self.OWNER}/{name}/commit/{sha}",
+            'commit': {'message': message, 'author': author, 'committer': author,
+                       'url': f"{self._repo_url(name)}/git/commits/{sha}"},
+            'author': {'login': self.OWNER}, 'parents': [],
+        }
+
+    def _not_found(self):
+        return json_response(404, {'message': 'Not Found'})
+
+    def handle(self, request):
+        parts = [unquote(part) for part in request.path.strip('/').split('/')]
+        method = request.method
+        if parts == ['user']:
+            return json_response(200, {'login': self.OWNER, 'id': 1, 'url': f"{self.url}/user"})
+        if parts == ['user', 'repos']:
+            if method == 'POST':
+                name = (request.json() or {}).get('name', 'repo')
+                with self.lock:
+                    self._create_repo(name)
+                return json_response(201, self._repo_json(name))
+            with self.lock:
+                names = list(self.repos)
+            return json_response(200, [self._repo_json(name) for name in names])
+        if len(parts) < 3 or parts[0] != 'repos' or parts[2] not in self.repos:
+            return self._not_found()
+        name = parts[2]
+        if len(parts) == 3:
+            return json_response(200, self._repo_json(name))
+        section, path = parts[3], '/'.join(parts[4:])
+        if section == 'contents':
+            return self._contents(request, name, path)
+        if section == 'git':
+            return self._git(request, name, parts[4:])
+        if section == 'commits' and path:
+            if 'sha' in request.headers.get('Accept', ''):
+                return self._head(request, name)
+            return self._commit_detail(name, path)
+        if section == 'commits':
+            return self._commit_list(request, name)
+        return self._not_found()
+
+    def _contents(self, request, name, path):
+        repo = self.repos[name]
+        if request.method == 'GET':
+            with self.lock:
+                if path in repo['files']:
+                    return json_response(200, self._content_json(name, path))
+                prefix = path.rstrip('/') + '/' if path else ''
+                entries = [p for p in repo['files'] if p.startswith(prefix)]
+                if not entries:
+                    return self._not_found()
+                listing = [self._content_json(name, p, with_content=False) for p in entries if '/' not in p[len(prefix):]]
+                for directory in sorted({p[len(prefix):].split('/')[0] for p in entries if '/' in p[len(prefix):]}):
+                    listing.append({'type': 'dir', 'name': directory, 'path': prefix + directory, 'sha': '0' * 40,
+                                    'size': 0, 'url': f"{self._repo_url(name)}/contents/{prefix}{directory}",
+                                    'download_url': None, 'html_url': None})
+            return json_response(200, listing)
+        body = request.json() or {}
+        sha = hashlib.sha1(f"{name}{path}{time.time()}".encode()).hexdigest()
+        with self.lock:
+            existed = path in repo['files']
+            if request.method == 'DELETE':
+                repo['files'].pop(path, None)
+            else:
+                content = base64.b64decode(body.get('content', '')).decode('utf-8', 'replace')
+                repo['files'][path] = (blob_sha(content), content)
+            # Geri alma testleri için commit'in ağacı saklanır
+            tree_sha = self._tree_sha(repo['files'])
+            repo['trees'][tree_sha] = dict(repo['files'])
+            repo['commit_trees'][sha] = (tree_sha, repo['commits'][-1][0] if repo['commits'] else None)
+            repo['commits'].append((sha, body.get('message', 'update')))
+            content_json = self._content_json(name, path) if request.method != 'DELETE' else None
+        commit = self._commit_json(name, sha, body.get('message', 'update'))['commit']
+        commit['sha'] = sha
+        return json_response(200 if existed else 201, {'content': content_json, 'commit': commit})
+
+
+    def _commit_list(self, request, name):
+        """Dal başından (veya ?sha= commit'inden) geriye doğru sayfalı liste"""
+        per_page = int(request.query.get('per_page', ['30'])[0])
+        page = int(request.query.get('page', ['1'])[0])
+        start = request.query.get('sha', [''])[0]
+        with self.lock:
+            commits = list(reversed(self.repos[name]['commits']))
+        shas = [sha for sha, _ in commits]
+        if start in shas:
+            commits = commits[shas.index(start):]
+        commits = commits[(page - 1) * per_page:page * per_page]
+        return json_response(200, [self._commit_json(name, sha, message) for sha, message in commits])
+
+    def _commit_detail(self, name, ref):
+        """Tek commit; diff istatistikleri SHA'dan türetilir"""
+        with self.lock:
+            repo = self.repos[name]
+            commits = repo['commits']
+            # Kısa SHA da kabul edilir
+            match = next(((sha, message) for sha, message in reversed(commits) if sha.startswith(ref)), None)
+            if match is None and ref == 'main' and commits:
+                match = commits[-1]
+            if match is not None:
+                tree_sha = repo['commit_trees'].get(match[0], (self._tree_sha(repo['files']), None))[0]
+        if match is None:
+            return json_response(422, {'message': 'No commit found for SHA: ' + ref})
+        item = self._commit_json(name, *match)
+        item['commit']['tree'] = {'sha': tree_sha}
+        additions, deletions = int(match[0][:2], 16), int(match[0][2:4], 16) % 32
+        item['stats'] = {'additions': additions, 'deletions': deletions, 'total': additions + deletions}
+        item['files'] = [{'filename': f"src/file_{i}.py", 'status': 'modified'} for i in range(1 + int(match[0][4], 16) % 4)]
+        return json_response(200, item)
+
+    def _head(self, request, name):
+        """Dal başı SHA'sı (application/vnd.github.sha); ETag ile 304 desteklenir"""
+        with self.lock:
+            commits = self.repos[name]['commits']
+            if not commits:
+                return json_response(409, {'message': 'Git Repository is empty.'})
+            head = commits[-1][0]
+        etag = f'"{head}"'
+        if request.headers.get('If-None-Match') == etag:
+            return 304, {'ETag': etag}, b''
+        return 200, {'Content-Type': 'application/vnd.github.sha', 'ETag': etag}, head.encode()
+
+    @staticmethod
+    def _tree_sha(files):
+        return hashlib.sha1("".join(f"{path}{sha}" for path, (sha, _) in sorted(files.items())).encode()).hexdigest()
+
+    def _git(self, request, name, parts):
+        """Git Data API: ağaç, ref, commit, blob (RepoSync'in kullandığı alt küme)"""
+        repo = self.repos[name]
+        kind = parts[0] if parts else ''
+        body = (request.json() or {}) if request.method != 'GET' else {}
+        with self.lock:
+            head = repo['commits'][-1][0] if repo['commits'] else None
+            if head is None and not repo['files']:
+                return json_response(409, {'message': 'Git Repository is empty.'})
+            current_tree = self._tree_sha(repo['files'])
+            if kind == 'trees' and request.method == 'GET':
+                ref = parts[1] if len(parts) > 1 else ''
+                if ref not in ('main', current_tree, head):
+                    return self._not_found()
+                return json_response(200, {'sha': current_tree, 'truncated': False, 'tree': [
+                    {'path': path, 'mode': '100644', 'type': 'blob', 'sha': sha, 'size': len(content)}
+                    for path, (sha, content) in sorted(repo['files'].items())]})
+            if kind == 'ref' and parts[1:] == ['heads', 'main']:
+                return json_response(200, {'ref': 'refs/heads/main', 'object': {'type': 'commit', 'sha': head}})
+            if kind == 'commits' and request.method == 'GET':
+                tree_sha = repo['commit_trees'].get(parts[1], (current_tree, None))[0]
+                return json_response(200, {'sha': parts[1], 'tree': {'sha': tree_sha}, 'message': ''})
+            if kind == 'blobs':
+                raw = base64.b64decode(body.get('content', ''))
+                sha = blob_sha(raw)
+                repo['blobs'][sha] = raw.decode('utf-8', 'replace')
+                return json_response(201, {'sha': sha})
+            if kind == 'trees':
+                base = repo['trees'].get(body.get('base_tree'), repo['files'])
+                files = dict(base)
+                for entry in body.get('tree', ()):
+                    if 'content' in entry:
+                        files[entry['path']] = (blob_sha(entry['content']), entry['content'])
+                    elif entry.get('sha') is None:
+                        files.pop(entry['path'], None)
+                    else:
+                        files[entry['path']] = (entry['sha'], repo['blobs'].get(entry['sha'], ''))
+                tree_sha = self._tree_sha(files)
+                repo['trees'][tree_sha] = files
+                return json_response(201, {'sha': tree_sha})
+            if kind == 'commits':
+                sha = hashlib.sha1(f"{name}{body.get('tree')}{time.time()}".encode()).hexdigest()
+                parents = body.get('parents') or [None]
+                repo['commit_trees'][sha] = (body.get('tree'), parents[0])
+                repo['pending'] = repo.get('pending', {})
+                repo['pending'][sha] = body.get('message', '')
+                return json_response(201, {'sha': sha})
+            if kind == 'refs' and request.method == 'PATCH':
+                sha = body.get('sha')
+                tree_sha, parent = repo['commit_trees'].get(sha, (None, None))
+                if tree_sha is None or parent != head:
+                    return json_response(422, {'message': 'Update is not a fast forward'})
+                repo['files'] = dict(repo['trees'][tree_sha])
+                repo['commits'].append((sha, repo.get('pending', {}).pop(sha, '')))
+                return json_response(200, {'ref': 'refs/heads/main', 'object': {'type': 'commit', 'sha': sha}})
+        return self._not_found()
+
+
+class FakeRender(FakeService):
+    """RenderManager'ın kullandığı servis, deploy ve log uç noktaları"""
+
+    name = 'render'
+
+    def __init__(self, *args, services=5, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.services = {}
+        self.deploys = {}
+        self.env_vars = {}
+        for index in range(services):
+            self._create_service(f"service-{index}")
+
+    def _create_service(self, name):
+        service_id = f"srv-{hashlib.sha1(name.encode()).hexdigest()[:16]}"
+        self.services[service_id] = {
+            'id': service_id, 'name': name, 'type': 'web_service', 'repo': f"https://github.com/bench/{name}",
+            'branch': 'main', 'createdAt': ISO_DATE, 'updatedAt': ISO_DATE,
+            'serviceDetails': {'status': 'live', 'url': f"https://{name}.onrender.com"},
+        }
+        self.deploys[service_id] = []
+        self.env_vars[service_id] = {f"VAR_{i}": f"value-{i}" for i in range(5)}
+        return self.services[service_id]
+
+    def endpoint_name(self, request):
+        parts = request.path.strip('/').split('/')
+        return f"{request.method} /{'/'.join(parts[1:2] + parts[3:4])}"
+
+    def handle(self, request):
+        parts = request.path.strip('/').split('/')[1:]  # 'v1' atlanır
+        if parts == ['services']:
+            if request.method == 'POST':
+                body = request.json() or {}
+                with self.lock:
+                    service = self._create_service(body.get('name', 'service'))
+                return json_response(201, service)
+            with self.lock:
+                # Gerçek API gibi: her eleman {"service": {...}, "cursor": ...}
+                return json_response(200, [{'service': service, 'cursor': service['id']}
+                                           for service in self.services.values()])
+        if len(parts) < 2 or parts[0] != 'services' or parts[1] not in self.services:
+            return json_response(404, {'message': 'not found'})
+        service_id = parts[1]
+        if len(parts) == 2:
+            return json_response(200, self.services[service_id])
+        if parts[2] == 'deploys':
+            with self.lock:
+                if request.method == 'POST':
+                    deploy = {'id': f"dep-{len(self.deploys[service_id]) + 1}", 'status': 'build_in_progress',
+                              'createdAt': ISO_DATE, 'finishedAt': None}
+                    self.deploys[service_id].insert(0, deploy)
+                    return json_response(201, deploy)
+                limit = int(request.query.get('limit', ['20'])[0])
+                return json_response(200, self.deploys[service_id][:limit])
+        if parts[2] == 'logs':
+            return json_response(200, [{'timestamp': ISO_DATE, 'message': f"log satırı {i}"} for i in range(50)])
+        if parts[2] == 'env-vars':
+            return self._env_vars(request, service_id)
+        return json_response(404, {'message': 'not found'})
+
+    def _env_vars(self, request, service_id):
+        """Cursor sayfalı liste; PUT listenin tamamını değiştirir"""
+        with self.lock:
+            if request.method == 'PUT':
+                self.env_vars[service_id] = {item['key']: item['value'] for item in request.json() or ()}
+                return json_response(200, [{'key': key, 'value': value}
+                                           for key, value in self.env_vars[service_id].items()])
+            keys = sorted(self.env_vars[service_id])
+            limit = int(request.query.get('limit', ['20'])[0])
+            cursor = request.query.get('cursor', [''])[0]
+            start = keys.index(cursor) + 1 if cursor in keys else 0
+            return json_response(200, [{'envVar': {'key': key, 'value': self.env_vars[service_id][key]}, 'cursor': key}
+                                       for key in keys[start:start + limit]])
+
+
+def parse_service_options(text, cast=float):
+    """'openai=800,github=120' -> {'openai': 800.0, 'github': 120.0}"""
+    options = {}
+    for item in (text or '').split(','):
+        if '=' in item:
+            key, value = item.split('=', 1)
+            options[key.strip()] = cast(value)
+    return options
+
+
+DEFAULT_LATENCY_MS = {'telegram': 40, 'openai': 800, 'github': 150, 'render': 300}
+SERVICE_CLASSES = {cls.name: cls for cls in (FakeTelegram, FakeOpenAI, FakeGitHub, FakeRender)}
+
+
+def start_fakes(latency_ms=None, errors=None, jitter_ratio=0.3, seed=0):
+    """Tüm sahte servisleri başlat; {ad: servis}"""
+    latency_ms = dict(DEFAULT_LATENCY_MS, **(latency_ms or {}))
+    errors = errors or {}
+    fakes = {}
+    for name, cls in SERVICE_CLASSES.items():
+        latency = latency_ms.get(name, 0)
+        fakes[name] = cls(latency, latency * jitter_ratio, errors.get(name, 0.0), seed).start()
+    return fakes
+
+
+if __name__ == "__main__":
+    # Manuel deneme için: sahte servisleri başlat ve adreslerini yazdır
+    services = start_fakes()
+    print(json.dumps({name: service.url for name, service in services.items()}, indent=2))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        for service in services.values():
+            service.stop()
@@ -0,0 +1,438 @@
+# -*- coding: utf-8 -*-
+"""Yük testi: main.py handler'larını sahte servislere karşı güncelleme akışlarıyla sürer.
+
+Telegram, OpenAI, GitHub ve Render yerel sahte sunuculara yönlendirilir
+(benchmarks/fake_upstreams.py); gecikme ve hata oranı servis başına
+ayarlanır. Güncellemeler supervisor'daki sohbet sıralı çalıştırıcıyla
+işlenir, yani aynı sohbetin adımları sırayla, farklı sohbetler paralel
+yürür. Senaryo başına verim, gecikme yüzdelikleri ve bellek raporlanır;
+sonuçlar commit'e göre saklanır ve önceki commit ile karşılaştırılabilir.
+
+Kullanım:
+    python benchmarks/load_bench.py
+    python benchmarks/load_bench.py --scenario ai_burst --users 200 --threads 16
+    python benchmarks/load_bench.py --latency openai=1500 --errors openai=0.05,telegram=0.01
+    python benchmarks/load_bench.py --replay updates.jsonl --rate 50
+    python benchmarks/load_bench.py --compare
+"""
+import os
+import sys
+import gc
+import json
+import time
+import random
+import logging
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_upstreams import start_fakes, parse_service_options
+from supervisor import ChatSerialExecutor, update_chat_id
+
+RESULTS_PATH = os.path.join(ROOT, "benchmarks", "results", "load_bench.jsonl")
+# Karşılaştırmada bu orandan kötü değişimler gerileme sayılır
+DEFAULT_THRESHOLD = 0.15
+
+
+class UpdateFactory:
+    """Telegram'ın göndereceği biçimde ham güncellemeler üretir"""
+
+    def __init__(self):
+        self.update_id = 0
+        self.lock = threading.Lock()
+
+    def _next(self):
+        with self.lock:
+            self.update_id += 1
+            return self.update_id
+
+    @staticmethod
+    def _user(user_id):
+        return {'id': user_id, 'is_bot': False, 'first_name': 'Bench', 'username': f"bench{user_id}",
+                'language_code': 'tr'}
+
+    def message(self, user_id, text):
+        update_id = self._next()
+        message = {
+            'message_id': update_id, 'date': int(time.time()),
+            'chat': {'id': user_id, 'type': 'private'}, 'from': self._user(user_id), 'text': text,
+        }
+        if text.startswith('/'):
+            message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+        return {'update_id': update_id, 'message': message}
+
+    def callback(self, user_id, data):
+        update_id = self._next()
+        return {'update_id': update_id, 'callback_query': {
+            'id': str(update_id), 'from': self._user(user_id), 'chat_instance': str(user_id), 'data': data,
+            'message': {'message_id': 1, 'date': int(time.time()), 'text': 'menü',
+                        'chat': {'id': user_id, 'type': 'private'},
+                        'from': {'id': 1, 'is_bot': True, 'first_name': 'ReisBot'}},
+        }}
+
+
+# SENARYOLAR
+# Her senaryo (fabrika, kullanıcı sayısı, rastgele) alır ve güncelleme listesi döndürür.
+# Kullanıcıların adımları araya karıştırılır; sohbet içi sıra korunur.
+
+def _interleave(sessions):
+    updates = []
+    for step in range(max((len(s) for s in sessions), default=0)):
+        for session in sessions:
+            if step < len(session):
+                updates.append(session[step])
+    return updates
+
+
+def scenario_ai_burst(factory, users, rng):
+    """Aynı anda soru soran kullanıcılar (/ai)"""
+    sessions = []
+    for index in range(users):
+        user_id = 10_000_000 + index
+        sessions.append([factory.message(user_id, f"/ai Python'da {topic} nedir?")
+                         for topic in rng.sample(['liste', 'sözlük', 'decorator', 'generator', 'thread'], 3)])
+    return _interleave(sessions)
+
+
+def scenario_github_browse(factory, users, rng):
+    """GitHub menüsü: repo listesi, dosya listesi, commit geçmişi"""
+    sessions = []
+    for index in range(users):
+        user_id = 20_000_000 + index
+        repo = f"repo-{rng.randrange(20)}"
+        sessions.append([
+            factory.message(user_id, "📁 GitHub Yönetimi"),
+            factory.callback(user_id, "github_list_repos"),
+            factory.callback(user_id, "github_list_files"),
+            factory.message(user_id, repo),
+            factory.callback(user_id, "github_commits"),
+            factory.message(user_id, repo),
+        ])
+    return _interleave(sessions)
+
+
+def scenario_autodeploy(factory, users, rng):
+    """/autodeploy: repo oluşturma, dosya yükleme, Render servis ve deploy"""
+    count = max(1, users // 10)
+    return [factory.message(30_000_000 + index, f"/autodeploy bench-app-{index}-{rng.randrange(10 ** 6)}")
+            for index in range(count)]
+
+
+def scenario_media(factory, users, rng):
+    """AI görsel üretimi (indirme + fotoğraf gönderimi) ve QR kod"""
+    sessions = []
+    for index in range(users):
+        user_id = 40_000_000 + index
+        sessions.append([
+            factory.message(user_id, f"/image gün batımında {rng.choice(['deniz', 'dağ', 'şehir'])}"),
+            factory.message(user_id, f"/qr https://example.com/{index}"),
+        ])
+    return _interleave(sessions)
+
+
+SCENARIOS = {
+    'ai_burst': scenario_ai_burst,
+    'github_browse': scenario_github_browse,
+    'autodeploy': scenario_autodeploy,
+    'media': scenario_media,
+}
+
+
+def load_replay(path):
+    """Kayıtlı güncellemeler: satır başına bir ham Telegram güncellemesi (getUpdates çıktısı)"""
+    updates = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                item = json.loads(line)
+                updates.append(item.get('update', item))
+    return updates
+
+
+# ÇALIŞTIRMA
+def prepare_environment(fakes, work_dir, send_rate):
+    """main.py import edilmeden önce tüm servisleri sahte sunuculara yönlendir"""
+    os.environ.update({
+        'BOT_TOKEN': '123456:bench-token',
+        'OPENAI_KEY': 'sk-bench',
+        'OPENAI_BASE_URL': fakes['openai'].url + '/v1',
+        'GITHUB_TOKEN': 'ghp_bench',
+        'GITHUB_USER': 'bench',
+        'GITHUB_API_URL': fakes['github'].url,
+        'RENDER_API_KEY': 'rnd_bench',
+        'RENDER_OWNER_ID': 'own-bench',
+        'RENDER_API_URL': fakes['render'].url + '/v1',
+        'DB_PATH': os.path.join(work_dir, 'bench.db'),
+        'SEND_GLOBAL_RATE': str(send_rate),
+        'PUBLIC_URL': '',
+        'USE_WEBHOOK': 'false',
+        'METRICS_ENABLED': 'false',
+    })
+    from telebot import apihelper
+    apihelper.API_URL = fakes['telegram'].url + '/bot{0}/{1}'
+
+
+def percentiles(values):
+    if not values:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    ordered = sorted(values)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {'p50': round(pick(0.50), 1), 'p95': round(pick(0.95), 1),
+            'p99': round(pick(0.99), 1), 'max': round(ordered[-1] * 1000, 1)}
+
+
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return None
+
+
+def run_scenario(bot_main, types, fakes, name, updates, threads, rate, trace_memory):
+    for fake in fakes.values():
+        fake.reset()
+    gc.collect()
+    rss_before = current_rss_mb()
+    if trace_memory:
+        tracemalloc.start()
+
+    total = len(updates)
+    service, response = [], []
+    state = {'completed': 0, 'errors': 0}
+    lock = threading.Lock()
+    done = threading.Event()
+    if not total:
+        done.set()
+
+    def process(raw, submitted):
+        started = time.perf_counter()
+        failed = False
+        try:
+            bot_main.bot.process_new_updates([types.Update.de_json(raw)])
+        except Exception as e:
+            failed = True
+            logging.getLogger(__name__).error("Güncelleme hatası: %s", e)
+        finished = time.perf_counter()
+        with lock:
+            service.append(finished - started)
+            response.append(finished - submitted)
+            state['errors'] += failed
+            state['completed'] += 1
+            if state['completed'] == total:
+                done.set()
+
+    executor = ChatSerialExecutor(threads)
+    started = time.perf_counter()
+    for index, raw in enumerate(updates):
+        submitted = time.perf_counter()
+        if rate:
+            # Açık döngü: güncellemeler sabit hızla gelir, yanıt süresi kuyrukta beklemeyi de içerir
+            submitted = started + index / rate
+            delay = submitted - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        executor.submit(update_chat_id(raw), process, raw, submitted)
+    done.wait()
+    wall = time.perf_counter() - started
+    executor.shutdown()
+
+    result = {
+        'updates': total,
+        'wall_s': round(wall, 3),
+        'throughput': round(total / wall, 2) if wall else 0.0,
+        'errors': state['errors'],
+        'service_ms': percentiles(service),
+        'response_ms': percentiles(response),
+        'upstream': {fake_name: fake.get_stats() for fake_name, fake in fakes.items()},
+        'telegram_messages': sum(fakes['telegram'].sent.values()),
+        'maxrss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    rss_after = current_rss_mb()
+    if rss_after is not None:
+        result['rss_mb'] = round(rss_after, 1)
+        result['rss_delta_mb'] = round(rss_after - rss_before, 1)
+    if trace_memory:
+        result['traced_peak_mb'] = round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+        tracemalloc.stop()
+    return result
+
+
+def print_result(name, result):
+    service = result['service_ms']
+    response = result['response_ms']
+    print(f"\n▶ {name}: {result['updates']} güncelleme, {result['wall_s']} sn, "
+          f"{result['throughput']} güncelleme/sn, {result['errors']} hata")
+    print(f"  işlem süresi  ms  p50 {service['p50']:>8}  p95 {service['p95']:>8}  "
+          f"p99 {service['p99']:>8}  max {service['max']:>8}")
+    print(f"  yanıt süresi  ms  p50 {response['p50']:>8}  p95 {response['p95']:>8}  "
+          f"p99 {response['p99']:>8}  max {response['max']:>8}")
+    calls = ", ".join(f"{fake_name} {stats['calls']} ({stats['errors']} hata)"
+                      for fake_name, stats in result['upstream'].items() if stats['calls'])
+    print(f"  servis çağrıları: {calls or 'yok'}; Telegram'a {result['telegram_messages']} mesaj")
+    memory = f"  bellek: RSS {result.get('rss_mb', '?')} MB (Δ {result.get('rss_delta_mb', '?')}), zirve {result['maxrss_mb']} MB"
+    if 'traced_peak_mb' in result:
+        memory += f", Python zirve {result['traced_peak_mb']} MB"
+    print(memory)
+
+
+# SONUÇ SAKLAMA VE KARŞILAŞTIRMA
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def save_record(path, record):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def find_baseline(path, record, ref=None):
+    """Karşılaştırılacak kayıt: ref verilirse o commit'in, yoksa başka bir commit'in son kaydı"""
+    if not os.path.exists(path):
+        return None
+    baseline = None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            candidate = json.loads(line)
+            if candidate is record or candidate.get('config') != record['config']:
+                continue
+            if ref:
+                if candidate['commit'].startswith(ref):
+                    baseline = candidate
+            elif candidate['commit'] != record['commit']:
+                baseline = candidate
+    return baseline
+
+
+def compare(record, baseline, threshold):
+    """Değişimleri yazdır; gerileme sayısını döndür"""
+    print(f"\n⚖️ Karşılaştırma: {baseline['commit'][:10]} ({baseline['time']}) → {record['commit'][:10]}")
+    # (ad, değeri bulan fonksiyon, büyük olan mı iyi)
+    checks = (
+        ('verim', lambda r: r['throughput'], True),
+        ('işlem p95', lambda r: r['service_ms']['p95'], False),
+        ('yanıt p99', lambda r: r['response_ms']['p99'], False),
+        ('hata', lambda r: r['errors'], False),
+        ('zirve RSS', lambda r: r['maxrss_mb'], False),
+    )
+    regressions = 0
+    for name, result in record['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if old is None:
+            continue
+        parts = []
+        for label, value, higher_is_better in checks:
+            before, after = value(old), value(result)
+            change = (after - before) / before if before else (1.0 if after else 0.0)
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > threshold:
+                flag = " ⚠️"
+                regressions += 1
+            parts.append(f"{label} {before}→{after} ({change * 100:+.0f}%){flag}")
+        print(f"  {name}: " + "; ".join(parts))
+    print("✅ Gerileme yok" if not regressions else f"⚠️ {regressions} gerileme (eşik %{threshold * 100:.0f})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sahte servislerle yük testi")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Çalıştırılacak senaryo (tekrarlanabilir; varsayılan: hepsi)")
+    parser.add_argument("--replay", help="Kayıtlı güncellemeler (JSONL) ile 'replay' senaryosu çalıştır")
+    parser.add_argument("--users", type=int, default=50, help="Senaryo başına sanal kullanıcı")
+    parser.add_argument("--threads", type=int, default=8, help="Handler thread sayısı")
+    parser.add_argument("--rate", type=float, default=0, help="Güncelleme/sn (0: hepsini birden gönder)")
+    parser.add_argument("--latency", default="", help="Servis gecikmesi ms, örn: openai=800,github=150")
+    parser.add_argument("--errors", default="", help="Hata oranı, örn: openai=0.05,telegram=0.01")
+    parser.add_argument("--send-rate", type=float, default=1000,
+                        help="Gönderim kuyruğu global limiti (Telegram'ın 30/sn limiti için 30)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tracemalloc", action="store_true", help="Python bellek zirvesini de ölç (yavaşlatır)")
+    parser.add_argument("--results", default=RESULTS_PATH, help="Sonuç dosyası (JSONL)")
+    parser.add_argument("--no-save", action="store_true", help="Sonucu kaydetme")
+    parser.add_argument("--compare", nargs="?", const="", default=None, metavar="COMMIT",
+                        help="Önceki bir commit'in sonucuyla karşılaştır")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--fail-on-regression", action="store_true", help="Gerileme varsa 1 ile çık")
+    parser.add_argument("--verbose", action="store_true", help="Bot loglarını göster")
+    args = parser.parse_args()
+
+    latency = parse_service_options(args.latency)
+    errors = parse_service_options(args.errors)
+    fakes = start_fakes(latency, errors, seed=args.seed)
+    work_dir = tempfile.mkdtemp(prefix="reisbot-load-")
+    prepare_environment(fakes, work_dir, args.send_rate)
+    # Handler'ların yazdığı geçici dosyalar (görsel, QR) depo dizinini kirletmesin
+    os.chdir(work_dir)
+
+    import main as bot_main
+    from telebot import types
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    bot_main.bot.threaded = False
+    bot_main.start_services(primary=False)
+
+    rng = random.Random(args.seed)
+    factory = UpdateFactory()
+    plan = []
+    if args.replay:
+        plan.append(('replay', load_replay(args.replay)))
+    if args.scenario or not args.replay:
+        for name in args.scenario or SCENARIOS:
+            plan.append((name, SCENARIOS[name](factory, args.users, rng)))
+
+    commit, dirty = git_revision()
+    record = {
+        'commit': commit,
+        'dirty': dirty,
+        'time': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'config': {'users': args.users, 'threads': args.threads, 'rate': args.rate,
+                   'latency': latency, 'errors': errors, 'send_rate': args.send_rate,
+                   'replay': os.path.basename(args.replay) if args.replay else None},
+        'scenarios': {},
+    }
+    print(f"🧪 Yük testi: commit {commit[:10]}{' (değişiklik var)' if dirty else ''}, "
+          f"{args.threads} thread, {args.users} kullanıcı")
+    try:
+        for name, updates in plan:
+            result = run_scenario(bot_main, types, fakes, name, updates, args.threads, args.rate, args.tracemalloc)
+            record['scenarios'][name] = result
+            print_result(name, result)
+    finally:
+        bot_main.stop_services()
+        for fake in fakes.values():
+            fake.stop()
+
+    if not args.no_save:
+        save_record(args.results, record)
+        print(f"\n💾 Sonuç kaydedildi: {args.results}")
+    if args.compare is not None:
+        baseline = find_baseline(args.results, record, args.compare or None)
+        if baseline is None:
+            print("\nKarşılaştırılacak önceki sonuç bulunamadı (aynı ayarlarla).")
+        elif compare(record, baseline, args.threshold) and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""Bot açılış süresi ölçümü.
+
+Hedef modül (varsayılan: main) temiz bir Python sürecinde `-X importtime`
+ile import edilir; toplam süre ve paket başına import maliyeti raporlanır.
+--lazy ile ilk kullanıma ertelenen ağır modüllerin tek başına yükleme
+maliyeti de ölçülür.
+
+Kullanım:
+    python benchmarks/startup_bench.py --runs 5 --top 15
+    python benchmarks/startup_bench.py --lazy
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Açılışta değil, ilgili özellik ilk kullanıldığında yüklenen modüller
+LAZY_MODULES = ('PIL.Image', 'qrcode', 'gtts', 'pydub', 'youtube_dl', 'openai', 'github')
+
+
+def bench_env(db_path):
+    """Ağ çağrısı yapılmadan import edilebilmesi için sahte ortam değişkenleri"""
+    env = dict(os.environ)
+    env.setdefault("BOT_TOKEN", "123456:benchmark")
+    env["DB_PATH"] = db_path
+    return env
+
+
+def import_once(module, env):
+    """(duvar saati sn, -X importtime çıktısı)"""
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        tail = "\n".join(result.stderr.strip().splitlines()[-5:])
+        raise RuntimeError(f"{module} import edilemedi:\n{tail}")
+    return elapsed, result.stderr
+
+
+def parse_importtime(output):
+    """Üst seviye paket başına toplam 'self' süresi (µs)"""
+    per_package = defaultdict(int)
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, _, name = line[len("import time:"):].split("|")
+            per_package[name.strip().split(".")[0]] += int(self_us)
+        except ValueError:
+            continue
+    return per_package
+
+
+def run(module, runs, top):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = bench_env(os.path.join(tmp, "bench.db"))
+        # İlk çalıştırma .pyc dosyalarını üretir, ölçüme katılmaz
+        import_once(module, env)
+        walls = []
+        totals = defaultdict(list)
+        for _ in range(runs):
+            wall, output = import_once(module, env)
+            walls.append(wall)
+            for package, us in parse_importtime(output).items():
+                totals[package].append(us)
+
+    print(f"{module} import (süreç dahil): medyan {statistics.median(walls) * 1000:.0f} ms, "
+          f"en iyi {min(walls) * 1000:.0f} ms ({runs} çalıştırma)")
+    ranked = sorted(((statistics.median(v), k) for k, v in totals.items()), reverse=True)
+    total_us = sum(us for us, _ in ranked)
+    print(f"Toplam import süresi: {total_us / 1000:.0f} ms, {len(ranked)} paket")
+    print(f"\n{'Paket':<28}{'ms':>10}{'pay':>8}")
+    for us, package in ranked[:top]:
+        print(f"{package:<28}{us / 1000:>10.1f}{us / total_us * 100 if total_us else 0:>7.1f}%")
+
+
+def run_lazy(runs):
+    print(f"\n{'Ertelenen modül':<28}{'ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        env = bench_env(os.path.join(tmp, "bench.db"))
+        for module in LAZY_MODULES:
+            try:
+                import_once(module, env)
+                walls = [import_once(module, env)[0] for _ in range(runs)]
+                baseline = min(import_once("os", env)[0] for _ in range(runs))
+            except RuntimeError:
+                print(f"{module:<28}{'kurulu değil':>10}")
+                continue
+            print(f"{module:<28}{(statistics.median(walls) - baseline) * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Açılış (import) süresi benchmark'ı")
+    parser.add_argument("--module", default="main", help="Import edilecek modül")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="Listelenecek paket sayısı")
+    parser.add_argument("--lazy", action="store_true", help="Ertelenen modüllerin yükleme maliyetini de ölç")
+    args = parser.parse_args()
+
+    run(args.module, args.runs, args.top)
+    if args.lazy:
+        run_lazy(args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""PremiumFeatures yazma performansı ölçümü.
+
+Eşzamanlı handler'ları taklit eden N thread, her biri kendi bağlantısıyla
+add_user / add_note / log_usage yazıları yapar.
+
+Kullanım:
+    python benchmarks/storage_bench.py --threads 8 --ops 2000
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from premium_features import PremiumFeatures
+
+
+def worker(store, thread_no, ops, barrier, errors):
+    barrier.wait()
+    base = thread_no * 1_000_000
+    try:
+        for i in range(ops):
+            user_id = base + (i % 500)
+            kind = i % 3
+            if kind == 0:
+                store.add_user(user_id, f"user{user_id}", "Ad", "Soyad")
+            elif kind == 1:
+                store.add_note(user_id, f"Not {i}", "Benchmark içeriği " * 4)
+            else:
+                store.log_usage(user_id, "/ai")
+    except Exception as e:
+        errors.append(e)
+
+
+def run(threads, ops, db_path):
+    store = PremiumFeatures(db_path)
+    barrier = threading.Barrier(threads + 1)
+    errors = []
+    workers = [
+        threading.Thread(target=worker, args=(store, n, ops, barrier, errors))
+        for n in range(threads)
+    ]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    store.close()
+
+    total = threads * ops
+    print(f"threads={threads} ops/thread={ops} toplam={total}")
+    print(f"süre={elapsed:.2f} sn  yazma/sn={total / elapsed:,.0f}  hata={len(errors)}")
+    if errors:
+        print(f"ilk hata: {errors[0]}")
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PremiumFeatures SQLite yazma benchmark'ı")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--db", default=None, help="Veritabanı yolu (varsayılan: geçici dosya)")
+    args = parser.parse_args()
+
+    if args.db:
+        run(args.threads, args.ops, args.db)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        run(args.threads, args.ops, os.path.join(tmp, "bench.db"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+import time
+import sqlite3
+import logging
+import threading
+from collections import deque
+from send_queue import send_bulk, wait_result
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 500
+SEND_WINDOW = 200
+CHECKPOINT_EVERY = 500
+
+# Bu hatalar alıcının artık ulaşılamaz olduğunu gösterir
+UNREACHABLE_MARKERS = (
+    'bot was blocked by the user',
+    'user is deactivated',
+    'chat not found',
+    'bot was kicked'
+)
+
+
+def is_unreachable_error(error):
+    """Telegram hatası kullanıcının botu engellediğini/silindiğini mi gösteriyor"""
+    code = getattr(error, 'error_code', None)
+    description = str(getattr(error, 'description', '') or error).lower()
+    if code not in (400, 403):
+        return False
+    return any(marker in description for marker in UNREACHABLE_MARKERS)
+
+
+class BroadcastManager:
+    def __init__(self, bot, db_path, user_store, send_queue=None):
+        self.bot = bot
+        self.user_store = user_store
+        self.send_queue = send_queue
+        self.lock = threading.Lock()
+        self.workers = {}
+        self.cancelled = set()
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._init_db()
+
+    def _init_db(self):
+        """Broadcast kontrol noktası tablosunu oluştur"""
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS broadcasts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    text TEXT NOT NULL,
+                    parse_mode TEXT,
+                    created_by INTEGER,
+                    report_chat_id INTEGER,
+                    status TEXT NOT NULL DEFAULT 'running',
+                    last_user_id INTEGER NOT NULL DEFAULT 0,
+                    sent INTEGER NOT NULL DEFAULT 0,
+                    failed INTEGER NOT NULL DEFAULT 0,
+                    blocked INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_broadcasts_status ON broadcasts (status)")
+
+    def _db(self, sql, params=()):
+        with self.lock:
+            with self.conn:
+                return self.conn.execute(sql, params)
+
+    def start_broadcast(self, text, created_by, report_chat_id, parse_mode=None):
+        """Yeni broadcast oluştur ve arka planda göndermeye başla"""
+        try:
+            now = time.time()
+            cursor = self._db(
+                "INSERT INTO broadcasts (text, parse_mode, created_by, report_chat_id, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (text, parse_mode, created_by, report_chat_id, now, now)
+            )
+            broadcast_id = cursor.lastrowid
+            self._spawn(broadcast_id)
+            return f"📣 Broadcast #{broadcast_id} başlatıldı."
+        except Exception as e:
+            logger.error("Broadcast başlatma hatası: %s", e)
+            return f"❌ Broadcast başlatma hatası: {str(e)}"
+
+    def resume_pending(self):
+        """Çökme/yeniden başlatma sonrası yarım kalan broadcast'leri kaldığı yerden sürdür"""
+        rows = self._db("SELECT id, last_user_id FROM broadcasts WHERE status = 'running'").fetchall()
+        for row in rows:
+            logger.info("Broadcast #%s kullanıcı %s sonrasından sürdürülüyor", row['id'], row['last_user_id'])
+            self._spawn(row['id'])
+        return len(rows)
+
+    def cancel_broadcast(self, broadcast_id):
+        """Devam eden broadcast'i durdur"""
+        row = self.get_broadcast(broadcast_id)
+        if not row or row['status'] != 'running':
+            return f"❌ #{broadcast_id} numaralı aktif broadcast bulunamadı."
+        self.cancelled.add(broadcast_id)
+        self._db("UPDATE broadcasts SET status = 'cancelled', updated_at = ? WHERE id = ?", (time.time(), broadcast_id))
+        return f"🛑 Broadcast #{broadcast_id} durduruluyor."
+
+    def get_broadcast(self, broadcast_id):
+        row = self._db("SELECT * FROM broadcasts WHERE id = ?", (broadcast_id,)).fetchone()
+        return dict(row) if row else None
+
+    def list_broadcasts(self, limit=5):
+        """Son broadcast'leri döndür"""
+        rows = self._db("SELECT * FROM broadcasts ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def _spawn(self, broadcast_id):
+        with self.lock:
+            worker = self.workers.get(broadcast_id)
+            if worker and worker.is_alive():
+                return
+            worker = threading.Thread(
+                target=self._run, args=(broadcast_id,), name=f"broadcast-{broadcast_id}", daemon=True
+            )
+            self.workers[broadcast_id] = worker
+        worker.start()
+
+    def _checkpoint(self, broadcast_id, counters, last_user_id, status='running'):
+        self._db(
+            "UPDATE broadcasts SET last_user_id = ?, sent = ?, failed = ?, blocked = ?, "
+            "status = CASE WHEN status = 'cancelled' THEN status ELSE ? END, updated_at = ? WHERE id = ?",
+            (last_user_id, counters['sent'], counters['failed'], counters['blocked'], status, time.time(), broadcast_id)
+        )
+
+    def _run(self, broadcast_id):
+        """Alıcıları sayfa sayfa gez, kuyruğa ver ve ilerlemeyi kaydet"""
+        row = self.get_broadcast(broadcast_id)
+        if not row:
+            return
+        counters = {'sent': row['sent'], 'failed': row['failed'], 'blocked': row['blocked']}
+        last_user_id = row['last_user_id']
+        pending = deque()
+        since_checkpoint = 0
+
+        def settle(user_id, outcome):
+            # outcome: None (başarılı) veya gönderimde oluşan hata
+            if outcome is None:
+                counters['sent'] += 1
+            elif is_unreachable_error(outcome):
+                counters['blocked'] += 1
+                try:
+                    self.user_store.mark_user_blocked(user_id)
+                except Exception as e:
+                    logger.error("Kullanıcı engelleme kaydı hatası (%s): %s", user_id, e)
+            else:
+                counters['failed'] += 1
+
+        try:
+            after_id = last_user_id
+            while broadcast_id not in self.cancelled:
+                user_ids = self.user_store.get_user_ids_page(after_id, PAGE_SIZE)
+                if not user_ids:
+                    break
+                after_id = user_ids[-1]
+
+                for user_id in user_ids:
+                    if broadcast_id in self.cancelled:
+                        break
+                    pending.append((user_id, self._send(user_id, row)))
+
+                    # Sabit bir pencere kadar gönderim havada kalır, fazlası beklenir
+                    while len(pending) > SEND_WINDOW:
+                        done_id, future = pending.popleft()
+                        settle(done_id, wait_result(future))
+                        last_user_id = done_id
+                        since_checkpoint += 1
+
+                    if since_checkpoint >= CHECKPOINT_EVERY:
+                        self._checkpoint(broadcast_id, counters, last_user_id)
+                        since_checkpoint = 0
+
+            while pending:
+                done_id, future = pending.popleft()
+                settle(done_id, wait_result(future))
+                last_user_id = done_id
+
+            status = 'cancelled' if broadcast_id in self.cancelled else 'done'
+            self._checkpoint(broadcast_id, counters, last_user_id, status)
+            self._report(row, counters, status)
+        except Exception as e:
+            logger.error("Broadcast #%s hatası: %s", broadcast_id, e)
+            # Durum 'running' kalır; resume_pending son kontrol noktasından sürdürür
+            self._checkpoint(broadcast_id, counters, last_user_id)
+        finally:
+            self.cancelled.discard(broadcast_id)
+
+    def _send(self, user_id, row):
+        """Mesajı toplu öncelikle kuyruğa ver; kuyruk yoksa doğrudan gönder"""
+        kwargs = {'parse_mode': row['parse_mode']} if row['parse_mode'] else {}
+        return send_bulk(self.bot, self.send_queue, user_id, row['text'], **kwargs)
+
+    def _report(self, row, counters, status):
+        if not row['report_chat_id']:
+            return
+        title = "✅ Broadcast tamamlandı" if status == 'done' else "🛑 Broadcast durduruldu"
+        text = (
+            f"{title} (#{row['id']})\n\n"
+            f"📨 Gönderilen: {counters['sent']}\n"
+            f"🚫 Engelleyen/silinen: {counters['blocked']}\n"
+            f"❌ Hatalı: {counters['failed']}"
+        )
+        try:
+            self.bot.send_message(row['report_chat_id'], text)
+        except Exception as e:
+            logger.error("Broadcast rapor hatası: %s", e)
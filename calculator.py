@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+import re
+import ast
+import math
+import time
+import logging
+import operator
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+MAX_EXPRESSION_LENGTH = 300
+MAX_DEPTH = 40
+MAX_INT_BITS = 10000
+MAX_EXPONENT = 10000
+MAX_FACTORIAL = 1000
+MAX_RANGE_ITEMS = 10000
+CPU_BUDGET = 0.5
+
+RANGE_PATTERN = re.compile(
+    r'^(?P<expr>.+?)\s+for\s+(?P<var>[a-zA-Z_]\w*)\s+in\s+'
+    r'(?P<start>-?\d+(?:\.\d+)?)\s*\.\.\s*(?P<stop>-?\d+(?:\.\d+)?)'
+    r'(?:\s+step\s+(?P<step>\d+(?:\.\d+)?))?\s*$'
+)
+
+CONSTANTS = {
+    'pi': math.pi,
+    'e': math.e,
+    'tau': math.tau
+}
+
+
+class CalcError(Exception):
+    pass
+
+
+def _check_int(value):
+    if isinstance(value, int) and value.bit_length() > MAX_INT_BITS:
+        raise CalcError("Sonuç çok büyük")
+    return value
+
+
+def _safe_pow(base, exponent):
+    if isinstance(base, int) and isinstance(exponent, int) and exponent > 0:
+        # Sonucun bit sayısını hesaplamadan önce tahmin et (9**9**9 gibi ifadeler için)
+        if exponent > MAX_EXPONENT or exponent * max(abs(base), 1).bit_length() > MAX_INT_BITS:
+            raise CalcError("Üs çok büyük")
+    elif isinstance(exponent, (int, float)) and abs(exponent) > MAX_EXPONENT and abs(base) not in (0, 1):
+        raise CalcError("Üs çok büyük")
+    result = operator.pow(base, exponent)
+    if isinstance(result, complex):
+        raise CalcError("Sonuç karmaşık sayı")
+    return result
+
+
+def _safe_factorial(n):
+    if not float(n).is_integer() or n < 0:
+        raise CalcError("Faktöriyel sadece pozitif tam sayılar için")
+    if n > MAX_FACTORIAL:
+        raise CalcError(f"Faktöriyel en fazla {MAX_FACTORIAL}!")
+    return math.factorial(int(n))
+
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: _safe_pow
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg
+}
+
+FUNCTIONS = {
+    'sqrt': math.sqrt,
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'asin': math.asin,
+    'acos': math.acos,
+    'atan': math.atan,
+    'log': math.log,
+    'ln': math.log,
+    'log10': math.log10,
+    'log2': math.log2,
+    'exp': math.exp,
+    'abs': abs,
+    'round': round,
+    'floor': math.floor,
+    'ceil': math.ceil,
+    'factorial': _safe_factorial,
+    'min': min,
+    'max': max,
+    'hypot': math.hypot,
+    'degrees': math.degrees,
+    'radians': math.radians
+}
+
+
+class _Budget:
+    # Bu thread'in CPU süresi: eşzamanlı handler'lar birbirinin bütçesini tüketmez
+    __slots__ = ('deadline',)
+
+    def __init__(self, seconds):
+        self.deadline = time.thread_time() + seconds
+
+    def check(self):
+        if time.thread_time() > self.deadline:
+            raise CalcError("Hesaplama zaman sınırını aştı")
+
+
+def _compile_node(node, variables, depth=0):
+    """AST düğümünü (env, budget) alan bir closure'a derle; izin listesi dışı her şey reddedilir"""
+    if depth > MAX_DEPTH:
+        raise CalcError("İfade çok derin")
+
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body, variables, depth + 1)
+
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise CalcError("Sadece sayılar kullanılabilir")
+        value = _check_int(node.value)
+        return lambda env, budget: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        if name in variables:
+            return lambda env, budget: env[name]
+        if name in CONSTANTS:
+            value = CONSTANTS[name]
+            return lambda env, budget: value
+        raise CalcError(f"Bilinmeyen isim: {name}")
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        op = UNARY_OPERATORS[type(node.op)]
+        operand = _compile_node(node.operand, variables, depth + 1)
+        return lambda env, budget: op(operand(env, budget))
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        op = BINARY_OPERATORS[type(node.op)]
+        left = _compile_node(node.left, variables, depth + 1)
+        right = _compile_node(node.right, variables, depth + 1)
+
+        def binary(env, budget):
+            budget.check()
+            return _check_int(op(left(env, budget), right(env, budget)))
+        return binary
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS or node.keywords:
+            raise CalcError("İzin verilmeyen fonksiyon çağrısı")
+        func = FUNCTIONS[node.func.id]
+        args = [_compile_node(arg, variables, depth + 1) for arg in node.args]
+        if not args:
+            raise CalcError(f"{node.func.id} en az bir argüman almalı")
+
+        def call(env, budget):
+            budget.check()
+            return _check_int(func(*[arg(env, budget) for arg in args]))
+        return call
+
+    raise CalcError(f"İzin verilmeyen ifade: {type(node).__name__}")
+
+
+@lru_cache(maxsize=512)
+def compile_expression(expression, variables=()):
+    """İfadeyi doğrula ve derlenmiş halini önbelleğe al"""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise CalcError(f"İfade en fazla {MAX_EXPRESSION_LENGTH} karakter olabilir")
+    source = expression.replace('^', '**').replace('×', '*').replace('÷', '/')
+    try:
+        tree = ast.parse(source, mode='eval')
+    except (SyntaxError, ValueError, RecursionError):
+        raise CalcError("Geçersiz ifade")
+    return _compile_node(tree, frozenset(variables))
+
+
+def _run(compiled, env, budget):
+    try:
+        result = compiled(env, budget)
+    except CalcError:
+        raise
+    except ZeroDivisionError:
+        raise CalcError("Sıfıra bölme hatası")
+    except OverflowError:
+        raise CalcError("Sonuç çok büyük")
+    except (ValueError, TypeError) as e:
+        raise CalcError(f"Matematik hatası: {e}")
+    if isinstance(result, float) and not math.isfinite(result):
+        raise CalcError("Sonuç tanımsız veya çok büyük")
+    return result
+
+
+def evaluate(expression, cpu_budget=CPU_BUDGET):
+    """Tek bir ifadeyi hesapla"""
+    compiled = compile_expression(expression.strip())
+    return _run(compiled, {}, _Budget(cpu_budget))
+
+
+def evaluate_range(expression, variable, start, stop, step=1, cpu_budget=CPU_BUDGET):
+    """'x^2 for x in 1..1000' gibi bir aralık için ifadeyi toplu hesapla (derleme bir kez yapılır)"""
+    if step <= 0:
+        raise CalcError("Adım pozitif olmalı")
+    count = int((stop - start) / step) + 1
+    if count <= 0:
+        raise CalcError("Aralık boş")
+    if count > MAX_RANGE_ITEMS:
+        raise CalcError(f"Aralık en fazla {MAX_RANGE_ITEMS} eleman olabilir")
+
+    compiled = compile_expression(expression.strip(), (variable,))
+    budget = _Budget(cpu_budget)
+    env = {}
+    values = []
+    integral = all(float(v).is_integer() for v in (start, step))
+    for i in range(count):
+        x = start + i * step
+        env[variable] = int(x) if integral else x
+        values.append((env[variable], _run(compiled, env, budget)))
+    return values
+
+
+def format_number(value):
+    """Sonucu okunabilir biçimde yaz"""
+    if isinstance(value, int):
+        text = str(value)
+        if len(text) > 60:
+            return f"{text[:20]}…(toplam {len(text)} basamak)"
+        return text
+    if isinstance(value, float):
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return f"{value:.10g}"
+    return str(value)
+
+
+def calculate(text):
+    """Kullanıcı ifadesini hesapla ve yanıt metnini döndür"""
+    text = (text or '').strip()
+    if not text:
+        return "❌ Hesaplanacak ifade yaz. Örnek: 2*(3+4) veya x^2 for x in 1..10"
+    try:
+        match = RANGE_PATTERN.match(text)
+        if match:
+            start, stop = float(match.group('start')), float(match.group('stop'))
+            step = float(match.group('step') or 1)
+            values = evaluate_range(match.group('expr'), match.group('var'), start, stop, step)
+            results = [result for _, result in values]
+            shown = values if len(values) <= 15 else values[:10] + [None] + values[-3:]
+            lines = [f"🧮 {match.group('expr')} ({len(values)} değer)\n"]
+            for item in shown:
+                if item is None:
+                    lines.append("…")
+                else:
+                    lines.append(f"{match.group('var')}={format_number(item[0])} → {format_number(item[1])}")
+            lines.append(f"\nΣ Toplam: {format_number(sum(results))}")
+            lines.append(f"⬇️ Min: {format_number(min(results))}  ⬆️ Maks: {format_number(max(results))}")
+            return "\n".join(lines)
+
+        result = evaluate(text)
+        return f"🧮 {text} = {format_number(result)}"
+    except CalcError as e:
+        return f"❌ {e}"
+    except Exception as e:
+        logger.error("Hesap makinesi hatası: %s", e)
+        return f"❌ Hesaplama hatası: {str(e)}"
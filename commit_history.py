@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from repo_index import HEAD_TTL, MAX_REPOS
+
+logger = logging.getLogger(__name__)
+
+# GitHub'ın commit listesinde izin verdiği en büyük sayfa
+FETCH_PAGE_SIZE = 100
+# Dal başı bu kadar sayfadan fazla ilerlediyse geçmiş baştan yüklenir
+MAX_CATCHUP_PAGES = 5
+# Görünen sayfanın diff istatistikleri bu kadar paralel istekle çekilir
+STATS_WORKERS = 5
+
+
+def parse_commit(item):
+    """GitHub commit nesnesinden liste için gereken alanlar"""
+    commit = item.get('commit') or {}
+    author = commit.get('author') or {}
+    return {
+        'sha': item['sha'],
+        'message': commit.get('message', ''),
+        'author': author.get('name') or (item.get('author') or {}).get('login', '?'),
+        # '2024-05-01T12:34:56Z' -> '2024-05-01 12:34'
+        'date': (author.get('date') or '')[:16].replace('T', ' '),
+    }
+
+
+class CommitHistoryCache:
+    """Repo başına dal başından geriye doğru commit listesi.
+
+    Liste dal başı SHA'sına bağlıdır: dal ilerlediyse sadece yeni commit'ler
+    çekilip başa eklenir, eski sayfalar tekrar indirilmez. Eski commit'ler
+    ihtiyaç oldukça (sayfa ileri gidildikçe) 100'lük sayfalarla yüklenir.
+    Diff istatistikleri (eklenen/silinen satır, dosya sayısı) commit başına
+    ayrı istek gerektirdiği için sadece gösterilen sayfa için ve paralel
+    çekilir; commit değişmediğinden bir kez alınması yeter.
+    """
+
+    def __init__(self, api, ttl=HEAD_TTL, max_repos=MAX_REPOS, workers=STATS_WORKERS):
+        self.api = api
+        self.ttl = ttl
+        self.max_repos = max_repos
+        # repo -> {'head', 'etag', 'checked', 'commits', 'seen', 'base', 'pages', 'complete', 'stats'}
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._repo_locks = {}
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="commit-stats")
+        self.stats = {'requests': 0, 'hits': 0, 'head_checks': 0, 'rebuilds': 0,
+                      'appended': 0, 'pages_fetched': 0, 'stats_fetched': 0}
+
+    def _repo_lock(self, repo):
+        with self._lock:
+            return self._repo_locks.setdefault(repo, threading.Lock())
+
+    def get_page(self, repo, page=0, page_size=10, refresh=False):
+        """page. sayfanın commit'leri (en yeni önce) ve sonraki sayfa olup olmadığı.
+
+        Her commit sözlüğünde 'stats' ({'additions', 'deletions', 'files'})
+        bulunur; alınamadıysa None'dır.
+        """
+        self.stats['requests'] += 1
+        with self._repo_lock(repo):
+            entry = self._current(repo, refresh)
+            start = page * page_size
+            # Sonraki sayfa var mı bilmek için bir commit fazlası gerekir
+            while len(entry['commits']) <= start + page_size and not entry['complete']:
+                self._load_older(repo, entry)
+            commits = entry['commits'][start:start + page_size]
+            has_next = len(entry['commits']) > start + page_size
+            self._load_stats(repo, entry, commits)
+            return [dict(commit, stats=entry['stats'].get(commit['sha'])) for commit in commits], has_next
+
+    def _current(self, repo, refresh):
+        entry = self.entries.get(repo)
+        now = time.monotonic()
+        if entry is not None and not refresh and now - entry['checked'] < self.ttl:
+            self.stats['hits'] += 1
+            self._touch(repo)
+            return entry
+
+        self.stats['head_checks'] += 1
+        head, etag = self.api.branch_head(repo, entry['etag'] if entry and not refresh else None)
+        if entry is not None and (head is None or head == entry['head']):
+            entry.update(etag=etag, checked=now)
+            self.stats['hits'] += 1
+            self._touch(repo)
+            return entry
+
+        if entry is None or not entry['head'] or not head or not self._catch_up(repo, entry, head):
+            entry = self._new_entry(head)
+        entry.update(head=head, etag=etag, checked=now)
+        with self._lock:
+            self.entries[repo] = entry
+            self.entries.move_to_end(repo)
+            while len(self.entries) > self.max_repos:
+                self.entries.popitem(last=False)
+        return entry
+
+    def _new_entry(self, head):
+        self.stats['rebuilds'] += 1
+        # Boş repoda listelenecek commit yok
+        return {'head': head, 'etag': None, 'checked': 0, 'commits': [], 'seen': set(),
+                'base': head, 'pages': 0, 'complete': not head, 'stats': {}}
+
+    def _touch(self, repo):
+        with self._lock:
+            if repo in self.entries:
+                self.entries.move_to_end(repo)
+
+    def _fetch(self, repo, sha, page):
+        self.stats['pages_fetched'] += 1
+        response = self.api.request('GET', f"/repos/{repo}/commits",
+                                    params={'sha': sha, 'per_page': FETCH_PAGE_SIZE, 'page': page})
+        return self.api.check(response, "Commit listeleme")
+
+    def _catch_up(self, repo, entry, head):
+        """Yeni dal başından eski başa kadar olan commit'leri başa ekle; eski baş bulunamazsa False.
+
+        Başa ekleme sadece doğrusal ilerlemede doğrudur. Araya merge girdiyse
+        birleşen daldaki commit'ler tarih sırasında eski başın arkasına düşer
+        ve atlanırdı; bu durumda da liste baştan yüklenir.
+        """
+        new = []
+        for page in range(1, MAX_CATCHUP_PAGES + 1):
+            items = self._fetch(repo, head, page)
+            for item in items:
+                if item['sha'] == entry['head']:
+                    new = [commit for commit in new if commit['sha'] not in entry['seen']]
+                    entry['commits'][:0] = new
+                    entry['seen'].update(commit['sha'] for commit in new)
+                    self.stats['appended'] += len(new)
+                    return True
+                if len(item.get('parents') or ()) > 1:
+                    logger.info("📜 %s dalına merge geldi, geçmiş yeniden yükleniyor", repo)
+                    return False
+                new.append(parse_commit(item))
+            if len(items) < FETCH_PAGE_SIZE:
+                break
+        # Force push veya çok uzun aralık: eski liste artık dal geçmişi değil
+        logger.info("📜 %s geçmişi yeniden yükleniyor (%s -> %s)", repo, entry['head'][:7], head[:7])
+        return False
+
+    def _load_older(self, repo, entry):
+        entry['pages'] += 1
+        items = self._fetch(repo, entry['base'], entry['pages'])
+        for item in items:
+            if item['sha'] not in entry['seen']:
+                entry['seen'].add(item['sha'])
+                entry['commits'].append(parse_commit(item))
+        if len(items) < FETCH_PAGE_SIZE:
+            entry['complete'] = True
+
+    def _load_stats(self, repo, entry, commits):
+        missing = [commit['sha'] for commit in commits if commit['sha'] not in entry['stats']]
+        if not missing:
+            return
+        for sha, stats in zip(missing, self.executor.map(lambda sha: self._commit_stats(repo, sha), missing)):
+            if stats is not None:
+                entry['stats'][sha] = stats
+
+    def _commit_stats(self, repo, sha):
+        try:
+            response = self.api.request('GET', f"/repos/{repo}/commits/{sha}")
+            data = self.api.check(response, "Commit okuma")
+            self.stats['stats_fetched'] += 1
+            stats = data.get('stats') or {}
+            return {'additions': stats.get('additions', 0), 'deletions': stats.get('deletions', 0),
+                    'files': len(data.get('files') or ())}
+        except Exception as e:
+            # Tek commit'in istatistiği alınamazsa liste yine gösterilir
+            logger.error("Commit istatistik hatası (%s): %s", sha[:7], e)
+            return None
+
+    def expire(self, repo):
+        """Bir sonraki istekte dal başı TTL beklenmeden sorulsun (liste korunur)"""
+        entry = self.entries.get(repo)
+        if entry is not None:
+            entry['checked'] = float('-inf')
+
+    def get_stats(self):
+        return dict(self.stats, repos=len(self.entries),
+                    commits=sum(len(entry['commits']) for entry in list(self.entries.values())))
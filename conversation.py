@@ -0,0 +1,271 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 600
+# Bellek deposunda süresi dolan kayıtlar bu kadar yazmada bir süpürülür
+SWEEP_EVERY = 1000
+MAX_MEMORY_ENTRIES = 100000
+CANCEL_WORDS = frozenset({'/iptal', '/cancel', 'iptal'})
+CANCELLED = 'cancelled'
+
+
+def encode_data(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')) if data else None
+
+
+def decode_data(raw):
+    return json.loads(raw) if raw else None
+
+
+class MemoryBackend:
+    """Tek süreç için bellek deposu: sohbet başına (durum, bitiş zamanı, veri) demeti"""
+
+    def __init__(self, max_entries=MAX_MEMORY_ENTRIES):
+        self.records = {}
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, chat_id, now):
+        with self.lock:
+            record = self.records.get(chat_id)
+            if record is None:
+                return None
+            if record[1] <= now:
+                del self.records[chat_id]
+                return None
+            return record[0], decode_data(record[2])
+
+    def set(self, chat_id, state, expires_at, data):
+        with self.lock:
+            self.records[chat_id] = (state, expires_at, encode_data(data))
+            self._writes += 1
+            if self._writes >= SWEEP_EVERY or len(self.records) > self.max_entries:
+                self._sweep(time.time())
+
+    def delete(self, chat_id):
+        with self.lock:
+            return self.records.pop(chat_id, None) is not None
+
+    def _sweep(self, now):
+        self._writes = 0
+        expired = [chat_id for chat_id, record in self.records.items() if record[1] <= now]
+        for chat_id in expired:
+            del self.records[chat_id]
+        # Hâlâ sınırı aşıyorsa en erken bitecek kayıtlar atılır
+        overflow = len(self.records) - self.max_entries
+        if overflow > 0:
+            for chat_id, _ in sorted(self.records.items(), key=lambda item: item[1][1])[:overflow]:
+                del self.records[chat_id]
+        return len(expired)
+
+    def sweep(self):
+        with self.lock:
+            return self._sweep(time.time())
+
+    def count(self):
+        with self.lock:
+            return len(self.records)
+
+
+class SQLiteBackend:
+    """Kalıcı ve süreçler arası paylaşılan depo.
+
+    Kayıtlar WITHOUT ROWID tabloda sohbet id'siyle saklanır; aynı veritabanı
+    dosyasını kullanan birden çok bot süreci aynı konuşmaları görür ve
+    yeniden başlatmada bekleyen adımlar kaybolmaz.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS conversation_state (
+            chat_id INTEGER PRIMARY KEY,
+            state TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            data TEXT
+        ) WITHOUT ROWID
+    """
+    SQL_GET = "SELECT state, data FROM conversation_state WHERE chat_id = ? AND expires_at > ?"
+    SQL_SET = """
+        INSERT INTO conversation_state (chat_id, state, expires_at, data) VALUES (?, ?, ?, ?)
+        ON CONFLICT(chat_id) DO UPDATE SET
+            state = excluded.state, expires_at = excluded.expires_at, data = excluded.data
+    """
+    SQL_DELETE = "DELETE FROM conversation_state WHERE chat_id = ?"
+    SQL_SWEEP = "DELETE FROM conversation_state WHERE expires_at <= ?"
+    SQL_COUNT = "SELECT COUNT(*) FROM conversation_state WHERE expires_at > ?"
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._writes = 0
+        with self.conn as conn:
+            conn.execute(self.SCHEMA)
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def get(self, chat_id, now):
+        row = self.conn.execute(self.SQL_GET, (chat_id, now)).fetchone()
+        return (row[0], decode_data(row[1])) if row else None
+
+    def set(self, chat_id, state, expires_at, data):
+        with self.conn as conn:
+            conn.execute(self.SQL_SET, (chat_id, state, expires_at, encode_data(data)))
+        self._writes += 1
+        if self._writes >= SWEEP_EVERY:
+            self.sweep()
+
+    def delete(self, chat_id):
+        with self.conn as conn:
+            return conn.execute(self.SQL_DELETE, (chat_id,)).rowcount > 0
+
+    def sweep(self):
+        self._writes = 0
+        with self.conn as conn:
+            return conn.execute(self.SQL_SWEEP, (time.time(),)).rowcount
+
+    def count(self):
+        return self.conn.execute(self.SQL_COUNT, (time.time(),)).fetchone()[0]
+
+
+class RedisBackend:
+    """Redis protokolü konuşan bir sunucu (Redis, KeyDB, yerel test sunucusu) üzerinde depo.
+
+    Süre dolumu sunucunun kendi TTL mekanizmasına bırakılır. redis paketi
+    opsiyoneldir ve sadece bu depo seçildiğinde yüklenir.
+    """
+
+    KEY_PREFIX = "conv:"
+
+    def __init__(self, url):
+        import redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, chat_id, now):
+        raw = self.client.get(f"{self.KEY_PREFIX}{chat_id}")
+        if raw is None:
+            return None
+        state, _, data = raw.decode('utf-8').partition('\n')
+        return state, decode_data(data)
+
+    def set(self, chat_id, state, expires_at, data):
+        ttl_ms = max(1, int((expires_at - time.time()) * 1000))
+        value = state + '\n' + (encode_data(data) or '')
+        self.client.set(f"{self.KEY_PREFIX}{chat_id}", value.encode('utf-8'), px=ttl_ms)
+
+    def delete(self, chat_id):
+        return bool(self.client.delete(f"{self.KEY_PREFIX}{chat_id}"))
+
+    def sweep(self):
+        return 0
+
+    def count(self):
+        return sum(1 for _ in self.client.scan_iter(match=f"{self.KEY_PREFIX}*", count=1000))
+
+
+def create_backend(kind=None, db_path=None, redis_url=None):
+    """CONVERSATION_BACKEND ayarına göre depo oluştur: memory, sqlite veya redis"""
+    kind = (kind or os.getenv("CONVERSATION_BACKEND", "sqlite")).lower()
+    if kind == 'redis':
+        return RedisBackend(redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    if kind == 'sqlite' and db_path:
+        return SQLiteBackend(db_path)
+    return MemoryBackend()
+
+
+class ConversationManager:
+    """Çok adımlı akışlar için açık durumlu, süreli konuşma yöneticisi.
+
+    register_next_step_handler yerine sohbetin beklediği adım bir durum adı
+    olarak depoya yazılır (ör. 'weather.city'). Durum adları handler'lara
+    kayıt sırasında bağlanır; böylece depoda fonksiyon değil sadece kısa bir
+    metin tutulur ve kayıt başka bir süreçte de işlenebilir.
+    """
+
+    def __init__(self, backend, default_ttl=DEFAULT_TTL):
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.handlers = {}
+        self.stats = {'started': 0, 'handled': 0, 'expired_or_unknown': 0, 'cancelled': 0}
+
+    def on_state(self, state, handler, pass_data=False):
+        """Durumu handler'a bağla; pass_data ise handler (message, data) alır"""
+        self.handlers[state] = (handler, pass_data)
+
+    def state(self, name, pass_data=False):
+        """on_state için dekoratör"""
+        def decorator(handler):
+            self.on_state(name, handler, pass_data)
+            return handler
+        return decorator
+
+    def ask(self, chat_id, state, data=None, ttl=None):
+        """Sohbetin bir sonraki mesajını 'state' durumunun handler'ına yönlendir"""
+        if state not in self.handlers:
+            raise KeyError(f"Kayıtlı olmayan konuşma durumu: {state}")
+        self.backend.set(chat_id, state, time.time() + (ttl or self.default_ttl), data)
+        self.stats['started'] += 1
+
+    def get(self, chat_id):
+        """(durum, veri) veya None"""
+        return self.backend.get(chat_id, time.time())
+
+    def clear(self, chat_id):
+        return self.backend.delete(chat_id)
+
+    def handle(self, message):
+        """Sohbetin bekleyen bir adımı varsa mesajı ona ver.
+
+        Bekleyen adım yoksa False, kullanıcı iptal ettiyse CANCELLED, mesaj
+        işlendiyse True döner.
+        """
+        chat_id = message.chat.id
+        record = self.backend.get(chat_id, time.time())
+        if record is None:
+            return False
+        state, data = record
+        self.backend.delete(chat_id)
+        entry = self.handlers.get(state)
+        if entry is None:
+            self.stats['expired_or_unknown'] += 1
+            logger.warning("Bilinmeyen konuşma durumu atlandı: %s", state)
+            return False
+        if (message.text or '').strip().lower() in CANCEL_WORDS:
+            self.stats['cancelled'] += 1
+            return CANCELLED
+        handler, pass_data = entry
+        self.stats['handled'] += 1
+        # Handler yeni bir ask() ile akışı sürdürebilir
+        if pass_data:
+            handler(message, data)
+        else:
+            handler(message)
+        return True
+
+    def sweep(self):
+        return self.backend.sweep()
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        try:
+            stats['active'] = self.backend.count()
+        except Exception as e:
+            logger.error("Konuşma sayımı hatası: %s", e)
+            stats['active'] = None
+        return stats
+
@@ -1,18 +1,111 @@
 # -*- coding: utf-8 -*-
 import os
 import logging
-from github import Github
+import threading
 from datetime import datetime
 import zipfile
 import shutil
+from repo_sync import GitHubAPI, GitHubAPIError, RepoSync
+from repo_index import RepoIndexCache
+from commit_history import CommitHistoryCache
 
 logger = logging.getLogger(__name__)
 
 class GitHubManager:
     def __init__(self, token, username):
-        self.github = Github(token)
+        self.token = token
         self.username = username
-        self.user = self.github.get_user()
+        self._github = None
+        self._user = None
+        self._api = None
+        self._sync = None
+        self._index = None
+        self._history = None
+        self._lock = threading.Lock()
+        # upload_current_bot'un eşitlediği klasör (varsayılan: botun kendi klasörü)
+        self.sync_dir = os.getenv("GITHUB_SYNC_DIR") or os.path.dirname(os.path.abspath(__file__))
+    
+    @property
+    def github(self):
+        """PyGithub istemcisi ilk kullanımda oluşturulur (açılışta import ve ağ çağrısı yok)"""
+        if self._github is None:
+            with self._lock:
+                if self._github is None:
+                    from github import Github
+                    # GITHUB_API_URL: GitHub Enterprise veya yük testindeki sahte sunucu
+                    self._github = Github(self.token, base_url=os.getenv("GITHUB_API_URL", "https://api.github.com"))
+        return self._github
+    
+    @property
+    def user(self):
+        """Kimliği doğrulanmış kullanıcı; get_user() tembel nesne döndürür, istek ilk kullanımda yapılır"""
+        if self._user is None:
+            user = self.github.get_user()
+            with self._lock:
+                if self._user is None:
+                    self._user = user
+        return self._user
+    
+    @property
+    def api(self):
+        """Git Data API istemcisi (eşitleme ve repo indeksi paylaşır)"""
+        if self._api is None:
+            with self._lock:
+                if self._api is None:
+                    self._api = GitHubAPI(self.token)
+        return self._api
+    
+    @property
+    def sync_engine(self):
+        if self._sync is None:
+            api = self.api
+            with self._lock:
+                if self._sync is None:
+                    self._sync = RepoSync(api)
+        return self._sync
+    
+    @property
+    def repo_index(self):
+        if self._index is None:
+            api = self.api
+            with self._lock:
+                if self._index is None:
+                    self._index = RepoIndexCache(api)
+        return self._index
+    
+    @property
+    def commit_history(self):
+        if self._history is None:
+            api = self.api
+            with self._lock:
+                if self._history is None:
+                    self._history = CommitHistoryCache(api)
+        return self._history
+    
+    def get_repo_index(self, repo_name, refresh=False):
+        """Reponun tüm dosya ağacı (dal başı değişmedikçe önbellekten)"""
+        return self.repo_index.get(self.full_name(repo_name), refresh=refresh)
+    
+    def get_index_stats(self):
+        """Repo indeksi önbellek istatistikleri (indeks hiç kullanılmadıysa None)"""
+        return self._index.get_stats() if self._index is not None else None
+    
+    def get_history_stats(self):
+        """Commit geçmişi önbellek istatistikleri (hiç kullanılmadıysa None)"""
+        return self._history.get_stats() if self._history is not None else None
+    
+    def _commit_changed(self, full_name):
+        """Bot yeni commit attığında önbellekler TTL beklemeden tazelensin"""
+        if self._index is not None:
+            self._index.invalidate(full_name)
+        if self._history is not None:
+            self._history.expire(full_name)
+    
+    def full_name(self, repo_name):
+        """'repo' -> 'kullanıcı/repo' (GITHUB_USER yoksa kullanıcı adı bir kez sorulur)"""
+        if '/' in repo_name:
+            return repo_name
+        return f"{self.username or self.user.login}/{repo_name}"
     
     def list_repositories(self):
         """Kullanıcının repolarını listele"""
@@ -29,27 +122,34 @@ class GitHubManager:
                 })
             return repos
         except Exception as e:
-            logger.error(f"Repo listeleme hatası: {e}")
+            logger.error("Repo listeleme hatası: %s", e)
             return []
     
     def get_repository_files(self, repo_name, path=""):
-        """Repo dosyalarını listele"""
+        """Repo dosyalarını listele (tek klasör seviyesi, indeksten)"""
         try:
-            repo = self.user.get_repo(repo_name)
-            contents = repo.get_contents(path)
-            
-            files = []
-            for content in contents:
-                files.append({
-                    'name': content.name,
-                    'type': content.type,
-                    'size': content.size if content.type == 'file' else 0,
-                    'path': content.path,
-                    'download_url': content.download_url if content.type == 'file' else None
-                })
-            return files
+            index = self.get_repo_index(repo_name)
+            dirs, files = index.list_dir(path)
+            prefix = path.strip('/') + '/' if path.strip('/') else ''
+            raw_base = f"https://raw.githubusercontent.com/{self.full_name(repo_name)}/{index.head}/"
+            listing = [{'name': name, 'type': 'dir', 'size': size, 'files': count, 'path': prefix + name,
+                        'download_url': None} for name, size, count in dirs]
+            listing.extend({'name': name, 'type': 'file', 'size': size, 'path': prefix + name,
+                            'download_url': raw_base + prefix + name} for name, size in files)
+            return listing
+        except Exception as e:
+            logger.error("Dosya listeleme hatası: %s", e)
+            return []
+    
+    def search_files(self, repo_name, query, limit=20):
+        """Yol öneki ('src/') veya dosya adında bulanık arama: [(yol, boyut)]"""
+        try:
+            index = self.get_repo_index(repo_name)
+            if '/' in query:
+                return index.prefix(query.lstrip('/'), limit)
+            return index.search(query, limit)
         except Exception as e:
-            logger.error(f"Dosya listeleme hatası: {e}")
+            logger.error("Dosya arama hatası: %s", e)
             return []
     
     def delete_file(self, repo_name, file_path):
@@ -60,7 +160,7 @@ class GitHubManager:
             repo.delete_file(contents.path, f"Delete {file_path}", contents.sha)
             return f"✅ {file_path} dosyası silindi!"
         except Exception as e:
-            logger.error(f"Dosya silme hatası: {e}")
+            logger.error("Dosya silme hatası: %s", e)
             return f"❌ Dosya silme hatası: {str(e)}"
     
     def update_file(self, repo_name, file_path, new_content, commit_message=None):
@@ -75,7 +175,7 @@ class GitHubManager:
             repo.update_file(contents.path, commit_message, new_content, contents.sha)
             return f"✅ {file_path} dosyası güncellendi!"
         except Exception as e:
-            logger.error(f"Dosya güncelleme hatası: {e}")
+            logger.error("Dosya güncelleme hatası: %s", e)
             return f"❌ Dosya güncelleme hatası: {str(e)}"
     
     def create_file(self, repo_name, file_path, content, commit_message=None):
@@ -89,7 +189,7 @@ class GitHubManager:
             repo.create_file(file_path, commit_message, content)
             return f"✅ {file_path} dosyası oluşturuldu!"
         except Exception as e:
-            logger.error(f"Dosya oluşturma hatası: {e}")
+            logger.error("Dosya oluşturma hatası: %s", e)
             return f"❌ Dosya oluşturma hatası: {str(e)}"
     
     def get_file_content(self, repo_name, file_path):
@@ -99,36 +199,39 @@ class GitHubManager:
             contents = repo.get_contents(file_path)
             return contents.decoded_content.decode('utf-8')
         except Exception as e:
-            logger.error(f"Dosya okuma hatası: {e}")
+            logger.error("Dosya okuma hatası: %s", e)
             return None
     
+    def get_commit_page(self, repo_name, page=0, page_size=10):
+        """Commit geçmişinin bir sayfası: (commit'ler, sonraki sayfa var mı)"""
+        commits, has_next = self.commit_history.get_page(self.full_name(repo_name), page, page_size)
+        for commit in commits:
+            commit['full_sha'] = commit['sha']
+            commit['sha'] = commit['sha'][:7]
+        return commits, has_next
+    
     def get_commits(self, repo_name, limit=10):
         """Son commit'leri al"""
         try:
-            repo = self.user.get_repo(repo_name)
-            commits = []
-            
-            for commit in repo.get_commits()[:limit]:
-                commits.append({
-                    'sha': commit.sha[:7],
-                    'message': commit.commit.message,
-                    'author': commit.commit.author.name,
-                    'date': commit.commit.author.date.strftime('%Y-%m-%d %H:%M')
-                })
-            return commits
+            return self.get_commit_page(repo_name, 0, limit)[0]
         except Exception as e:
-            logger.error(f"Commit listeleme hatası: {e}")
+            logger.error("Commit listeleme hatası: %s", e)
             return []
     
     def revert_to_commit(self, repo_name, commit_sha):
-        """Belirli commit'e geri dön"""
+        """Dalı commit_sha'daki haline döndür (yeni commit; geçmiş korunur)"""
         try:
-            repo = self.user.get_repo(repo_name)
-            
-            # Bu işlem karmaşık olduğu için basit bir mesaj döndürüyoruz
-            return f"⚠️ Commit geri alma işlemi manuel olarak yapılmalıdır. SHA: {commit_sha}"
+            full_name = self.full_name(repo_name)
+            result = self.sync_engine.rollback(full_name, commit_sha)
+            if result['commit'] is None:
+                return f"✅ {result['branch']} dalı zaten {result['target'][:7]} commit'inde."
+            self._commit_changed(full_name)
+            return (f"✅ {result['branch']} dalı {result['target'][:7]} haline döndürüldü. "
+                    f"Yeni commit: {result['commit'][:7]}")
+        except GitHubAPIError as e:
+            return f"❌ Commit geri alma hatası: {str(e)}"
         except Exception as e:
-            logger.error(f"Commit geri alma hatası: {e}")
+            logger.error("Commit geri alma hatası: %s", e)
             return f"❌ Commit geri alma hatası: {str(e)}"
     
     def create_repository(self, repo_name, description="", private=False):
@@ -142,7 +245,7 @@ class GitHubManager:
             )
             return f"✅ Yeni repository oluşturuldu: {repo.html_url}"
         except Exception as e:
-            logger.error(f"Repo oluşturma hatası: {e}")
+            logger.error("Repo oluşturma hatası: %s", e)
             return f"❌ Repo oluşturma hatası: {str(e)}"
 
     def upload_zip_to_repo(self, repo_name, zip_file_path, extract_to_root=True):
@@ -186,44 +289,41 @@ class GitHubManager:
                 return "\n".join(results)
                 
         except Exception as e:
-            logger.error(f"Zip yükleme hatası: {e}")
+            logger.error("Zip yükleme hatası: %s", e)
             return f"❌ Zip yükleme hatası: {str(e)}"
 
-    def upload_current_bot(self, repo_name):
-        """Mevcut bot dosyalarını GitHub'a yükle"""
+    def sync_directory(self, repo_name, local_dir, branch=None, message=None, delete=True):
+        """Klasörü repoyla eşitle: sadece değişen dosyalar, tek commit"""
         try:
-            repo = self.user.get_repo(repo_name)
-            
-            # Ana dosyaları yükle
-            files_to_upload = [
-                'main.py',
-                'utils.py',
-                'github_manager.py',
-                'render_manager.py',
-                'requirements.txt',
-                'README.md'
-            ]
-            
-            results = []
-            for file_name in files_to_upload:
-                file_path = f"C:/Users/Zafer/Desktop/ReisBot_Premium/{file_name}"
-                if os.path.exists(file_path):
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    
-                    try:
-                        # Dosya varsa güncelle, yoksa oluştur
-                        try:
-                            existing = repo.get_contents(file_name)
-                            repo.update_file(file_name, f"Update {file_name}", content, existing.sha)
-                            results.append(f"✅ {file_name} güncellendi")
-                        except:
-                            repo.create_file(file_name, f"Create {file_name}", content)
-                            results.append(f"✅ {file_name} oluşturuldu")
-                    except Exception as e:
-                        results.append(f"❌ {file_name} hatası: {str(e)}")
-            
-            return "\n".join(results)
+            result = self.sync_engine.sync(self.full_name(repo_name), local_dir, branch=branch,
+                                           message=message, delete=delete)
+            if result['commit']:
+                self._commit_changed(self.full_name(repo_name))
+            return format_sync_result(result)
+        except GitHubAPIError as e:
+            return f"❌ Eşitleme hatası: {str(e)}"
         except Exception as e:
-            logger.error(f"Bot yükleme hatası: {e}")
-            return f"❌ Bot yükleme hatası: {str(e)}"
+            logger.error("Repo eşitleme hatası: %s", e)
+            return f"❌ Eşitleme hatası: {str(e)}"
+
+    def upload_current_bot(self, repo_name):
+        """Mevcut bot dosyalarını GitHub'a yükle (değişmeyen dosyalar gönderilmez)"""
+        return self.sync_directory(repo_name, self.sync_dir, message=f"Bot sync - {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+
+
+def format_sync_result(result, limit=10):
+    """Eşitleme sonucunu kullanıcıya gösterilecek metne çevir"""
+    if result['commit'] is None:
+        return f"✅ Repo zaten güncel ({result['files']} dosya, {result['api_calls']} API çağrısı)"
+    lines = [f"✅ {len(result['added'])} eklendi, {len(result['changed'])} güncellendi, "
+             f"{len(result['deleted'])} silindi (commit {result['commit'][:7]}, {result['branch']})"]
+    entries = ([f"➕ {path}" for path in result['added']] + [f"✏️ {path}" for path in result['changed']]
+               + [f"🗑️ {path}" for path in result['deleted']])
+    lines.extend(entries[:limit])
+    if len(entries) > limit:
+        lines.append(f"... ve {len(entries) - limit} dosya daha")
+    if result['skipped']:
+        lines.append(f"⚠️ Çok büyük olduğu için atlanan: {', '.join(result['skipped'])}")
+    if result['truncated']:
+        lines.append("⚠️ Uzak ağaç çok büyük olduğu için silme yapılmadı")
+    return "\n".join(lines)
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+import html
+from telebot import types
+from repo_index import format_size
+from router import timed, requires, ADMIN_ONLY_TEXT
+
+COMMIT_PAGE_SIZE = 10
+
+
+class GitHubRoutes:
+    """GitHub yönetim menüsü: callback'ler, adım adım akışlar ve geri alma.
+
+    Bağımlılıklar dışarıdan verilir; github_manager None ise route'lar
+    "devre dışı" yanıtı verir, render_manager None ise geri alma sonrası
+    deploy seçeneği gösterilmez.
+    """
+
+    def __init__(self, bot, conversations, github_manager, render_manager, is_admin):
+        self.bot = bot
+        self.conversations = conversations
+        self.github_manager = github_manager
+        self.render_manager = render_manager
+        self.is_admin = is_admin
+
+    def show_menu(self, message):
+        """GitHub yönetim menüsünü göster"""
+        markup = types.InlineKeyboardMarkup(row_width=2)
+        buttons = [
+            types.InlineKeyboardButton("📋 Repo Listesi", callback_data="github_list_repos"),
+            types.InlineKeyboardButton("📁 Dosya Listesi", callback_data="github_list_files"),
+            types.InlineKeyboardButton("📤 Dosya Yükle", callback_data="github_upload_file"),
+            types.InlineKeyboardButton("🗑️ Dosya Sil", callback_data="github_delete_file"),
+            types.InlineKeyboardButton("📝 Dosya Güncelle", callback_data="github_update_file"),
+            types.InlineKeyboardButton("📜 Commit Geçmişi", callback_data="github_commits"),
+            types.InlineKeyboardButton("🔄 Bot'u Yükle", callback_data="github_upload_bot"),
+            types.InlineKeyboardButton("❌ Kapat", callback_data="close_menu")
+        ]
+        markup.add(*buttons)
+
+        menu_text = """
+📁 *GitHub Yönetim Paneli*
+
+Yapmak istediğin işlemi seç:
+• 📋 Repo Listesi - Tüm repolarını görüntüle
+• 📁 Dosya Listesi - Repo dosyalarını listele
+• 📤 Dosya Yükle - Yeni dosya oluştur
+• 🗑️ Dosya Sil - Dosya sil
+• 📝 Dosya Güncelle - Mevcut dosyayı güncelle
+• 📜 Commit Geçmişi - Son commit'leri görüntüle
+• 🔄 Bot'u Yükle - Mevcut botu GitHub'a yükle
+    """
+
+        self.bot.send_message(message.chat.id, menu_text, parse_mode='Markdown', reply_markup=markup)
+
+    # CALLBACK'LER
+    def handle_list_repos(self, call):
+        """GitHub repo listesini göster"""
+        try:
+            repos = self.github_manager.list_repositories()
+            if repos:
+                repo_text = "📋 *GitHub Repolarınız:*\n\n"
+                for repo in repos[:10]:  # İlk 10 repo
+                    status = "🔒" if repo['private'] else "🌐"
+                    repo_text += f"{status} *{repo['name']}*\n"
+                    repo_text += f"   📝 {repo['description'][:50]}...\n"
+                    repo_text += f"   📅 {repo['updated']} | 💾 {repo['size']} KB\n\n"
+
+                if len(repos) > 10:
+                    repo_text += f"... ve {len(repos) - 10} repo daha"
+            else:
+                repo_text = "❌ Hiç repo bulunamadı."
+
+            self.bot.edit_message_text(repo_text, call.message.chat.id, call.message.message_id, parse_mode='Markdown')
+        except Exception as e:
+            self.bot.edit_message_text(f"❌ Repo listesi alınamadı: {str(e)}", call.message.chat.id, call.message.message_id)
+
+    def handle_list_files(self, call):
+        """GitHub dosya listesini göster"""
+        self.bot.send_message(call.message.chat.id, "📁 Hangi repo'nun dosyalarını listelemek istiyorsun? Repo adını yaz:\n"
+                              "• Klasör: `repo src/`\n• Dosya adı arama: `repo main`", parse_mode='Markdown')
+        self.conversations.ask(call.message.chat.id, 'github.list_files')
+
+    def process_list_files(self, message):
+        """GitHub dosya listesi işlemi: klasör içeriği veya arama, repo indeksinden"""
+        try:
+            parts = message.text.strip().split(maxsplit=1)
+            repo_name = parts[0]
+            query = parts[1].strip() if len(parts) > 1 else ""
+            index = self.github_manager.get_repo_index(repo_name)
+            if not index.file_count:
+                self.bot.reply_to(message, "❌ Dosya bulunamadı veya repo boş.")
+                return
+
+            if query and not query.endswith('/'):
+                results = self.github_manager.search_files(repo_name, query, 15)
+                if not results:
+                    self.bot.reply_to(message, f"🔍 '{query}' ile eşleşen dosya yok.")
+                    return
+                # Sorgu ve yollar '_' içerebilir; Markdown yerine kaçışlı HTML
+                file_text = f"🔍 <b>{html.escape(repo_name)}</b> içinde '{html.escape(query)}':\n\n"
+                for path, size in results:
+                    file_text += f"📄 <code>{html.escape(path)}</code> ({format_size(size)})\n"
+                self.bot.reply_to(message, file_text, parse_mode='HTML')
+                return
+
+            path = query.strip('/')
+            dirs, files = index.list_dir(path)
+            if not dirs and not files:
+                self.bot.reply_to(message, f"❌ '{path}' klasörü bulunamadı.")
+                return
+            total_size, total_files = index.dirs[path]
+            file_text = (f"📁 <b>{html.escape(repo_name)}/{html.escape(path)}</b> - {total_files} dosya, "
+                         f"{format_size(total_size)} (<code>{index.head[:7]}</code>)\n\n")
+            dirs.sort(key=lambda item: item[1], reverse=True)
+            for name, size, count in dirs[:10]:
+                file_text += f"📁 <code>{html.escape(name)}/</code> {format_size(size)}, {count} dosya\n"
+            for name, size in files[:15]:
+                file_text += f"📄 <code>{html.escape(name)}</code> ({format_size(size)})\n"
+
+            hidden = max(0, len(dirs) - 10) + max(0, len(files) - 15)
+            if hidden:
+                file_text += f"\n... ve {hidden} öğe daha"
+            if index.truncated:
+                file_text += "\n⚠️ Repo çok büyük, liste eksik olabilir."
+            self.bot.reply_to(message, file_text, parse_mode='HTML')
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Dosya listesi alınamadı: {str(e)}")
+
+    def handle_upload_file(self, call):
+        """GitHub dosya yükleme"""
+        self.bot.send_message(call.message.chat.id, "📤 Repo adı, dosya adı ve içeriği yaz (örn: myrepo test.py print('hello'))")
+        self.conversations.ask(call.message.chat.id, 'github.upload_file')
+
+    def process_upload_file(self, message):
+        """GitHub dosya yükleme işlemi"""
+        try:
+            parts = message.text.split(' ', 2)
+            if len(parts) < 3:
+                self.bot.reply_to(message, "❌ Format: repo_adı dosya_adı dosya_içeriği")
+                return
+
+            repo_name, file_name, content = parts
+            result = self.github_manager.create_file(repo_name, file_name, content)
+            self.bot.reply_to(message, result)
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Dosya yükleme hatası: {str(e)}")
+
+    def handle_delete_file(self, call):
+        """GitHub dosya silme"""
+        self.bot.send_message(call.message.chat.id, "🗑️ Silinecek dosyanın repo adı ve dosya yolunu yaz (örn: myrepo src/main.py)")
+        self.conversations.ask(call.message.chat.id, 'github.delete_file')
+
+    def process_delete_file(self, message):
+        """GitHub dosya silme işlemi"""
+        try:
+            parts = message.text.split(' ', 1)
+            if len(parts) < 2:
+                self.bot.reply_to(message, "❌ Format: repo_adı dosya_yolu")
+                return
+
+            repo_name, file_path = parts
+            result = self.github_manager.delete_file(repo_name, file_path)
+            self.bot.reply_to(message, result)
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Dosya silme hatası: {str(e)}")
+
+    def handle_update_file(self, call):
+        """GitHub dosya güncelleme"""
+        self.bot.send_message(call.message.chat.id, "📝 Güncellenecek dosyanın repo adı, dosya yolu ve yeni içeriği yaz")
+        self.conversations.ask(call.message.chat.id, 'github.update_file')
+
+    def process_update_file(self, message):
+        """GitHub dosya güncelleme işlemi"""
+        try:
+            parts = message.text.split(' ', 2)
+            if len(parts) < 3:
+                self.bot.reply_to(message, "❌ Format: repo_adı dosya_yolu yeni_içerik")
+                return
+
+            repo_name, file_path, new_content = parts
+            result = self.github_manager.update_file(repo_name, file_path, new_content)
+            self.bot.reply_to(message, result)
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Dosya güncelleme hatası: {str(e)}")
+
+    # COMMIT GEÇMİŞİ VE GERİ ALMA
+    def handle_commits(self, call):
+        """GitHub commit geçmişi"""
+        self.bot.send_message(call.message.chat.id, "📜 Hangi repo'nun commit geçmişini görmek istiyorsun? Repo adını yaz:")
+        self.conversations.ask(call.message.chat.id, 'github.commits')
+
+    def render_commit_page(self, repo_name, page, rollback=False):
+        """Commit geçmişi sayfasını (HTML metin, sayfalama butonları) olarak hazırla; rollback: geri alma butonları"""
+        try:
+            commits, has_next = self.github_manager.get_commit_page(repo_name, page, COMMIT_PAGE_SIZE)
+        except Exception as e:
+            return f"❌ Commit geçmişi alınamadı: {html.escape(str(e))}", None
+
+        if not commits:
+            return "❌ Commit geçmişi bulunamadı.", None
+
+        commit_text = f"📜 <b>{html.escape(repo_name)}</b> commit'leri (sayfa {page + 1})\n\n"
+        for commit in commits:
+            message_line = commit['message'].split('\n', 1)[0]
+            commit_text += f"🔸 <code>{commit['sha']}</code> - {html.escape(commit['author'])}\n"
+            commit_text += f"   📝 {html.escape(message_line[:80])}\n"
+            stats = commit['stats']
+            diff = f" · {stats['files']} dosya +{stats['additions']} -{stats['deletions']}" if stats else ""
+            commit_text += f"   📅 {commit['date']}{diff}\n\n"
+
+        # callback_data en fazla 64 bayt olabilir; uzun repo adında butonlar gösterilmez
+        if len(f"ghrollback:d:{commits[0]['sha']}:{repo_name}".encode('utf-8')) > 64:
+            return commit_text, None
+        markup = types.InlineKeyboardMarkup(row_width=5)
+        # Yöneticiye her commit için geri dönme butonu (dalın ucundaki commit hariç)
+        rollback_buttons = [
+            types.InlineKeyboardButton(f"⏪ {commit['sha']}", callback_data=f"ghrevert:{commit['sha']}:{repo_name}")
+            for index, commit in enumerate(commits) if rollback and (page > 0 or index > 0)
+        ]
+        if rollback_buttons:
+            markup.add(*rollback_buttons)
+        buttons = []
+        if page > 0:
+            buttons.append(types.InlineKeyboardButton("⬅️ Yeni", callback_data=f"ghcommits:{page - 1}:{repo_name}"))
+        if has_next:
+            buttons.append(types.InlineKeyboardButton("Eski ➡️", callback_data=f"ghcommits:{page + 1}:{repo_name}"))
+        if buttons:
+            markup.add(*buttons)
+        return commit_text, markup
+
+    def handle_commits_page(self, call):
+        """Commit geçmişinde sayfa değiştir"""
+        _, page, repo_name = call.data.split(":", 2)
+        text, markup = self.render_commit_page(repo_name, int(page), rollback=self.is_admin(call))
+        self.bot.edit_message_text(text, call.message.chat.id, call.message.message_id, parse_mode='HTML', reply_markup=markup)
+
+    def handle_revert_prompt(self, call, sha, repo_name):
+        """Geri alma onayı: sadece commit veya commit + Render deploy"""
+        markup = types.InlineKeyboardMarkup(row_width=1)
+        markup.add(types.InlineKeyboardButton("⏪ Geri al", callback_data=f"ghrollback:c:{sha}:{repo_name}"))
+        if self.render_manager is not None:
+            markup.add(types.InlineKeyboardButton("🚀 Geri al + Deploy", callback_data=f"ghrollback:d:{sha}:{repo_name}"))
+        markup.add(types.InlineKeyboardButton("❌ İptal", callback_data=f"ghrollback:x:{sha}:{repo_name}"))
+        self.bot.send_message(
+            call.message.chat.id,
+            f"⏪ <b>{html.escape(repo_name)}</b> dalı <code>{sha}</code> commit'indeki haline döndürülsün mü?\n\n"
+            "Dalın ucuna bu commit'in dosyalarıyla yeni bir commit eklenir; geçmiş silinmez.",
+            parse_mode='HTML', reply_markup=markup
+        )
+
+    def handle_rollback(self, call, mode, sha, repo_name):
+        """Onaylanan geri alma; istenirse repoya bağlı Render servisleri yeniden deploy edilir"""
+        chat_id, message_id = call.message.chat.id, call.message.message_id
+        if mode == 'x':
+            self.bot.edit_message_text("❌ Geri alma iptal edildi.", chat_id, message_id)
+            return
+        self.bot.edit_message_text(f"⏳ {repo_name} {sha} haline döndürülüyor...", chat_id, message_id)
+        result = self.github_manager.revert_to_commit(repo_name, sha)
+        lines = [result]
+        if mode == 'd' and result.startswith("✅") and self.render_manager is not None:
+            # Sadece geri alınan daldan deploy eden servisler
+            full_name = self.github_manager.full_name(repo_name)
+            branch = self.github_manager.api.branches.get(full_name)
+            services = self.render_manager.find_services_by_repo(full_name, branch)
+            if not services:
+                lines.append("⚠️ Bu repoya bağlı Render servisi bulunamadı, deploy atlandı.")
+            for service in services:
+                lines.append(f"🚀 {service['name']}: {self.render_manager.deploy_service(service['id'])}")
+        self.bot.edit_message_text("\n".join(lines), chat_id, message_id)
+
+    def process_commits(self, message):
+        """GitHub commit geçmişi işlemi"""
+        try:
+            repo_name = message.text.strip()
+            commit_text, markup = self.render_commit_page(repo_name, 0, rollback=self.is_admin(message))
+            self.bot.reply_to(message, commit_text, parse_mode='HTML', reply_markup=markup)
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Commit geçmişi alınamadı: {str(e)}")
+
+    def handle_upload_bot(self, call):
+        """Mevcut botu GitHub'a yükle"""
+        try:
+            self.bot.send_message(call.message.chat.id, "🔄 Bot dosyaları GitHub'a yükleniyor...")
+            result = self.github_manager.upload_current_bot("ReisBot_Premium")
+            # Dosya adlarındaki '_' Markdown'ı bozmasın
+            self.bot.send_message(call.message.chat.id, f"📤 Bot Yükleme Sonucu:\n\n{result}")
+        except Exception as e:
+            self.bot.send_message(call.message.chat.id, f"❌ Bot yükleme hatası: {str(e)}")
+
+    # KAYIT
+    def register(self, router):
+        """GitHub menüsü, callback'leri ve adımları"""
+        conversations = self.conversations
+        github_required = requires(lambda event: self.github_manager is not None, "❌ GitHub servisi devre dışı!")
+        router.button("📁 GitHub Yönetimi", timed, github_required)(self.show_menu)
+
+        callbacks = {
+            "github_list_repos": self.handle_list_repos,
+            "github_list_files": self.handle_list_files,
+            "github_upload_file": self.handle_upload_file,
+            "github_delete_file": self.handle_delete_file,
+            "github_update_file": self.handle_update_file,
+            "github_commits": self.handle_commits,
+            "github_upload_bot": self.handle_upload_bot
+        }
+        for data, handler in callbacks.items():
+            router.callback(data, timed, github_required)(handler)
+
+        conversations.on_state('github.list_files', self.process_list_files)
+        conversations.on_state('github.upload_file', self.process_upload_file)
+        conversations.on_state('github.delete_file', self.process_delete_file)
+        conversations.on_state('github.update_file', self.process_update_file)
+        conversations.on_state('github.commits', self.process_commits)
+        router.callback_prefix("ghcommits", timed, github_required)(lambda call, params: self.handle_commits_page(call))
+        # Geri alma üretim dalına commit atar ve deploy tetikler; sadece yönetici
+        admin_required = requires(self.is_admin, ADMIN_ONLY_TEXT)
+        router.callback_prefix("ghrevert", timed, github_required, admin_required)(
+            lambda call, params: self.handle_revert_prompt(call, params[0], ':'.join(params[1:])))
+        router.callback_prefix("ghrollback", timed, github_required, admin_required)(
+            lambda call, params: self.handle_rollback(call, params[0], params[1], ':'.join(params[2:])))
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import time
+import logging
+import importlib
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Modül adı -> ilk yükleme süresi (sn); /status ve benchmark için
+IMPORT_TIMES = {}
+_import_lock = threading.RLock()
+
+
+class LazyModule:
+    """İlk özellik erişiminde import edilen modül vekili.
+
+    Ağır kütüphaneler (ses, görsel, YouTube, OpenAI) botun açılışında
+    değil, onları kullanan özellik ilk çağrıldığında yüklenir.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            with _import_lock:
+                if self._module is None:
+                    started = time.perf_counter()
+                    self._module = importlib.import_module(self._name)
+                    IMPORT_TIMES[self._name] = time.perf_counter() - started
+                    logger.info("📦 %s yüklendi (%.0f ms)", self._name, IMPORT_TIMES[self._name] * 1000)
+                module = self._module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    @property
+    def loaded(self):
+        return self._module is not None
+
+    def __repr__(self):
+        state = "yüklü" if self._module is not None else "yüklenmedi"
+        return f"<LazyModule {self._name} ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+class LazyValue:
+    """factory() sonucu ilk get() çağrısında oluşturulur (API istemcileri için).
+
+    Oluşturma hata verirse değer saklanmaz; bir sonraki çağrı yeniden dener.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self._value = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        value = self._value
+        if value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self.factory()
+                value = self._value
+        return value
+
+    @property
+    def loaded(self):
+        return self._value is not None
+
+    def reset(self):
+        with self._lock:
+            self._value = None
+
+
+def get_import_times():
+    """Yüklenmiş tembel modüller, en pahalı önce: [(modül, sn)]"""
+    return sorted(IMPORT_TIMES.items(), key=lambda item: item[1], reverse=True)
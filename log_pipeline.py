@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import functools
+import threading
+import contextvars
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+from metrics import BOT_HANDLER_LISTS
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+# Kuyruk dolarsa kayıt düşürülür; handler thread'i asla yazıcıyı beklemez
+QUEUE_SIZE = 10000
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_BACKUPS = 5
+# Aynı hata satırından pencere başına ilk SAMPLE_BURST kayıt yazılır, kalanı sayılır
+SAMPLE_BURST = 10
+SAMPLE_WINDOW = 60
+
+# O an işlenen güncellemenin alanları (cid, chat_id, user_id, handler)
+_context = contextvars.ContextVar('log_context', default=None)
+_pipeline = None
+
+
+# KORELASYON
+def update_context(obj, handler=None):
+    """Mesaj veya callback'ten log alanları; cid aynı güncellemenin tüm kayıtlarını bağlar"""
+    fields = {}
+    chat = getattr(obj, 'chat', None)
+    message = getattr(obj, 'message', None)
+    if chat is not None:
+        fields['cid'] = f"{chat.id}:{obj.message_id}"
+        fields['chat_id'] = chat.id
+    elif message is not None and getattr(obj, 'data', None) is not None:
+        fields['cid'] = f"cb:{obj.id}"
+        fields['chat_id'] = message.chat.id
+    from_user = getattr(obj, 'from_user', None)
+    if from_user is not None:
+        fields['user_id'] = from_user.id
+    if handler:
+        fields['handler'] = handler
+    return fields
+
+
+def wrap_handler(func, name=None):
+    """Handler süresince kayıtlara güncellemenin korelasyon alanlarını ekle"""
+    if getattr(func, '_log_context', False):
+        return func
+    name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        token = _context.set(update_context(args[0], name) if args else {'handler': name})
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _context.reset(token)
+
+    wrapper._log_context = True
+    return wrapper
+
+
+def instrument_bot(bot):
+    """Kayıtlı telebot handler'larına korelasyon bağlamı ekle; sarılan sayıyı döndür"""
+    count = 0
+    for attr in BOT_HANDLER_LISTS:
+        for handler in getattr(bot, attr, ()):
+            func = handler['function']
+            if not getattr(func, '_log_context', False):
+                handler['function'] = wrap_handler(func)
+                count += 1
+    return count
+
+
+# FİLTRELER VE BİÇİMLENDİRİCİLER
+class ContextFilter(logging.Filter):
+    """Kaydı üreten thread'in bağlamını kayda kopyalar (yazıcı thread'i bağlamı göremez)"""
+
+    def filter(self, record):
+        record.ctx = _context.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Tekrarlayan uyarı/hataları örnekle.
+
+    Anahtar (logger, satır, şablon) olduğu için %-biçimli çağrılarda aynı
+    hata farklı argümanlarla da tek anahtara düşer. Pencere başına ilk
+    `burst` kayıt geçer; kalanı sayılır ve pencere dolduktan sonraki ilk
+    kayda `suppressed` alanı olarak eklenir.
+    """
+
+    def __init__(self, burst=SAMPLE_BURST, window=SAMPLE_WINDOW, level=logging.WARNING):
+        super().__init__()
+        self.burst = burst
+        self.window = window
+        self.level = level
+        self.lock = threading.Lock()
+        # anahtar -> [pencere başlangıcı, pencerede görülen, bastırılan]
+        self.counters = {}
+        self.suppressed_total = 0
+
+    def filter(self, record):
+        if record.levelno < self.level or self.burst <= 0:
+            return True
+        key = (record.name, record.lineno, record.msg if isinstance(record.msg, str) else type(record.msg))
+        now = time.monotonic()
+        with self.lock:
+            state = self.counters.get(key)
+            if state is None or now - state[0] >= self.window:
+                if state is not None and state[2]:
+                    record.suppressed = state[2]
+                if len(self.counters) > 1000:
+                    self._prune(now)
+                self.counters[key] = [now, 1, 0]
+                return True
+            state[1] += 1
+            if state[1] <= self.burst:
+                return True
+            state[2] += 1
+            self.suppressed_total += 1
+            return False
+
+    def _prune(self, now):
+        for key in [k for k, state in self.counters.items() if now - state[0] >= self.window]:
+            del self.counters[key]
+
+
+class JsonFormatter(logging.Formatter):
+    """Satır başına bir JSON nesnesi"""
+
+    def __init__(self, process_name=None):
+        super().__init__()
+        self.process_name = process_name
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'thread': record.threadName,
+        }
+        if self.process_name:
+            entry['process'] = self.process_name
+        ctx = getattr(record, 'ctx', None)
+        if ctx:
+            entry.update(ctx)
+        suppressed = getattr(record, 'suppressed', None)
+        if suppressed:
+            entry['suppressed'] = suppressed
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """Konsol için okunur biçim; korelasyon kimliği ve bastırılan sayısı sona eklenir"""
+
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def formatMessage(self, record):
+        # Traceback'ten önce, ilk satırın sonuna eklenir
+        text = super().formatMessage(record)
+        ctx = getattr(record, 'ctx', None)
+        if ctx and 'cid' in ctx:
+            text += f" [{ctx['cid']}]"
+        suppressed = getattr(record, 'suppressed', None)
+        if suppressed:
+            text += f" (+{suppressed} benzer kayıt bastırıldı)"
+        return text
+
+
+class AsyncQueueHandler(QueueHandler):
+    """Kaydı bloklamadan kuyruğa koyar; kuyruk doluysa düşürüp sayar"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Mesaj burada birleştirilir (argümanlar sonradan değişebilir); traceback
+        # biçimlendirmesi aynı süreçte kaldığımız için yazıcı thread'ine bırakılır
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# KURULUM
+class LogPipeline:
+    def __init__(self, handler, listener, sampler, file_path):
+        self.handler = handler
+        self.listener = listener
+        self.sampler = sampler
+        self.file_path = file_path
+
+    def stop(self):
+        """Kuyruktaki kayıtları yazıp yazıcı thread'ini durdur"""
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+    def get_stats(self):
+        return {
+            'queued': self.handler.queue.qsize(),
+            'dropped': self.handler.dropped,
+            'suppressed': self.sampler.suppressed_total,
+            'file': self.file_path,
+        }
+
+
+def log_file_for(path, process_name):
+    """Çoklu süreçte her süreç kendi dosyasını döndürür (bot.log -> bot.w1.log)"""
+    if not path or not process_name:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{process_name}{ext or '.log'}"
+
+
+def setup_logging(process_name=None, level=None, log_file=None, console_format=None,
+                  max_bytes=None, backups=None, burst=None, window=None):
+    """Kök logger'ı kuyruk + arka plan yazıcısına bağla.
+
+    Parametreler verilmezse ortam değişkenleri kullanılır: LOG_LEVEL,
+    LOG_FILE (boş: sadece konsol), LOG_FORMAT (konsol: json/text),
+    LOG_MAX_BYTES, LOG_BACKUPS, LOG_SAMPLE_BURST, LOG_SAMPLE_WINDOW.
+    Birden fazla çağrılırsa ilk kurulum döndürülür.
+    """
+    global _pipeline
+    if _pipeline is not None:
+        return _pipeline
+
+    level = level or os.getenv("LOG_LEVEL", "INFO").upper()
+    log_file = log_file if log_file is not None else os.getenv("LOG_FILE", "")
+    console_format = console_format or os.getenv("LOG_FORMAT", "json").lower()
+    max_bytes = max_bytes or int(os.getenv("LOG_MAX_BYTES", DEFAULT_MAX_BYTES))
+    backups = backups if backups is not None else int(os.getenv("LOG_BACKUPS", DEFAULT_BACKUPS))
+    burst = burst if burst is not None else int(os.getenv("LOG_SAMPLE_BURST", SAMPLE_BURST))
+    window = window or float(os.getenv("LOG_SAMPLE_WINDOW", SAMPLE_WINDOW))
+
+    handlers = []
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(JsonFormatter(process_name) if console_format == "json" else TextFormatter())
+    handlers.append(console)
+
+    file_path = log_file_for(log_file, process_name)
+    if file_path:
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+        file_handler = RotatingFileHandler(file_path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter(process_name))
+        handlers.append(file_handler)
+
+    handler = AsyncQueueHandler(queue.Queue(QUEUE_SIZE))
+    sampler = SamplingFilter(burst, window)
+    handler.addFilter(sampler)
+    handler.addFilter(ContextFilter())
+    listener = QueueListener(handler.queue, *handlers, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level)
+    listener.start()
+
+    _pipeline = LogPipeline(handler, listener, sampler, file_path)
+    # Çıkışta kuyrukta kalan kayıtlar yazılsın
+    atexit.register(_pipeline.stop)
+    return _pipeline
+
+
+def get_pipeline():
+    return _pipeline
@@ -4,19 +4,42 @@ import logging
 import requests
 import json
 import time
+import html
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
 import telebot
 from telebot import types
-from github import Github
-import openai
-import youtube_dl
-from bs4 import BeautifulSoup
 import utils
+from lazy import lazy_import, get_import_times
 from github_manager import GitHubManager
 from render_manager import RenderManager
 from scheduler import BotScheduler
 from premium_features import PremiumFeatures
+from alerts import AlertManager, parse_alert
+from send_queue import SendQueue, GLOBAL_RATE, PRIORITY_NAMES
+from broadcast import BroadcastManager
+from usage_stats import UsageTracker
+from reminders import ReminderEngine, parse_recurrence, RECURRENCE_LABELS
+from calculator import calculate, compile_expression
+from translator import Translator, TranslationError, resolve_language, LANGUAGES
+from web_server import WebServer, text_response, webhook_secret
+from shortener import URLShortener, ShortenerError
+import passwords
+from quotes import QuoteService
+from router import Router
+from menu_routes import register_main_menu
+from note_routes import NoteRoutes
+from github_routes import GitHubRoutes
+from render_routes import RenderRoutes
+from conversation import ConversationManager, create_backend, CANCELLED
+import metrics
+import log_pipeline
+from metrics import track
+from profiler import Profiler, format_collapsed
+
+# YouTube indirici ilk indirmede yüklenir (açılışı yavaşlatmasın)
+youtube_dl = lazy_import('youtube_dl')
 
 # ENV YÜKLE
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -30,33 +53,54 @@ GITHUB_USER = os.getenv("GITHUB_USER")
 OPENAI_API_KEY = os.getenv("OPENAI_KEY")
 RENDER_API_KEY = os.getenv("RENDER_API_KEY")
 RENDER_SERVICE_ID = os.getenv("RENDER_OWNER_ID")  # RENDER_OWNER_ID olarak değiştirildi
+DB_PATH = os.getenv("DB_PATH", os.path.join(current_dir, "reisbot.db"))
+ADMIN_IDS = {int(x) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip().isdigit()}
+# Botun dışarıdan erişilen adresi (kısa linkler ve webhook için), örn: https://reisbot.onrender.com
+PUBLIC_URL = os.getenv("PUBLIC_URL", "").rstrip("/")
+WEB_PORT = int(os.getenv("PORT", "8080"))
+USE_WEBHOOK = os.getenv("USE_WEBHOOK", "false").lower() == "true" and bool(PUBLIC_URL)
+# PUBLIC_URL olmadan da /metrics için HTTP sunucusu açılsın mı
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+QUOTE_TIME = os.getenv("QUOTE_TIME", "09:00")
+CONVERSATION_TTL = int(os.getenv("CONVERSATION_TTL", "600"))
+# Handler çağrılarının ne kadarı yığın örnekleyiciyle profillensin (0: kapalı, /profile ile açılabilir)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+# supervisor.py ile çalışırken her worker sürecine numarası verilir
+WORKER_INDEX = os.getenv("BOT_WORKER_INDEX")
+MULTI_PROCESS = WORKER_INDEX is not None
 
 # LOGGING
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# JSON kayıtlar kuyruktan arka plan thread'inde yazılır; handler thread'i log I/O'su beklemez
+log_pipeline.setup_logging(process_name=f"w{WORKER_INDEX}" if MULTI_PROCESS else None)
 logger = logging.getLogger(__name__)
 
 # TELEGRAM BOT
 bot = telebot.TeleBot(BOT_TOKEN)
 
+# GÖNDERİM KUYRUĞU (Telegram flood limitleri: global 30/sn, sohbet başına 1/sn)
+# Çoklu süreç modunda global limit worker'lar arasında paylaştırılır
+send_queue = SendQueue(bot, global_rate=float(os.getenv("SEND_GLOBAL_RATE", GLOBAL_RATE)))
+send_queue.install()
+
 # OPENAI KURULUM
 if OPENAI_API_KEY and OPENAI_API_KEY != "your_openai_api_key_here":
-    openai.api_key = OPENAI_API_KEY
     AI_ENABLED = True
 else:
     AI_ENABLED = False
     logger.warning("OpenAI API anahtarı bulunamadı. AI özellikleri devre dışı.")
 
+# ÇEVİRİ SERVİSİ (önbellekli, kısa metinleri toplu çevirir)
+translator = Translator(utils.openai_client) if AI_ENABLED else None
+
 # GITHUB KURULUM
 if GITHUB_TOKEN:
     try:
-        github = Github(GITHUB_TOKEN)
+        # İstemci ve kullanıcı bilgisi ilk GitHub işleminde yüklenir
         github_manager = GitHubManager(GITHUB_TOKEN, GITHUB_USER)
         GITHUB_ENABLED = True
     except Exception as e:
-        logger.error(f"GitHub bağlantı hatası: {e}")
+        logger.error("GitHub bağlantı hatası: %s", e)
         GITHUB_ENABLED = False
         github_manager = None
 else:
@@ -70,7 +114,7 @@ if RENDER_API_KEY and RENDER_SERVICE_ID:
         render_manager = RenderManager(RENDER_API_KEY, RENDER_SERVICE_ID)
         RENDER_ENABLED = True
     except Exception as e:
-        logger.error(f"Render bağlantı hatası: {e}")
+        logger.error("Render bağlantı hatası: %s", e)
         RENDER_ENABLED = False
         render_manager = None
 else:
@@ -79,28 +123,158 @@ else:
     logger.warning("Render API anahtarları bulunamadı. Render özellikleri devre dışı.")
 
 # SCHEDULER KURULUM
-scheduler = None
-if github_manager and render_manager:
-    try:
-        scheduler = BotScheduler(bot, github_manager, render_manager)
-        SCHEDULER_ENABLED = True
-    except Exception as e:
-        logger.error(f"Scheduler kurulum hatası: {e}")
-        SCHEDULER_ENABLED = False
-else:
+try:
+    scheduler = BotScheduler(bot, github_manager, render_manager, db_path=DB_PATH, admin_ids=ADMIN_IDS)
+    SCHEDULER_ENABLED = True
+except Exception as e:
+    logger.error("Scheduler kurulum hatası: %s", e)
     SCHEDULER_ENABLED = False
-    logger.warning("Scheduler için gerekli bileşenler eksik.")
+    scheduler = None
 
 # PREMIUM FEATURES KURULUM
 try:
-    premium = PremiumFeatures()
+    premium = PremiumFeatures(DB_PATH)
     PREMIUM_ENABLED = True
     logger.info("✅ Premium özellikler aktif!")
 except Exception as e:
-    logger.error(f"Premium features kurulum hatası: {e}")
+    logger.error("Premium features kurulum hatası: %s", e)
     PREMIUM_ENABLED = False
     premium = None
 
+# BROADCAST KURULUM
+if PREMIUM_ENABLED:
+    try:
+        broadcast_manager = BroadcastManager(bot, DB_PATH, premium, send_queue)
+        BROADCAST_ENABLED = True
+    except Exception as e:
+        logger.error("Broadcast kurulum hatası: %s", e)
+        BROADCAST_ENABLED = False
+        broadcast_manager = None
+else:
+    BROADCAST_ENABLED = False
+    broadcast_manager = None
+
+# FİYAT ALARMI KURULUM
+try:
+    alert_manager = AlertManager(bot, DB_PATH, send_queue, shared=MULTI_PROCESS)
+    ALERTS_ENABLED = True
+except Exception as e:
+    logger.error("Fiyat alarmı kurulum hatası: %s", e)
+    ALERTS_ENABLED = False
+    alert_manager = None
+
+# HATIRLATICI MOTORU KURULUM
+# Çoklu süreç modunda diğer worker'ların eklediği hatırlatıcılar ön yükleme penceresi
+# sonunda görülür, bu yüzden pencere kısa tutulur
+REMINDER_WINDOW = int(os.getenv("REMINDER_WINDOW", "60" if MULTI_PROCESS else "3600"))
+reminder_engine = ReminderEngine(bot, premium, send_queue, window=REMINDER_WINDOW) if PREMIUM_ENABLED else None
+
+# KULLANIM İSTATİSTİKLERİ KURULUM
+usage_tracker = UsageTracker(premium) if PREMIUM_ENABLED else None
+
+# MOTİVASYON SÖZLERİ KURULUM
+try:
+    quote_service = QuoteService(bot, DB_PATH, send_queue)
+except Exception as e:
+    logger.error("Söz servisi kurulum hatası: %s", e)
+    quote_service = None
+
+# YÖNLENDİRİCİ VE KONUŞMA DURUMU
+# Route'lar dosyanın sonunda, handler'lar tanımlandıktan sonra özellik bazında kaydedilir
+router = Router(reply=lambda event, text: bot.send_message((getattr(event, 'message', None) or event).chat.id, text))
+try:
+    conversations = ConversationManager(create_backend(db_path=DB_PATH), default_ttl=CONVERSATION_TTL)
+except Exception as e:
+    logger.error("Konuşma deposu kurulum hatası, bellek deposu kullanılıyor: %s", e)
+    conversations = ConversationManager(create_backend('memory'), default_ttl=CONVERSATION_TTL)
+
+# HTTP SUNUCUSU (webhook, kısa link yönlendirmeleri, sağlık kontrolü, metrikler)
+web_server = WebServer(port=WEB_PORT) if PUBLIC_URL or METRICS_ENABLED else None
+
+# URL KISALTICI KURULUM
+try:
+    shortener = URLShortener(DB_PATH, PUBLIC_URL) if PUBLIC_URL else None
+    if shortener:
+        shortener.register_routes(web_server)
+except Exception as e:
+    logger.error("URL kısaltıcı kurulum hatası: %s", e)
+    shortener = None
+
+WEBHOOK_PATH = "/webhook"
+WEBHOOK_SECRET = webhook_secret(BOT_TOKEN)
+
+def handle_webhook(request):
+    """Telegram webhook güncellemelerini botun handler havuzuna ilet"""
+    if request.headers.get("X-Telegram-Bot-Api-Secret-Token") != WEBHOOK_SECRET:
+        return text_response(403, "Forbidden")
+    update = types.Update.de_json(request.body.decode("utf-8"))
+    bot.process_new_updates([update])
+    return text_response(200, "OK")
+
+if USE_WEBHOOK:
+    web_server.route("POST", WEBHOOK_PATH, handle_webhook)
+
+# Ana menü butonları
+MAIN_BUTTONS = [
+    "🤖 AI Sohbet",
+    "📁 GitHub Yönetimi", 
+    "🔄 Render Yönetimi",
+    "🎵 YouTube İndir",
+    "📊 Bot Durumu",
+    "🌤️ Hava Durumu",
+    "💱 Döviz Kuru",
+    "₿ Bitcoin",
+    "🔗 QR Kod",
+    "🎤 Ses Çevir",
+    "🖼️ AI Görsel",
+    "📝 Makale Yaz",
+    "🌍 Çeviri",
+    "🔐 Şifre Üret",
+    "📋 Notlarım",
+    "⏰ Hatırlatıcı",
+    "🧮 Hesap Makinesi",
+    "🔗 URL Kısalt",
+    "💭 Motivasyon",
+    "📈 İstatistiklerim"
+]
+MAIN_BUTTON_SET = frozenset(MAIN_BUTTONS)
+
+_registered_commands = None
+
+
+def registered_commands():
+    """Bota kayıtlı komut adları ('/' olmadan); handler'lar kaydedildikten sonra bir kez toplanır"""
+    global _registered_commands
+    if _registered_commands is None:
+        _registered_commands = frozenset(
+            command for handler in bot.message_handlers
+            for command in (handler['filters'].get('commands') or ()))
+    return _registered_commands
+
+
+def track_usage(messages):
+    """Gelen komut ve buton kullanımlarını sayaçlara işle (sadece bellek)
+
+    Sadece kayıtlı komutlar sayılır; rastgele '/xyz' mesajları sayaç tablosunu şişirmesin.
+    """
+    if usage_tracker is None:
+        return
+    for message in messages:
+        text = getattr(message, 'text', None)
+        if not text or not message.from_user:
+            continue
+        if text.startswith('/'):
+            command = text.split(maxsplit=1)[0].split('@', 1)[0]
+            if command[1:] not in registered_commands():
+                continue
+        elif text in MAIN_BUTTON_SET:
+            command = text
+        else:
+            continue
+        usage_tracker.increment(message.from_user.id, command)
+
+bot.set_update_listener(track_usage)
+
 # AI 429 cooldown kontrolü (saniye cinsinden epoch zaman)
 AI_COOLDOWN_UNTIL = 0
 
@@ -122,15 +296,13 @@ def get_ai_response(prompt):
         pass
 
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=500,
-            temperature=0.7
-        )
+        with track('openai'):
+            response = utils.openai_client.get().chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=500,
+                temperature=0.7
+            )
         return response.choices[0].message.content
     except Exception as e:
         error_msg = str(e).lower()
@@ -154,7 +326,7 @@ def github_push_to_repo(repo_name, file_content, file_name="bot_update.py"):
         return "❌ GitHub servisi şu anda kullanılamıyor."
     
     try:
-        user = github.get_user()
+        user = github_manager.user
         try:
             repo = user.get_repo(repo_name)
         except:
@@ -202,32 +374,10 @@ def send_welcome(message):
                 message.from_user.last_name
             )
         except Exception as e:
-            logger.error(f"Kullanıcı ekleme hatası: {e}")
+            logger.error("Kullanıcı ekleme hatası: %s", e)
     
     markup = types.ReplyKeyboardMarkup(row_width=3, resize_keyboard=True)
-    buttons = [
-        "🤖 AI Sohbet",
-        "📁 GitHub Yönetimi", 
-        "🔄 Render Yönetimi",
-        "🎵 YouTube İndir",
-        "📊 Bot Durumu",
-        "🌤️ Hava Durumu",
-        "💱 Döviz Kuru",
-        "₿ Bitcoin",
-        "🔗 QR Kod",
-        "🎤 Ses Çevir",
-        "🖼️ AI Görsel",
-        "📝 Makale Yaz",
-        "🌍 Çeviri",
-        "🔐 Şifre Üret",
-        "📋 Notlarım",
-        "⏰ Hatırlatıcı",
-        "🧮 Hesap Makinesi",
-        "🔗 URL Kısalt",
-        "💭 Motivasyon",
-        "📈 İstatistiklerim"
-    ]
-    markup.add(*[types.KeyboardButton(btn) for btn in buttons])
+    markup.add(*[types.KeyboardButton(btn) for btn in MAIN_BUTTONS])
     
     welcome_text = """
     🚀 *ReisBot Premium'a Hoşgeldin!*
@@ -271,6 +421,7 @@ def send_help(message):
     */start* - Botu başlat
     */help* - Yardım menüsü
     */status* - Bot durumu
+    */iptal* - Bekleyen adımı iptal et
 
     *AI & Medya:*
     */ai <soru>* - AI ile sohbet et
@@ -286,19 +437,26 @@ def send_help(message):
     */weather <şehir>* - Hava durumu
     */exchange <from> <to>* - Döviz kuru
     */bitcoin* - Bitcoin fiyatı
+    */alert <sembol> <>|<> <değer>* - Fiyat alarmı (örn: USD/TRY > 35)
+    */alerts* - Alarmlarımı listele
+    */delalert <id>* - Alarm sil
     */qr <metin>* - QR kod oluştur
     */calc <ifade>* - Hesap makinesi (örn: 2*(3+4))
     */translate <dil> <metin>* - Çeviri (örn: en merhaba dünya)
     */shorten <url>* - URL kısalt
-    */password <uzunluk> <evet/hayır>* - Şifre üret (semboller)
+    */password <uzunluk> <evet/hayır> [adet]* - Şifre üret (semboller, toplu)
+    */password kelime <sayı>* - Parola cümlesi üret
 
     *Not & Hatırlatıcı:*
     */notes* - Notlarımı listele
     */addnote <başlık> | <içerik>* - Not ekle
     */delnote <id>* - Not sil
-    */remind <YYYY-MM-DD HH:MM> | <mesaj>* - Hatırlatıcı ekle
+    */searchnote <sorgu>* - Notlarda ara
+    */remind <YYYY-MM-DD HH:MM> | <mesaj> [| günlük]* - Hatırlatıcı ekle
     */reminders* - Hatırlatıcıları listele
-    */motivate* - Günün sözü
+    */delreminder <id>* - Hatırlatıcı sil
+    */motivate* - Günün sözü (tekrarsız)
+    */motivate günlük* - Her gün söz al (/motivate kapat ile kapat)
     */mystats* - Kullanım istatistiklerim
 
     *Buton Özellikleri:*
@@ -443,6 +601,133 @@ def auto_deploy_command(message):
     except Exception as e:
         bot.reply_to(message, f"❌ Otomatik deploy hatası: {str(e)}")
 
+def is_admin(message):
+    """Mesaj (veya callback) sahibi yönetici mi"""
+    return message.from_user.id in ADMIN_IDS
+
+@bot.message_handler(commands=['broadcast'])
+def broadcast_command(message):
+    """Tüm kullanıcılara mesaj gönder (sadece yönetici)"""
+    if not is_admin(message):
+        bot.reply_to(message, "❌ Bu komut sadece yöneticiler içindir.")
+        return
+    if not BROADCAST_ENABLED:
+        bot.reply_to(message, "❌ Broadcast servisi şu anda kullanılamıyor.")
+        return
+    
+    parts = message.text.split(maxsplit=1)
+    if len(parts) < 2:
+        bot.reply_to(message, "❌ Kullanım: /broadcast <mesaj>\n/broadcast status\n/broadcast cancel <id>")
+        return
+    
+    arg = parts[1].strip()
+    if arg == "status":
+        broadcasts = broadcast_manager.list_broadcasts()
+        if broadcasts:
+            status_text = "📣 *Son Broadcast'ler:*\n\n"
+            for item in broadcasts:
+                status_text += f"#{item['id']} - {item['status']}\n"
+                status_text += f"   📨 {item['sent']} | 🚫 {item['blocked']} | ❌ {item['failed']}\n\n"
+        else:
+            status_text = "📣 Henüz broadcast yapılmadı."
+        bot.reply_to(message, status_text, parse_mode='Markdown')
+    elif arg.startswith("cancel"):
+        cancel_parts = arg.split()
+        if len(cancel_parts) < 2 or not cancel_parts[1].isdigit():
+            bot.reply_to(message, "❌ Kullanım: /broadcast cancel <id>")
+            return
+        bot.reply_to(message, broadcast_manager.cancel_broadcast(int(cancel_parts[1])))
+    else:
+        result = broadcast_manager.start_broadcast(arg, message.from_user.id, message.chat.id)
+        bot.reply_to(message, result)
+
+@bot.message_handler(commands=['jobs'])
+def jobs_command(message):
+    """Zamanlanmış işlerin çalışma istatistikleri (sadece yönetici)"""
+    if not is_admin(message):
+        bot.reply_to(message, "❌ Bu komut sadece yöneticiler içindir.")
+        return
+    if not SCHEDULER_ENABLED:
+        bot.reply_to(message, "❌ Scheduler şu anda kullanılamıyor.")
+        return
+    
+    jobs = scheduler.get_job_stats()
+    if jobs:
+        jobs_text = "⏰ *Zamanlanmış İşler:*\n\n"
+        for job in jobs:
+            next_run = datetime.fromtimestamp(job['next_run']).strftime('%Y-%m-%d %H:%M:%S') if job['next_run'] else '-'
+            jobs_text += f"{'🔄' if job['running'] else '🔸'} `{job['name']}`\n"
+            jobs_text += f"   ▶️ {job['runs']} çalışma | ❌ {job['failures']} hata | ⏭️ {job['misfires']} kaçırılan\n"
+            jobs_text += f"   ⏱️ ort {job['avg_runtime']:.2f} sn | maks {job['max_runtime']:.2f} sn\n"
+            jobs_text += f"   📅 Sonraki: {next_run}\n\n"
+    else:
+        jobs_text = "⏰ Kayıtlı iş yok."
+    bot.reply_to(message, jobs_text, parse_mode='Markdown')
+
+def send_profile(chat_id, stacks, title):
+    """Yığınları flamegraph uyumlu dosya olarak gönder"""
+    if not stacks:
+        bot.send_message(chat_id, f"{title}\n\nÖrnek yok (bu sürede çalışan handler olmadı).")
+        return
+    data = format_collapsed(stacks).encode("utf-8")
+    file_name = f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.folded"
+    caption = f"{title}\n\n{profiler.summary(stacks)}"
+    bot.send_document(chat_id, data, visible_file_name=file_name, caption=caption[:1024])
+
+def run_profile_capture(chat_id, seconds):
+    try:
+        stacks = profiler.capture(seconds)
+        if stacks is None:
+            bot.send_message(chat_id, "❌ Zaten süren bir profil yakalaması var.")
+            return
+        send_profile(chat_id, stacks, f"🔬 {seconds} sn profil")
+    except Exception as e:
+        logger.error("Profil yakalama hatası: %s", e)
+        bot.send_message(chat_id, f"❌ Profil hatası: {str(e)}")
+
+@bot.message_handler(commands=['profile'])
+def profile_command(message):
+    """Süreli profil yakalama ve örneklemeli handler profili (sadece yönetici)"""
+    if not is_admin(message):
+        bot.reply_to(message, "❌ Bu komut sadece yöneticiler içindir.")
+        return
+    
+    parts = message.text.split()
+    arg = parts[1].lower() if len(parts) > 1 else ""
+    if arg.isdigit():
+        seconds = max(1, min(120, int(arg)))
+        if profiler.capturing:
+            bot.reply_to(message, "❌ Zaten süren bir profil yakalaması var.")
+            return
+        bot.reply_to(message, f"🔬 {seconds} sn boyunca profil alınıyor, bitince dosya gönderilecek.")
+        # Handler thread'i süre boyunca meşgul edilmez
+        threading.Thread(target=run_profile_capture, args=(message.chat.id, seconds), daemon=True).start()
+    elif arg == "sample":
+        try:
+            rate = float(parts[2].replace(",", "."))
+        except (IndexError, ValueError):
+            bot.reply_to(message, "❌ Kullanım: /profile sample <oran> (örn: 0.05, kapatmak için 0)")
+            return
+        profiler.sample_rate = max(0.0, min(1.0, rate))
+        bot.reply_to(message, f"✅ Handler örnekleme oranı: %{profiler.sample_rate * 100:g}")
+    elif arg == "stacks":
+        send_profile(message.chat.id, profiler.stacks.copy(), "🔬 Örneklenen handler çağrıları")
+    elif arg == "reset":
+        profiler.reset()
+        bot.reply_to(message, "✅ Biriken profil örnekleri silindi.")
+    else:
+        stats = profiler.get_stats()
+        bot.reply_to(message, f"""🔬 *Profil*
+
+Örnekleme oranı: %{stats['sample_rate'] * 100:g} ({stats['interval_ms']:g} ms aralık)
+Örneklenen çağrı: {stats['sampled_calls']}, {stats['stacks']} farklı yığın (~{stats['sampled_time']:.1f} sn)
+Yakalama: {'🔄 sürüyor' if stats['capturing'] else 'yok'}
+
+/profile <sn> - Süreli profil (en fazla 120 sn)
+/profile sample <oran> - Handler örnekleme oranı
+/profile stacks - Biriken örnekleri gönder
+/profile reset - Örnekleri sil""", parse_mode='Markdown')
+
 @bot.message_handler(commands=['yt'])
 def youtube_download(message):
     try:
@@ -461,17 +746,55 @@ def youtube_download(message):
     except Exception as e:
         bot.reply_to(message, f"❌ İndirme hatası: {str(e)}")
 
+def format_latency_table(histogram, limit=6):
+    """En çok çağrılan etiketler için p50/p95/p99 tablosu (ms)"""
+    rows = [f"{'':<16} {'p50':>6} {'p95':>6} {'p99':>6} {'adet':>6}"]
+    for labels, summary in histogram.summaries()[:limit]:
+        rows.append(
+            f"{labels[0][:16]:<16} {summary['p50'] * 1000:>6.0f} {summary['p95'] * 1000:>6.0f} "
+            f"{summary['p99'] * 1000:>6.0f} {summary['count']:>6}"
+        )
+    return "\n".join(rows) if len(rows) > 1 else "veri yok"
+
+def format_metrics_report():
+    """Yöneticiler için gecikme, hata ve önbellek özeti"""
+    errors = sorted(metrics.ERRORS.snapshot()['values'].items(), key=lambda item: item[1], reverse=True)
+    error_text = ", ".join(f"{source}/{name}: {count}" for (source, name), count in errors[:5]) or "yok"
+    cache_text = ", ".join(
+        f"{name} %{hits / total * 100:.0f}" for name, (hits, total) in cache_stats().items() if total
+    ) or "veri yok"
+    return f"""
+*Handler gecikmesi (ms):*
+```
+{format_latency_table(metrics.HANDLER_LATENCY)}
+```
+*Dış servis gecikmesi (ms):*
+```
+{format_latency_table(metrics.UPSTREAM_LATENCY)}
+```
+*Hatalar:* `{error_text}`
+*Önbellek isabeti:* {cache_text}
+"""
+
 @bot.message_handler(commands=['status'])
 def bot_status(message):
+    queue_metrics = send_queue.get_metrics()
+    lazy_times = get_import_times()
     status_text = f"""
     📊 *ReisBot Durumu*
 
     *Bot:* ✅ Çalışıyor
     *AI Servis:* {'✅ Aktif' if AI_ENABLED else '❌ Devre Dışı'}
     *GitHub:* {'✅ Bağlı' if GITHUB_ENABLED else '❌ Bağlantı Yok'}
+    *Gönderim:* {queue_metrics['throughput_per_sec']} msg/sn, {queue_metrics['sent']} gönderildi, {queue_metrics['retried']} tekrar (429)
+    *Kuyruk:* {queue_metrics['pending_interactive']} / {queue_metrics['pending_normal']} / {queue_metrics['pending_bulk']} bekleyen
+    *Aktif Konuşma:* {conversations.get_stats()['active']}
+    *Sonradan Yüklenen Modül:* {len(lazy_times)} ({sum(t for _, t in lazy_times) * 1000:.0f} ms)
     *Zaman:* {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
     *Chat ID:* {message.chat.id}
     """
+    if is_admin(message):
+        status_text += format_metrics_report()
     bot.reply_to(message, status_text, parse_mode='Markdown')
 
 @bot.message_handler(commands=['weather'])
@@ -551,6 +874,96 @@ def bitcoin_command(message):
     except Exception as e:
         bot.reply_to(message, f"❌ Hata: {str(e)}")
 
+@bot.message_handler(commands=['alert'])
+def alert_command(message):
+    if not ALERTS_ENABLED:
+        bot.reply_to(message, "❌ Fiyat alarmı servisi şu anda kullanılamıyor.")
+        return
+    
+    try:
+        parsed = parse_alert(message.text.replace("/alert", "", 1))
+        if not parsed:
+            bot.reply_to(message, "❌ Kullanım: /alert <sembol> <>|<> <değer>\nÖrnek: /alert USD/TRY > 35 veya /alert BTC < 60000")
+            return
+        
+        symbol, direction, threshold = parsed
+        result = alert_manager.add_alert(message.from_user.id, message.chat.id, symbol, direction, threshold)
+        bot.reply_to(message, result)
+    except Exception as e:
+        bot.reply_to(message, f"❌ Hata: {str(e)}")
+
+@bot.message_handler(commands=['alerts'])
+def alerts_command(message):
+    if not ALERTS_ENABLED:
+        bot.reply_to(message, "❌ Fiyat alarmı servisi şu anda kullanılamıyor.")
+        return
+    
+    alerts = alert_manager.list_alerts(message.from_user.id)
+    if alerts:
+        alert_text = "🔔 *Aktif Alarmların:*\n\n"
+        for alert in alerts:
+            alert_text += f"#{alert['id']} {alert['symbol']} {alert['direction']} {alert['threshold']:,.4f}\n"
+    else:
+        alert_text = "🔕 Aktif alarmın yok. Örnek: /alert USD/TRY > 35"
+    bot.reply_to(message, alert_text, parse_mode='Markdown')
+
+@bot.message_handler(commands=['delalert'])
+def delalert_command(message):
+    if not ALERTS_ENABLED:
+        bot.reply_to(message, "❌ Fiyat alarmı servisi şu anda kullanılamıyor.")
+        return
+    
+    parts = message.text.split()
+    if len(parts) < 2 or not parts[1].lstrip('#').isdigit():
+        bot.reply_to(message, "❌ Kullanım: /delalert <id>")
+        return
+    
+    result = alert_manager.delete_alert(message.from_user.id, int(parts[1].lstrip('#')))
+    bot.reply_to(message, result)
+
+@bot.message_handler(commands=['calc'])
+def calc_command(message):
+    expression = message.text.replace("/calc", "", 1).strip()
+    if not expression:
+        bot.reply_to(message, "❌ İfade yaz. Örnek: /calc 2*(3+4) veya /calc x^2 for x in 1..10")
+        return
+    bot.reply_to(message, calculate(expression))
+
+@bot.message_handler(commands=['translate'])
+def translate_command(message):
+    translate_text(message, message.text.replace("/translate", "", 1).strip())
+
+@bot.message_handler(commands=['shorten'])
+def shorten_command(message):
+    url = message.text.replace("/shorten", "", 1).strip()
+    if not url:
+        bot.reply_to(message, "❌ URL yaz. Örnek: /shorten https://google.com\nİstatistik: /shorten stats <kod>")
+        return
+    shorten_url(message, url)
+
+@bot.message_handler(commands=['password'])
+def password_command(message):
+    generate_password_reply(message, message.text.replace("/password", "", 1).strip())
+
+@bot.message_handler(commands=['motivate'])
+def motivate_command(message):
+    option = message.text.replace("/motivate", "", 1).strip().lower()
+    if option in ("günlük", "gunluk", "daily", "kapat", "off"):
+        if quote_service is None:
+            bot.reply_to(message, "❌ Söz servisi şu anda kullanılamıyor.")
+            return
+        enabled = option in ("günlük", "gunluk", "daily")
+        try:
+            quote_service.set_daily(message.from_user.id, message.chat.id, enabled)
+            if enabled:
+                bot.reply_to(message, f"✅ Her gün {QUOTE_TIME}'da bir motivasyon sözü göndereceğim.\nKapatmak için: /motivate kapat")
+            else:
+                bot.reply_to(message, "✅ Günlük söz gönderimi kapatıldı.")
+        except Exception as e:
+            bot.reply_to(message, f"❌ Abonelik hatası: {str(e)}")
+        return
+    process_motivate(message)
+
 @bot.message_handler(commands=['qr'])
 def qr_command(message):
     try:
@@ -616,88 +1029,106 @@ def image_command(message):
     except Exception as e:
         bot.reply_to(message, f"❌ Hata: {str(e)}")
 
-# BUTON İŞLEMLERİ
-@bot.message_handler(func=lambda message: True)
-def handle_all_messages(message):
-    if message.text == "🤖 AI Sohbet":
-        msg = bot.reply_to(message, "🤖 Sorunu yaz reis, AI cevaplayacak:")
-        bot.register_next_step_handler(msg, process_ai_question)
+@bot.message_handler(commands=['notes'])
+def notes_command(message):
+    notes_menu.list_notes(message)
+
+@bot.message_handler(commands=['addnote'])
+def addnote_command(message):
+    notes_menu.save_note(message, message.text.replace("/addnote", "", 1))
+
+@bot.message_handler(commands=['delnote'])
+def delnote_command(message):
+    if not PREMIUM_ENABLED:
+        bot.reply_to(message, "❌ Not servisi şu anda kullanılamıyor.")
+        return
     
-    elif message.text == "📁 GitHub Yönetimi":
-        if GITHUB_ENABLED:
-            show_github_menu(message)
-        else:
-            bot.reply_to(message, "❌ GitHub servisi devre dışı!")
+    parts = message.text.split()
+    if len(parts) < 2 or not parts[1].lstrip('#').isdigit():
+        bot.reply_to(message, "❌ Kullanım: /delnote <id>")
+        return
     
-    elif message.text == "🔄 Render Yönetimi":
-        if RENDER_ENABLED:
-            show_render_menu(message)
+    try:
+        note_id = int(parts[1].lstrip('#'))
+        if premium.delete_note(message.from_user.id, note_id):
+            bot.reply_to(message, f"✅ Not #{note_id} silindi.")
         else:
-            bot.reply_to(message, "❌ Render servisi devre dışı!")
-    
-    elif message.text == "🎵 YouTube İndir":
-        msg = bot.reply_to(message, "🎵 YouTube URL'si yaz:")
-        bot.register_next_step_handler(msg, process_youtube_download)
-    
-    elif message.text == "📊 Bot Durumu":
-        bot_status(message)
-    
-    elif message.text == "🌤️ Hava Durumu":
-        msg = bot.reply_to(message, "🌤️ Hangi şehrin hava durumunu öğrenmek istiyorsun? (Varsayılan: İstanbul)")
-        bot.register_next_step_handler(msg, process_weather_request)
-    
-    elif message.text == "💱 Döviz Kuru":
-        msg = bot.reply_to(message, "💱 Hangi döviz kurunu öğrenmek istiyorsun? (örn: USD TRY veya boş bırak)")
-        bot.register_next_step_handler(msg, process_exchange_request)
-    
-    elif message.text == "₿ Bitcoin":
-        bitcoin_command(message)
-    
-    elif message.text == "🔗 QR Kod":
-        msg = bot.reply_to(message, "🔗 QR kod için metin veya URL yaz:")
-        bot.register_next_step_handler(msg, process_qr_request)
-    
-    elif message.text == "🎤 Ses Çevir":
-        msg = bot.reply_to(message, "🎤 Okutulacak metni yaz:")
-        bot.register_next_step_handler(msg, process_tts_request)
-    
-    elif message.text == "🖼️ AI Görsel":
-        msg = bot.reply_to(message, "🖼️ Oluşturulacak görselin açıklamasını yaz:")
-        bot.register_next_step_handler(msg, process_image_request)
-
-    elif message.text == "🧮 Hesap Makinesi":
-        msg = bot.reply_to(message, "🧮 İfadeyi yaz (örn: 2*(3+4)):")
-        bot.register_next_step_handler(msg, process_calc_request)
-
-    elif message.text == "🌍 Çeviri":
-        msg = bot.reply_to(message, "🌍 Hedef dil ve metni yaz (örn: en merhaba dünya):")
-        bot.register_next_step_handler(msg, process_translate_request)
+            bot.reply_to(message, f"❌ #{note_id} numaralı not bulunamadı.")
+    except Exception as e:
+        bot.reply_to(message, f"❌ Not silme hatası: {str(e)}")
 
-    elif message.text == "🔗 URL Kısalt":
-        msg = bot.reply_to(message, "🔗 Kısaltılacak URL'yi yaz:")
-        bot.register_next_step_handler(msg, process_shorten_request)
+@bot.message_handler(commands=['searchnote'])
+def searchnote_command(message):
+    query = message.text.replace("/searchnote", "", 1).strip()
+    if not query:
+        bot.reply_to(message, "❌ Kullanım: /searchnote <aranacak kelimeler>")
+        return
+    
+    text, markup = notes_menu.render_search(message.from_user.id, query, 0)
+    bot.reply_to(message, text, parse_mode='HTML', reply_markup=markup)
 
-    elif message.text == "🔐 Şifre Üret":
-        msg = bot.reply_to(message, "🔐 Uzunluk ve semboller (örn: 12 evet/hayır):")
-        bot.register_next_step_handler(msg, process_password_request)
+@bot.message_handler(commands=['remind'])
+def remind_command(message):
+    save_reminder(message, message.text.replace("/remind", "", 1))
 
-    elif message.text == "📋 Notlarım":
-        # Notları listele ve ekleme için prompt ver
-        process_list_notes(message)
-        msg = bot.reply_to(message, "📝 Yeni not eklemek için 'Başlık | İçerik' yaz:")
-        bot.register_next_step_handler(msg, process_addnote_request)
+@bot.message_handler(commands=['reminders'])
+def reminders_command(message):
+    if not PREMIUM_ENABLED:
+        bot.reply_to(message, "❌ Hatırlatıcı servisi şu anda kullanılamıyor.")
+        return
+    
+    try:
+        reminders = premium.get_reminders(message.from_user.id)
+        if reminders:
+            reminder_text = "⏰ *Bekleyen Hatırlatıcıların:*\n\n"
+            for reminder in reminders:
+                due = datetime.fromtimestamp(reminder['due_time']).strftime('%Y-%m-%d %H:%M')
+                repeat = f" 🔁 {RECURRENCE_LABELS[reminder['recurrence']]}" if reminder['recurrence'] else ""
+                reminder_text += f"🔸 #{reminder['id']} - {due}{repeat}\n   📝 {reminder['message'][:60]}\n\n"
+        else:
+            reminder_text = "⏰ Bekleyen hatırlatıcın yok."
+        bot.reply_to(message, reminder_text, parse_mode='Markdown')
+    except Exception as e:
+        bot.reply_to(message, f"❌ Hatırlatıcılar alınamadı: {str(e)}")
 
-    elif message.text == "⏰ Hatırlatıcı":
-        msg = bot.reply_to(message, "⏰ Tarih/Saat ve mesaj yaz (örn: 2025-08-31 09:00 | toplantı):")
-        bot.register_next_step_handler(msg, process_remind_request)
+@bot.message_handler(commands=['delreminder'])
+def delreminder_command(message):
+    if not PREMIUM_ENABLED:
+        bot.reply_to(message, "❌ Hatırlatıcı servisi şu anda kullanılamıyor.")
+        return
+    
+    parts = message.text.split()
+    if len(parts) < 2 or not parts[1].lstrip('#').isdigit():
+        bot.reply_to(message, "❌ Kullanım: /delreminder <id>")
+        return
+    
+    try:
+        reminder_id = int(parts[1].lstrip('#'))
+        if premium.delete_reminder(message.from_user.id, reminder_id):
+            reminder_engine.cancel(reminder_id)
+            bot.reply_to(message, f"✅ Hatırlatıcı #{reminder_id} silindi.")
+        else:
+            bot.reply_to(message, f"❌ #{reminder_id} numaralı hatırlatıcı bulunamadı.")
+    except Exception as e:
+        bot.reply_to(message, f"❌ Hatırlatıcı silme hatası: {str(e)}")
 
-    elif message.text == "💭 Motivasyon":
-        process_motivate(message)
+@bot.message_handler(commands=['mystats'])
+def mystats_command(message):
+    process_mystats(message)
 
-    elif message.text == "📈 İstatistiklerim":
-        process_mystats(message)
+# BUTON İŞLEMLERİ
+@bot.message_handler(func=lambda message: True)
+def handle_all_messages(message):
+    # Menü butonu bekleyen adımı kapatır; diğer mesajlar önce bekleyen adıma gider
+    if router.is_button(message.text):
+        conversations.clear(message.chat.id)
+        router.dispatch_message(message)
+        return
     
-    else:
+    outcome = conversations.handle(message)
+    if outcome == CANCELLED:
+        bot.reply_to(message, "✅ İşlem iptal edildi.")
+    elif not outcome and not router.dispatch_message(message):
         bot.reply_to(message, "❌ Anlamadım reis. /help yazabilirsin.")
 
 def process_ai_question(message):
@@ -802,6 +1233,124 @@ def process_exchange_request(message):
     else:
         bot.reply_to(message, "❌ Döviz kuru bilgisi alınamadı.")
 
+def process_calc_request(message):
+    bot.reply_to(message, calculate(message.text or ""))
+
+def translate_text(message, text):
+    """'<dil> <metin>' biçimindeki girdiyi çevir"""
+    if translator is None:
+        bot.reply_to(message, "❌ Çeviri servisi şu anda kullanılamıyor.")
+        return
+    parts = (text or "").split(None, 1)
+    if len(parts) < 2:
+        bot.reply_to(message, "❌ Kullanım: /translate <dil> <metin>\nÖrnek: /translate en merhaba dünya")
+        return
+
+    target = resolve_language(parts[0])
+    if not target:
+        codes = ", ".join(LANGUAGES)
+        bot.reply_to(message, f"❌ Bilinmeyen dil: {parts[0]}\nDesteklenenler: {codes}")
+        return
+
+    try:
+        bot.send_chat_action(message.chat.id, 'typing')
+        translated, source = translator.translate(parts[1], target)
+        source_label = LANGUAGES.get(source, "Otomatik")
+        bot.reply_to(message, f"🌍 {source_label} → {LANGUAGES[target]}\n\n{translated}")
+    except TranslationError as e:
+        bot.reply_to(message, f"❌ {str(e)}")
+    except Exception as e:
+        logger.error("Çeviri hatası: %s", e)
+        bot.reply_to(message, f"❌ Çeviri hatası: {str(e)}")
+
+def process_translate_request(message):
+    translate_text(message, message.text)
+
+def shorten_url(message, text):
+    """URL kısalt veya 'stats <kod>' ile tıklama sayısını göster"""
+    if shortener is None:
+        bot.reply_to(message, "❌ URL kısaltıcı devre dışı (PUBLIC_URL ayarlı değil).")
+        return
+    try:
+        parts = text.split()
+        if len(parts) == 2 and parts[0].lower() in ("stats", "istatistik"):
+            code = parts[1].rsplit("/", 1)[-1]
+            info = shortener.get_link_stats(code)
+            if not info:
+                bot.reply_to(message, "❌ Link bulunamadı.")
+                return
+            created = datetime.fromtimestamp(info['created_at']).strftime('%Y-%m-%d %H:%M')
+            bot.reply_to(message, f"📊 {shortener.short_url(code)}\n\n🔗 {info['url']}\n👆 Tıklama: {info['clicks']}\n📅 Oluşturma: {created}")
+            return
+
+        code, created = shortener.shorten(text, message.from_user.id)
+        note = "" if created else "\n♻️ Bu URL daha önce kısaltılmış, aynı link verildi."
+        bot.reply_to(message, f"✅ Kısa link: {shortener.short_url(code)}{note}", disable_web_page_preview=True)
+    except ShortenerError as e:
+        bot.reply_to(message, f"❌ {str(e)}")
+    except Exception as e:
+        logger.error("URL kısaltma hatası: %s", e)
+        bot.reply_to(message, f"❌ URL kısaltma hatası: {str(e)}")
+
+def process_shorten_request(message):
+    shorten_url(message, message.text.strip())
+
+def generate_password_reply(message, text):
+    """'<uzunluk> <evet/hayır> [adet]' veya 'kelime <sayı>' girdisine göre şifre üret"""
+    parts = (text or "").lower().split()
+    try:
+        if parts and parts[0] in ("kelime", "passphrase"):
+            words = int(parts[1]) if len(parts) > 1 else 5
+            phrase, bits = passwords.generate_passphrase(words)
+            bot.reply_to(message, f"🔐 Parola cümlesi:\n<code>{html.escape(phrase)}</code>\n\n📏 Entropi: {bits:.0f} bit {passwords.strength_label(bits)}", parse_mode='HTML')
+            return
+
+        length = int(parts[0]) if parts else 16
+        use_symbols = parts[1] not in ("hayır", "hayir", "h", "no", "n") if len(parts) > 1 else True
+        count = int(parts[2]) if len(parts) > 2 else 1
+        bits = passwords.password_entropy(length, passwords.character_classes(use_symbols))
+        info = f"📏 Entropi: {bits:.0f} bit {passwords.strength_label(bits)}"
+
+        if count == 1:
+            password = passwords.generate_password(length, use_symbols)
+            bot.reply_to(message, f"🔐 Şifre:\n<code>{html.escape(password)}</code>\n\n{info}", parse_mode='HTML')
+            return
+
+        generated = passwords.generate_passwords(count, length, use_symbols)
+        if count <= 20:
+            lines = "\n".join(f"<code>{html.escape(p)}</code>" for p in generated)
+            bot.reply_to(message, f"🔐 {count} şifre:\n{lines}\n\n{info}", parse_mode='HTML')
+        else:
+            bot.send_chat_action(message.chat.id, 'upload_document')
+            data = ("\n".join(generated) + "\n").encode("utf-8")
+            bot.send_document(message.chat.id, data, visible_file_name=f"sifreler_{count}.txt",
+                              caption=f"🔐 {count} şifre ({length} karakter)\n{info}")
+    except ValueError:
+        bot.reply_to(message, "❌ Kullanım: /password <uzunluk> <evet/hayır> [adet]\nParola cümlesi: /password kelime 5")
+    except passwords.PasswordError as e:
+        bot.reply_to(message, f"❌ {str(e)}")
+    except Exception as e:
+        logger.error("Şifre üretme hatası: %s", e)
+        bot.reply_to(message, f"❌ Şifre üretme hatası: {str(e)}")
+
+def process_password_request(message):
+    generate_password_reply(message, message.text)
+
+def process_motivate(message):
+    """Kullanıcıya daha önce görmediği bir söz gönder"""
+    if quote_service is None:
+        bot.reply_to(message, "❌ Söz servisi şu anda kullanılamıyor.")
+        return
+    try:
+        text, author, position, total = quote_service.next_quote(message.from_user.id, message.chat.id)
+        footer = f"\n\n📖 {position}/{total}"
+        if position == 1 and not quote_service.is_daily(message.from_user.id):
+            footer += " • Her gün söz almak için: /motivate günlük"
+        bot.reply_to(message, quote_service.format_quote(text, author) + footer, parse_mode='Markdown')
+    except Exception as e:
+        logger.error("Söz gönderme hatası: %s", e)
+        bot.reply_to(message, f"❌ Söz hatası: {str(e)}")
+
 def process_qr_request(message):
     text = message.text.strip()
     if not text:
@@ -855,66 +1404,77 @@ def process_image_request(message):
     else:
         bot.reply_to(message, "❌ AI görsel oluşturulamadı.")
 
-# GITHUB YÖNETİMİ FONKSİYONLARI
-def show_github_menu(message):
-    """GitHub yönetim menüsünü göster"""
-    markup = types.InlineKeyboardMarkup(row_width=2)
-    buttons = [
-        types.InlineKeyboardButton("📋 Repo Listesi", callback_data="github_list_repos"),
-        types.InlineKeyboardButton("📁 Dosya Listesi", callback_data="github_list_files"),
-        types.InlineKeyboardButton("📤 Dosya Yükle", callback_data="github_upload_file"),
-        types.InlineKeyboardButton("🗑️ Dosya Sil", callback_data="github_delete_file"),
-        types.InlineKeyboardButton("📝 Dosya Güncelle", callback_data="github_update_file"),
-        types.InlineKeyboardButton("📜 Commit Geçmişi", callback_data="github_commits"),
-        types.InlineKeyboardButton("🔄 Bot'u Yükle", callback_data="github_upload_bot"),
-        types.InlineKeyboardButton("❌ Kapat", callback_data="close_menu")
-    ]
-    markup.add(*buttons)
+def parse_reminder_input(text):
+    """'YYYY-MM-DD HH:MM | mesaj [| günlük]' metnini (epoch, mesaj, tekrar) olarak ayrıştır"""
+    parts = [part.strip() for part in (text or "").split("|")]
+    if len(parts) < 2 or not parts[1]:
+        return None
+    try:
+        due = datetime.strptime(parts[0], '%Y-%m-%d %H:%M')
+    except ValueError:
+        return None
+    recurrence = None
+    if len(parts) > 2:
+        recurrence = parse_recurrence(parts[-1])
+        if recurrence:
+            parts = parts[:-1]
+    return due.timestamp(), " | ".join(parts[1:]), recurrence
+
+def save_reminder(message, text):
+    """Hatırlatıcıyı doğrulayıp kaydet"""
+    if not PREMIUM_ENABLED:
+        bot.reply_to(message, "❌ Hatırlatıcı servisi şu anda kullanılamıyor.")
+        return
     
-    menu_text = """
-📁 *GitHub Yönetim Paneli*
-
-Yapmak istediğin işlemi seç:
-• 📋 Repo Listesi - Tüm repolarını görüntüle
-• 📁 Dosya Listesi - Repo dosyalarını listele
-• 📤 Dosya Yükle - Yeni dosya oluştur
-• 🗑️ Dosya Sil - Dosya sil
-• 📝 Dosya Güncelle - Mevcut dosyayı güncelle
-• 📜 Commit Geçmişi - Son commit'leri görüntüle
-• 🔄 Bot'u Yükle - Mevcut botu GitHub'a yükle
-    """
+    parsed = parse_reminder_input(text)
+    if not parsed:
+        bot.reply_to(message, "❌ Format: YYYY-MM-DD HH:MM | mesaj [| günlük/haftalık/saatlik] (örn: 2025-08-31 09:00 | toplantı)")
+        return
     
-    bot.send_message(message.chat.id, menu_text, parse_mode='Markdown', reply_markup=markup)
-
-def show_render_menu(message):
-    """Render yönetim menüsünü göster"""
-    markup = types.InlineKeyboardMarkup(row_width=2)
-    buttons = [
-        types.InlineKeyboardButton("🚀 Servis Listesi", callback_data="render_list_services"),
-        types.InlineKeyboardButton("📊 Servis Detayı", callback_data="render_service_details"),
-        types.InlineKeyboardButton("🔄 Deploy Et", callback_data="render_deploy"),
-        types.InlineKeyboardButton("📜 Deploy Geçmişi", callback_data="render_deploys"),
-        types.InlineKeyboardButton("📋 Logları Görüntüle", callback_data="render_logs"),
-        types.InlineKeyboardButton("🔁 Servisi Yeniden Başlat", callback_data="render_restart"),
-        types.InlineKeyboardButton("⚙️ Env Variables", callback_data="render_env_vars"),
-        types.InlineKeyboardButton("❌ Kapat", callback_data="close_menu")
-    ]
-    markup.add(*buttons)
+    due_time, reminder_message, recurrence = parsed
+    if due_time <= time.time():
+        bot.reply_to(message, "❌ Hatırlatıcı zamanı gelecekte olmalı.")
+        return
     
-    menu_text = """
-🔄 *Render Yönetim Paneli*
-
-Yapmak istediğin işlemi seç:
-• 🚀 Servis Listesi - Tüm servislerini görüntüle
-• 📊 Servis Detayı - Detaylı servis bilgisi
-• 🔄 Deploy Et - Yeni deployment başlat
-• 📜 Deploy Geçmişi - Son deployment'ları görüntüle
-• 📋 Logları Görüntüle - Servis loglarını incele
-• 🔁 Servisi Yeniden Başlat - Servisi restart et
-• ⚙️ Env Variables - Environment variables yönet
-    """
+    try:
+        reminder_id = premium.add_reminder(message.from_user.id, message.chat.id, reminder_message, due_time, recurrence)
+        reminder_engine.schedule(reminder_id, due_time)
+        due = datetime.fromtimestamp(due_time).strftime('%Y-%m-%d %H:%M')
+        repeat = f" (🔁 {RECURRENCE_LABELS[recurrence]})" if recurrence else ""
+        bot.reply_to(message, f"✅ Hatırlatıcı #{reminder_id} kuruldu: {due}{repeat}")
+    except Exception as e:
+        bot.reply_to(message, f"❌ Hatırlatıcı kaydetme hatası: {str(e)}")
+
+def process_remind_request(message):
+    save_reminder(message, message.text)
+
+def process_mystats(message):
+    """Kullanıcının kullanım istatistiklerini göster"""
+    if not PREMIUM_ENABLED:
+        bot.reply_to(message, "❌ İstatistik servisi şu anda kullanılamıyor.")
+        return
     
-    bot.send_message(message.chat.id, menu_text, parse_mode='Markdown', reply_markup=markup)
+    try:
+        stats = premium.get_user_stats(message.from_user.id)
+        if usage_tracker is not None:
+            # Henüz diske yazılmamış sayaçlar da dahil edilir
+            stats['usage'] = usage_tracker.get_usage(message.from_user.id)
+            stats['total_commands'] = sum(stats['usage'].values())
+        joined = datetime.fromtimestamp(stats['joined']).strftime('%Y-%m-%d') if stats['joined'] else 'Bilinmiyor'
+        stats_text = "📈 *Kullanım İstatistiklerin*\n\n"
+        stats_text += f"📅 *Katılım:* {joined}\n"
+        stats_text += f"📋 *Notlar:* {stats['notes']}\n"
+        stats_text += f"⏰ *Bekleyen Hatırlatıcılar:* {stats['reminders']}\n"
+        stats_text += f"⚡ *Toplam Komut:* {stats['total_commands']}\n"
+        top_commands = sorted(stats['usage'].items(), key=lambda item: item[1], reverse=True)[:5]
+        if top_commands:
+            stats_text += "\n🏆 *En Çok Kullandıkların:*\n"
+            for command, count in top_commands:
+                # Komut adındaki '_' Markdown'ı bozmasın
+                stats_text += f"   • `{command}`: {count}\n"
+        bot.reply_to(message, stats_text, parse_mode='Markdown')
+    except Exception as e:
+        bot.reply_to(message, f"❌ İstatistikler alınamadı: {str(e)}")
 
 # CALLBACK HANDLER
 @bot.callback_query_handler(func=lambda call: True)
@@ -925,329 +1485,174 @@ def callback_query(call):
             bot.delete_message(call.message.chat.id, call.message.message_id)
             return
         
-        # GitHub Callbacks
-        elif call.data == "github_list_repos":
-            handle_github_list_repos(call)
-        elif call.data == "github_list_files":
-            handle_github_list_files(call)
-        elif call.data == "github_upload_file":
-            handle_github_upload_file(call)
-        elif call.data == "github_delete_file":
-            handle_github_delete_file(call)
-        elif call.data == "github_update_file":
-            handle_github_update_file(call)
-        elif call.data == "github_commits":
-            handle_github_commits(call)
-        elif call.data == "github_upload_bot":
-            handle_github_upload_bot(call)
-        
-        # Render Callbacks
-        elif call.data == "render_list_services":
-            handle_render_list_services(call)
-        elif call.data == "render_service_details":
-            handle_render_service_details(call)
-        elif call.data == "render_deploy":
-            handle_render_deploy(call)
-        elif call.data == "render_deploys":
-            handle_render_deploys(call)
-        elif call.data == "render_logs":
-            handle_render_logs(call)
-        elif call.data == "render_restart":
-            handle_render_restart(call)
-        elif call.data == "render_env_vars":
-            handle_render_env_vars(call)
-        
+        router.dispatch_callback(call)
         bot.answer_callback_query(call.id)
     except Exception as e:
         bot.answer_callback_query(call.id, f"❌ Hata: {str(e)}")
 
-# GITHUB CALLBACK HANDLERs
-def handle_github_list_repos(call):
-    """GitHub repo listesini göster"""
-    try:
-        repos = github_manager.list_repositories()
-        if repos:
-            repo_text = "📋 *GitHub Repolarınız:*\n\n"
-            for repo in repos[:10]:  # İlk 10 repo
-                status = "🔒" if repo['private'] else "🌐"
-                repo_text += f"{status} *{repo['name']}*\n"
-                repo_text += f"   📝 {repo['description'][:50]}...\n"
-                repo_text += f"   📅 {repo['updated']} | 💾 {repo['size']} KB\n\n"
-            
-            if len(repos) > 10:
-                repo_text += f"... ve {len(repos) - 10} repo daha"
-        else:
-            repo_text = "❌ Hiç repo bulunamadı."
-        
-        bot.edit_message_text(repo_text, call.message.chat.id, call.message.message_id, parse_mode='Markdown')
-    except Exception as e:
-        bot.edit_message_text(f"❌ Repo listesi alınamadı: {str(e)}", call.message.chat.id, call.message.message_id)
-
-def handle_github_list_files(call):
-    """GitHub dosya listesini göster"""
-    msg = bot.send_message(call.message.chat.id, "📁 Hangi repo'nun dosyalarını listelemek istiyorsun? Repo adını yaz:")
-    bot.register_next_step_handler(msg, process_github_list_files)
-
-def process_github_list_files(message):
-    """GitHub dosya listesi işlemi"""
-    try:
-        repo_name = message.text.strip()
-        files = github_manager.get_repository_files(repo_name)
-        
-        if files:
-            file_text = f"📁 *{repo_name} Dosyaları:*\n\n"
-            for file in files[:15]:  # İlk 15 dosya
-                icon = "📁" if file['type'] == 'dir' else "📄"
-                size = f" ({file['size']} bytes)" if file['type'] == 'file' else ""
-                file_text += f"{icon} `{file['name']}`{size}\n"
-            
-            if len(files) > 15:
-                file_text += f"\n... ve {len(files) - 15} dosya daha"
-        else:
-            file_text = "❌ Dosya bulunamadı veya repo mevcut değil."
-        
-        bot.reply_to(message, file_text, parse_mode='Markdown')
-    except Exception as e:
-        bot.reply_to(message, f"❌ Dosya listesi alınamadı: {str(e)}")
-
-def handle_github_upload_file(call):
-    """GitHub dosya yükleme"""
-    msg = bot.send_message(call.message.chat.id, "📤 Repo adı, dosya adı ve içeriği yaz (örn: myrepo test.py print('hello'))")
-    bot.register_next_step_handler(msg, process_github_upload_file)
-
-def process_github_upload_file(message):
-    """GitHub dosya yükleme işlemi"""
-    try:
-        parts = message.text.split(' ', 2)
-        if len(parts) < 3:
-            bot.reply_to(message, "❌ Format: repo_adı dosya_adı dosya_içeriği")
-            return
-        
-        repo_name, file_name, content = parts
-        result = github_manager.create_file(repo_name, file_name, content)
-        bot.reply_to(message, result)
-    except Exception as e:
-        bot.reply_to(message, f"❌ Dosya yükleme hatası: {str(e)}")
-
-def handle_github_delete_file(call):
-    """GitHub dosya silme"""
-    msg = bot.send_message(call.message.chat.id, "🗑️ Silinecek dosyanın repo adı ve dosya yolunu yaz (örn: myrepo src/main.py)")
-    bot.register_next_step_handler(msg, process_github_delete_file)
-
-def process_github_delete_file(message):
-    """GitHub dosya silme işlemi"""
-    try:
-        parts = message.text.split(' ', 1)
-        if len(parts) < 2:
-            bot.reply_to(message, "❌ Format: repo_adı dosya_yolu")
-            return
-        
-        repo_name, file_path = parts
-        result = github_manager.delete_file(repo_name, file_path)
-        bot.reply_to(message, result)
-    except Exception as e:
-        bot.reply_to(message, f"❌ Dosya silme hatası: {str(e)}")
-
-def handle_github_update_file(call):
-    """GitHub dosya güncelleme"""
-    msg = bot.send_message(call.message.chat.id, "📝 Güncellenecek dosyanın repo adı, dosya yolu ve yeni içeriği yaz")
-    bot.register_next_step_handler(msg, process_github_update_file)
-
-def process_github_update_file(message):
-    """GitHub dosya güncelleme işlemi"""
-    try:
-        parts = message.text.split(' ', 2)
-        if len(parts) < 3:
-            bot.reply_to(message, "❌ Format: repo_adı dosya_yolu yeni_içerik")
-            return
-        
-        repo_name, file_path, new_content = parts
-        result = github_manager.update_file(repo_name, file_path, new_content)
-        bot.reply_to(message, result)
-    except Exception as e:
-        bot.reply_to(message, f"❌ Dosya güncelleme hatası: {str(e)}")
-
-def handle_github_commits(call):
-    """GitHub commit geçmişi"""
-    msg = bot.send_message(call.message.chat.id, "📜 Hangi repo'nun commit geçmişini görmek istiyorsun? Repo adını yaz:")
-    bot.register_next_step_handler(msg, process_github_commits)
-
-def process_github_commits(message):
-    """GitHub commit geçmişi işlemi"""
-    try:
-        repo_name = message.text.strip()
-        commits = github_manager.get_commits(repo_name, 10)
-        
-        if commits:
-            commit_text = f"📜 *{repo_name} Son Commit'ler:*\n\n"
-            for commit in commits:
-                commit_text += f"🔸 `{commit['sha']}` - {commit['author']}\n"
-                commit_text += f"   📝 {commit['message'][:60]}...\n"
-                commit_text += f"   📅 {commit['date']}\n\n"
-        else:
-            commit_text = "❌ Commit geçmişi bulunamadı."
-        
-        bot.reply_to(message, commit_text, parse_mode='Markdown')
-    except Exception as e:
-        bot.reply_to(message, f"❌ Commit geçmişi alınamadı: {str(e)}")
-
-def handle_github_upload_bot(call):
-    """Mevcut botu GitHub'a yükle"""
-    try:
-        bot.send_message(call.message.chat.id, "🔄 Bot dosyaları GitHub'a yükleniyor...")
-        result = github_manager.upload_current_bot("ReisBot_Premium")
-        bot.send_message(call.message.chat.id, f"📤 *Bot Yükleme Sonucu:*\n\n{result}", parse_mode='Markdown')
-    except Exception as e:
-        bot.send_message(call.message.chat.id, f"❌ Bot yükleme hatası: {str(e)}")
-
-# RENDER CALLBACK HANDLERs
-def handle_render_list_services(call):
-    """Render servis listesini göster"""
-    try:
-        services = render_manager.get_services()
-        if services:
-            service_text = "🚀 *Render Servisleriniz:*\n\n"
-            for service in services:
-                status_icon = "✅" if service['status'] == 'active' else "❌"
-                service_text += f"{status_icon} *{service['name']}*\n"
-                service_text += f"   🔗 {service['url'] or 'URL yok'}\n"
-                service_text += f"   📅 {service['updated']}\n\n"
-        else:
-            service_text = "❌ Hiç servis bulunamadı."
-        
-        bot.edit_message_text(service_text, call.message.chat.id, call.message.message_id, parse_mode='Markdown')
-    except Exception as e:
-        bot.edit_message_text(f"❌ Servis listesi alınamadı: {str(e)}", call.message.chat.id, call.message.message_id)
-
-def handle_render_service_details(call):
-    """Render servis detayları"""
-    msg = bot.send_message(call.message.chat.id, "📊 Hangi servisin detaylarını görmek istiyorsun? Servis ID'sini yaz:")
-    bot.register_next_step_handler(msg, process_render_service_details)
-
-def process_render_service_details(message):
-    """Render servis detayları işlemi"""
-    try:
-        service_id = message.text.strip()
-        details = render_manager.get_service_details(service_id)
-        
-        if details:
-            detail_text = f"📊 *Servis Detayları:*\n\n"
-            detail_text += f"📛 *Ad:* {details['name']}\n"
-            detail_text += f"🔗 *URL:* {details['url'] or 'Yok'}\n"
-            detail_text += f"📊 *Durum:* {details['status']}\n"
-            detail_text += f"🌿 *Branch:* {details['branch']}\n"
-            detail_text += f"🔧 *Build Cmd:* `{details['build_command']}`\n"
-            detail_text += f"▶️ *Start Cmd:* `{details['start_command']}`\n"
-            detail_text += f"📅 *Oluşturulma:* {details['created'][:10]}\n"
-        else:
-            detail_text = "❌ Servis detayları bulunamadı."
-        
-        bot.reply_to(message, detail_text, parse_mode='Markdown')
-    except Exception as e:
-        bot.reply_to(message, f"❌ Servis detayları alınamadı: {str(e)}")
-
-def handle_render_deploy(call):
-    """Render deploy başlat"""
-    msg = bot.send_message(call.message.chat.id, "🔄 Hangi servisi deploy etmek istiyorsun? Servis ID'sini yaz:")
-    bot.register_next_step_handler(msg, process_render_deploy)
-
-def process_render_deploy(message):
-    """Render deploy işlemi"""
-    try:
-        service_id = message.text.strip()
-        bot.send_message(message.chat.id, "🔄 Deploy başlatılıyor...")
-        result = render_manager.deploy_service(service_id)
-        bot.reply_to(message, result)
-    except Exception as e:
-        bot.reply_to(message, f"❌ Deploy hatası: {str(e)}")
-
-def handle_render_deploys(call):
-    """Render deploy geçmişi"""
-    msg = bot.send_message(call.message.chat.id, "📜 Hangi servisin deploy geçmişini görmek istiyorsun? Servis ID'sini yaz:")
-    bot.register_next_step_handler(msg, process_render_deploys)
-
-def process_render_deploys(message):
-    """Render deploy geçmişi işlemi"""
-    try:
-        service_id = message.text.strip()
-        deploys = render_manager.get_deploys(service_id, 10)
-        
-        if deploys:
-            deploy_text = f"📜 *Son Deploy'lar:*\n\n"
-            for deploy in deploys:
-                status_icon = "✅" if deploy['status'] == 'live' else "🔄" if deploy['status'] == 'build_in_progress' else "❌"
-                deploy_text += f"{status_icon} `{deploy['id'][:8]}...`\n"
-                deploy_text += f"   📅 {deploy['created']} - {deploy['finished']}\n\n"
-        else:
-            deploy_text = "❌ Deploy geçmişi bulunamadı."
-        
-        bot.reply_to(message, deploy_text, parse_mode='Markdown')
-    except Exception as e:
-        bot.reply_to(message, f"❌ Deploy geçmişi alınamadı: {str(e)}")
-
-def handle_render_logs(call):
-    """Render logları göster"""
-    msg = bot.send_message(call.message.chat.id, "📋 Hangi servisin loglarını görmek istiyorsun? Servis ID'sini yaz:")
-    bot.register_next_step_handler(msg, process_render_logs)
-
-def process_render_logs(message):
-    """Render logları işlemi"""
-    try:
-        service_id = message.text.strip()
-        logs = render_manager.get_logs(service_id, 50)
-        
-        if logs:
-            log_text = f"📋 *Son Loglar:*\n\n"
-            # Logları işle (format render API'sine göre değişebilir)
-            log_text += "```\n"
-            for log in logs[-10:]:  # Son 10 log
-                log_text += f"{log}\n"
-            log_text += "```"
-        else:
-            log_text = "❌ Log bulunamadı."
-        
-        bot.reply_to(message, log_text, parse_mode='Markdown')
-    except Exception as e:
-        bot.reply_to(message, f"❌ Log alma hatası: {str(e)}")
-
-def handle_render_restart(call):
-    """Render servisi yeniden başlat"""
-    msg = bot.send_message(call.message.chat.id, "🔁 Hangi servisi yeniden başlatmak istiyorsun? Servis ID'sini yaz:")
-    bot.register_next_step_handler(msg, process_render_restart)
-
-def process_render_restart(message):
-    """Render restart işlemi"""
-    try:
-        service_id = message.text.strip()
-        bot.send_message(message.chat.id, "🔁 Servis yeniden başlatılıyor...")
-        result = render_manager.restart_service(service_id)
-        bot.reply_to(message, result)
-    except Exception as e:
-        bot.reply_to(message, f"❌ Restart hatası: {str(e)}")
-
-def handle_render_env_vars(call):
-    """Render environment variables"""
-    bot.send_message(call.message.chat.id, "⚙️ Environment variables yönetimi yakında eklenecek!")
-
-# BOTU BAŞLAT
-if __name__ == "__main__":
-    logger.info("🤖 ReisBot Premium başlatılıyor...")
-    logger.info(f"AI Durumu: {'Aktif' if AI_ENABLED else 'Devre Dışı'}")
-    logger.info(f"GitHub Durumu: {'Bağlı' if GITHUB_ENABLED else 'Bağlantı Yok'}")
-    logger.info(f"Render Durumu: {'Bağlı' if RENDER_ENABLED else 'Bağlantı Yok'}")
-    logger.info(f"Scheduler Durumu: {'Aktif' if SCHEDULER_ENABLED else 'Devre Dışı'}")
+# YÖNLENDİRME TABLOLARI
+# Her özellik kendi modülünde; route'ları ve adımları buradan kaydedilir
+notes_menu = NoteRoutes(bot, conversations, premium)
+github_menu = GitHubRoutes(bot, conversations, github_manager, render_manager, is_admin)
+render_menu = RenderRoutes(bot, conversations, render_manager, is_admin)
+
+STEP_HANDLERS = {
+    'ai.question': process_ai_question,
+    'youtube.url': process_youtube_download,
+    'weather.city': process_weather_request,
+    'exchange.pair': process_exchange_request,
+    'qr.text': process_qr_request,
+    'tts.text': process_tts_request,
+    'image.prompt': process_image_request,
+    'calc.expression': process_calc_request,
+    'translate.text': process_translate_request,
+    'shorten.url': process_shorten_request,
+    'password.options': process_password_request,
+    'reminder.input': process_remind_request
+}
+DIRECT_BUTTONS = {
+    "📊 Bot Durumu": bot_status,
+    "₿ Bitcoin": bitcoin_command,
+    "💭 Motivasyon": process_motivate,
+    "📈 İstatistiklerim": process_mystats
+}
+
+router.include(register_main_menu, bot, conversations, STEP_HANDLERS, DIRECT_BUTTONS)
+router.include(notes_menu.register)
+router.include(github_menu.register)
+router.include(render_menu.register)
+
+# PROFİLLEME
+# Ölçüm sarmalayıcısının içinde kalsın; yığınlar doğrudan handler'dan başlar
+profiler = Profiler(sample_rate=PROFILE_SAMPLE_RATE, interval=PROFILE_INTERVAL_MS / 1000)
+profiler.instrument_bot(bot)
+
+# METRİKLER
+# Telegram, GitHub ve Render çağrıları requests üzerinden, handler'lar telebot listelerinden ölçülür
+metrics.instrument_requests()
+metrics.instrument_bot(bot)
+# Loglara güncelleme korelasyon kimliği (en dışta: ölçüm ve profil kayıtları da taşır)
+log_pipeline.instrument_bot(bot)
+
+def send_queue_depth():
+    queue_metrics = send_queue.get_metrics()
+    return {(name,): queue_metrics[f'pending_{name}'] for name in PRIORITY_NAMES}
+
+def cache_stats():
+    """Önbellek başına (isabet, istek) sayıları"""
+    info = compile_expression.cache_info()
+    stats = {'calculator': (info.hits, info.hits + info.misses)}
+    if translator is not None:
+        stats['translator'] = (translator.stats['cache_hits'], translator.stats['requests'])
+    if shortener is not None:
+        stats['shortener'] = (shortener.stats['cache_hits'], shortener.stats['redirects'])
+    index_stats = github_manager.get_index_stats() if github_manager is not None else None
+    if index_stats:
+        stats['repo_index'] = (index_stats['hits'], index_stats['requests'])
+    history_stats = github_manager.get_history_stats() if github_manager is not None else None
+    if history_stats:
+        stats['commit_history'] = (history_stats['hits'], history_stats['requests'])
+    if render_manager is not None:
+        env_stats = render_manager.env_vars.get_stats()
+        stats['render_env'] = (env_stats['hits'], env_stats['requests'])
+    return stats
+
+metrics.REGISTRY.gauge('send_queue_pending', 'Gönderim kuyruğunda bekleyen mesaj', send_queue_depth, ('lane',))
+metrics.REGISTRY.gauge('send_queue_inflight', 'Gönderimi süren sohbet', lambda: len(send_queue.inflight))
+metrics.REGISTRY.gauge('conversations_active', 'Yanıt beklenen konuşma', lambda: conversations.get_stats()['active'])
+if reminder_engine is not None:
+    metrics.REGISTRY.gauge('reminders_scheduled', 'Bellekte zamanlanmış hatırlatıcı', lambda: len(reminder_engine.scheduled))
+if translator is not None:
+    metrics.REGISTRY.gauge('translator_queued', 'Toplu çeviri kuyruğu', lambda: translator.pending.qsize())
+metrics.REGISTRY.callback_counter('cache_hits', 'Önbellek isabeti',
+                                  lambda: {(name,): hits for name, (hits, _) in cache_stats().items()}, ('cache',))
+metrics.REGISTRY.callback_counter('cache_requests', 'Önbellek sorgusu',
+                                  lambda: {(name,): total for name, (_, total) in cache_stats().items()}, ('cache',))
+
+def log_stats():
+    pipeline = log_pipeline.get_pipeline()
+    stats = pipeline.get_stats() if pipeline is not None else {}
+    return {('dropped',): stats.get('dropped', 0), ('suppressed',): stats.get('suppressed', 0)}
+
+metrics.REGISTRY.callback_counter('log_records_skipped', 'Yazılmayan log kaydı (kuyruk dolu / örnekleme)',
+                                  log_stats, ('reason',))
+
+if web_server is not None:
+    metrics.register_routes(web_server)
+
+# SERVİSLER
+def start_services(primary=True):
+    """Arka plan servislerini başlat.
+    
+    Çoklu süreç modunda tek kopya çalışması gerekenler (scheduler,
+    hatırlatıcı teslimi, broadcast devamı) sadece birincil worker'da başlar.
+    """
+    # Gönderim kuyruğunu başlat
+    send_queue.start()
+    
+    # Kullanım sayaçlarının toplu yazımını başlat (çıkışta otomatik flush)
+    if usage_tracker is not None:
+        usage_tracker.start()
+    
+    if not primary:
+        return
+    
+    # Hatırlatıcı motorunu başlat (bekleyenler depodan yeniden yüklenir)
+    if reminder_engine is not None:
+        reminder_engine.start()
+    
+    # Yarım kalan broadcast'leri sürdür
+    if BROADCAST_ENABLED:
+        broadcast_manager.resume_pending()
     
     # Scheduler'ı başlat
     if SCHEDULER_ENABLED:
         scheduler.setup_default_jobs()
+        if ALERTS_ENABLED:
+            scheduler.add_job('price_alerts', alert_manager.check_prices, interval=60, jitter=5)
+        scheduler.add_job('conversation_sweep', conversations.sweep, interval=600, jitter=30)
+        if quote_service is not None:
+            scheduler.add_job('daily_quotes', quote_service.push_daily, at=QUOTE_TIME, pool='slow')
         scheduler.start_scheduler()
         logger.info("⏰ Cron job'lar başlatıldı!")
+
+def stop_services():
+    """Servisleri durdur, bekleyen yazımları tamamla"""
+    if SCHEDULER_ENABLED:
+        scheduler.stop_scheduler()
+    if reminder_engine is not None:
+        reminder_engine.stop()
+    if usage_tracker is not None:
+        usage_tracker.stop()
+    send_queue.stop()
+
+# BOTU BAŞLAT
+if __name__ == "__main__":
+    logger.info("🤖 ReisBot Premium başlatılıyor...")
+    logger.info("AI Durumu: %s", 'Aktif' if AI_ENABLED else 'Devre Dışı')
+    logger.info("GitHub Durumu: %s", 'Bağlı' if GITHUB_ENABLED else 'Bağlantı Yok')
+    logger.info("Render Durumu: %s", 'Bağlı' if RENDER_ENABLED else 'Bağlantı Yok')
+    logger.info("Scheduler Durumu: %s", 'Aktif' if SCHEDULER_ENABLED else 'Devre Dışı')
     
-    try:
-        bot.infinity_polling()
-    except Exception as e:
-        logger.error(f"Bot hatası: {e}")
-        if SCHEDULER_ENABLED:
-            scheduler.stop_scheduler()
-        time.sleep(5)
-        bot.infinity_polling()
+    start_services()
+    
+    # HTTP sunucusu ve kısa link tıklama sayaçları
+    if shortener is not None:
+        shortener.start()
+    if web_server is not None:
+        web_server.start()
+    
+    if USE_WEBHOOK:
+        bot.remove_webhook()
+        bot.set_webhook(url=PUBLIC_URL + WEBHOOK_PATH, secret_token=WEBHOOK_SECRET)
+        logger.info("🔗 Webhook modu: %s%s", PUBLIC_URL, WEBHOOK_PATH)
+        web_server.serve_forever()
+    else:
+        try:
+            bot.infinity_polling()
+        except Exception as e:
+            logger.error("Bot hatası: %s", e)
+            if SCHEDULER_ENABLED:
+                scheduler.stop_scheduler()
+            time.sleep(5)
+            bot.infinity_polling()
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from router import timed, rate_limit
+
+# Sadece soru sorup cevabı bir sonraki adımda işleyen butonlar: buton -> (soru, durum)
+PROMPT_BUTTONS = {
+    "🤖 AI Sohbet": ("🤖 Sorunu yaz reis, AI cevaplayacak:", 'ai.question'),
+    "🎵 YouTube İndir": ("🎵 YouTube URL'si yaz:", 'youtube.url'),
+    "🌤️ Hava Durumu": ("🌤️ Hangi şehrin hava durumunu öğrenmek istiyorsun? (Varsayılan: İstanbul)", 'weather.city'),
+    "💱 Döviz Kuru": ("💱 Hangi döviz kurunu öğrenmek istiyorsun? (örn: USD TRY veya boş bırak)", 'exchange.pair'),
+    "🔗 QR Kod": ("🔗 QR kod için metin veya URL yaz:", 'qr.text'),
+    "🎤 Ses Çevir": ("🎤 Okutulacak metni yaz:", 'tts.text'),
+    "🖼️ AI Görsel": ("🖼️ Oluşturulacak görselin açıklamasını yaz:", 'image.prompt'),
+    "🧮 Hesap Makinesi": ("🧮 İfadeyi yaz (örn: 2*(3+4)):", 'calc.expression'),
+    "🌍 Çeviri": ("🌍 Hedef dil ve metni yaz (örn: en merhaba dünya):", 'translate.text'),
+    "🔗 URL Kısalt": ("🔗 Kısaltılacak URL'yi yaz:", 'shorten.url'),
+    "🔐 Şifre Üret": ("🔐 Uzunluk ve semboller (örn: 12 evet/hayır):", 'password.options'),
+    "⏰ Hatırlatıcı": ("⏰ Tarih/Saat ve mesaj yaz (örn: 2025-08-31 09:00 | toplantı):", 'reminder.input')
+}
+
+# Pahalı (AI) akışlar kullanıcı başına dakikada ~6 istekle sınırlanır
+AI_STATES = frozenset({'ai.question', 'image.prompt'})
+AI_RATE_LIMIT = rate_limit(0.1, 3)
+
+
+def prompt_handler(bot, conversations, prompt_text, state):
+    def handler(message):
+        bot.reply_to(message, prompt_text)
+        conversations.ask(message.chat.id, state)
+    return handler
+
+
+def register_main_menu(router, bot, conversations, step_handlers, buttons):
+    """Ana menü butonları ve adım adım akışlar.
+
+    step_handlers: durum -> cevabı işleyen handler (PROMPT_BUTTONS'taki her durum için)
+    buttons: soru sormadan doğrudan çalışan butonlar, buton -> handler
+    """
+    for button, (prompt_text, state) in PROMPT_BUTTONS.items():
+        middleware = (timed, AI_RATE_LIMIT) if state in AI_STATES else (timed,)
+        router.button(button, *middleware)(prompt_handler(bot, conversations, prompt_text, state))
+        conversations.on_state(state, step_handlers[state])
+
+    for button, handler in buttons.items():
+        router.button(button, timed)(handler)
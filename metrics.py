@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import bisect
+import logging
+import functools
+import threading
+from urllib.parse import urlsplit
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "reisbot_"
+# Saniye cinsinden gecikme kova sınırları (uzun AI ve deploy çağrıları için 60 sn'ye kadar)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# requests üzerinden yapılan çağrılar host adına göre servislere ayrılır
+UPSTREAM_HOSTS = {
+    'api.telegram.org': 'telegram',
+    'api.github.com': 'github',
+    'api.render.com': 'render',
+    'api.openai.com': 'openai',
+}
+# Long polling istekleri saniyelerce açık kalır; gecikme dağılımını bozmasın
+LONG_POLL_METHODS = ('/getUpdates',)
+
+# telebot'un handler listeleri
+BOT_HANDLER_LISTS = (
+    'message_handlers', 'edited_message_handlers', 'callback_query_handlers',
+    'inline_handlers', 'channel_post_handlers', 'my_chat_member_handlers',
+)
+
+
+class _ThreadShards:
+    """Thread başına ayrı sözlük: yazma yolunda kilit yok.
+
+    Her thread sadece kendi sözlüğüne yazar, okuyucu hepsini toplar. Yeni
+    bir thread kaydolurken ölmüş thread'lerin değerleri tek bir emekli
+    sözlüğe katlanır; böylece kısa ömürlü thread'ler (HTTP istekleri)
+    listeyi büyütmez.
+    """
+
+    def __init__(self, merge):
+        self._merge = merge
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards = []
+        self._retired = {}
+
+    def local(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._lock:
+                alive = []
+                for thread, other in self._shards:
+                    if thread.is_alive():
+                        alive.append((thread, other))
+                    else:
+                        self._merge(self._retired, other)
+                alive.append((threading.current_thread(), shard))
+                self._shards = alive
+            return shard
+
+    def collect(self):
+        total = {}
+        with self._lock:
+            self._merge(total, self._retired)
+            for _, shard in self._shards:
+                self._merge(total, shard.copy())
+        return total
+
+
+def _merge_rows(target, source):
+    for labels, row in source.items():
+        current = target.get(labels)
+        if current is None:
+            target[labels] = list(row)
+        else:
+            for i, value in enumerate(row):
+                current[i] += value
+
+
+def _merge_values(target, source):
+    for labels, value in source.items():
+        target[labels] = target.get(labels, 0) + value
+
+
+class Histogram:
+    """Etiket başına kova sayaçları; her satır [kova sayıları..., taşan, toplam]"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._shards = _ThreadShards(_merge_rows)
+
+    def observe(self, value, *labels):
+        shard = self._shards.local()
+        row = shard.get(labels)
+        if row is None:
+            row = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        row[bisect.bisect_left(self.buckets, value)] += 1
+        row[-1] += value
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def snapshot(self):
+        return {'type': self.kind, 'help': self.help, 'labelnames': self.labelnames,
+                'buckets': self.buckets, 'values': self._shards.collect()}
+
+    def summary(self, *labels):
+        """{'count', 'avg', 'p50', 'p95', 'p99'} (sn) veya gözlem yoksa None"""
+        row = self._shards.collect().get(labels)
+        return summarize(row, self.buckets) if row else None
+
+    def summaries(self):
+        """Tüm etiketler için özet, en çok gözlemlenen önce: [(etiketler, özet)]"""
+        rows = self._shards.collect()
+        result = [(labels, summarize(row, self.buckets)) for labels, row in rows.items()]
+        return sorted(result, key=lambda item: item[1]['count'], reverse=True)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._shards = _ThreadShards(_merge_values)
+
+    def inc(self, *labels, amount=1):
+        shard = self._shards.local()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._shards.collect().get(labels, 0)
+
+    def snapshot(self):
+        return {'type': self.kind, 'help': self.help, 'labelnames': self.labelnames,
+                'values': self._shards.collect()}
+
+
+class CallbackMetric:
+    """Değeri okuma anında bir fonksiyondan alınan gauge veya sayaç.
+
+    Kuyruk derinlikleri ve modüllerin zaten tuttuğu istatistikler (önbellek
+    isabetleri gibi) için kullanılır; sıcak yolda hiçbir maliyeti yoktur.
+    func() bir sayı veya {etiket demeti: değer} döndürür.
+    """
+
+    def __init__(self, kind, name, help, func, labelnames=()):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.func = func
+        self.labelnames = tuple(labelnames)
+
+    def snapshot(self):
+        try:
+            values = self.func()
+        except Exception as e:
+            logger.error("Metrik okunamadı (%s): %s", self.name, e)
+            values = {}
+        if not isinstance(values, dict):
+            values = {(): values}
+        return {'type': self.kind, 'help': self.help, 'labelnames': self.labelnames,
+                'values': {labels: value for labels, value in values.items() if value is not None}}
+
+
+class _Timer:
+    __slots__ = ('histogram', 'labels', 'started')
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def _add(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(PREFIX + name, help, labelnames, buckets))
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(PREFIX + name, help, labelnames))
+
+    def gauge(self, name, help, func, labelnames=()):
+        return self._add(CallbackMetric('gauge', PREFIX + name, help, func, labelnames))
+
+    def callback_counter(self, name, help, func, labelnames=()):
+        return self._add(CallbackMetric('counter', PREFIX + name, help, func, labelnames))
+
+    def snapshot(self):
+        """Tüm metriklerin süreçler arası taşınabilir (pickle'lanabilir) kopyası"""
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+
+REGISTRY = Registry()
+
+HANDLER_LATENCY = REGISTRY.histogram('handler_seconds', 'Telegram handler çalışma süresi', ('handler',))
+ROUTE_LATENCY = REGISTRY.histogram('route_seconds', 'Buton ve callback route çalışma süresi', ('route',))
+UPSTREAM_LATENCY = REGISTRY.histogram('upstream_seconds', 'Dış servis çağrı süresi', ('service',))
+ERRORS = REGISTRY.counter('errors', 'Hata sayısı', ('source', 'name'))
+
+
+def summarize(row, buckets):
+    count = sum(row[:-1])
+    return {
+        'count': count,
+        'avg': row[-1] / count if count else 0.0,
+        'p50': quantile(row, buckets, 0.50),
+        'p95': quantile(row, buckets, 0.95),
+        'p99': quantile(row, buckets, 0.99),
+    }
+
+
+def quantile(row, buckets, q):
+    """Kova sayılarından yüzdelik tahmini (kova içinde doğrusal ara değer)"""
+    count = sum(row[:-1])
+    if not count:
+        return 0.0
+    rank = q * count
+    cumulative = 0
+    for i, bound in enumerate(buckets):
+        previous = cumulative
+        cumulative += row[i]
+        if cumulative >= rank:
+            lower = buckets[i - 1] if i else 0.0
+            return lower + (bound - lower) * ((rank - previous) / row[i] if row[i] else 0.0)
+    return buckets[-1]
+
+
+# ÖLÇÜM YARDIMCILARI
+def track(service):
+    """with track('openai'): ... — dış servis çağrısının süresi ve hatası"""
+    return _Upstream(service)
+
+
+class _Upstream(_Timer):
+    __slots__ = ()
+
+    def __init__(self, service):
+        super().__init__(UPSTREAM_LATENCY, (service,))
+
+    def __exit__(self, exc_type, exc, tb):
+        super().__exit__(exc_type, exc, tb)
+        if exc_type is not None:
+            ERRORS.inc('upstream', self.labels[0])
+        return False
+
+
+def instrument_handler(func, name=None):
+    """Handler fonksiyonunu süre ve hata ölçen sarmalayıcıyla değiştir"""
+    if getattr(func, '_instrumented', False):
+        return func
+    name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            ERRORS.inc('handler', name)
+            raise
+        finally:
+            HANDLER_LATENCY.observe(time.perf_counter() - started, name)
+
+    wrapper._instrumented = True
+    return wrapper
+
+
+def instrument_bot(bot):
+    """Kayıtlı tüm telebot handler'larını ölçümlü hale getir; kaç handler sarıldığını döndürür"""
+    count = 0
+    for attr in BOT_HANDLER_LISTS:
+        for handler in getattr(bot, attr, ()):
+            func = handler['function']
+            if not getattr(func, '_instrumented', False):
+                handler['function'] = instrument_handler(func)
+                count += 1
+    return count
+
+
+def instrument_requests():
+    """requests üzerinden giden Telegram, GitHub ve Render çağrılarını ölç.
+
+    PyGithub, telebot ve RenderManager aynı Session.send yolundan geçtiği için
+    tek bir noktadan tüm bu servislerin gecikmesi ve 429/5xx hataları sayılır.
+    """
+    import requests
+    if getattr(requests.Session.send, '_instrumented', False):
+        return
+    original = requests.Session.send
+
+    @functools.wraps(original)
+    def send(session, request, **kwargs):
+        parts = urlsplit(request.url)
+        service = UPSTREAM_HOSTS.get(parts.hostname)
+        if service is None:
+            return original(session, request, **kwargs)
+        if service == 'telegram' and parts.path.endswith(LONG_POLL_METHODS):
+            service = 'telegram_poll'
+        started = time.perf_counter()
+        try:
+            response = original(session, request, **kwargs)
+        except Exception:
+            ERRORS.inc('upstream', service)
+            raise
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - started, service)
+        if response.status_code == 429 or response.status_code >= 500:
+            ERRORS.inc('upstream', service)
+        return response
+
+    send._instrumented = True
+    requests.Session.send = send
+
+
+# PROMETHEUS ÇIKTISI
+def merge_snapshots(snapshots):
+    """Birden çok sürecin anlık görüntülerini topla (supervisor modu)"""
+    merged = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.get(name)
+            if target is None:
+                merged[name] = dict(metric, values={})
+                target = merged[name]
+            if metric['type'] == 'histogram':
+                _merge_rows(target['values'], metric['values'])
+            else:
+                _merge_values(target['values'], metric['values'])
+    return merged
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labelnames, labels, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labels)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+def render(snapshot):
+    """Prometheus metin biçimi (0.0.4)"""
+    lines = []
+    for name, metric in sorted(snapshot.items()):
+        kind = metric['type']
+        labelnames = metric['labelnames']
+        series = name + '_total' if kind == 'counter' else name
+        lines.append(f"# HELP {series} {metric['help']}")
+        lines.append(f"# TYPE {series} {kind}")
+        for labels, value in sorted(metric['values'].items()):
+            if kind != 'histogram':
+                lines.append(f"{series}{_labels(labelnames, labels)} {_number(value)}")
+                continue
+            cumulative = 0
+            for bound, count in zip(metric['buckets'], value):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(f"{name}_bucket{_labels(labelnames, labels, le)} {cumulative}")
+            cumulative += value[len(metric['buckets'])]
+            le = 'le="+Inf"'
+            lines.append(f"{name}_bucket{_labels(labelnames, labels, le)} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labelnames, labels)} {_number(value[-1])}")
+            lines.append(f"{name}_count{_labels(labelnames, labels)} {cumulative}")
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_handler(snapshot_func):
+    """WebServer route'u; METRICS_TOKEN ayarlıysa Bearer token istenir"""
+    from web_server import text_response
+    token = os.getenv("METRICS_TOKEN")
+
+    def handler(request):
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            return text_response(401, "Unauthorized")
+        return text_response(200, render(snapshot_func()), CONTENT_TYPE)
+    return handler
+
+
+def register_routes(web_server, snapshot_func=None):
+    web_server.route('GET', '/metrics', metrics_handler(snapshot_func or REGISTRY.snapshot))
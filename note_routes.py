@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import html
+from datetime import datetime
+from telebot import types
+from text_search import make_snippet
+from router import timed
+
+NOTE_SEARCH_PAGE_SIZE = 5
+
+
+class NoteRoutes:
+    """Notlar: liste, ekleme akışı ve sayfalı arama.
+
+    /notes, /addnote ve /searchnote komutları da aynı metotları kullanır;
+    premium None ise not servisi kullanılamıyor yanıtı verilir.
+    """
+
+    def __init__(self, bot, conversations, premium):
+        self.bot = bot
+        self.conversations = conversations
+        self.premium = premium
+
+    def save_note(self, message, text):
+        """'Başlık | İçerik' metninden not kaydet"""
+        if self.premium is None:
+            self.bot.reply_to(message, "❌ Not servisi şu anda kullanılamıyor.")
+            return
+
+        parts = [part.strip() for part in (text or "").split("|", 1)]
+        if len(parts) < 2 or not parts[0] or not parts[1]:
+            self.bot.reply_to(message, "❌ Format: Başlık | İçerik")
+            return
+
+        try:
+            note_id = self.premium.add_note(message.from_user.id, parts[0], parts[1])
+            self.bot.reply_to(message, f"✅ Not #{note_id} kaydedildi: {parts[0]}")
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Not kaydetme hatası: {str(e)}")
+
+    def process_add_note(self, message):
+        self.save_note(message, message.text)
+
+    def list_notes(self, message):
+        """Kullanıcının son notlarını listele"""
+        if self.premium is None:
+            self.bot.reply_to(message, "❌ Not servisi şu anda kullanılamıyor.")
+            return
+
+        try:
+            notes = self.premium.get_notes(message.from_user.id, limit=20)
+            if notes:
+                total = self.premium.count_notes(message.from_user.id)
+                # Başlık ve içerik '_' veya '*' içerebilir; aramadaki gibi kaçışlı HTML
+                note_text = "📋 <b>Notların:</b>\n\n"
+                for note in notes:
+                    created = datetime.fromtimestamp(note['created_at']).strftime('%Y-%m-%d %H:%M')
+                    note_text += f"🔸 #{note['id']} <b>{html.escape(note['title'])}</b>\n"
+                    note_text += f"   📝 {html.escape(note['content'][:80])}\n"
+                    note_text += f"   📅 {created}\n\n"
+                if total > len(notes):
+                    note_text += f"... ve {total - len(notes)} not daha"
+            else:
+                note_text = "📋 Henüz notun yok. Eklemek için: /addnote Başlık | İçerik"
+            self.bot.reply_to(message, note_text, parse_mode='HTML')
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Notlar alınamadı: {str(e)}")
+
+    def render_search(self, user_id, query, page):
+        """Not arama sonuç sayfasını (HTML metin, sayfalama butonları) olarak hazırla"""
+        if self.premium is None:
+            return "❌ Not servisi şu anda kullanılamıyor.", None
+
+        try:
+            notes, total, terms = self.premium.search_notes(
+                user_id, query, limit=NOTE_SEARCH_PAGE_SIZE, offset=page * NOTE_SEARCH_PAGE_SIZE
+            )
+        except Exception as e:
+            return f"❌ Not arama hatası: {html.escape(str(e))}", None
+
+        if not notes:
+            return f"🔍 <b>{html.escape(query)}</b> için not bulunamadı.", None
+
+        pages = (total + NOTE_SEARCH_PAGE_SIZE - 1) // NOTE_SEARCH_PAGE_SIZE
+        result_text = f"🔍 <b>{html.escape(query)}</b> - {total} sonuç (sayfa {page + 1}/{pages})\n\n"
+        for note in notes:
+            result_text += f"🔸 #{note['id']} {make_snippet(note['title'], terms, 60)}\n"
+            result_text += f"   {make_snippet(note['content'], terms)}\n\n"
+
+        markup = None
+        if pages > 1:
+            markup = types.InlineKeyboardMarkup(row_width=2)
+            # callback_data en fazla 64 bayt olabilir
+            encoded_query = query.encode('utf-8')[:40].decode('utf-8', 'ignore')
+            buttons = []
+            if page > 0:
+                buttons.append(types.InlineKeyboardButton("⬅️ Önceki", callback_data=f"notesearch:{page - 1}:{encoded_query}"))
+            if page + 1 < pages:
+                buttons.append(types.InlineKeyboardButton("Sonraki ➡️", callback_data=f"notesearch:{page + 1}:{encoded_query}"))
+            markup.add(*buttons)
+        return result_text, markup
+
+    def handle_search_page(self, call):
+        """Not arama sonuçlarında sayfa değiştir"""
+        _, page, query = call.data.split(":", 2)
+        text, markup = self.render_search(call.from_user.id, query, int(page))
+        self.bot.edit_message_text(text, call.message.chat.id, call.message.message_id, parse_mode='HTML', reply_markup=markup)
+
+    def notes_button(self, message):
+        self.list_notes(message)
+        self.bot.reply_to(message, "📝 Yeni not eklemek için 'Başlık | İçerik' yaz:")
+        self.conversations.ask(message.chat.id, 'notes.add')
+
+    # KAYIT
+    def register(self, router):
+        """Notlar: liste + ekleme akışı, arama sayfalama"""
+        router.button("📋 Notlarım", timed)(self.notes_button)
+        self.conversations.on_state('notes.add', self.process_add_note)
+        router.callback_prefix("notesearch", timed)(lambda call, params: self.handle_search_page(call))
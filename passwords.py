@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import os
+import math
+import string
+import secrets
+import logging
+import threading
+from array import array
+
+logger = logging.getLogger(__name__)
+
+LOWER = string.ascii_lowercase
+UPPER = string.ascii_uppercase
+DIGITS = string.digits
+SYMBOLS = "!@#$%^&*()-_=+[]{};:,.?/"
+
+MIN_LENGTH = 4
+MAX_LENGTH = 128
+MAX_BULK_COUNT = 10000
+# Toplu üretimde kaç şifrenin tek bir rastgele sayıdan çıkarılacağı
+BULK_CHUNK = 32
+
+MIN_WORDS = 3
+MAX_WORDS = 12
+WORDLIST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "wordlist_tr.txt")
+
+
+class PasswordError(Exception):
+    pass
+
+
+class _WordList:
+    """Kelime listesi: tek bir bytes bloğu ve başlangıç ofsetleri dizisi.
+
+    Binlerce küçük str nesnesi yerine iki kompakt nesne tutulur; liste ilk
+    kullanımda yüklenir, botun açılışı bundan etkilenmez.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.blob = None
+        self.offsets = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self.blob is not None:
+                return
+            with open(self.path, 'rb') as f:
+                words = [line.strip() for line in f if line.strip()]
+            offsets = array('I', [0])
+            for word in words:
+                offsets.append(offsets[-1] + len(word))
+            self.blob = b''.join(words)
+            self.offsets = offsets
+            logger.info("Kelime listesi yüklendi: %s kelime, %s bayt", len(words), len(self.blob))
+
+    def __len__(self):
+        if self.blob is None:
+            self._load()
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if self.blob is None:
+            self._load()
+        return self.blob[self.offsets[index]:self.offsets[index + 1]].decode('utf-8')
+
+
+WORDLIST = _WordList(WORDLIST_PATH)
+
+
+def character_classes(use_symbols=True):
+    classes = [LOWER, UPPER, DIGITS]
+    if use_symbols:
+        classes.append(SYMBOLS)
+    return classes
+
+
+def password_entropy(length, classes):
+    """Her sınıftan en az bir karakter içeren şifre uzayının bit cinsinden büyüklüğü.
+
+    Geçerli şifre sayısı içerme-dışlama ile hesaplanır:
+    sum((-1)^|S| * (N - |S karakterleri|)^L), S sınıfların alt kümeleri.
+    """
+    total = 0
+    count = len(classes)
+    for mask in range(1 << count):
+        excluded = sum(len(classes[i]) for i in range(count) if mask >> i & 1)
+        sign = -1 if bin(mask).count('1') % 2 else 1
+        total += sign * (sum(len(c) for c in classes) - excluded) ** length
+    return math.log2(total) if total > 0 else 0.0
+
+
+def passphrase_entropy(words, wordlist_size):
+    return words * math.log2(wordlist_size)
+
+
+def strength_label(bits):
+    if bits < 40:
+        return "🔴 Zayıf"
+    if bits < 60:
+        return "🟠 Orta"
+    if bits < 80:
+        return "🟢 Güçlü"
+    return "🟣 Çok güçlü"
+
+
+class _Plan:
+    """Bir şifre biçimi için karışık tabanlı (mixed-radix) çözümleme planı.
+
+    Her aday şifre tek bir rastgele tamsayıdan divmod ile çıkarılır: her
+    karakter tüm alfabeden bağımsız ve eşit olasılıkla seçilir. Her sınıftan
+    en az bir karakter içermeyen adaylar atılır (rejection sampling); böylece
+    çıktı geçerli şifreler üzerinde düzgün dağılır ve password_entropy'nin
+    saydığı uzay gerçekten sağlanan entropidir.
+    """
+
+    def __init__(self, length, classes):
+        if length < len(classes):
+            raise PasswordError(f"Uzunluk en az {len(classes)} olmalı")
+        self.length = length
+        self.alphabet = ''.join(classes)
+        # karakter -> sınıf biti; tüm sınıflar varsa maske full_mask olur
+        self.class_bits = {ch: 1 << i for i, chars in enumerate(classes) for ch in chars}
+        self.full_mask = (1 << len(classes)) - 1
+        self.space = len(self.alphabet) ** length
+
+    def build(self, value):
+        """Adayı çöz; her sınıftan karakter yoksa None"""
+        alphabet = self.alphabet
+        size = len(alphabet)
+        class_bits = self.class_bits
+        chars = []
+        mask = 0
+        for _ in range(self.length):
+            value, index = divmod(value, size)
+            ch = alphabet[index]
+            mask |= class_bits[ch]
+            chars.append(ch)
+        return ''.join(chars) if mask == self.full_mask else None
+
+
+def generate_password(length=16, use_symbols=True):
+    """Her karakter sınıfından en az bir karakter içeren tek şifre üret"""
+    plan = _Plan(_check_length(length), character_classes(use_symbols))
+    while True:
+        password = plan.build(secrets.randbelow(plan.space))
+        if password is not None:
+            return password
+
+
+def generate_passwords(count, length=16, use_symbols=True):
+    """Toplu şifre üretimi: BULK_CHUNK aday tek bir rastgele sayıdan çözülür"""
+    if not 1 <= count <= MAX_BULK_COUNT:
+        raise PasswordError(f"Adet 1 ile {MAX_BULK_COUNT} arasında olmalı")
+    plan = _Plan(_check_length(length), character_classes(use_symbols))
+    passwords = []
+    while len(passwords) < count:
+        value = secrets.randbelow(plan.space ** BULK_CHUNK)
+        for _ in range(BULK_CHUNK):
+            value, part = divmod(value, plan.space)
+            password = plan.build(part)
+            if password is not None:
+                passwords.append(password)
+    return passwords[:count]
+
+
+def generate_passphrase(words=5, separator='-'):
+    """Kelime listesinden parola cümlesi üret; (parola, entropi) döndürür"""
+    if not MIN_WORDS <= words <= MAX_WORDS:
+        raise PasswordError(f"Kelime sayısı {MIN_WORDS} ile {MAX_WORDS} arasında olmalı")
+    size = len(WORDLIST)
+    value = secrets.randbelow(size ** words)
+    chosen = []
+    for _ in range(words):
+        value, index = divmod(value, size)
+        chosen.append(WORDLIST[index])
+    return separator.join(chosen), passphrase_entropy(words, size)
+
+
+def _check_length(length):
+    if not MIN_LENGTH <= length <= MAX_LENGTH:
+        raise PasswordError(f"Uzunluk {MIN_LENGTH} ile {MAX_LENGTH} arasında olmalı")
+    return length
@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import sqlite3
+import logging
+import weakref
+import threading
+from text_search import turkish_fold, query_terms, build_match_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.getenv("DB_PATH", "reisbot.db")
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        user_id INTEGER PRIMARY KEY,
+        username TEXT,
+        first_name TEXT,
+        last_name TEXT,
+        created_at REAL NOT NULL,
+        last_seen REAL NOT NULL,
+        blocked INTEGER NOT NULL DEFAULT 0,
+        blocked_at REAL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        content TEXT NOT NULL,
+        created_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_notes_user_created ON notes (user_id, created_at)",
+    """
+    CREATE TABLE IF NOT EXISTS reminders (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        chat_id INTEGER NOT NULL,
+        message TEXT NOT NULL,
+        due_time REAL NOT NULL,
+        sent INTEGER NOT NULL DEFAULT 0,
+        created_at REAL NOT NULL,
+        recurrence TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_reminders_user_created ON reminders (user_id, created_at)",
+    """
+    CREATE TABLE IF NOT EXISTS usage_stats (
+        user_id INTEGER NOT NULL,
+        command TEXT NOT NULL,
+        count INTEGER NOT NULL DEFAULT 0,
+        last_used REAL NOT NULL,
+        PRIMARY KEY (user_id, command)
+    )
+    """
+)
+
+# Eski veritabanlarına sonradan eklenen kolonlar: (tablo, kolon, tanım)
+MIGRATIONS = (
+    ('reminders', 'recurrence', 'TEXT'),
+)
+
+# Kolon migrasyonlarından sonra oluşturulan indeksler
+POST_MIGRATION_SCHEMA = (
+    "CREATE INDEX IF NOT EXISTS idx_reminders_due ON reminders (sent, due_time)",
+)
+
+# Notların tam metin indeksi: metin Türkçe kurallarla katlanmış olarak
+# saklanır, 'owner' kolonu 'u<user_id>' tokeniyle kullanıcıya göre süzer.
+FTS_SCHEMA = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+        owner, title, content,
+        tokenize = "unicode61 remove_diacritics 0"
+    )
+"""
+
+# Sorgular sabit metin olarak tutulur; sqlite3 her bağlantıda derlenmiş
+# ifadeleri metne göre önbelleğe aldığından tekrar eden çağrılar yeniden
+# derlenmez (prepared statement).
+SQL_UPSERT_USER = """
+    INSERT INTO users (user_id, username, first_name, last_name, created_at, last_seen)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        username = excluded.username,
+        first_name = excluded.first_name,
+        last_name = excluded.last_name,
+        last_seen = excluded.last_seen,
+        blocked = 0,
+        blocked_at = NULL
+"""
+SQL_GET_USER = "SELECT * FROM users WHERE user_id = ?"
+SQL_USER_PAGE = "SELECT user_id FROM users WHERE user_id > ? AND blocked = 0 ORDER BY user_id LIMIT ?"
+SQL_BLOCK_USER = "UPDATE users SET blocked = 1, blocked_at = ? WHERE user_id = ?"
+SQL_COUNT_USERS = "SELECT COUNT(*) FROM users WHERE blocked = 0"
+
+SQL_ADD_NOTE = "INSERT INTO notes (user_id, title, content, created_at) VALUES (?, ?, ?, ?)"
+SQL_GET_NOTES = """
+    SELECT id, title, content, created_at FROM notes
+    WHERE user_id = ? ORDER BY created_at DESC LIMIT ? OFFSET ?
+"""
+SQL_DELETE_NOTE = "DELETE FROM notes WHERE id = ? AND user_id = ?"
+SQL_COUNT_NOTES = "SELECT COUNT(*) FROM notes WHERE user_id = ?"
+SQL_FTS_INSERT = "INSERT INTO notes_fts (rowid, owner, title, content) VALUES (?, ?, ?, ?)"
+SQL_FTS_DELETE = "DELETE FROM notes_fts WHERE rowid = ?"
+SQL_FTS_SEARCH = """
+    SELECT n.id, n.title, n.content, n.created_at
+    FROM notes_fts JOIN notes n ON n.id = notes_fts.rowid
+    WHERE notes_fts MATCH ?
+    ORDER BY bm25(notes_fts, 0.0, 5.0, 1.0)
+    LIMIT ? OFFSET ?
+"""
+SQL_FTS_COUNT = "SELECT COUNT(*) FROM notes_fts WHERE notes_fts MATCH ?"
+
+SQL_ADD_REMINDER = """
+    INSERT INTO reminders (user_id, chat_id, message, due_time, created_at, recurrence) VALUES (?, ?, ?, ?, ?, ?)
+"""
+SQL_GET_REMINDERS = """
+    SELECT id, message, due_time, created_at, recurrence FROM reminders
+    WHERE user_id = ? AND sent = 0 ORDER BY due_time LIMIT ?
+"""
+SQL_DUE_REMINDERS = """
+    SELECT id, user_id, chat_id, message, due_time, recurrence FROM reminders
+    WHERE sent = 0 AND due_time <= ? ORDER BY due_time LIMIT ?
+"""
+SQL_GET_REMINDER = "SELECT id, user_id, chat_id, message, due_time, recurrence FROM reminders WHERE id = ? AND sent = 0"
+SQL_MARK_REMINDER_SENT = "UPDATE reminders SET sent = 1 WHERE id = ?"
+SQL_RESCHEDULE_REMINDER = "UPDATE reminders SET due_time = ? WHERE id = ?"
+SQL_DELETE_REMINDER = "DELETE FROM reminders WHERE id = ? AND user_id = ?"
+SQL_COUNT_REMINDERS = "SELECT COUNT(*) FROM reminders WHERE user_id = ? AND sent = 0"
+
+SQL_LOG_USAGE = """
+    INSERT INTO usage_stats (user_id, command, count, last_used) VALUES (?, ?, ?, ?)
+    ON CONFLICT(user_id, command) DO UPDATE SET
+        count = count + excluded.count,
+        last_used = MAX(last_used, excluded.last_used)
+"""
+SQL_USER_USAGE = "SELECT command, count, last_used FROM usage_stats WHERE user_id = ? ORDER BY count DESC"
+
+
+class _ThreadConnection:
+    """Thread'in bağlantısını taşır; thread bitip bu nesne silinince bağlantı kapanır"""
+    __slots__ = ('conn', '__weakref__')
+
+    def __init__(self, conn):
+        self.conn = conn
+
+
+def _release_connection(conn, connections, lock):
+    with lock:
+        connections.discard(conn)
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+class PremiumFeatures:
+    """Kullanıcı, not, hatırlatıcı ve istatistik verileri için SQLite katmanı.
+
+    Veritabanı WAL modunda açılır; okuyucular yazıcıları beklemez. Her thread
+    kendi bağlantısını kullanır (telebot handler'ları thread havuzunda
+    çalışır), böylece bağlantılar arasında kilit paylaşımı olmaz. Kısa
+    ömürlü thread'lerin bağlantısı thread bitince kapanır.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = set()
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        with self._lock:
+            self._connections.add(conn)
+        return conn
+
+    @property
+    def conn(self):
+        """Bu thread'e ait bağlantı (ilk kullanımda açılır)"""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            holder = self._local.holder = _ThreadConnection(self._connect())
+            # threading.local thread bitince değeri bırakır; bağlantı da o an kapanır
+            weakref.finalize(holder, _release_connection, holder.conn, self._connections, self._lock)
+        return holder.conn
+
+    def _init_db(self):
+        """Tabloları ve indeksleri oluştur, eksik kolonları ekle"""
+        with self.conn as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+            for table, column, definition in MIGRATIONS:
+                columns = {row['name'] for row in conn.execute(f"PRAGMA table_info({table})")}
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            for statement in POST_MIGRATION_SCHEMA:
+                conn.execute(statement)
+        self._init_fts()
+
+    def _init_fts(self):
+        """Not arama indeksini oluştur, notlarla senkron değilse yeniden kur"""
+        try:
+            with self.conn as conn:
+                conn.execute(FTS_SCHEMA)
+                indexed = conn.execute("SELECT COUNT(*) FROM notes_fts").fetchone()[0]
+                total = conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+                if indexed != total:
+                    logger.info("Not arama indeksi yeniden oluşturuluyor (%s/%s)", indexed, total)
+                    conn.execute("DELETE FROM notes_fts")
+                    rows = conn.execute("SELECT id, user_id, title, content FROM notes")
+                    conn.executemany(SQL_FTS_INSERT, (
+                        (row['id'], f"u{row['user_id']}", turkish_fold(row['title']), turkish_fold(row['content']))
+                        for row in rows.fetchall()
+                    ))
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            # SQLite FTS5 olmadan derlenmişse arama LIKE ile yapılır
+            logger.warning("FTS5 kullanılamıyor, not araması yavaş modda: %s", e)
+            self.fts_enabled = False
+
+    def close(self):
+        """Tüm thread bağlantılarını kapat"""
+        with self._lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+    # KULLANICILAR
+    def add_user(self, user_id, username=None, first_name=None, last_name=None):
+        """Kullanıcıyı ekle veya bilgilerini güncelle (upsert)"""
+        now = time.time()
+        with self.conn as conn:
+            conn.execute(SQL_UPSERT_USER, (user_id, username, first_name, last_name, now, now))
+
+    def get_user(self, user_id):
+        """Kullanıcı kaydını getir"""
+        row = self.conn.execute(SQL_GET_USER, (user_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_user_ids_page(self, after_user_id=0, limit=500):
+        """Aktif kullanıcı id'lerini sayfa sayfa döndür (keyset pagination)"""
+        rows = self.conn.execute(SQL_USER_PAGE, (after_user_id, limit)).fetchall()
+        return [row[0] for row in rows]
+
+    def mark_user_blocked(self, user_id):
+        """Botu engelleyen/silinen kullanıcıyı işaretle"""
+        with self.conn as conn:
+            conn.execute(SQL_BLOCK_USER, (time.time(), user_id))
+
+    def count_users(self):
+        """Aktif kullanıcı sayısı"""
+        return self.conn.execute(SQL_COUNT_USERS).fetchone()[0]
+
+    # NOTLAR
+    def add_note(self, user_id, title, content):
+        """Not ekle ve id'sini döndür (arama indeksi aynı işlemde güncellenir)"""
+        with self.conn as conn:
+            cursor = conn.execute(SQL_ADD_NOTE, (user_id, title, content, time.time()))
+            if self.fts_enabled:
+                conn.execute(SQL_FTS_INSERT, (cursor.lastrowid, f"u{user_id}", turkish_fold(title), turkish_fold(content)))
+        return cursor.lastrowid
+
+    def get_notes(self, user_id, limit=20, offset=0):
+        """Kullanıcının notlarını yeniden eskiye döndür"""
+        rows = self.conn.execute(SQL_GET_NOTES, (user_id, limit, offset)).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete_note(self, user_id, note_id):
+        """Kullanıcının notunu sil"""
+        with self.conn as conn:
+            cursor = conn.execute(SQL_DELETE_NOTE, (note_id, user_id))
+            deleted = cursor.rowcount > 0
+            if deleted and self.fts_enabled:
+                conn.execute(SQL_FTS_DELETE, (note_id,))
+        return deleted
+
+    def count_notes(self, user_id):
+        return self.conn.execute(SQL_COUNT_NOTES, (user_id,)).fetchone()[0]
+
+    def search_notes(self, user_id, query, limit=5, offset=0):
+        """Notlarda sıralı tam metin arama; (sonuçlar, toplam, terimler) döndürür"""
+        terms = query_terms(query)
+        if not terms:
+            return [], 0, terms
+
+        if not self.fts_enabled:
+            notes = [
+                note for note in self.get_notes(user_id, limit=1000)
+                if all(term in turkish_fold(f"{note['title']} {note['content']}") for term in terms)
+            ]
+            return notes[offset:offset + limit], len(notes), terms
+
+        # Terimler sadece başlık/içerikte aranır; aksi halde 'u' gibi bir terim sahip tokenına eşleşir
+        match = f'owner : "u{user_id}" AND {{title content}} : ({build_match_query(terms)})'
+        rows = self.conn.execute(SQL_FTS_SEARCH, (match, limit, offset)).fetchall()
+        total = self.conn.execute(SQL_FTS_COUNT, (match,)).fetchone()[0]
+        return [dict(row) for row in rows], total, terms
+
+    # HATIRLATICILAR
+    def add_reminder(self, user_id, chat_id, message, due_time, recurrence=None):
+        """Hatırlatıcı ekle (due_time epoch saniye, recurrence: hourly/daily/weekly)"""
+        with self.conn as conn:
+            cursor = conn.execute(SQL_ADD_REMINDER, (user_id, chat_id, message, due_time, time.time(), recurrence))
+        return cursor.lastrowid
+
+    def get_due_reminders(self, until, limit=1000):
+        """Zamanı 'until' anına kadar gelen bekleyen hatırlatıcılar (due_time indeksinden)"""
+        rows = self.conn.execute(SQL_DUE_REMINDERS, (until, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_reminder(self, reminder_id):
+        row = self.conn.execute(SQL_GET_REMINDER, (reminder_id,)).fetchone()
+        return dict(row) if row else None
+
+    def mark_reminder_sent(self, reminder_id):
+        with self.conn as conn:
+            conn.execute(SQL_MARK_REMINDER_SENT, (reminder_id,))
+
+    def reschedule_reminder(self, reminder_id, due_time):
+        """Tekrarlayan hatırlatıcının bir sonraki zamanını kaydet"""
+        with self.conn as conn:
+            conn.execute(SQL_RESCHEDULE_REMINDER, (due_time, reminder_id))
+
+    def get_reminders(self, user_id, limit=20):
+        """Kullanıcının bekleyen hatırlatıcıları"""
+        rows = self.conn.execute(SQL_GET_REMINDERS, (user_id, limit)).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete_reminder(self, user_id, reminder_id):
+        """Kullanıcının hatırlatıcısını sil"""
+        with self.conn as conn:
+            cursor = conn.execute(SQL_DELETE_REMINDER, (reminder_id, user_id))
+        return cursor.rowcount > 0
+
+    def count_reminders(self, user_id):
+        return self.conn.execute(SQL_COUNT_REMINDERS, (user_id,)).fetchone()[0]
+
+    # İSTATİSTİKLER
+    def log_usage(self, user_id, command, count=1):
+        """Komut kullanım sayacını artır"""
+        with self.conn as conn:
+            conn.execute(SQL_LOG_USAGE, (user_id, command, count, time.time()))
+
+    def log_usage_batch(self, rows):
+        """(user_id, command, count) farklarını tek işlemde yaz"""
+        now = time.time()
+        with self.conn as conn:
+            conn.executemany(SQL_LOG_USAGE, [(user_id, command, count, now) for user_id, command, count in rows])
+
+    def get_usage(self, user_id):
+        """Kullanıcının komut bazlı kullanım sayıları"""
+        rows = self.conn.execute(SQL_USER_USAGE, (user_id,)).fetchall()
+        return {row['command']: row['count'] for row in rows}
+
+    def get_user_stats(self, user_id):
+        """Kullanıcının özet istatistikleri"""
+        user = self.get_user(user_id)
+        usage = self.get_usage(user_id)
+        return {
+            'joined': user['created_at'] if user else None,
+            'last_seen': user['last_seen'] if user else None,
+            'notes': self.count_notes(user_id),
+            'reminders': self.count_reminders(user_id),
+            'total_commands': sum(usage.values()),
+            'usage': usage
+        }
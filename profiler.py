@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import time
+import random
+import logging
+import functools
+import threading
+from collections import Counter
+
+from metrics import BOT_HANDLER_LISTS
+
+logger = logging.getLogger(__name__)
+
+# Örnekleme aralığı (sn) ve yığın derinliği sınırı
+DEFAULT_INTERVAL = 0.005
+MAX_DEPTH = 64
+# Farklı yığın sayısı sınırı; aşılınca yeni yığınlar tek satırda toplanır
+MAX_STACKS = 10000
+MAX_CAPTURE_SECONDS = 120
+# Handler dışındaki thread'ler bu fonksiyonlardan birinde bekliyorsa boşta sayılır
+IDLE_FUNCTIONS = frozenset((
+    'wait', 'sleep', 'select', 'poll', 'epoll', 'accept', '_wait_for_tstate_lock',
+    'get', 'serve_forever', 'recv_into', 'getUpdates',
+))
+
+
+def frame_label(frame):
+    """py-spy ile aynı biçim: fonksiyon (dosya.py:satır)"""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse(frame, root, stop=None):
+    """Yaprak çerçeveden köke yürüyüp 'kök;dış;...;iç' satırını üret.
+
+    stop verilirse o çerçeveye (handler sarmalayıcısı) gelince durulur;
+    telebot'un dağıtım katmanı yığınlarda görünmez.
+    """
+    labels = []
+    while frame is not None and frame is not stop and len(labels) < MAX_DEPTH:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    labels.append(root)
+    labels.reverse()
+    return ";".join(label.replace(";", ":") for label in labels)
+
+
+def format_collapsed(stacks):
+    """flamegraph.pl / speedscope / inferno uyumlu 'yığın sayı' satırları"""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+def top_functions(stacks, limit=5):
+    """En çok örnekte yaprak olan fonksiyonlar (kendi süresi): [(etiket, örnek)]"""
+    leaves = Counter()
+    for stack, count in stacks.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    return leaves.most_common(limit)
+
+
+class Profiler:
+    """Düşük maliyetli yığın örnekleyici.
+
+    Ayrı bir thread belirli aralıklarla sys._current_frames() ile diğer
+    thread'lerin yığınlarını okur; profillenen koda hiçbir kanca eklenmez.
+    İki kullanım var:
+      - Örneklemeli handler profili: handler çağrılarının sample_rate kadarı
+        işaretlenir, sadece o çağrılar sürerken yığınları toplanır.
+      - Süreli yakalama: capture(sn) boyunca tüm handler çağrıları ve boşta
+        olmayan diğer thread'ler örneklenir.
+    Hiçbir çağrı işaretli değilken örnekleyici thread uyur; devre dışıyken
+    handler başına maliyet tek bir karşılaştırmadır.
+    """
+
+    def __init__(self, sample_rate=0.0, interval=DEFAULT_INTERVAL):
+        self.sample_rate = sample_rate
+        self.interval = interval
+        # Örneklemeli handler çağrılarından biriken yığınlar
+        self.stacks = Counter()
+        # thread id -> (handler adı, sarmalayıcı çerçevesi)
+        self.watched = {}
+        self._capture = None
+        self._capture_thread = None
+        self._capture_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._stopped = False
+        self.stats = {'sampled_calls': 0, 'samples': 0, 'captures': 0}
+
+    # HANDLER SARMALAMA
+    def wrap(self, func, name=None):
+        if getattr(func, '_profiled', False):
+            return func
+        name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if self._capture is None and not (self.sample_rate and random.random() < self.sample_rate):
+                return func(*args, **kwargs)
+            ident = threading.get_ident()
+            self._watch(ident, name, sys._getframe())
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.watched.pop(ident, None)
+
+        wrapper._profiled = True
+        return wrapper
+
+    def instrument_bot(self, bot):
+        """Kayıtlı telebot handler'larını örneklenebilir hale getir; sarılan sayıyı döndür"""
+        count = 0
+        for attr in BOT_HANDLER_LISTS:
+            for handler in getattr(bot, attr, ()):
+                func = handler['function']
+                if not getattr(func, '_profiled', False):
+                    handler['function'] = self.wrap(func)
+                    count += 1
+        return count
+
+    def _watch(self, ident, name, frame):
+        self._ensure_thread()
+        self.watched[ident] = (name, frame)
+        self.stats['sampled_calls'] += 1
+        self._wakeup.set()
+
+    # ÖRNEKLEYİCİ
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while not self._stopped:
+            if not self.watched and self._capture is None:
+                self._wakeup.wait()
+                self._wakeup.clear()
+                continue
+            try:
+                self._sample()
+            except Exception as e:
+                logger.error("Profil örnekleme hatası: %s", e)
+            time.sleep(self.interval)
+
+    def _sample(self):
+        own = threading.get_ident()
+        frames = sys._current_frames()
+        watched = dict(self.watched)
+        capture = self._capture
+        names = {thread.ident: thread.name for thread in threading.enumerate()} if capture is not None else None
+        for ident, frame in frames.items():
+            if ident == own or ident == self._capture_thread:
+                continue
+            entry = watched.get(ident)
+            if entry is not None:
+                stack = collapse(frame, entry[0], stop=entry[1])
+                self._add(self.stacks, stack)
+                if capture is not None:
+                    self._add(capture, stack)
+            elif capture is not None and frame.f_code.co_name not in IDLE_FUNCTIONS:
+                self._add(capture, collapse(frame, f"[{names.get(ident, ident)}]"))
+        self.stats['samples'] += 1
+        del frames
+
+    @staticmethod
+    def _add(stacks, stack):
+        if stack not in stacks and len(stacks) >= MAX_STACKS:
+            stack = stack.split(";", 1)[0] + ";[diğer]"
+        stacks[stack] += 1
+
+    # SÜRELİ YAKALAMA
+    def capture(self, seconds):
+        """seconds boyunca örnekle ve yığınları döndür; başka yakalama sürüyorsa None"""
+        seconds = max(1, min(MAX_CAPTURE_SECONDS, seconds))
+        if not self._capture_lock.acquire(blocking=False):
+            return None
+        try:
+            # Bekleyen yakalama thread'inin kendisi örneklenmez
+            self._capture_thread = threading.get_ident()
+            self._capture = Counter()
+            self.stats['captures'] += 1
+            self._ensure_thread()
+            self._wakeup.set()
+            time.sleep(seconds)
+            stacks, self._capture = self._capture, None
+            return stacks
+        finally:
+            self._capture = None
+            self._capture_thread = None
+            self._capture_lock.release()
+
+    @property
+    def capturing(self):
+        return self._capture is not None
+
+    def reset(self):
+        self.stacks = Counter()
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def get_stats(self):
+        return dict(self.stats, sample_rate=self.sample_rate, interval_ms=self.interval * 1000,
+                    stacks=len(self.stacks), sampled_time=sum(self.stacks.values()) * self.interval,
+                    capturing=self.capturing)
+
+    def summary(self, stacks, limit=5):
+        """Yöneticiye gönderilecek kısa özet (handler ve yaprak fonksiyon dağılımı)"""
+        total = sum(stacks.values())
+        if not total:
+            return "Örnek yok (bu sürede çalışan handler olmadı)."
+        roots = Counter()
+        for stack, count in stacks.items():
+            roots[stack.split(";", 1)[0]] += count
+        lines = [f"{total} örnek (~{total * self.interval:.1f} sn)"]
+        lines.append("Kök: " + ", ".join(f"{root} %{count / total * 100:.0f}"
+                                             for root, count in roots.most_common(limit)))
+        lines.append("En sıcak:")
+        lines.extend(f"  %{count / total * 100:.0f} {label}" for label, count in top_functions(stacks, limit))
+        return "\n".join(lines)
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+import os
+import math
+import mmap
+import time
+import secrets
+import sqlite3
+import logging
+import threading
+from array import array
+from send_queue import send_bulk, wait_result
+from broadcast import is_unreachable_error
+
+logger = logging.getLogger(__name__)
+
+QUOTES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "quotes_tr.txt")
+PUSH_PAGE_SIZE = 500
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS quote_state (
+        user_id INTEGER PRIMARY KEY,
+        chat_id INTEGER NOT NULL,
+        seed INTEGER NOT NULL,
+        position INTEGER NOT NULL DEFAULT 0,
+        size INTEGER NOT NULL,
+        daily INTEGER NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_quote_state_daily ON quote_state (user_id) WHERE daily = 1"
+)
+
+SQL_GET_STATE = "SELECT seed, position, size, daily FROM quote_state WHERE user_id = ?"
+SQL_SAVE_STATE = """
+    INSERT INTO quote_state (user_id, chat_id, seed, position, size, updated_at) VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(user_id) DO UPDATE SET
+        chat_id = excluded.chat_id,
+        seed = excluded.seed,
+        position = excluded.position,
+        size = excluded.size,
+        updated_at = excluded.updated_at
+"""
+SQL_SET_DAILY = "UPDATE quote_state SET daily = ?, chat_id = ? WHERE user_id = ?"
+SQL_DAILY_PAGE = """
+    SELECT user_id, chat_id, seed, position, size FROM quote_state
+    WHERE daily = 1 AND user_id > ? ORDER BY user_id LIMIT ?
+"""
+SQL_ADVANCE = "UPDATE quote_state SET seed = ?, position = ?, size = ?, updated_at = ? WHERE user_id = ?"
+SQL_DISABLE_DAILY = "UPDATE quote_state SET daily = 0 WHERE user_id = ?"
+SQL_COUNT_DAILY = "SELECT COUNT(*) FROM quote_state WHERE daily = 1"
+
+
+class QuoteCorpus:
+    """'söz|yazar' satırlarından oluşan dosya, bellek eşlemli (mmap) olarak okunur.
+
+    Bellekte sadece satır başlangıçlarının ofset dizisi tutulur; bir söz,
+    ofsetle dosyadan doğrudan dilimlenir. Dosya ilk kullanımda açılır.
+    """
+
+    def __init__(self, path=QUOTES_PATH):
+        self.path = path
+        self.data = None
+        self.offsets = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self.data is not None:
+                return
+            with open(self.path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            offsets = array('I')
+            start = 0
+            size = len(data)
+            while start < size:
+                end = data.find(b'\n', start)
+                if end == -1:
+                    end = size
+                if end > start:
+                    offsets.append(start)
+                start = end + 1
+            offsets.append(size + 1)
+            self.offsets = offsets
+            self.data = data
+
+    def __len__(self):
+        if self.data is None:
+            self._load()
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if self.data is None:
+            self._load()
+        line = self.data[self.offsets[index]:self.offsets[index + 1] - 1].decode('utf-8').strip()
+        text, _, author = line.partition('|')
+        return text, author or "Anonim"
+
+
+def permutation_params(seed, size):
+    """Tohumdan (a, b) üret; i -> (a*i + b) mod size bir permütasyondur (gcd(a, size) = 1)"""
+    if size <= 1:
+        return 1, 0
+    a = 1 + seed % (size - 1)
+    while math.gcd(a, size) != 1:
+        a += 1
+    return a, (seed >> 32) % size
+
+
+def permuted_index(seed, position, size):
+    a, b = permutation_params(seed, size)
+    return (a * position + b) % size
+
+
+def new_seed():
+    return secrets.randbits(62)
+
+
+class QuoteService:
+    """Motivasyon sözleri: kullanıcı başına tekrarsız sıra ve isteğe bağlı günlük gönderim.
+
+    Her kullanıcı için geçmiş tablosu yerine sadece bir tohum ve konum
+    saklanır. Tohum sözler üzerinde afin bir permütasyon belirler; konum
+    korpus boyuna ulaşana kadar hiçbir söz tekrar etmez, sonra yeni tohumla
+    yeni tur başlar.
+    """
+
+    def __init__(self, bot, db_path, send_queue=None, corpus=None):
+        self.bot = bot
+        self.send_queue = send_queue
+        self.corpus = corpus or QuoteCorpus()
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._init_db()
+
+    def _init_db(self):
+        with self.conn:
+            for statement in SCHEMA:
+                self.conn.execute(statement)
+
+    def _advance(self, seed, position, size):
+        """Sıradaki sözün indeksi ve yeni (tohum, konum, boy)"""
+        total = len(self.corpus)
+        if seed is None or size != total or position >= total:
+            # İlk kullanım, tur sonu veya korpus değişmiş: yeni permütasyon
+            seed, position = new_seed(), 0
+        index = permuted_index(seed, position, total)
+        return index, (seed, position + 1, total)
+
+    def next_quote(self, user_id, chat_id):
+        """Kullanıcıya sıradaki sözü ver; (söz, yazar, sıra, toplam) döndürür"""
+        with self.lock:
+            row = self.conn.execute(SQL_GET_STATE, (user_id,)).fetchone()
+            seed, position, size = (row[0], row[1], row[2]) if row else (None, 0, 0)
+            index, (seed, position, size) = self._advance(seed, position, size)
+            with self.conn:
+                self.conn.execute(SQL_SAVE_STATE, (user_id, chat_id, seed, position, size, time.time()))
+        text, author = self.corpus[index]
+        return text, author, position, size
+
+    def set_daily(self, user_id, chat_id, enabled):
+        """Günlük söz aboneliğini aç/kapat"""
+        with self.lock:
+            if not self.conn.execute(SQL_GET_STATE, (user_id,)).fetchone():
+                seed, size = new_seed(), len(self.corpus)
+                with self.conn:
+                    self.conn.execute(SQL_SAVE_STATE, (user_id, chat_id, seed, 0, size, time.time()))
+            with self.conn:
+                self.conn.execute(SQL_SET_DAILY, (1 if enabled else 0, chat_id, user_id))
+
+    def is_daily(self, user_id):
+        with self.lock:
+            row = self.conn.execute(SQL_GET_STATE, (user_id,)).fetchone()
+        return bool(row and row[3])
+
+    def count_daily(self):
+        with self.lock:
+            return self.conn.execute(SQL_COUNT_DAILY).fetchone()[0]
+
+    @staticmethod
+    def format_quote(text, author):
+        return f"💭 _{text}_\n\n— {author}"
+
+    def push_daily(self):
+        """Abonelere günün sözünü sayfa sayfa, toplu öncelikle gönder (scheduler işi)"""
+        sent = failed = 0
+        after_id = 0
+        while True:
+            with self.lock:
+                rows = self.conn.execute(SQL_DAILY_PAGE, (after_id, PUSH_PAGE_SIZE)).fetchall()
+            if not rows:
+                break
+            after_id = rows[-1][0]
+
+            updates = []
+            deliveries = []
+            now = time.time()
+            for user_id, chat_id, seed, position, size in rows:
+                index, (seed, position, size) = self._advance(seed, position, size)
+                updates.append((seed, position, size, now, user_id))
+                text, author = self.corpus[index]
+                deliveries.append((user_id, self._send(chat_id, self.format_quote(text, author))))
+            with self.lock:
+                with self.conn:
+                    self.conn.executemany(SQL_ADVANCE, updates)
+
+            unreachable = []
+            for user_id, result in deliveries:
+                error = wait_result(result)
+                if error is None:
+                    sent += 1
+                else:
+                    failed += 1
+                    if is_unreachable_error(error):
+                        unreachable.append((user_id,))
+            if unreachable:
+                with self.lock:
+                    with self.conn:
+                        self.conn.executemany(SQL_DISABLE_DAILY, unreachable)
+
+        logger.info("Günlük söz gönderildi: %s başarılı, %s hatalı", sent, failed)
+        return sent
+
+    def _send(self, chat_id, text):
+        return send_bulk(self.bot, self.send_queue, chat_id, text, parse_mode='Markdown')
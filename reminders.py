@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+import html
+import time
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+from send_queue import PRIORITY_NORMAL, wait_result
+
+logger = logging.getLogger(__name__)
+
+# Bellekte sadece önümüzdeki pencere tutulur; gerisi due_time indeksinde bekler
+PREFETCH_WINDOW = 3600
+PREFETCH_LIMIT = 5000
+# Gönderilemeyen hatırlatıcı artan aralıklarla tekrar denenir, sonra bırakılır
+RETRY_DELAY = 30
+MAX_DELIVERY_ATTEMPTS = 5
+
+RECURRENCE_STEPS = {
+    'hourly': timedelta(hours=1),
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1)
+}
+
+# Kullanıcı girdisindeki tekrar ifadeleri
+RECURRENCE_ALIASES = {
+    'saatlik': 'hourly',
+    'hourly': 'hourly',
+    'günlük': 'daily',
+    'her gün': 'daily',
+    'daily': 'daily',
+    'haftalık': 'weekly',
+    'her hafta': 'weekly',
+    'weekly': 'weekly'
+}
+
+RECURRENCE_LABELS = {
+    'hourly': 'saatlik',
+    'daily': 'günlük',
+    'weekly': 'haftalık'
+}
+
+
+def parse_recurrence(text):
+    """'günlük', 'weekly' gibi ifadeleri iç koda çevir"""
+    return RECURRENCE_ALIASES.get((text or '').strip().lower())
+
+
+def next_occurrence(due_time, recurrence, now):
+    """Tekrarlayan hatırlatıcının 'now' sonrasındaki ilk zamanı (kaçırılanlar atlanır)"""
+    step = RECURRENCE_STEPS[recurrence]
+    due = datetime.fromtimestamp(due_time) + step
+    while due.timestamp() <= now:
+        due += step
+    return due.timestamp()
+
+
+class ReminderEngine:
+    """Hatırlatıcı teslim motoru.
+
+    Zamanı PREFETCH_WINDOW içinde gelen hatırlatıcılar due_time indeksinden
+    okunup bir min-heap'e alınır. Tek bir thread heap'in tepesindeki zamana
+    kadar uyur, bu yüzden boşta CPU harcanmaz ve tablo periyodik olarak
+    taranmaz; pencere bitince sadece bir sonraki pencere okunur.
+    """
+
+    def __init__(self, bot, store, send_queue=None, window=PREFETCH_WINDOW):
+        self.bot = bot
+        self.store = store
+        self.send_queue = send_queue
+        self.window = window
+        self.heap = []
+        self.scheduled = {}
+        # hatırlatıcı id -> başarısız gönderim sayısı
+        self.attempts = {}
+        self.loaded_until = 0
+        self.cond = threading.Condition()
+        self.running = False
+        self._thread = None
+        self.stats = {'delivered': 0, 'failed': 0, 'retried': 0, 'late': 0, 'prefetches': 0}
+
+    def start(self):
+        """Depodan yükle ve teslim thread'ini başlat (yeniden başlatmada kaldığı yerden sürer)"""
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+            self._prefetch(time.time())
+        self._thread = threading.Thread(target=self._loop, name="reminder-engine", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+
+    def _prefetch(self, now):
+        """Bir sonraki pencerede zamanı gelecek hatırlatıcıları heap'e al (cond kilidi altında)"""
+        until = now + self.window
+        rows = self.store.get_due_reminders(until, PREFETCH_LIMIT)
+        if len(rows) >= PREFETCH_LIMIT:
+            # Pencere çok kalabalık; okunan son zamana kadar yüklü kabul edilir
+            until = rows[-1]['due_time']
+        for row in rows:
+            if row['id'] not in self.scheduled:
+                self._push(row['id'], row['due_time'])
+        self.loaded_until = until
+        self.stats['prefetches'] += 1
+
+    def _push(self, reminder_id, due_time):
+        self.scheduled[reminder_id] = due_time
+        heapq.heappush(self.heap, (due_time, reminder_id))
+
+    def schedule(self, reminder_id, due_time):
+        """Yeni eklenen hatırlatıcıyı, yüklü pencereye düşüyorsa hemen heap'e al"""
+        with self.cond:
+            if due_time <= self.loaded_until:
+                self._push(reminder_id, due_time)
+                self.cond.notify()
+
+    def cancel(self, reminder_id):
+        """Heap'teki kayıt teslim anında yok sayılır"""
+        with self.cond:
+            self.scheduled.pop(reminder_id, None)
+            self.attempts.pop(reminder_id, None)
+
+    def _loop(self):
+        while True:
+            with self.cond:
+                if not self.running:
+                    return
+                now = time.time()
+                if now >= self.loaded_until:
+                    try:
+                        self._prefetch(now)
+                    except Exception as e:
+                        logger.error("Hatırlatıcı ön yükleme hatası: %s", e)
+                        self.cond.wait(timeout=5)
+                        continue
+
+                due = []
+                while self.heap and self.heap[0][0] <= now:
+                    due_time, reminder_id = heapq.heappop(self.heap)
+                    # İptal edilmiş ya da zamanı değişmiş kayıtlar atlanır
+                    if self.scheduled.get(reminder_id) == due_time:
+                        del self.scheduled[reminder_id]
+                        due.append(reminder_id)
+
+                if not due:
+                    wake_at = self.loaded_until
+                    if self.heap:
+                        wake_at = min(wake_at, self.heap[0][0])
+                    self.cond.wait(timeout=max(0.0, wake_at - now))
+                    continue
+
+            # Önce hepsi kuyruğa verilir, sonra sonuçlar beklenir; teslim sırayla beklemesin
+            sent = [(reminder_id,) + self._send(reminder_id, now) for reminder_id in due]
+            for reminder_id, reminder, result in sent:
+                self._finish(reminder_id, reminder, result, now)
+
+    def _send(self, reminder_id, now):
+        """Hatırlatıcıyı gönderime ver: (kayıt, sonuç); sonuç Future, hata veya None"""
+        reminder = None
+        try:
+            reminder = self.store.get_reminder(reminder_id)
+            if not reminder:
+                return None, None
+            lateness = now - reminder['due_time']
+            # Kullanıcı metni kaçışlı HTML; '_' veya '*' gönderimi bozmasın
+            text = f"⏰ <b>Hatırlatıcı:</b> {html.escape(reminder['message'])}"
+            if lateness > 60:
+                self.stats['late'] += 1
+                text += f"\n\n<i>({datetime.fromtimestamp(reminder['due_time']).strftime('%Y-%m-%d %H:%M')} için planlanmıştı)</i>"
+            if reminder['recurrence'] in RECURRENCE_LABELS:
+                text += f"\n🔁 {RECURRENCE_LABELS[reminder['recurrence']]}"
+
+            if self.send_queue and self.send_queue.running:
+                return reminder, self.send_queue.send_message(reminder['chat_id'], text, priority=PRIORITY_NORMAL,
+                                                              parse_mode='HTML')
+            self.bot.send_message(reminder['chat_id'], text, parse_mode='HTML')
+            return reminder, None
+        except Exception as e:
+            return reminder, e
+
+    def _finish(self, reminder_id, reminder, result, now):
+        """Gönderim başarılıysa kaydı güncelle, değilse tekrar denemeye al"""
+        error = wait_result(result)
+        if error is not None:
+            logger.error("Hatırlatıcı teslim hatası (#%s): %s", reminder_id, error)
+            self._retry(reminder_id, reminder, now)
+            return
+        if reminder is None:
+            return
+        self.attempts.pop(reminder_id, None)
+        try:
+            self._complete(reminder_id, reminder, now)
+            self.stats['delivered'] += 1
+        except Exception as e:
+            # Mesaj gitti; kayıt güncellenemediyse tekrar gönderilmesin diye yeniden denenmez
+            self.stats['failed'] += 1
+            logger.error("Hatırlatıcı kayıt hatası (#%s): %s", reminder_id, e)
+
+    def _complete(self, reminder_id, reminder, now):
+        """Tekrarlayan hatırlatıcıyı sonraki zamana kur, diğerlerini gönderildi işaretle"""
+        if reminder['recurrence'] in RECURRENCE_STEPS:
+            next_due = next_occurrence(reminder['due_time'], reminder['recurrence'], now)
+            self.store.reschedule_reminder(reminder_id, next_due)
+            self.schedule(reminder_id, next_due)
+        else:
+            self.store.mark_reminder_sent(reminder_id)
+
+    def _retry(self, reminder_id, reminder, now):
+        """Gönderilemeyen hatırlatıcıyı heap'e geri koy; deneme hakkı bitince bırak"""
+        attempts = self.attempts.get(reminder_id, 0) + 1
+        if attempts < MAX_DELIVERY_ATTEMPTS:
+            self.attempts[reminder_id] = attempts
+            self.stats['retried'] += 1
+            # Yüklü pencerenin dışına düşerse bir sonraki ön yüklemede depodan tekrar okunur
+            self.schedule(reminder_id, now + RETRY_DELAY * 2 ** (attempts - 1))
+            return
+        self.attempts.pop(reminder_id, None)
+        self.stats['failed'] += 1
+        if reminder is None:
+            return
+        logger.error("Hatırlatıcı #%s %s denemede gönderilemedi, bırakılıyor", reminder_id, attempts)
+        try:
+            self._complete(reminder_id, reminder, now)
+        except Exception as e:
+            logger.error("Hatırlatıcı kayıt hatası (#%s): %s", reminder_id, e)
+
+    def get_stats(self):
+        with self.cond:
+            stats = dict(self.stats)
+            stats['in_memory'] = len(self.scheduled)
+            stats['loaded_until'] = self.loaded_until
+        return stats
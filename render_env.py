@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+import re
+import time
+import secrets
+import logging
+import threading
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Gösterim ve fark önizlemesi için önbellek süresi (yazmadan önce her zaman taze okunur)
+ENV_CACHE_TTL = 300
+PAGE_LIMIT = 100
+REQUEST_TIMEOUT = 30
+# Onay bekleyen değişiklik bu süre sonra unutulur (konuşma süresiyle aynı)
+PENDING_TTL = 600
+
+KEY_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_.-]*$')
+ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', '"': '"', '\\': '\\'}
+
+
+class EnvVarError(Exception):
+    pass
+
+
+# AYRIŞTIRMA VE FARK
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1]
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r'\\(.)', lambda m: ESCAPES.get(m.group(1), '\\' + m.group(1)), value[1:-1])
+    # Tırnaksız değerde ' #' sonrası yorumdur
+    return re.split(r'\s+#', value, 1)[0].rstrip()
+
+
+def parse_env_block(text):
+    """.env metnini ayrıştır: (ayarlanacaklar {anahtar: değer}, silinecekler [anahtar], hatalı satırlar).
+
+    Desteklenenler: KEY=değer, export KEY=değer, tek/çift tırnak, # yorum
+    satırları ve tırnaksız değer sonundaki ' # yorum'. '-KEY' satırı
+    değişkeni siler. Aynı anahtar birden fazla geçerse sonuncusu geçerlidir.
+    """
+    sets, unsets, errors = {}, [], []
+    for number, raw in enumerate((text or '').splitlines(), 1):
+        line = raw.strip()
+        if not line or line.startswith('#'):
+            continue
+        if line.startswith('-') and '=' not in line:
+            key = line[1:].strip()
+            if KEY_PATTERN.match(key):
+                sets.pop(key, None)
+                if key not in unsets:
+                    unsets.append(key)
+                continue
+        if line.startswith('export '):
+            line = line[7:].lstrip()
+        key, sep, value = line.partition('=')
+        key = key.strip()
+        if not sep or not KEY_PATTERN.match(key):
+            errors.append(number)
+            continue
+        sets[key] = _unquote(value.strip())
+        if key in unsets:
+            unsets.remove(key)
+    return sets, unsets, errors
+
+
+def diff_env(current, sets, unsets=()):
+    """Mevcut değişkenlere göre gerçekten değişenler"""
+    added = {key: value for key, value in sets.items() if key not in current}
+    changed = {key: value for key, value in sets.items() if key in current and current[key] != value}
+    removed = [key for key in unsets if key in current]
+    return {'added': added, 'changed': changed, 'removed': removed,
+            'unchanged': sum(1 for key, value in sets.items() if current.get(key) == value)}
+
+
+def has_changes(diff):
+    return bool(diff['added'] or diff['changed'] or diff['removed'])
+
+
+def mask_value(value):
+    """Gizli değer sohbette gösterilmez; ne ön ek ne uzunluk sızar"""
+    return '••••••' if value else '(boş)'
+
+
+def format_env_diff(diff, limit=30):
+    lines = []
+    for symbol, keys in (('➕', list(diff['added'])), ('✏️', list(diff['changed'])), ('➖', diff['removed'])):
+        for key in keys[:limit]:
+            value = diff['added'].get(key, diff['changed'].get(key))
+            lines.append(f"{symbol} {key}" + (f" = {mask_value(value)}" if value is not None else ""))
+        if len(keys) > limit:
+            lines.append(f"   ... ve {len(keys) - limit} tane daha")
+    if diff['unchanged']:
+        lines.append(f"= {diff['unchanged']} değişken zaten aynı")
+    return "\n".join(lines)
+
+
+# ÖNBELLEK
+class EnvVarCache:
+    """Servis başına env değişkenleri; bir kez okunur, değişiklik tek istekte yazılır.
+
+    Render'ın toplu yazma uç noktası (PUT /services/{id}/env-vars) listenin
+    tamamını değiştirir. Bu yüzden kullanıcının değişikliği önbellekteki
+    listeye uygulanır ve sonuç tek PUT ile gönderilir; değişiklik yoksa hiç
+    istek yapılmaz. Önbellek gösterim ve fark önizlemesi içindir; yazmadan
+    hemen önce liste her zaman yeniden okunur, böylece panelden yapılan
+    değişiklikler ezilmez.
+
+    Onay bekleyen değişiklikler (gizli değerler içerir) konuşma deposuna
+    değil, bu süreçteki bellek içi `pending` tablosuna konur; depoya
+    sadece rastgele bir anahtar yazılır.
+    """
+
+    def __init__(self, base_url, headers, ttl=ENV_CACHE_TTL):
+        self.base_url = base_url
+        self.headers = headers
+        self.ttl = ttl
+        # servis id -> (okunma zamanı, {anahtar: değer})
+        self.entries = {}
+        # anahtar -> (son geçerlilik, servis id, ayarlanacaklar, silinecekler)
+        self.pending = {}
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'hits': 0, 'fetches': 0, 'writes': 0}
+
+    def get(self, service_id, refresh=False):
+        """Servisin env değişkenleri {anahtar: değer} (kopya)"""
+        self.stats['requests'] += 1
+        entry = self.entries.get(service_id)
+        if entry is not None and not refresh and time.monotonic() - entry[0] < self.ttl:
+            self.stats['hits'] += 1
+            return dict(entry[1])
+        env = self._fetch(service_id)
+        self.entries[service_id] = (time.monotonic(), env)
+        return dict(env)
+
+    def _fetch(self, service_id):
+        env = {}
+        cursor = None
+        while True:
+            params = {'limit': PAGE_LIMIT}
+            if cursor:
+                params['cursor'] = cursor
+            self.stats['fetches'] += 1
+            response = requests.get(f"{self.base_url}/services/{service_id}/env-vars", headers=self.headers,
+                                    params=params, timeout=REQUEST_TIMEOUT)
+            if response.status_code != 200:
+                raise EnvVarError(f"Env değişkenleri okunamadı ({response.status_code})")
+            items = response.json()
+            for item in items:
+                var = item.get('envVar', item)
+                env[var['key']] = var.get('value', '')
+            if len(items) < PAGE_LIMIT:
+                return env
+            cursor = items[-1].get('cursor')
+            if not cursor:
+                return env
+
+    def apply(self, service_id, sets, unsets=()):
+        """Değişikliği uygula; gerçekleşen farkı döndürür (fark yoksa istek yapılmaz)"""
+        with self._lock:
+            # Tam liste PUT'u arada panelden eklenenleri silmesin diye taze okunur
+            current = self.get(service_id, refresh=True)
+            diff = diff_env(current, sets, unsets)
+            if not has_changes(diff):
+                return diff
+            for key in diff['removed']:
+                current.pop(key)
+            current.update(diff['added'])
+            current.update(diff['changed'])
+            self.stats['writes'] += 1
+            response = requests.put(f"{self.base_url}/services/{service_id}/env-vars", headers=self.headers,
+                                    json=[{'key': key, 'value': value} for key, value in current.items()],
+                                    timeout=REQUEST_TIMEOUT)
+            if response.status_code != 200:
+                # Sunucudaki liste artık bilinmiyor; bir sonraki istekte yeniden okunur
+                self.entries.pop(service_id, None)
+                raise EnvVarError(f"Env değişkenleri yazılamadı ({response.status_code})")
+            self.entries[service_id] = (time.monotonic(), current)
+            logger.info("⚙️ %s env: +%s ~%s -%s", service_id, len(diff['added']), len(diff['changed']),
+                        len(diff['removed']))
+            return diff
+
+    def stage(self, service_id, sets, unsets):
+        """Onay bekleyen değişikliği sakla; konuşma deposuna yazılacak anahtarı döndür"""
+        now = time.monotonic()
+        with self._lock:
+            for token in [t for t, item in self.pending.items() if item[0] < now]:
+                del self.pending[token]
+            token = secrets.token_hex(8)
+            self.pending[token] = (now + PENDING_TTL, service_id, dict(sets), list(unsets))
+        return token
+
+    def take(self, token):
+        """Saklanan değişikliği bir kez al: (servis id, ayarlanacaklar, silinecekler) veya None"""
+        with self._lock:
+            item = self.pending.pop(token, None)
+        if item is None or item[0] < time.monotonic():
+            return None
+        return item[1:]
+
+    def invalidate(self, service_id):
+        self.entries.pop(service_id, None)
+
+    def get_stats(self):
+        return dict(self.stats, services=len(self.entries))
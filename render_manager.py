@@ -2,7 +2,8 @@
 import os
 import requests
 import logging
-from datetime import datetime
+from metrics import UPSTREAM_LATENCY, ERRORS
+from render_env import EnvVarCache, EnvVarError, format_env_diff, has_changes
 
 logger = logging.getLogger(__name__)
 
@@ -10,11 +11,12 @@ class RenderManager:
     def __init__(self, api_key, owner_id):
         self.api_key = api_key
         self.owner_id = owner_id
-        self.base_url = "https://api.render.com/v1"
+        self.base_url = os.getenv("RENDER_API_URL", "https://api.render.com/v1")
         self.headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json"
         }
+        self.env_vars = EnvVarCache(self.base_url, self.headers)
     
     def get_services(self):
         """Render servislerini listele"""
@@ -28,13 +30,17 @@ class RenderManager:
                 services = response.json()
                 service_list = []
                 
-                for service in services:
+                for item in services:
+                    # Liste elemanları {"service": {...}, "cursor": ...} biçimindedir
+                    service = item.get('service', item)
                     service_list.append({
                         'id': service.get('id'),
                         'name': service.get('name'),
                         'type': service.get('type'),
                         'status': service.get('serviceDetails', {}).get('status', 'unknown'),
                         'url': service.get('serviceDetails', {}).get('url'),
+                        'repo': service.get('repo'),
+                        'branch': service.get('branch'),
                         'created': service.get('createdAt', '').split('T')[0],
                         'updated': service.get('updatedAt', '').split('T')[0]
                     })
@@ -43,9 +49,23 @@ class RenderManager:
             else:
                 return []
         except Exception as e:
-            logger.error(f"Render servis listeleme hatası: {e}")
+            logger.error("Render servis listeleme hatası: %s", e)
             return []
     
+    def find_services_by_repo(self, repo_full_name, branch=None):
+        """'sahip/repo' reposundan (branch verilirse o daldan) deploy edilen servisler"""
+        suffix = "/" + repo_full_name.lower()
+        matches = []
+        for service in self.get_services():
+            if branch and service['branch'] != branch:
+                continue
+            repo_url = (service['repo'] or '').lower().rstrip('/')
+            if repo_url.endswith('.git'):
+                repo_url = repo_url[:-4]
+            if repo_url.endswith(suffix):
+                matches.append(service)
+        return matches
+    
     def get_service_details(self, service_id):
         """Servis detaylarını al"""
         try:
@@ -69,7 +89,7 @@ class RenderManager:
                 }
             return None
         except Exception as e:
-            logger.error(f"Servis detay hatası: {e}")
+            logger.error("Servis detay hatası: %s", e)
             return None
     
     def deploy_service(self, service_id):
@@ -87,7 +107,7 @@ class RenderManager:
             else:
                 return f"❌ Deploy hatası: {response.status_code}"
         except Exception as e:
-            logger.error(f"Deploy hatası: {e}")
+            logger.error("Deploy hatası: %s", e)
             return f"❌ Deploy hatası: {str(e)}"
     
     def get_deploys(self, service_id, limit=5):
@@ -114,7 +134,7 @@ class RenderManager:
                 return deploy_list
             return []
         except Exception as e:
-            logger.error(f"Deploy listeleme hatası: {e}")
+            logger.error("Deploy listeleme hatası: %s", e)
             return []
     
     def get_logs(self, service_id, limit=100):
@@ -131,7 +151,7 @@ class RenderManager:
                 return logs
             return []
         except Exception as e:
-            logger.error(f"Log alma hatası: {e}")
+            logger.error("Log alma hatası: %s", e)
             return []
     
     def restart_service(self, service_id):
@@ -140,26 +160,33 @@ class RenderManager:
             # Render API'sinde restart endpoint'i yoksa deploy kullanıyoruz
             return self.deploy_service(service_id)
         except Exception as e:
-            logger.error(f"Restart hatası: {e}")
+            logger.error("Restart hatası: %s", e)
             return f"❌ Restart hatası: {str(e)}"
     
-    def update_environment_variables(self, service_id, env_vars):
-        """Environment variables güncelle"""
+    def get_env_vars(self, service_id, refresh=False):
+        """Servisin env değişkenleri {anahtar: değer} (önbellekten)"""
+        return self.env_vars.get(service_id, refresh=refresh)
+    
+    def update_environment_variables(self, service_id, env_vars, unset=(), deploy=False):
+        """Env değişkenlerini güncelle: sadece fark tek istekte yazılır, istenirse tek deploy.
+
+        env_vars {anahtar: değer} veya [{'key', 'value'}] olabilir; listede
+        olmayan değişkenlere dokunulmaz, unset'tekiler silinir.
+        """
         try:
-            response = requests.patch(
-                f"{self.base_url}/services/{service_id}",
-                headers=self.headers,
-                json={
-                    "envVars": env_vars
-                }
-            )
-            
-            if response.status_code == 200:
-                return "✅ Environment variables güncellendi!"
-            else:
-                return f"❌ Güncelleme hatası: {response.status_code}"
+            if not isinstance(env_vars, dict):
+                env_vars = {item['key']: item['value'] for item in env_vars}
+            diff = self.env_vars.apply(service_id, env_vars, unset)
+            if not has_changes(diff):
+                return "✅ Değişiklik yok, env değişkenleri zaten güncel."
+            result = "✅ Environment variables güncellendi!\n" + format_env_diff(diff)
+            if deploy:
+                result += "\n" + self.deploy_service(service_id)
+            return result
+        except EnvVarError as e:
+            return f"❌ Env var hatası: {str(e)}"
         except Exception as e:
-            logger.error(f"Env var güncelleme hatası: {e}")
+            logger.error("Env var güncelleme hatası: %s", e)
             return f"❌ Env var hatası: {str(e)}"
     
     def auto_deploy_from_github(self, service_id, github_repo_url):
@@ -170,22 +197,28 @@ class RenderManager:
             result = self.deploy_service(service_id)
             return f"🔄 GitHub'dan otomatik deploy: {result}"
         except Exception as e:
-            logger.error(f"Auto deploy hatası: {e}")
+            logger.error("Auto deploy hatası: %s", e)
             return f"❌ Auto deploy hatası: {str(e)}"
     
     def get_service_metrics(self, service_id):
-        """Servis metriklerini al (CPU, Memory vs.)"""
+        """Servis durumu, son deploy ve bu süreçten ölçülen Render API gecikmesi"""
         try:
-            # Render API'sinde metrics endpoint'i varsa kullan
-            # Şimdilik basit bilgi döndürüyoruz
+            details = self.get_service_details(service_id)
+            if details is None:
+                return {}
+            deploys = self.get_deploys(service_id, limit=1)
+            last_deploy = deploys[0] if deploys else {}
+            latency = UPSTREAM_LATENCY.summary('render')
             return {
-                'status': 'active',
-                'uptime': '99.9%',
-                'last_deploy': datetime.now().strftime('%Y-%m-%d %H:%M'),
-                'requests_today': 'N/A'
+                'status': details.get('status') or 'bilinmiyor',
+                'last_deploy': last_deploy.get('created', 'N/A'),
+                'last_deploy_status': last_deploy.get('status', 'N/A'),
+                'api_calls': latency['count'] if latency else 0,
+                'api_p95_ms': round(latency['p95'] * 1000) if latency else None,
+                'api_errors': ERRORS.value('upstream', 'render')
             }
         except Exception as e:
-            logger.error(f"Metrics hatası: {e}")
+            logger.error("Metrics hatası: %s", e)
             return {}
 
     def create_service(self, service_name, github_repo_url, branch="main", environment="docker"):
@@ -216,7 +249,7 @@ class RenderManager:
                 return f"❌ Servis oluşturma hatası: {response.status_code} - {response.text}"
                 
         except Exception as e:
-            logger.error(f"Servis oluşturma hatası: {e}")
+            logger.error("Servis oluşturma hatası: %s", e)
             return f"❌ Servis oluşturma hatası: {str(e)}"
 
     def auto_create_and_deploy(self, service_name, github_repo_url):
@@ -238,5 +271,5 @@ class RenderManager:
                 return create_result
                 
         except Exception as e:
-            logger.error(f"Otomatik oluşturma hatası: {e}")
+            logger.error("Otomatik oluşturma hatası: %s", e)
             return f"❌ Otomatik oluşturma hatası: {str(e)}"
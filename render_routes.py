@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+from telebot import types
+from render_env import parse_env_block, diff_env, has_changes, format_env_diff, mask_value
+from router import timed, requires, ADMIN_ONLY_TEXT
+
+ENV_LIST_LIMIT = 50
+ENV_EDIT_HELP = (
+    "✏️ Değişiklikleri yaz veya .env içeriğini yapıştır:\n"
+    "KEY=değer → ekle/güncelle\n"
+    "-KEY → sil\n"
+    "Yazmadığın değişkenlere dokunulmaz. Vazgeçmek için 'iptal' yaz."
+)
+
+
+class RenderRoutes:
+    """Render yönetim menüsü: servis callback'leri, adım adım akışlar ve env düzenleme.
+
+    render_manager None ise route'lar "devre dışı" yanıtı verir.
+    """
+
+    def __init__(self, bot, conversations, render_manager, is_admin):
+        self.bot = bot
+        self.conversations = conversations
+        self.render_manager = render_manager
+        self.is_admin = is_admin
+
+    def show_menu(self, message):
+        """Render yönetim menüsünü göster"""
+        markup = types.InlineKeyboardMarkup(row_width=2)
+        buttons = [
+            types.InlineKeyboardButton("🚀 Servis Listesi", callback_data="render_list_services"),
+            types.InlineKeyboardButton("📊 Servis Detayı", callback_data="render_service_details"),
+            types.InlineKeyboardButton("🔄 Deploy Et", callback_data="render_deploy"),
+            types.InlineKeyboardButton("📜 Deploy Geçmişi", callback_data="render_deploys"),
+            types.InlineKeyboardButton("📋 Logları Görüntüle", callback_data="render_logs"),
+            types.InlineKeyboardButton("🔁 Servisi Yeniden Başlat", callback_data="render_restart"),
+            types.InlineKeyboardButton("⚙️ Env Variables", callback_data="render_env_vars"),
+            types.InlineKeyboardButton("❌ Kapat", callback_data="close_menu")
+        ]
+        markup.add(*buttons)
+
+        menu_text = """
+🔄 *Render Yönetim Paneli*
+
+Yapmak istediğin işlemi seç:
+• 🚀 Servis Listesi - Tüm servislerini görüntüle
+• 📊 Servis Detayı - Detaylı servis bilgisi
+• 🔄 Deploy Et - Yeni deployment başlat
+• 📜 Deploy Geçmişi - Son deployment'ları görüntüle
+• 📋 Logları Görüntüle - Servis loglarını incele
+• 🔁 Servisi Yeniden Başlat - Servisi restart et
+• ⚙️ Env Variables - Environment variables yönet
+    """
+
+        self.bot.send_message(message.chat.id, menu_text, parse_mode='Markdown', reply_markup=markup)
+
+    # CALLBACK'LER
+    def handle_list_services(self, call):
+        """Render servis listesini göster"""
+        try:
+            services = self.render_manager.get_services()
+            if services:
+                service_text = "🚀 *Render Servisleriniz:*\n\n"
+                for service in services:
+                    status_icon = "✅" if service['status'] == 'active' else "❌"
+                    service_text += f"{status_icon} *{service['name']}*\n"
+                    service_text += f"   🔗 {service['url'] or 'URL yok'}\n"
+                    service_text += f"   📅 {service['updated']}\n\n"
+            else:
+                service_text = "❌ Hiç servis bulunamadı."
+
+            self.bot.edit_message_text(service_text, call.message.chat.id, call.message.message_id, parse_mode='Markdown')
+        except Exception as e:
+            self.bot.edit_message_text(f"❌ Servis listesi alınamadı: {str(e)}", call.message.chat.id, call.message.message_id)
+
+    def handle_service_details(self, call):
+        """Render servis detayları"""
+        self.bot.send_message(call.message.chat.id, "📊 Hangi servisin detaylarını görmek istiyorsun? Servis ID'sini yaz:")
+        self.conversations.ask(call.message.chat.id, 'render.service_details')
+
+    def process_service_details(self, message):
+        """Render servis detayları işlemi"""
+        try:
+            service_id = message.text.strip()
+            details = self.render_manager.get_service_details(service_id)
+
+            if details:
+                detail_text = f"📊 *Servis Detayları:*\n\n"
+                detail_text += f"📛 *Ad:* {details['name']}\n"
+                detail_text += f"🔗 *URL:* {details['url'] or 'Yok'}\n"
+                detail_text += f"📊 *Durum:* {details['status']}\n"
+                detail_text += f"🌿 *Branch:* {details['branch']}\n"
+                detail_text += f"🔧 *Build Cmd:* `{details['build_command']}`\n"
+                detail_text += f"▶️ *Start Cmd:* `{details['start_command']}`\n"
+                detail_text += f"📅 *Oluşturulma:* {details['created'][:10]}\n"
+            else:
+                detail_text = "❌ Servis detayları bulunamadı."
+
+            self.bot.reply_to(message, detail_text, parse_mode='Markdown')
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Servis detayları alınamadı: {str(e)}")
+
+    def handle_deploy(self, call):
+        """Render deploy başlat"""
+        self.bot.send_message(call.message.chat.id, "🔄 Hangi servisi deploy etmek istiyorsun? Servis ID'sini yaz:")
+        self.conversations.ask(call.message.chat.id, 'render.deploy')
+
+    def process_deploy(self, message):
+        """Render deploy işlemi"""
+        try:
+            service_id = message.text.strip()
+            self.bot.send_message(message.chat.id, "🔄 Deploy başlatılıyor...")
+            result = self.render_manager.deploy_service(service_id)
+            self.bot.reply_to(message, result)
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Deploy hatası: {str(e)}")
+
+    def handle_deploys(self, call):
+        """Render deploy geçmişi"""
+        self.bot.send_message(call.message.chat.id, "📜 Hangi servisin deploy geçmişini görmek istiyorsun? Servis ID'sini yaz:")
+        self.conversations.ask(call.message.chat.id, 'render.deploys')
+
+    def process_deploys(self, message):
+        """Render deploy geçmişi işlemi"""
+        try:
+            service_id = message.text.strip()
+            deploys = self.render_manager.get_deploys(service_id, 10)
+
+            if deploys:
+                deploy_text = f"📜 *Son Deploy'lar:*\n\n"
+                for deploy in deploys:
+                    status_icon = "✅" if deploy['status'] == 'live' else "🔄" if deploy['status'] == 'build_in_progress' else "❌"
+                    deploy_text += f"{status_icon} `{deploy['id'][:8]}...`\n"
+                    deploy_text += f"   📅 {deploy['created']} - {deploy['finished']}\n\n"
+            else:
+                deploy_text = "❌ Deploy geçmişi bulunamadı."
+
+            self.bot.reply_to(message, deploy_text, parse_mode='Markdown')
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Deploy geçmişi alınamadı: {str(e)}")
+
+    def handle_logs(self, call):
+        """Render logları göster"""
+        self.bot.send_message(call.message.chat.id, "📋 Hangi servisin loglarını görmek istiyorsun? Servis ID'sini yaz:")
+        self.conversations.ask(call.message.chat.id, 'render.logs')
+
+    def process_logs(self, message):
+        """Render logları işlemi"""
+        try:
+            service_id = message.text.strip()
+            logs = self.render_manager.get_logs(service_id, 50)
+
+            if logs:
+                log_text = f"📋 *Son Loglar:*\n\n"
+                # Logları işle (format render API'sine göre değişebilir)
+                log_text += "```\n"
+                for log in logs[-10:]:  # Son 10 log
+                    log_text += f"{log}\n"
+                log_text += "```"
+            else:
+                log_text = "❌ Log bulunamadı."
+
+            self.bot.reply_to(message, log_text, parse_mode='Markdown')
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Log alma hatası: {str(e)}")
+
+    def handle_restart(self, call):
+        """Render servisi yeniden başlat"""
+        self.bot.send_message(call.message.chat.id, "🔁 Hangi servisi yeniden başlatmak istiyorsun? Servis ID'sini yaz:")
+        self.conversations.ask(call.message.chat.id, 'render.restart')
+
+    def process_restart(self, message):
+        """Render restart işlemi"""
+        try:
+            service_id = message.text.strip()
+            self.bot.send_message(message.chat.id, "🔁 Servis yeniden başlatılıyor...")
+            result = self.render_manager.restart_service(service_id)
+            self.bot.reply_to(message, result)
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Restart hatası: {str(e)}")
+
+    # ENV DEĞİŞKENLERİ
+    def handle_env_vars(self, call):
+        """Render environment variables"""
+        self.bot.send_message(call.message.chat.id, "⚙️ Hangi servisin env değişkenlerini yönetmek istiyorsun? Servis ID'sini yaz:")
+        self.conversations.ask(call.message.chat.id, 'render.env_service')
+
+    def process_env_service(self, message):
+        """Servisin env değişkenlerini (maskeli) göster ve değişiklik iste"""
+        # Konuşma sohbete bağlı; grupta sıradaki mesajı başka biri yazmış olabilir
+        if not self.is_admin(message):
+            self.bot.reply_to(message, ADMIN_ONLY_TEXT)
+            return
+        try:
+            service_id = message.text.strip()
+            env = self.render_manager.get_env_vars(service_id, refresh=True)
+            env_text = f"⚙️ {service_id} - {len(env)} değişken\n\n"
+            for key in sorted(env)[:ENV_LIST_LIMIT]:
+                env_text += f"🔸 {key} = {mask_value(env[key])}\n"
+            if len(env) > ENV_LIST_LIMIT:
+                env_text += f"... ve {len(env) - ENV_LIST_LIMIT} tane daha\n"
+            self.bot.reply_to(message, env_text + "\n" + ENV_EDIT_HELP)
+            self.conversations.ask(message.chat.id, 'render.env_edit', data={'service_id': service_id})
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Env değişkenleri alınamadı: {str(e)}")
+
+    def process_env_edit(self, message, data):
+        """Değişikliği ayrıştır, farkı göster ve onay iste (henüz hiçbir şey yazılmaz)"""
+        if not self.is_admin(message):
+            self.bot.reply_to(message, ADMIN_ONLY_TEXT)
+            return
+        try:
+            service_id = data['service_id']
+            sets, unsets, errors = parse_env_block(message.text)
+            if not sets and not unsets:
+                self.bot.reply_to(message, "❌ Geçerli satır bulunamadı.\n\n" + ENV_EDIT_HELP)
+                self.conversations.ask(message.chat.id, 'render.env_edit', data=data)
+                return
+            diff = diff_env(self.render_manager.get_env_vars(service_id), sets, unsets)
+            warning = f"\n⚠️ Atlanan satırlar: {', '.join(map(str, errors))}" if errors else ""
+            if not has_changes(diff):
+                self.bot.reply_to(message, "✅ Değişiklik yok, env değişkenleri zaten güncel." + warning)
+                return
+            markup = types.InlineKeyboardMarkup(row_width=1)
+            markup.add(types.InlineKeyboardButton("✅ Uygula", callback_data="renv:apply"))
+            markup.add(types.InlineKeyboardButton("🚀 Uygula + Deploy", callback_data="renv:deploy"))
+            markup.add(types.InlineKeyboardButton("❌ İptal", callback_data="renv:cancel"))
+            self.bot.reply_to(message, f"⚙️ {service_id} için değişiklikler:\n\n{format_env_diff(diff)}{warning}", reply_markup=markup)
+            # Değerler bellekte kalır; konuşma deposuna (SQLite/Redis) sadece anahtar yazılır
+            token = self.render_manager.env_vars.stage(service_id, {**diff['added'], **diff['changed']}, diff['removed'])
+            self.conversations.ask(message.chat.id, 'render.env_confirm', data={'service_id': service_id, 'token': token})
+        except Exception as e:
+            self.bot.reply_to(message, f"❌ Env değişikliği hazırlanamadı: {str(e)}")
+
+    def handle_env_apply(self, call, action):
+        """Onaylanan env farkını tek istekte uygula; istenirse tek deploy başlat"""
+        chat_id, message_id = call.message.chat.id, call.message.message_id
+        record = self.conversations.get(chat_id)
+        if record is None or record[0] != 'render.env_confirm':
+            self.bot.edit_message_text("⌛ Bu değişikliğin süresi doldu, tekrar dene.", chat_id, message_id)
+            return
+        self.conversations.clear(chat_id)
+        staged = self.render_manager.env_vars.take(record[1]['token'])
+        if action == 'cancel':
+            self.bot.edit_message_text("❌ Env değişikliği iptal edildi.", chat_id, message_id)
+            return
+        if staged is None:
+            self.bot.edit_message_text("⌛ Bu değişikliğin süresi doldu, tekrar dene.", chat_id, message_id)
+            return
+        service_id, sets, unsets = staged
+        self.bot.edit_message_text("⏳ Env değişkenleri güncelleniyor...", chat_id, message_id)
+        result = self.render_manager.update_environment_variables(service_id, sets, unsets, deploy=action == 'deploy')
+        self.bot.edit_message_text(result, chat_id, message_id)
+
+    # KAYIT
+    def register(self, router):
+        """Render menüsü, callback'leri ve adımları"""
+        conversations = self.conversations
+        render_required = requires(lambda event: self.render_manager is not None, "❌ Render servisi devre dışı!")
+        router.button("🔄 Render Yönetimi", timed, render_required)(self.show_menu)
+
+        callbacks = {
+            "render_list_services": self.handle_list_services,
+            "render_service_details": self.handle_service_details,
+            "render_deploy": self.handle_deploy,
+            "render_deploys": self.handle_deploys,
+            "render_logs": self.handle_logs,
+            "render_restart": self.handle_restart,
+        }
+        for data, handler in callbacks.items():
+            router.callback(data, timed, render_required)(handler)
+        # Env değişkenleri gizli anahtar içerir (ADMIN_IDS dahil); sadece yönetici
+        admin_required = requires(self.is_admin, ADMIN_ONLY_TEXT)
+        router.callback("render_env_vars", timed, render_required, admin_required)(self.handle_env_vars)
+
+        conversations.on_state('render.service_details', self.process_service_details)
+        conversations.on_state('render.deploy', self.process_deploy)
+        conversations.on_state('render.deploys', self.process_deploys)
+        conversations.on_state('render.logs', self.process_logs)
+        conversations.on_state('render.restart', self.process_restart)
+        conversations.on_state('render.env_service', self.process_env_service)
+        conversations.on_state('render.env_edit', self.process_env_edit, pass_data=True)
+        # Onay beklerken gelen yeni metin aynı servis için yeni değişiklik sayılır
+        conversations.on_state('render.env_confirm', self.process_env_edit, pass_data=True)
+        router.callback_prefix("renv", timed, render_required, admin_required)(
+            lambda call, params: self.handle_env_apply(call, params[0]))
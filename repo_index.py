@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+import time
+import bisect
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+
+
+logger = logging.getLogger(__name__)
+
+# Bu süre içinde dal başı tekrar sorulmaz (dosya gezinirken her mesajda istek olmasın)
+HEAD_TTL = 30
+MAX_REPOS = 32
+
+
+class RepoIndex:
+    """Bir commit'teki tüm dosyaların sıralı, sıkıştırılmış listesi.
+
+    Yollar sıralı tuple'da, boyutlar paralel bir array'de tutulur; klasör
+    toplamları (iç içe tüm dosyalar dahil) bir kez hesaplanır. Önek araması
+    bisect, bulanık arama küçük harfli dosya adları üzerinden yapılır; hiçbiri
+    ağ isteği gerektirmez.
+    """
+
+    __slots__ = ('head', 'paths', 'sizes', 'names', 'dirs', 'truncated', 'built_at')
+
+    def __init__(self, head, entries, truncated=False):
+        entries = sorted(entries)
+        self.head = head
+        self.paths = tuple(path for path, _ in entries)
+        self.sizes = array('Q', (size for _, size in entries))
+        self.names = tuple(path.rsplit('/', 1)[-1].lower() for path in self.paths)
+        # klasör -> [toplam bayt, dosya sayısı]; '' kök klasör
+        self.dirs = {'': [0, 0]}
+        for path, size in entries:
+            parts = path.split('/')[:-1]
+            totals = self.dirs['']
+            totals[0] += size
+            totals[1] += 1
+            for depth in range(1, len(parts) + 1):
+                totals = self.dirs.setdefault('/'.join(parts[:depth]), [0, 0])
+                totals[0] += size
+                totals[1] += 1
+        self.truncated = truncated
+        self.built_at = time.time()
+
+    @property
+    def file_count(self):
+        return len(self.paths)
+
+    @property
+    def total_size(self):
+        return self.dirs[''][0]
+
+    def _range(self, prefix):
+        start = bisect.bisect_left(self.paths, prefix)
+        end = bisect.bisect_left(self.paths, prefix + '\U0010ffff', start)
+        return start, end
+
+    def prefix(self, prefix, limit=50):
+        """Yolu prefix ile başlayan dosyalar: [(yol, boyut)]"""
+        start, end = self._range(prefix)
+        return [(self.paths[i], self.sizes[i]) for i in range(start, min(end, start + limit))]
+
+    def list_dir(self, path=''):
+        """Tek klasör seviyesi: ([(alt klasör, bayt, dosya sayısı)], [(dosya adı, boyut)])"""
+        path = path.strip('/')
+        prefix = path + '/' if path else ''
+        start, end = self._range(prefix)
+        dirs, files = {}, []
+        for i in range(start, end):
+            rest = self.paths[i][len(prefix):]
+            if '/' in rest:
+                name = rest.split('/', 1)[0]
+                if name not in dirs:
+                    dirs[name] = self.dirs[prefix + name]
+            else:
+                files.append((rest, self.sizes[i]))
+        return [(name, total[0], total[1]) for name, total in dirs.items()], files
+
+    def dir_sizes(self, path='', limit=None):
+        """Alt klasörler, en büyük önce"""
+        dirs, _ = self.list_dir(path)
+        dirs.sort(key=lambda item: item[1], reverse=True)
+        return dirs[:limit] if limit else dirs
+
+    def search(self, query, limit=20):
+        """Dosya adında bulanık arama: harfler sırayla geçmeli; tam ve bitişik eşleşme öne çıkar"""
+        query = query.lower().strip()
+        if not query:
+            return []
+        scored = []
+        for i, name in enumerate(self.names):
+            score = _fuzzy_score(query, name)
+            if score is not None:
+                # Kısa yol (sığ dosya) eşit puanda önce gelir
+                scored.append((-score, len(self.paths[i]), i))
+        scored.sort()
+        return [(self.paths[i], self.sizes[i]) for _, _, i in scored[:limit]]
+
+
+def _fuzzy_score(query, name):
+    """query'nin harfleri name içinde sırayla geçiyorsa puan, geçmiyorsa None"""
+    position = name.find(query)
+    if position >= 0:
+        # Alt dize: baştan eşleşme ve tam ad en yüksek puanı alır
+        bonus = (500 if name == query else 0) + (200 if position == 0 else 0)
+        return 1000 + bonus - position * 2 - (len(name) - len(query))
+    score = 0
+    index = 0
+    previous = -2
+    for char in query:
+        index = name.find(char, index)
+        if index < 0:
+            return None
+        # Bitişik harfler ve kelime başları (., _, - sonrası) ödüllendirilir
+        if index == previous + 1:
+            score += 5
+        if index == 0 or name[index - 1] in '._- ':
+            score += 3
+        previous = index
+        index += 1
+    return score - (len(name) - len(query)) // 4
+
+
+class RepoIndexCache:
+    """Repo başına en son commit'in indeksi.
+
+    Dal başı SHA, ETag ile sorulur (değişmemişse 304 döner); SHA aynıysa
+    indeks olduğu gibi kullanılır, değiştiyse ağaç tek recursive istekle
+    yeniden çekilir. HEAD_TTL içinde dal başı hiç sorulmaz.
+    """
+
+    def __init__(self, api, ttl=HEAD_TTL, max_repos=MAX_REPOS):
+        self.api = api
+        self.ttl = ttl
+        self.max_repos = max_repos
+        # repo -> {'index', 'etag', 'checked'}
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._repo_locks = {}
+        self.stats = {'requests': 0, 'hits': 0, 'head_checks': 0, 'rebuilds': 0}
+
+    def _repo_lock(self, repo):
+        with self._lock:
+            return self._repo_locks.setdefault(repo, threading.Lock())
+
+    def get(self, repo, refresh=False):
+        """repo ('sahip/ad') için güncel RepoIndex; aynı repoya eşzamanlı istekler tek fetch yapar"""
+        self.stats['requests'] += 1
+        with self._repo_lock(repo):
+            entry = self.entries.get(repo)
+            now = time.monotonic()
+            if entry is not None and not refresh and now - entry['checked'] < self.ttl:
+                self.stats['hits'] += 1
+                self._touch(repo)
+                return entry['index']
+
+            head, etag = self._head(repo, entry['etag'] if entry and not refresh else None)
+            if head is None and entry is not None:
+                # 304: dal başı değişmedi
+                entry['checked'] = now
+                self.stats['hits'] += 1
+                self._touch(repo)
+                return entry['index']
+            if entry is not None and head == entry['index'].head:
+                entry.update(etag=etag, checked=now)
+                self.stats['hits'] += 1
+                self._touch(repo)
+                return entry['index']
+
+            index = self._build(repo, head)
+            with self._lock:
+                self.entries[repo] = {'index': index, 'etag': etag, 'checked': now}
+                while len(self.entries) > self.max_repos:
+                    self.entries.popitem(last=False)
+            return index
+
+    def _touch(self, repo):
+        with self._lock:
+            if repo in self.entries:
+                self.entries.move_to_end(repo)
+
+    def _head(self, repo, etag):
+        self.stats['head_checks'] += 1
+        return self.api.branch_head(repo, etag)
+
+    def _build(self, repo, head):
+        self.stats['rebuilds'] += 1
+        if not head:
+            return RepoIndex('', [])
+        response = self.api.request('GET', f"/repos/{repo}/git/trees/{head}", params={'recursive': 1})
+        data = self.api.check(response, "Ağaç okuma")
+        entries = [(item['path'], item.get('size', 0)) for item in data.get('tree', ()) if item.get('type') == 'blob']
+        index = RepoIndex(head, entries, data.get('truncated', False))
+        logger.info("🗂️ %s indekslendi: %s dosya (%s)", repo, index.file_count, head[:7])
+        return index
+
+    def invalidate(self, repo):
+        with self._lock:
+            self.entries.pop(repo, None)
+
+    def get_stats(self):
+        return dict(self.stats, repos=len(self.entries))
+
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+import os
+import base64
+import fnmatch
+import hashlib
+import logging
+import threading
+import requests
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_URL = "https://api.github.com"
+DEFAULT_BRANCH = "main"
+REQUEST_TIMEOUT = 30
+# GitHub blob sınırı 100 MB; bundan büyük dosyalar atlanır
+MAX_FILE_SIZE = 50 * 1024 * 1024
+SHA_MEDIA_TYPE = "application/vnd.github.sha"
+# Ağacı başka biri aynı anda değiştirirse fark yeniden hesaplanır
+MAX_ATTEMPTS = 3
+
+# Gizli anahtarlar, veritabanı ve üretilen dosyalar hiçbir zaman yüklenmez
+DEFAULT_IGNORES = (
+    '.git/', '__pycache__/', '*.py[cod]', '.env', '*.env', '*.db', '*.db-wal', '*.db-shm',
+    'venv/', '.venv/', 'node_modules/', 'logs/', '*.log', '.DS_Store', '.pytest_cache/',
+    'benchmarks/results/',
+)
+
+
+class GitHubAPIError(Exception):
+    pass
+
+
+class SyncError(GitHubAPIError):
+    pass
+
+
+def git_blob_sha(data):
+    """git hash-object ile aynı SHA: sha1('blob <boyut>\\0' + içerik)"""
+    digest = hashlib.sha1(b"blob %d\0" % len(data))
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class IgnoreRules:
+    """.gitignore sözdiziminin sık kullanılan alt kümesi.
+
+    - Sonu '/' olan desen sadece klasörlerle eşleşir (içindekiler de atlanır)
+    - '/' içeren desen köke göre, içermeyen her seviyede dosya/klasör adıyla eşleşir
+    - '!' ile başlayan desen önceki eşleşmeyi geri alır; son eşleşen kural geçerlidir
+    """
+
+    def __init__(self, patterns=()):
+        self.rules = []
+        for pattern in patterns:
+            self.add(pattern)
+
+    def add(self, pattern):
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith('#'):
+            return
+        negate = pattern.startswith('!')
+        if negate:
+            pattern = pattern[1:]
+        dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+        self.rules.append((pattern, negate, dir_only, anchored))
+
+    def add_file(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self.add(line)
+        except OSError:
+            pass
+
+    def ignored(self, rel_path, is_dir=False):
+        name = rel_path.rsplit('/', 1)[-1]
+        result = False
+        for pattern, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if fnmatch.fnmatchcase(rel_path if anchored else name, pattern):
+                result = not negate
+        return result
+
+    def ignored_path(self, rel_path):
+        """Dosyanın kendisi veya üst klasörlerinden biri hariç tutulmuş mu (uzak ağaç için)"""
+        parts = rel_path.split('/')
+        for depth in range(1, len(parts)):
+            if self.ignored('/'.join(parts[:depth]), is_dir=True):
+                return True
+        return self.ignored(rel_path)
+
+
+class GitHubAPI:
+    """Git Data API için ham REST istemcisi.
+
+    PyGithub commit/ağaç nesneleri için fazladan istek yaptığından, çağrı
+    sayısının önemli olduğu eşitleme ve indeksleme doğrudan bu istemciyi
+    kullanır. Reponun varsayılan dalı bir kez öğrenilip saklanır.
+    """
+
+    def __init__(self, token, api_url=None):
+        self.api_url = (api_url or os.getenv("GITHUB_API_URL", DEFAULT_API_URL)).rstrip('/')
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github+json",
+        })
+        # repo -> dal (tahmin tutmazsa varsayılan dal bir kez sorulur)
+        self.branches = {}
+
+    def request(self, method, path, **kwargs):
+        return self.session.request(method, f"{self.api_url}{path}", timeout=REQUEST_TIMEOUT, **kwargs)
+
+    def check(self, response, action, error=GitHubAPIError):
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get('message', '')
+            except ValueError:
+                detail = response.text[:200]
+            raise error(f"{action} başarısız ({response.status_code}): {detail}")
+        return response.json()
+
+    def default_branch(self, repo):
+        data = self.check(self.request('GET', f"/repos/{repo}"), "Repo bilgisi")
+        branch = self.branches[repo] = data.get('default_branch') or DEFAULT_BRANCH
+        return branch
+
+
+    def branch_head(self, repo, etag=None):
+        """Dal başı SHA'sı: (sha, etag); değişmediyse (None, etag); repo boşsa ('', None).
+
+        SHA medya tipi yalnızca 40 karakter döndürür; ETag ile sorulan ve
+        değişmemiş dal 304 alır (GitHub bunu istek kotasından düşmez).
+        """
+        branch = self.branches.get(repo) or DEFAULT_BRANCH
+        headers = {'Accept': SHA_MEDIA_TYPE}
+        if etag:
+            headers['If-None-Match'] = etag
+        response = self.request('GET', f"/repos/{repo}/commits/{branch}", headers=headers)
+        if response.status_code in (404, 422) and repo not in self.branches:
+            # Dal tahmini tutmadı; varsayılan dal bir kez öğrenilir
+            branch = self.default_branch(repo)
+            response = self.request('GET', f"/repos/{repo}/commits/{branch}", headers=headers)
+        if response.status_code == 304:
+            return None, etag
+        if response.status_code == 409:
+            return '', None
+        if response.status_code >= 400:
+            self.check(response, "Dal başı okuma")
+        self.branches.setdefault(repo, branch)
+        return response.text.strip(), response.headers.get('ETag')
+
+
+class RepoSync:
+    """Yerel klasörü GitHub reposuyla tek commit'te eşitler.
+
+    Yerel dosyaların git blob SHA'ları hesaplanır (değişmeyen dosyalar
+    mtime/boyut ile önbellekten), uzak taraf tek bir recursive ağaç isteğiyle
+    alınır. Fark yoksa işlem tek API çağrısıyla biter; varsa sadece eklenen,
+    değişen ve silinen dosyalar tek bir ağaç + commit + ref güncellemesiyle
+    gönderilir. UTF-8 metin dosyaları ağaç isteğinin içinde, diğerleri blob
+    olarak yüklenir.
+    """
+
+    def __init__(self, api):
+        self.api = api
+        # mutlak yol -> (mtime_ns, boyut, sha)
+        self._sha_cache = {}
+        self._lock = threading.Lock()
+        self.api_calls = 0
+
+    # YEREL TARAF
+    def build_ignore_rules(self, root, extra=()):
+        rules = IgnoreRules(DEFAULT_IGNORES)
+        rules.add_file(os.path.join(root, '.gitignore'))
+        for pattern in extra:
+            rules.add(pattern)
+        return rules
+
+    def local_files(self, root, rules):
+        """{yol: (sha, mod, mutlak yol)} ve atlanan büyük dosyalar"""
+        files = {}
+        skipped = []
+        for current, dirs, names in os.walk(root):
+            rel_dir = os.path.relpath(current, root).replace(os.sep, '/')
+            rel_dir = '' if rel_dir == '.' else rel_dir + '/'
+            dirs[:] = sorted(d for d in dirs if not self._skip(rules, rel_dir + d, os.path.join(current, d), True))
+            for name in names:
+                rel_path = rel_dir + name
+                full_path = os.path.join(current, name)
+                if self._skip(rules, rel_path, full_path, False):
+                    continue
+                stat = os.stat(full_path)
+                if stat.st_size > MAX_FILE_SIZE:
+                    skipped.append(rel_path)
+                    continue
+                mode = '100755' if stat.st_mode & 0o111 else '100644'
+                files[rel_path] = (self._file_sha(full_path, stat), mode, full_path)
+        return files, skipped
+
+    @staticmethod
+    def _skip(rules, rel_path, full_path, is_dir):
+        return os.path.islink(full_path) or rules.ignored(rel_path, is_dir)
+
+    def _file_sha(self, path, stat):
+        cached = self._sha_cache.get(path)
+        if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        with open(path, 'rb') as f:
+            sha = git_blob_sha(f.read())
+        self._sha_cache[path] = (stat.st_mtime_ns, stat.st_size, sha)
+        return sha
+
+    # GITHUB API
+    def _request(self, method, path, **kwargs):
+        self.api_calls += 1
+        return self.api.request(method, path, **kwargs)
+
+    def _check(self, response, action):
+        return self.api.check(response, action, SyncError)
+
+    def remote_tree(self, repo, branch):
+        """(ağaç sha, {yol: (sha, mod)}, eksik_mi); repo boşsa None. Tek istek."""
+        response = self._request('GET', f"/repos/{repo}/git/trees/{branch}", params={'recursive': 1})
+        if response.status_code == 409:
+            return None
+        if response.status_code == 404:
+            raise LookupError(branch)
+        data = self._check(response, "Ağaç okuma")
+        entries = {item['path']: (item['sha'], item['mode']) for item in data.get('tree', ())
+                   if item.get('type') == 'blob'}
+        return data['sha'], entries, data.get('truncated', False)
+
+    # EŞİTLEME
+    def sync(self, repo, root, branch=None, message=None, delete=True, extra_ignores=()):
+        """repo ('sahip/ad') içeriğini root klasörüyle eşitle; sonuç sözlüğü döndürür"""
+        if not os.path.isdir(root):
+            raise SyncError(f"Klasör bulunamadı: {root}")
+        with self._lock:
+            started_calls = self.api_calls
+            rules = self.build_ignore_rules(root, extra_ignores)
+            local, skipped = self.local_files(root, rules)
+            if not local:
+                raise SyncError("Yüklenecek dosya yok")
+            result = self._sync(repo, root, branch, message, delete, rules, local)
+            result['skipped'] = skipped
+            result['files'] = len(local)
+            result['api_calls'] = self.api_calls - started_calls
+            return result
+
+    def _sync(self, repo, root, branch, message, delete, rules, local):
+        branch = branch or self.api.branches.get(repo) or os.getenv("GITHUB_SYNC_BRANCH", DEFAULT_BRANCH)
+        initialized = None
+        for _ in range(MAX_ATTEMPTS):
+            try:
+                remote = self.remote_tree(repo, branch)
+            except LookupError:
+                # Dal tahmini tutmadı (örn. master); gerçek varsayılan dal bir kez sorulur
+                self.api_calls += 1
+                actual = self.api.default_branch(repo)
+                if actual == branch:
+                    raise SyncError(f"'{branch}' dalı bulunamadı")
+                branch = actual
+                remote = self.remote_tree(repo, branch)
+            self.api.branches[repo] = branch
+
+            if remote is None:
+                # Boş repoda Git Data API çalışmaz; ilk dosya contents API ile yazılıp repo başlatılır
+                initialized = self._initialize(repo, branch, local)
+                continue
+
+            tree_sha, entries, truncated = remote
+            added = sorted(path for path in local if path not in entries)
+            changed = sorted(path for path in local if path in entries
+                             and entries[path] != (local[path][0], local[path][1]))
+            deleted = []
+            # Ağaç eksik geldiyse neyin silineceği bilinemez
+            if delete and not truncated:
+                deleted = sorted(path for path in entries if path not in local and not rules.ignored_path(path))
+            result = {'added': added, 'changed': changed, 'deleted': deleted, 'branch': branch,
+                      'commit': None, 'truncated': truncated}
+            if initialized:
+                path, result['commit'] = initialized
+                result['added'] = sorted(set(added) | {path})
+            if not (added or changed or deleted):
+                return result
+
+            parent = self._check(self._request('GET', f"/repos/{repo}/git/ref/heads/{branch}"), "Ref okuma")['object']['sha']
+            commit = self._check(self._request('GET', f"/repos/{repo}/git/commits/{parent}"), "Commit okuma")
+            if commit['tree']['sha'] != tree_sha:
+                # Fark hesaplanırken dal ilerledi; güncel ağaçla tekrar dene
+                continue
+
+            tree = [self._tree_entry(repo, path, local[path]) for path in added + changed]
+            tree.extend({'path': path, 'mode': entries[path][1], 'type': 'blob', 'sha': None} for path in deleted)
+            new_tree = self._check(self._request('POST', f"/repos/{repo}/git/trees",
+                                                 json={'base_tree': tree_sha, 'tree': tree}), "Ağaç oluşturma")
+            message = message or self._commit_message(added, changed, deleted)
+            new_commit = self._check(self._request('POST', f"/repos/{repo}/git/commits", json={
+                'message': message, 'tree': new_tree['sha'], 'parents': [parent],
+            }), "Commit oluşturma")
+            # force yok: arada başka bir push olduysa güncelleme reddedilir
+            self._check(self._request('PATCH', f"/repos/{repo}/git/refs/heads/{branch}",
+                                      json={'sha': new_commit['sha']}), "Ref güncelleme")
+            result['commit'] = new_commit['sha']
+            logger.info("🔄 %s eşitlendi: +%s ~%s -%s (%s)", repo, len(result['added']), len(changed),
+                        len(deleted), new_commit['sha'][:7])
+            return result
+        raise SyncError("Repo eşitleme sırasında sürekli değişti, daha sonra tekrar deneyin")
+
+    def rollback(self, repo, target, branch=None, message=None):
+        """Dalın ucuna, ağacı target commit'inin ağacı olan yeni bir commit ekle.
+
+        Geçmiş yeniden yazılmaz (force push yok); dosya başına iş de yoktur:
+        hedefin ağacı bir istekle okunur, ardından tek commit ve tek ref
+        güncellemesi yapılır. target kısa SHA olabilir. Dal zaten hedefteyse
+        commit oluşturulmaz ('commit' None döner).
+        """
+        with self._lock:
+            started_calls = self.api_calls
+            branch = branch or self.api.branches.get(repo) or os.getenv("GITHUB_SYNC_BRANCH", DEFAULT_BRANCH)
+            data = self._check(self._request('GET', f"/repos/{repo}/commits/{target}"), "Hedef commit okuma")
+            target_sha, tree_sha = data['sha'], data['commit']['tree']['sha']
+            title = (data['commit'].get('message') or '').split('\n', 1)[0]
+            message = message or f"Rollback to {target_sha[:7]}: {title}".rstrip(': ')
+            for _ in range(MAX_ATTEMPTS):
+                response = self._request('GET', f"/repos/{repo}/git/ref/heads/{branch}")
+                if response.status_code == 404 and repo not in self.api.branches:
+                    self.api_calls += 1
+                    branch = self.api.default_branch(repo)
+                    response = self._request('GET', f"/repos/{repo}/git/ref/heads/{branch}")
+                parent = self._check(response, "Ref okuma")['object']['sha']
+                self.api.branches[repo] = branch
+                result = {'branch': branch, 'target': target_sha, 'parent': parent, 'commit': None,
+                          'api_calls': self.api_calls - started_calls}
+                if parent == target_sha:
+                    return result
+                new_commit = self._check(self._request('POST', f"/repos/{repo}/git/commits", json={
+                    'message': message, 'tree': tree_sha, 'parents': [parent],
+                }), "Commit oluşturma")
+                response = self._request('PATCH', f"/repos/{repo}/git/refs/heads/{branch}",
+                                         json={'sha': new_commit['sha']})
+                if response.status_code == 422:
+                    # Arada başka bir push geldi; yeni uçla tekrar dene (ağaç aynı kalır)
+                    continue
+                self._check(response, "Ref güncelleme")
+                result.update(commit=new_commit['sha'], api_calls=self.api_calls - started_calls)
+                logger.info("⏪ %s %s dalı %s ağacına döndürüldü (%s)", repo, branch, target_sha[:7],
+                            new_commit['sha'][:7])
+                return result
+            raise SyncError("Dal geri alma sırasında sürekli değişti, daha sonra tekrar deneyin")
+
+    def _tree_entry(self, repo, path, local_entry):
+        sha, mode, full_path = local_entry
+        with open(full_path, 'rb') as f:
+            data = f.read()
+        try:
+            return {'path': path, 'mode': mode, 'type': 'blob', 'content': data.decode('utf-8')}
+        except UnicodeDecodeError:
+            blob = self._check(self._request('POST', f"/repos/{repo}/git/blobs", json={
+                'content': base64.b64encode(data).decode('ascii'), 'encoding': 'base64',
+            }), "Blob yükleme")
+            return {'path': path, 'mode': mode, 'type': 'blob', 'sha': blob['sha']}
+
+    def _initialize(self, repo, branch, local):
+        """Boş repoya ilk dosyayı yaz (README tercih edilir); (yol, commit sha) döndürür"""
+        path = 'README.md' if 'README.md' in local else sorted(local)[0]
+        with open(local[path][2], 'rb') as f:
+            content = base64.b64encode(f.read()).decode('ascii')
+        data = self._check(self._request('PUT', f"/repos/{repo}/contents/{path}", json={
+            'message': f"Add {path}", 'content': content, 'branch': branch,
+        }), "İlk dosya yükleme")
+        return path, data['commit']['sha']
+
+    @staticmethod
+    def _commit_message(added, changed, deleted):
+        parts = [f"{label} {len(paths)}" for label, paths in (('add', added), ('update', changed), ('delete', deleted)) if paths]
+        paths = added + changed + deleted
+        if len(paths) == 1:
+            return f"Sync: {'add' if added else 'update' if changed else 'delete'} {paths[0]}"
+        return "Sync: " + ", ".join(parts)
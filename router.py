@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+import re
+import time
+import logging
+import threading
+from functools import reduce
+from send_queue import TokenBucket
+from metrics import ROUTE_LATENCY
+
+logger = logging.getLogger(__name__)
+
+# Parametreli callback verileri 'önek:param1:param2' biçimindedir
+CALLBACK_SEPARATOR = ':'
+MAX_RATE_BUCKETS = 10000
+ADMIN_ONLY_TEXT = "❌ Bu işlem sadece yöneticiler içindir."
+
+
+class Route:
+    __slots__ = ('router', 'name', 'handler', 'chain', 'stats')
+
+    def __init__(self, router, name, handler, middleware):
+        self.router = router
+        self.name = name
+        self.handler = handler
+        # Middleware zinciri kayıt anında bir kez kurulur, dispatch sırasında değil
+        self.chain = reduce(lambda inner, mw: _wrap(mw, inner, self), reversed(middleware), handler)
+        self.stats = [0, 0.0, 0.0]  # çağrı sayısı, toplam süre, en uzun süre
+
+
+def _wrap(middleware, inner, route):
+    def call(event, *args):
+        return middleware(event, lambda: inner(event, *args), route)
+    return call
+
+
+class Router:
+    """Buton metinleri ve callback verileri için tablo tabanlı yönlendirici.
+
+    Buton metinleri ve sabit callback verileri sözlükten tek adımda bulunur.
+    'notesearch:2:sorgu' gibi parametreli callback'ler ilk ':' öncesindeki
+    önek ile yine sözlükten bulunur; sadece bunlara uymayanlar için regex
+    route'ları sırayla denenir. Her route kendi middleware listesine
+    sahiptir (yetki, hız sınırı, süre ölçümü).
+    """
+
+    def __init__(self, reply=None):
+        # Middleware'lerin kullanıcıya yanıt vermesi için: reply(event, text)
+        self.reply_func = reply
+        self.buttons = {}
+        self.text_patterns = []
+        self.callbacks = {}
+        self.callback_prefixes = {}
+        self.callback_patterns = []
+
+    # KAYIT
+    def button(self, text, *middleware):
+        """Ana menü butonu (mesaj metni tam eşleşme)"""
+        def decorator(handler):
+            self.buttons[text] = Route(self, text, handler, middleware)
+            return handler
+        return decorator
+
+    def text_regex(self, pattern, *middleware):
+        """Regex ile eşleşen serbest metin; handler (message, match) alır"""
+        def decorator(handler):
+            self.text_patterns.append((re.compile(pattern), Route(self, pattern, handler, middleware)))
+            return handler
+        return decorator
+
+    def callback(self, data, *middleware):
+        """Sabit callback verisi (tam eşleşme)"""
+        def decorator(handler):
+            self.callbacks[data] = Route(self, data, handler, middleware)
+            return handler
+        return decorator
+
+    def callback_prefix(self, prefix, *middleware):
+        """'önek:...' biçimindeki callback'ler; handler (call, params) alır"""
+        def decorator(handler):
+            self.callback_prefixes[prefix] = Route(self, prefix, handler, middleware)
+            return handler
+        return decorator
+
+    def callback_regex(self, pattern, *middleware):
+        """Regex ile eşleşen callback verisi; handler (call, match) alır"""
+        def decorator(handler):
+            self.callback_patterns.append((re.compile(pattern), Route(self, pattern, handler, middleware)))
+            return handler
+        return decorator
+
+    def include(self, registrar, *args, **kwargs):
+        """Bir özellik modülünün route'larını kaydet: registrar(router, ...)"""
+        registrar(self, *args, **kwargs)
+        return self
+
+    # DISPATCH
+    def is_button(self, text):
+        return text in self.buttons
+
+    def dispatch_message(self, message):
+        """Mesajı uygun route'a ilet; route bulunamazsa False"""
+        text = message.text
+        route = self.buttons.get(text)
+        if route is not None:
+            route.chain(message)
+            return True
+        if text:
+            for pattern, route in self.text_patterns:
+                match = pattern.match(text)
+                if match:
+                    route.chain(message, match)
+                    return True
+        return False
+
+    def dispatch_callback(self, call):
+        """Callback verisini uygun route'a ilet; route bulunamazsa False"""
+        data = call.data or ''
+        route = self.callbacks.get(data)
+        if route is not None:
+            route.chain(call)
+            return True
+        prefix, sep, rest = data.partition(CALLBACK_SEPARATOR)
+        if sep:
+            route = self.callback_prefixes.get(prefix)
+            if route is not None:
+                route.chain(call, rest.split(CALLBACK_SEPARATOR))
+                return True
+        for pattern, route in self.callback_patterns:
+            match = pattern.match(data)
+            if match:
+                route.chain(call, match)
+                return True
+        return False
+
+    def reply(self, event, text):
+        if self.reply_func is None:
+            return
+        try:
+            self.reply_func(event, text)
+        except Exception as e:
+            logger.error("Router yanıt hatası: %s", e)
+
+    def get_stats(self):
+        """Süre ölçümü yapılan route'ların istatistikleri (en çok çağrılan önce)"""
+        routes = list(self.buttons.values()) + list(self.callbacks.values()) + list(self.callback_prefixes.values())
+        routes += [route for _, route in self.text_patterns + self.callback_patterns]
+        stats = [
+            {'name': route.name, 'calls': route.stats[0],
+             'avg_ms': route.stats[1] / route.stats[0] * 1000 if route.stats[0] else 0.0,
+             'max_ms': route.stats[2] * 1000}
+            for route in routes if route.stats[0]
+        ]
+        return sorted(stats, key=lambda item: item['calls'], reverse=True)
+
+
+# MIDDLEWARE
+# Her middleware (event, next_handler, route) alır; next_handler() çağrılmazsa route çalışmaz.
+
+def timed(event, next_handler, route):
+    """Route çalışma süresini ölç (route istatistikleri ve gecikme histogramı)"""
+    started = time.perf_counter()
+    try:
+        return next_handler()
+    finally:
+        elapsed = time.perf_counter() - started
+        stats = route.stats
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+        ROUTE_LATENCY.observe(elapsed, route.name)
+
+
+def requires(check, denial_text):
+    """check(event) False ise route çalışmaz ve kullanıcıya denial_text gönderilir (servis/yetki kontrolü)"""
+    def middleware(event, next_handler, route):
+        if check(event):
+            return next_handler()
+        route.router.reply(event, denial_text)
+    return middleware
+
+
+def rate_limit(rate, burst, text="⏳ Çok hızlısın reis, biraz yavaşla."):
+    """Kullanıcı başına token bucket hız sınırı"""
+    buckets = {}
+    lock = threading.Lock()
+
+    def middleware(event, next_handler, route):
+        user_id = event.from_user.id
+        now = time.monotonic()
+        with lock:
+            bucket = buckets.get(user_id)
+            if bucket is None:
+                if len(buckets) >= MAX_RATE_BUCKETS:
+                    # Dolu kovalar bilgi taşımaz; tablo sınırsız büyümesin
+                    for key in [key for key, b in buckets.items() if b.is_full(now)]:
+                        del buckets[key]
+                bucket = buckets[user_id] = TokenBucket(rate, burst)
+            allowed = bucket.delay(now) == 0
+            if allowed:
+                bucket.take(now)
+        if allowed:
+            return next_handler()
+        route.router.reply(event, text)
+    return middleware
+
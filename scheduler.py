@@ -0,0 +1,319 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import heapq
+import random
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Hızlı işler (hatırlatıcı, alarm) ile yavaş işler (yedekleme) ayrı havuzlarda çalışır
+POOL_SIZES = {
+    'default': 4,
+    'slow': 2
+}
+DEFAULT_MISFIRE_GRACE = 60
+
+
+class Job:
+    __slots__ = ('name', 'func', 'interval', 'at', 'jitter', 'misfire_grace', 'pool',
+                 'next_run', 'version', 'running', 'stats')
+
+    def __init__(self, name, func, interval=None, at=None, jitter=0, misfire_grace=DEFAULT_MISFIRE_GRACE, pool='default'):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.at = at
+        self.jitter = jitter
+        self.misfire_grace = misfire_grace
+        self.pool = pool
+        self.next_run = None
+        self.version = 0
+        self.running = False
+        self.stats = {
+            'runs': 0,
+            'failures': 0,
+            'misfires': 0,
+            'skipped': 0,
+            'total_runtime': 0.0,
+            'max_runtime': 0.0,
+            'last_runtime': 0.0,
+            'last_run': None,
+            'last_status': None
+        }
+
+    @property
+    def schedule(self):
+        """Zamanlama parmak izi; koddaki aralık/saat/jitter değişirse kayıtlı next_run geçersizdir"""
+        return f"interval={self.interval};at={self.at};jitter={self.jitter}"
+
+    def compute_next_run(self, now):
+        """Bir sonraki çalışma zamanını (epoch) hesapla"""
+        if self.at:
+            hour, minute = (int(x) for x in self.at.split(':'))
+            current = datetime.fromtimestamp(now)
+            target = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
+            if target.timestamp() <= now:
+                target += timedelta(days=1)
+            next_run = target.timestamp()
+        else:
+            next_run = now + self.interval
+        if self.jitter:
+            next_run += random.uniform(0, self.jitter)
+        return next_run
+
+
+class BotScheduler:
+    def __init__(self, bot, github_manager, render_manager, db_path="scheduler.db", admin_ids=()):
+        self.bot = bot
+        self.github_manager = github_manager
+        self.render_manager = render_manager
+        self.admin_ids = set(admin_ids)
+        self.jobs = {}
+        self.heap = []
+        self.counter = 0
+        self.cond = threading.Condition()
+        self.running = False
+        self._thread = None
+        self.executors = {}
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.db_lock = threading.Lock()
+        self._init_db()
+
+    def _init_db(self):
+        """İş durum tablosunu oluştur"""
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS scheduler_jobs (
+                    name TEXT PRIMARY KEY,
+                    next_run REAL,
+                    last_run REAL,
+                    last_status TEXT,
+                    runs INTEGER NOT NULL DEFAULT 0,
+                    failures INTEGER NOT NULL DEFAULT 0,
+                    misfires INTEGER NOT NULL DEFAULT 0,
+                    total_runtime REAL NOT NULL DEFAULT 0,
+                    max_runtime REAL NOT NULL DEFAULT 0,
+                    last_runtime REAL NOT NULL DEFAULT 0
+                )
+            """)
+            columns = {row['name'] for row in self.conn.execute("PRAGMA table_info(scheduler_jobs)")}
+            if 'schedule' not in columns:
+                self.conn.execute("ALTER TABLE scheduler_jobs ADD COLUMN schedule TEXT")
+
+    def _load_state(self, job):
+        with self.db_lock:
+            row = self.conn.execute("SELECT * FROM scheduler_jobs WHERE name = ?", (job.name,)).fetchone()
+        if not row:
+            return None
+        for key in ('runs', 'failures', 'misfires', 'total_runtime', 'max_runtime', 'last_runtime'):
+            job.stats[key] = row[key]
+        job.stats['last_run'] = row['last_run']
+        job.stats['last_status'] = row['last_status']
+        if row['schedule'] != job.schedule:
+            # Zamanlama kodda değişmiş; eski plana göre hesaplanan zaman kullanılmaz
+            logger.info("%s zamanlaması değişti, sonraki çalışma yeniden hesaplanıyor", job.name)
+            return None
+        return row['next_run']
+
+    def _save_state(self, job):
+        stats = job.stats
+        with self.db_lock:
+            with self.conn:
+                self.conn.execute("""
+                    INSERT INTO scheduler_jobs (name, next_run, schedule, last_run, last_status, runs, failures,
+                                                misfires, total_runtime, max_runtime, last_runtime)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(name) DO UPDATE SET
+                        next_run = excluded.next_run,
+                        schedule = excluded.schedule,
+                        last_run = excluded.last_run,
+                        last_status = excluded.last_status,
+                        runs = excluded.runs,
+                        failures = excluded.failures,
+                        misfires = excluded.misfires,
+                        total_runtime = excluded.total_runtime,
+                        max_runtime = excluded.max_runtime,
+                        last_runtime = excluded.last_runtime
+                """, (job.name, job.next_run, job.schedule, stats['last_run'], stats['last_status'], stats['runs'],
+                      stats['failures'], stats['misfires'], stats['total_runtime'], stats['max_runtime'],
+                      stats['last_runtime']))
+
+    def add_job(self, name, func, interval=None, at=None, jitter=0, misfire_grace=DEFAULT_MISFIRE_GRACE, pool='default'):
+        """Periyodik (interval sn) veya günlük (at='HH:MM') iş ekle"""
+        if not interval and not at:
+            raise ValueError("interval veya at belirtilmeli")
+        job = Job(name, func, interval, at, jitter, misfire_grace, pool)
+        persisted_next = self._load_state(job)
+        # Kayıtlı zaman varsa (ve zamanlama aynıysa) yeniden başlatma sonrası ondan devam edilir
+        # (misfire kontrolü döngüde)
+        job.next_run = persisted_next or job.compute_next_run(time.time())
+
+        with self.cond:
+            old = self.jobs.get(name)
+            if old:
+                job.version = old.version + 1
+            self.jobs[name] = job
+            self._push(job)
+            self.cond.notify()
+        self._save_state(job)
+        return job
+
+    def remove_job(self, name):
+        """İşi kaldır (heap'teki eski kayıt versiyon kontrolüyle yok sayılır)"""
+        with self.cond:
+            job = self.jobs.pop(name, None)
+            self.cond.notify()
+        if job:
+            with self.db_lock:
+                with self.conn:
+                    self.conn.execute("DELETE FROM scheduler_jobs WHERE name = ?", (name,))
+        return job is not None
+
+    def run_job_now(self, name):
+        """İşi hemen çalıştır"""
+        with self.cond:
+            job = self.jobs.get(name)
+            if not job:
+                return False
+            job.version += 1
+            job.next_run = time.time()
+            self._push(job)
+            self.cond.notify()
+        return True
+
+    def _push(self, job):
+        self.counter += 1
+        heapq.heappush(self.heap, (job.next_run, self.counter, job.name, job.version))
+
+    def setup_default_jobs(self):
+        """Varsayılan cron işlerini kaydet"""
+        if self.github_manager:
+            self.add_job('github_backup', self.backup_bot_to_github, at=os.getenv("BACKUP_TIME", "03:00"),
+                         jitter=300, misfire_grace=6 * 3600, pool='slow')
+        if self.render_manager:
+            self.add_job('render_health', self.check_render_health, interval=600, jitter=30)
+        logger.info("%s zamanlanmış iş kayıtlı", len(self.jobs))
+
+    def backup_bot_to_github(self):
+        """Bot dosyalarını GitHub'a yedekle"""
+        result = self.github_manager.upload_current_bot(os.getenv("BACKUP_REPO", "ReisBot_Premium"))
+        logger.info("GitHub yedekleme sonucu: %s", result)
+        return result
+
+    def check_render_health(self):
+        """Render servislerinin durumunu kontrol et, sorun varsa yöneticilere bildir"""
+        services = self.render_manager.get_services()
+        problems = [s for s in services if s['status'] not in ('active', 'not_suspended', 'unknown')]
+        if problems and self.admin_ids:
+            text = "⚠️ *Render Servis Uyarısı*\n\n" + "\n".join(f"❌ {s['name']}: {s['status']}" for s in problems)
+            for admin_id in self.admin_ids:
+                try:
+                    self.bot.send_message(admin_id, text, parse_mode='Markdown')
+                except Exception as e:
+                    logger.error("Render uyarı bildirimi hatası: %s", e)
+        return len(problems)
+
+    def start_scheduler(self):
+        """Zamanlayıcı thread'ini ve işçi havuzlarını başlat"""
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+            self.executors = {
+                pool: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"job-{pool}")
+                for pool, size in POOL_SIZES.items()
+            }
+        self._thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop_scheduler(self):
+        """Zamanlayıcıyı durdur"""
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        for executor in self.executors.values():
+            executor.shutdown(wait=False)
+        logger.info("⏰ Scheduler durduruldu")
+
+    def _loop(self):
+        """Heap'in tepesindeki işin zamanına kadar uyur; boşta CPU harcamaz"""
+        while True:
+            with self.cond:
+                if not self.running:
+                    return
+                if not self.heap:
+                    self.cond.wait()
+                    continue
+                next_run, _, name, version = self.heap[0]
+                delay = next_run - time.time()
+                if delay > 0:
+                    self.cond.wait(timeout=delay)
+                    continue
+                heapq.heappop(self.heap)
+                job = self.jobs.get(name)
+                if not job or job.version != version:
+                    continue
+                self._dispatch(job, next_run)
+
+    def _dispatch(self, job, scheduled_time):
+        """Zamanı gelen işi havuza ver ve bir sonraki çalışmayı planla (cond kilidi altında)"""
+        now = time.time()
+        lateness = now - scheduled_time
+        if job.misfire_grace is not None and lateness > job.misfire_grace:
+            # Kaçırılan çalışmalar tek tek telafi edilmez, bir sonraki zamana atlanır
+            job.stats['misfires'] += 1
+            logger.warning("⏰ %s işi %s sn gecikti, atlandı (misfire)", job.name, int(lateness))
+        elif job.running:
+            job.stats['skipped'] += 1
+            logger.warning("⏰ %s hâlâ çalışıyor, bu tur atlandı", job.name)
+        else:
+            job.running = True
+            executor = self.executors.get(job.pool) or self.executors['default']
+            executor.submit(self._execute, job)
+
+        job.next_run = job.compute_next_run(now)
+        self._push(job)
+        self._save_state(job)
+
+    def _execute(self, job):
+        started = time.perf_counter()
+        status = 'ok'
+        try:
+            job.func()
+        except Exception as e:
+            status = 'error'
+            logger.error("⏰ %s iş hatası: %s", job.name, e)
+        runtime = time.perf_counter() - started
+
+        with self.cond:
+            stats = job.stats
+            stats['runs'] += 1
+            if status != 'ok':
+                stats['failures'] += 1
+            stats['total_runtime'] += runtime
+            stats['max_runtime'] = max(stats['max_runtime'], runtime)
+            stats['last_runtime'] = runtime
+            stats['last_run'] = time.time()
+            stats['last_status'] = status
+            job.running = False
+        self._save_state(job)
+
+    def get_job_stats(self):
+        """İş başına çalışma süresi istatistiklerini döndür"""
+        with self.cond:
+            result = []
+            for job in self.jobs.values():
+                stats = dict(job.stats)
+                stats['name'] = job.name
+                stats['next_run'] = job.next_run
+                stats['running'] = job.running
+                stats['avg_runtime'] = stats['total_runtime'] / stats['runs'] if stats['runs'] else 0.0
+                result.append(stats)
+        return sorted(result, key=lambda s: s['next_run'] or 0)
@@ -0,0 +1,384 @@
+# -*- coding: utf-8 -*-
+import time
+import logging
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Öncelik şeritleri: küçük sayı önce gönderilir
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+PRIORITY_NAMES = ('interactive', 'normal', 'bulk')
+
+# Telegram limitleri: global ~30 mesaj/sn, sohbet başına ~1 mesaj/sn
+GLOBAL_RATE = 30
+PER_CHAT_RATE = 1
+PER_CHAT_BURST = 3
+
+MESSAGE_LIMIT = 4096
+MERGE_MAX_LENGTH = 1000
+MAX_RETRIES = 5
+
+# Kuyruk çalışmıyorken toplu gönderimler arası bekleme (~25 mesaj/sn)
+BULK_FALLBACK_DELAY = 1.0 / 25
+
+# Bot üzerinde kuyruktan geçirilecek metotlar
+QUEUED_METHODS = ('send_message', 'send_photo', 'send_audio', 'send_document', 'edit_message_text')
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now):
+        """Bir token için beklenmesi gereken süre (0 ise hemen alınabilir)"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now):
+        self._refill(now)
+        self.tokens -= 1
+
+    def drain(self, now):
+        self._refill(now)
+        self.tokens = min(self.tokens, 0.0)
+
+    def is_full(self, now):
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class QueueStoppedError(Exception):
+    """Kuyruk durdurulduğunda gönderilemeden kalan işlerin hatası"""
+
+
+class OutboundJob:
+    __slots__ = ('method', 'chat_id', 'args', 'kwargs', 'priority', 'futures', 'created', 'attempts')
+
+    def __init__(self, method, chat_id, args, kwargs, priority):
+        self.method = method
+        self.chat_id = chat_id
+        self.args = list(args)
+        self.kwargs = kwargs
+        self.priority = priority
+        self.futures = [Future()]
+        self.created = time.monotonic()
+        self.attempts = 0
+
+    @property
+    def plain(self):
+        """Markup veya yanıt referansı olmayan düz send_message çağrısı mı"""
+        if self.method != 'send_message' or len(self.args) != 2:
+            return False
+        if set(self.kwargs) - {'parse_mode', 'disable_notification'}:
+            return False
+        return isinstance(self.args[1], str)
+
+    @property
+    def mergeable(self):
+        """Sade ve kısa send_message çağrıları birleştirilebilir"""
+        return self.plain and len(self.args[1]) <= MERGE_MAX_LENGTH
+
+    def try_merge(self, other):
+        """Aynı sohbete giden ardışık kısa mesajı bu işe ekle"""
+        if not self.plain or not other.mergeable:
+            return False
+        if self.kwargs != other.kwargs:
+            return False
+        text = f"{self.args[1]}\n\n{other.args[1]}"
+        if len(text) > MESSAGE_LIMIT:
+            return False
+        self.args[1] = text
+        self.futures.extend(other.futures)
+        return True
+
+
+class SendQueue:
+    def __init__(self, bot, global_rate=GLOBAL_RATE, per_chat_rate=PER_CHAT_RATE,
+                 per_chat_burst=PER_CHAT_BURST, workers=8):
+        self.bot = bot
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_buckets = {}
+        self.blocked_until = {}
+        self.inflight = set()
+        self.lanes = [OrderedDict() for _ in PRIORITY_NAMES]
+        self.cond = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="send-worker")
+        self.originals = {name: getattr(bot, name) for name in QUEUED_METHODS}
+        self.running = False
+        self._dispatcher = None
+
+        self.stats = {
+            'enqueued': 0,
+            'sent': 0,
+            'failed': 0,
+            'merged': 0,
+            'retried': 0
+        }
+        self.sent_times = deque(maxlen=10000)
+        self.total_wait = 0.0
+
+    def install(self):
+        """bot.send_message ve benzerlerini kuyruk üzerinden çalışacak şekilde sar.
+
+        Handler'lar aynı API'yi kullanmaya devam eder; çağrı interaktif
+        öncelikle kuyruğa girer ve sonucu beklenir.
+        """
+        for name in QUEUED_METHODS:
+            setattr(self.bot, name, self._make_blocking(name))
+
+    def _make_blocking(self, method):
+        def wrapper(*args, **kwargs):
+            chat_id = self._extract_chat_id(method, args, kwargs)
+            if chat_id is None or not self.running:
+                return self.originals[method](*args, **kwargs)
+            future = self.submit(method, chat_id, *args, priority=PRIORITY_INTERACTIVE, **kwargs)
+            return future.result()
+        wrapper.__name__ = method
+        return wrapper
+
+    @staticmethod
+    def _extract_chat_id(method, args, kwargs):
+        if method == 'edit_message_text':
+            return args[1] if len(args) > 1 else kwargs.get('chat_id')
+        return args[0] if args else kwargs.get('chat_id')
+
+    def start(self):
+        """Gönderim dağıtıcısını başlat"""
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="send-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def stop(self, timeout=10):
+        """Bekleyen mesajları gönderip kuyruğu durdur.
+
+        Süre dolduğunda kuyrukta kalan işlerin Future'ları QueueStoppedError
+        ile sonuçlanır; sonucu bekleyen handler'lar ve toplu gönderimler
+        kapanışta asılı kalmaz.
+        """
+        deadline = time.monotonic() + timeout
+        while self.pending_count() and time.monotonic() < deadline:
+            time.sleep(0.1)
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        # Dağıtıcı son seçtiği işi havuza vermeden havuz kapanmasın
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=5)
+        # Çalışan gönderimler bitsin; 429 sonrası geri konan işler de aşağıda boşaltılır
+        self.executor.shutdown(wait=True)
+        with self.cond:
+            dropped = [job for lane in self.lanes for queue in lane.values() for job in queue]
+            for lane in self.lanes:
+                lane.clear()
+            self.stats['failed'] += len(dropped)
+        if dropped:
+            logger.warning("Gönderim kuyruğu durduruldu, %s iş gönderilemedi", len(dropped))
+        error = QueueStoppedError("Gönderim kuyruğu durduruldu")
+        for job in dropped:
+            for future in job.futures:
+                future.set_exception(error)
+
+    def submit(self, method, chat_id, *args, priority=PRIORITY_NORMAL, **kwargs):
+        """Bir bot çağrısını kuyruğa ekle ve Future döndür"""
+        job = OutboundJob(method, chat_id, args, kwargs, priority)
+        with self.cond:
+            if not self.running and self._dispatcher is not None:
+                # Durdurulmuş kuyruğa giren iş hiç gönderilmez; bekleyen taraf asılı kalmasın
+                job.futures[0].set_exception(QueueStoppedError("Gönderim kuyruğu durduruldu"))
+                return job.futures[0]
+            lane = self.lanes[priority]
+            queue = lane.get(chat_id)
+            if queue is None:
+                queue = lane[chat_id] = deque()
+            # Sıradaki son mesajla birleştirilebiliyorsa ayrı gönderim yapma
+            if queue and queue[-1].try_merge(job):
+                self.stats['merged'] += 1
+            else:
+                queue.append(job)
+            self.stats['enqueued'] += 1
+            self.cond.notify()
+        return job.futures[0]
+
+    def send_message(self, chat_id, text, priority=PRIORITY_NORMAL, **kwargs):
+        """Kuyruk üzerinden mesaj gönder (Future döner)"""
+        return self.submit('send_message', chat_id, chat_id, text, priority=priority, **kwargs)
+
+    def pending_count(self, priority=None):
+        """Kuyrukta bekleyen iş sayısı"""
+        with self.cond:
+            lanes = self.lanes if priority is None else [self.lanes[priority]]
+            return sum(len(queue) for lane in lanes for queue in lane.values()) + len(self.inflight)
+
+    def _chat_bucket(self, chat_id):
+        bucket = self.chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self.chat_buckets[chat_id] = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+        return bucket
+
+    def _next_job(self, now):
+        """Gönderilebilecek bir sonraki işi seç; yoksa bekleme süresini döndür"""
+        wait = self.global_bucket.delay(now)
+        if wait > 0:
+            return None, wait
+
+        wait = None
+        for lane in self.lanes:
+            for chat_id in list(lane):
+                if chat_id in self.inflight:
+                    continue
+                blocked = self.blocked_until.get(chat_id, 0) - now
+                if blocked > 0:
+                    wait = blocked if wait is None else min(wait, blocked)
+                    continue
+                bucket = self._chat_bucket(chat_id)
+                chat_wait = bucket.delay(now)
+                if chat_wait > 0:
+                    wait = chat_wait if wait is None else min(wait, chat_wait)
+                    continue
+
+                queue = lane[chat_id]
+                job = queue.popleft()
+                if queue:
+                    lane.move_to_end(chat_id)
+                else:
+                    del lane[chat_id]
+                bucket.take(now)
+                self.global_bucket.take(now)
+                return job, 0
+        return None, wait
+
+    def _dispatch_loop(self):
+        while True:
+            with self.cond:
+                if not self.running:
+                    return
+                now = time.monotonic()
+                job, wait = self._next_job(now)
+                if job is None:
+                    self._prune_buckets(now)
+                    self.cond.wait(timeout=wait)
+                    continue
+                self.inflight.add(job.chat_id)
+            self.executor.submit(self._send, job)
+
+    def _prune_buckets(self, now):
+        """Dolmuş ve boşta kalan sohbet kovalarını temizle (bellek sınırsız büyümesin)"""
+        if len(self.chat_buckets) < 10000:
+            return
+        for chat_id in [c for c, b in self.chat_buckets.items() if b.is_full(now) and c not in self.inflight]:
+            del self.chat_buckets[chat_id]
+        for chat_id in [c for c, until in self.blocked_until.items() if until <= now]:
+            del self.blocked_until[chat_id]
+
+    def _send(self, job):
+        job.attempts += 1
+        try:
+            result = self.originals[job.method](*job.args, **job.kwargs)
+        except Exception as e:
+            retry_after = self._retry_after(e)
+            if retry_after is not None and job.attempts < MAX_RETRIES:
+                self._requeue(job, retry_after)
+                return
+            with self.cond:
+                self.inflight.discard(job.chat_id)
+                self.stats['failed'] += 1
+                self.cond.notify()
+            for future in job.futures:
+                future.set_exception(e)
+            return
+
+        now = time.monotonic()
+        with self.cond:
+            self.inflight.discard(job.chat_id)
+            self.stats['sent'] += 1
+            self.sent_times.append(now)
+            self.total_wait += now - job.created
+            self.cond.notify()
+        for future in job.futures:
+            future.set_result(result)
+
+    @staticmethod
+    def _retry_after(error):
+        """429 hatasından retry_after süresini çıkar"""
+        if getattr(error, 'error_code', None) != 429:
+            return None
+        result_json = getattr(error, 'result_json', None) or {}
+        return float(result_json.get('parameters', {}).get('retry_after', 1))
+
+    def _requeue(self, job, retry_after):
+        now = time.monotonic()
+        logger.warning("Telegram 429: sohbet %s için %s sn bekleniyor", job.chat_id, retry_after)
+        with self.cond:
+            self.stats['retried'] += 1
+            self.blocked_until[job.chat_id] = now + retry_after
+            self.global_bucket.drain(now)
+            lane = self.lanes[job.priority]
+            queue = lane.get(job.chat_id)
+            if queue is None:
+                queue = lane[job.chat_id] = deque()
+            queue.appendleft(job)
+            self.inflight.discard(job.chat_id)
+            self.cond.notify()
+
+    def get_metrics(self):
+        """Kuyruk verim metriklerini döndür"""
+        now = time.monotonic()
+        with self.cond:
+            last_minute = sum(1 for t in self.sent_times if now - t <= 60)
+            metrics = dict(self.stats)
+            metrics['throughput_per_sec'] = round(last_minute / 60.0, 2)
+            metrics['avg_wait_ms'] = round(1000 * self.total_wait / self.stats['sent'], 1) if self.stats['sent'] else 0.0
+            metrics['inflight'] = len(self.inflight)
+            for name, lane in zip(PRIORITY_NAMES, self.lanes):
+                metrics[f'pending_{name}'] = sum(len(queue) for queue in lane.values())
+        return metrics
+
+
+# TOPLU GÖNDERİM YARDIMCILARI
+def send_bulk(bot, send_queue, chat_id, text, **kwargs):
+    """Mesajı toplu öncelikle gönder.
+
+    Kuyruk çalışıyorsa Future döner. Çalışmıyorsa mesaj doğrudan gönderilir,
+    hız sınırı için BULK_FALLBACK_DELAY beklenir ve hata (başarılıysa None)
+    döner. Her iki sonuç da wait_result ile okunur.
+    """
+    if send_queue is not None and send_queue.running:
+        return send_queue.send_message(chat_id, text, priority=PRIORITY_BULK, **kwargs)
+    try:
+        bot.send_message(chat_id, text, **kwargs)
+        outcome = None
+    except Exception as e:
+        outcome = e
+    time.sleep(BULK_FALLBACK_DELAY)
+    return outcome
+
+
+def wait_result(result):
+    """send_bulk sonucu: Future ise tamamlanmasını bekle; hata varsa hatayı, yoksa None döndür"""
+    # ApiTelegramException da .result (HTTP yanıtı) taşır; hasattr ile ayırt edilemez
+    if not isinstance(result, Future):
+        return result
+    try:
+        result.result()
+        return None
+    except Exception as e:
+        return e
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+import time
+import atexit
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from urllib.parse import urlsplit, urlunsplit, quote
+from web_server import redirect_response, text_response
+
+logger = logging.getLogger(__name__)
+
+BASE62_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+BASE62_INDEX = {ch: i for i, ch in enumerate(BASE62_ALPHABET)}
+# Kodlar en az 4 karakter olsun diye sayaç bu değerden kaydırılır
+ID_OFFSET = 62 ** 3
+MAX_URL_LENGTH = 2048
+MAX_CODE_LENGTH = 11
+REDIRECT_PREFIX = '/s/'
+# Yol/sorgu/parçada olduğu gibi bırakılan ASCII karakterler; gerisi yüzde kodlanır
+URL_SAFE_CHARS = "!#$%&'()*+,-./:;=?@[]~_"
+
+CACHE_SIZE = 50000
+CLICK_FLUSH_INTERVAL = 10
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS short_links (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        url TEXT NOT NULL,
+        url_hash BLOB NOT NULL,
+        created_by INTEGER,
+        created_at REAL NOT NULL,
+        clicks INTEGER NOT NULL DEFAULT 0,
+        last_click REAL
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_short_links_hash ON short_links (url_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_short_links_owner ON short_links (created_by, id)"
+)
+
+SQL_INSERT_LINK = """
+    INSERT INTO short_links (url, url_hash, created_by, created_at) VALUES (?, ?, ?, ?)
+    ON CONFLICT(url_hash) DO NOTHING
+"""
+SQL_LINK_BY_HASH = "SELECT id, url FROM short_links WHERE url_hash = ?"
+SQL_LINK_BY_ID = "SELECT url FROM short_links WHERE id = ?"
+SQL_LINK_STATS = "SELECT id, url, created_at, clicks, last_click FROM short_links WHERE id = ?"
+SQL_USER_LINKS = """
+    SELECT id, url, clicks FROM short_links WHERE created_by = ? ORDER BY id DESC LIMIT ?
+"""
+SQL_ADD_CLICKS = "UPDATE short_links SET clicks = clicks + ?, last_click = ? WHERE id = ?"
+
+
+class ShortenerError(Exception):
+    pass
+
+
+def encode_base62(number):
+    if number == 0:
+        return BASE62_ALPHABET[0]
+    chars = []
+    while number:
+        number, rem = divmod(number, 62)
+        chars.append(BASE62_ALPHABET[rem])
+    return ''.join(reversed(chars))
+
+
+def decode_base62(code):
+    number = 0
+    for ch in code:
+        number = number * 62 + BASE62_INDEX[ch]
+    return number
+
+
+def code_for_id(link_id):
+    return encode_base62(link_id + ID_OFFSET)
+
+
+def id_for_code(code):
+    """Kodu kayıt id'sine çevir; geçersizse None"""
+    if not code or len(code) > MAX_CODE_LENGTH or any(ch not in BASE62_INDEX for ch in code):
+        return None
+    link_id = decode_base62(code) - ID_OFFSET
+    return link_id if link_id > 0 else None
+
+
+def normalize_url(url):
+    """URL'yi doğrula; şema yoksa https ekle"""
+    url = (url or '').strip()
+    if not url:
+        raise ShortenerError("URL boş")
+    if '://' not in url:
+        url = 'https://' + url
+    if len(url) > MAX_URL_LENGTH:
+        raise ShortenerError(f"URL en fazla {MAX_URL_LENGTH} karakter olabilir")
+    # Boşluk ve kontrol karakterleri (CR/LF) Location başlığına yazıldığında yanıtı böler
+    if any(ord(ch) < 0x21 or ord(ch) == 0x7f for ch in url):
+        raise ShortenerError("Geçerli bir http/https URL'si yaz")
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.netloc:
+        raise ShortenerError("Geçerli bir http/https URL'si yaz")
+    try:
+        netloc = parts.netloc.encode('idna').decode('ascii')
+    except UnicodeError:
+        raise ShortenerError("Geçerli bir http/https URL'si yaz")
+    # Başlığa sadece ASCII yazılabilir; Türkçe karakterler yüzde kodlanır
+    url = urlunsplit((parts.scheme, netloc, quote(parts.path, safe=URL_SAFE_CHARS),
+                      quote(parts.query, safe=URL_SAFE_CHARS), quote(parts.fragment, safe=URL_SAFE_CHARS)))
+    if len(url) > MAX_URL_LENGTH:
+        raise ShortenerError(f"URL en fazla {MAX_URL_LENGTH} karakter olabilir")
+    return url
+
+
+class URLShortener:
+    """Kendi sunucumuzda çalışan URL kısaltıcı.
+
+    Kodlar AUTOINCREMENT sayacın base62 karşılığıdır, bu yüzden çakışma
+    olmaz ve kod doğrudan birincil anahtara çözülür. Aynı uzun URL, özetinin
+    tutulduğu benzersiz indeks sayesinde aynı kodu alır. Sık açılan linkler
+    LRU önbellekten yönlendirilir; tıklamalar bellekte toplanıp periyodik
+    olarak tek işlemde yazılır.
+    """
+
+    def __init__(self, db_path, base_url=None, cache_size=CACHE_SIZE, flush_interval=CLICK_FLUSH_INTERVAL):
+        self.db_path = db_path
+        self.base_url = (base_url or '').rstrip('/')
+        self.cache_size = cache_size
+        self.flush_interval = flush_interval
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.clicks = {}
+        self.clicks_lock = threading.Lock()
+        self._conn = None
+        # HTTP sunucusu her isteği yeni bir thread'de işler; thread başına bağlantı her
+        # yönlendirmede yeni bağlantı + PRAGMA demekti. Sorgular kısa, tek bağlantı ve kilit yeterli
+        self.db_lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self.stats = {'created': 0, 'deduplicated': 0, 'redirects': 0, 'cache_hits': 0, 'not_found': 0}
+        self._init_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    @property
+    def conn(self):
+        """Paylaşılan bağlantı (db_lock altında kullanılır)"""
+        if self._conn is None:
+            with self.db_lock:
+                if self._conn is None:
+                    self._conn = self._connect()
+        return self._conn
+
+    def _init_db(self):
+        with self.db_lock, self.conn as conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+
+    def short_url(self, code):
+        return f"{self.base_url}{REDIRECT_PREFIX}{code}"
+
+    def shorten(self, url, user_id=None):
+        """URL'yi kısalt; (kod, yeni_mi) döndürür. Aynı URL her zaman aynı kodu alır"""
+        url = normalize_url(url)
+        url_hash = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        with self.db_lock, self.conn as conn:
+            cursor = conn.execute(SQL_INSERT_LINK, (url, url_hash, user_id, time.time()))
+            created = cursor.rowcount == 1
+            if created:
+                link_id = cursor.lastrowid
+            else:
+                link_id, stored_url = conn.execute(SQL_LINK_BY_HASH, (url_hash,)).fetchone()
+                if stored_url != url:
+                    raise ShortenerError("URL özeti çakıştı, lütfen tekrar dene")
+        self.stats['created' if created else 'deduplicated'] += 1
+        self._cache_put(link_id, url)
+        return code_for_id(link_id), created
+
+    def _cache_put(self, link_id, url):
+        with self.cache_lock:
+            self.cache[link_id] = url
+            self.cache.move_to_end(link_id)
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def resolve(self, code, count_click=True):
+        """Kodun hedef URL'sini bul (önce LRU, sonra birincil anahtar)"""
+        link_id = id_for_code(code)
+        if link_id is None:
+            return None
+        with self.cache_lock:
+            url = self.cache.get(link_id)
+            if url is not None:
+                self.cache.move_to_end(link_id)
+        if url is not None:
+            self.stats['cache_hits'] += 1
+        else:
+            with self.db_lock:
+                row = self.conn.execute(SQL_LINK_BY_ID, (link_id,)).fetchone()
+            if row is None:
+                self.stats['not_found'] += 1
+                return None
+            url = row[0]
+            self._cache_put(link_id, url)
+        if count_click:
+            self.stats['redirects'] += 1
+            with self.clicks_lock:
+                self.clicks[link_id] = self.clicks.get(link_id, 0) + 1
+        return url
+
+    def handle_redirect(self, request):
+        """'/s/<kod>' HTTP route'u"""
+        url = self.resolve(request.path[len(REDIRECT_PREFIX):], count_click=request.method == 'GET')
+        if url is None:
+            return text_response(404, 'Link bulunamadı')
+        return redirect_response(url)
+
+    def register_routes(self, web_server):
+        web_server.prefix_route('GET', REDIRECT_PREFIX, self.handle_redirect)
+
+    def get_link_stats(self, code):
+        """Link bilgisi ve (henüz yazılmamışlar dahil) tıklama sayısı"""
+        link_id = id_for_code(code)
+        if link_id is None:
+            return None
+        with self.db_lock:
+            row = self.conn.execute(SQL_LINK_STATS, (link_id,)).fetchone()
+        if row is None:
+            return None
+        with self.clicks_lock:
+            pending = self.clicks.get(link_id, 0)
+        return {
+            'code': code,
+            'url': row[1],
+            'created_at': row[2],
+            'clicks': row[3] + pending,
+            'last_click': row[4]
+        }
+
+    def list_links(self, user_id, limit=10):
+        with self.db_lock:
+            rows = self.conn.execute(SQL_USER_LINKS, (user_id, limit)).fetchall()
+        return [{'code': code_for_id(link_id), 'url': url, 'clicks': clicks} for link_id, url, clicks in rows]
+
+    def flush_clicks(self):
+        """Birikmiş tıklamaları tek işlemde yaz"""
+        with self.clicks_lock:
+            pending, self.clicks = self.clicks, {}
+        if not pending:
+            return 0
+        now = time.time()
+        try:
+            with self.db_lock, self.conn as conn:
+                conn.executemany(SQL_ADD_CLICKS, ((count, now, link_id) for link_id, count in pending.items()))
+        except Exception as e:
+            # Yazılamayan tıklamalar bir sonraki flush'a geri eklenir
+            with self.clicks_lock:
+                for link_id, count in pending.items():
+                    self.clicks[link_id] = self.clicks.get(link_id, 0) + count
+            logger.error("Tıklama sayacı yazma hatası: %s", e)
+            return 0
+        return len(pending)
+
+    def start(self):
+        """Tıklama flush thread'ini başlat; çıkışta son flush yapılır"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="shortener-clicks", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush_clicks()
+
+    def stop(self):
+        self._stopped.set()
+        self.flush_clicks()
@@ -0,0 +1,489 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import bisect
+import signal
+import hashlib
+import logging
+import argparse
+import resource
+import threading
+import multiprocessing as mp
+import queue as queue_module
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from dotenv import load_dotenv
+from web_server import WebServer, text_response, json_response, webhook_secret
+from send_queue import GLOBAL_RATE
+from log_pipeline import setup_logging
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+WORKER_THREADS = 8
+VIRTUAL_NODES = 64
+REPORT_INTERVAL = 5
+HEALTH_LOG_INTERVAL = 60
+POLL_TIMEOUT = 30
+STOP_TIMEOUT = 30
+MAX_RESTART_DELAY = 60
+# Bu kadar süre ayakta kalan worker'ın yeniden başlatma sayacı sıfırlanır
+STABLE_AFTER = 60
+WEBHOOK_PATH = "/webhook"
+TELEGRAM_API = "https://api.telegram.org/bot{token}/{method}"
+
+# Sohbet id'sinin aranacağı güncelleme alanları, sırasıyla
+CHAT_FIELDS = ('message', 'edited_message', 'channel_post', 'edited_channel_post',
+               'my_chat_member', 'chat_member', 'chat_join_request')
+USER_FIELDS = ('inline_query', 'chosen_inline_result', 'shipping_query', 'pre_checkout_query')
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(str(key).encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    """Tutarlı hash halkası: her düğüm halkaya VIRTUAL_NODES noktayla yerleşir.
+
+    Anahtar, saat yönünde ilk noktanın düğümüne gider; düğüm sayısı
+    değiştiğinde sohbetlerin sadece küçük bir kısmı başka worker'a geçer.
+    """
+
+    def __init__(self, nodes, replicas=VIRTUAL_NODES):
+        points = sorted((_hash(f"{node}:{replica}"), node) for node in nodes for replica in range(replicas))
+        self.keys = [point[0] for point in points]
+        self.nodes = [point[1] for point in points]
+
+    def get(self, key):
+        index = bisect.bisect(self.keys, _hash(key))
+        return self.nodes[index % len(self.nodes)]
+
+
+def update_chat_id(update):
+    """Ham güncellemenin ait olduğu sohbet (yoksa kullanıcı) id'si"""
+    for field in CHAT_FIELDS:
+        item = update.get(field)
+        if item:
+            return item['chat']['id']
+    callback = update.get('callback_query')
+    if callback:
+        message = callback.get('message')
+        return message['chat']['id'] if message else callback['from']['id']
+    for field in USER_FIELDS:
+        item = update.get(field)
+        if item:
+            return item['from']['id']
+    poll_answer = update.get('poll_answer')
+    if poll_answer and poll_answer.get('user'):
+        return poll_answer['user']['id']
+    return update.get('update_id', 0)
+
+
+class ChatSerialExecutor:
+    """Thread havuzu üzerinde sohbet başına sıralı (FIFO) çalıştırıcı.
+
+    Farklı sohbetler paralel işlenir; aynı sohbetin işleri, öncekinin bittiği
+    thread tarafından sırayla alınır, bu yüzden bir sohbetin mesajları
+    asla yer değiştirmez.
+    """
+
+    def __init__(self, workers=WORKER_THREADS):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chat")
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.backlog = 0
+
+    def submit(self, chat_id, func, *args):
+        with self.lock:
+            self.backlog += 1
+            queue = self.pending.get(chat_id)
+            if queue is not None:
+                queue.append((func, args))
+                return
+            self.pending[chat_id] = deque()
+        self.pool.submit(self._run, chat_id, func, args)
+
+    def _run(self, chat_id, func, args):
+        while True:
+            try:
+                func(*args)
+            except Exception as e:
+                logger.error("Sohbet işi hatası (%s): %s", chat_id, e)
+            with self.lock:
+                self.backlog -= 1
+                queue = self.pending[chat_id]
+                if not queue:
+                    del self.pending[chat_id]
+                    return
+                func, args = queue.popleft()
+
+    def shutdown(self):
+        """Kuyruktaki tüm işler bitene kadar bekle"""
+        self.pool.shutdown(wait=True)
+
+
+def worker_main(index, workers, updates, reports, threads=WORKER_THREADS):
+    """Worker süreci: botu yükler, kendi kuyruğundaki güncellemeleri işler.
+
+    Tek kopya çalışması gereken servisler (scheduler, hatırlatıcılar,
+    broadcast devamı) sadece 0 numaralı worker'da başlatılır.
+    """
+    os.environ["BOT_WORKER_INDEX"] = str(index)
+    # Telegram global gönderim limiti worker'lar arasında paylaştırılır
+    os.environ.setdefault("SEND_GLOBAL_RATE", str(GLOBAL_RATE / workers))
+    # Kapatma supervisor'dan gelen işaretle yapılır; Ctrl+C tüm gruba gider
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+    import main as bot_main
+    from telebot import types
+
+    # Güncellemeler zaten sohbet sıralı havuzda işleniyor
+    bot_main.bot.threaded = False
+    bot_main.start_services(primary=index == 0)
+
+    executor = ChatSerialExecutor(threads)
+    stats = {'processed': 0, 'errors': 0, 'busy': 0.0}
+    stats_lock = threading.Lock()
+
+    def process(raw):
+        started = time.perf_counter()
+        failed = False
+        try:
+            bot_main.bot.process_new_updates([types.Update.de_json(raw)])
+        except Exception as e:
+            failed = True
+            logger.error("Güncelleme işleme hatası (worker %s): %s", index, e)
+        elapsed = time.perf_counter() - started
+        with stats_lock:
+            stats['processed'] += 1
+            stats['errors'] += failed
+            stats['busy'] += elapsed
+
+    def report():
+        with stats_lock:
+            processed, errors, busy = stats['processed'], stats['errors'], stats['busy']
+        try:
+            send_metrics = bot_main.send_queue.get_metrics()
+        except Exception as e:
+            logger.error("Gönderim metrikleri alınamadı: %s", e)
+            send_metrics = {}
+        reports.put({
+            'worker': index,
+            'pid': os.getpid(),
+            'time': time.time(),
+            'processed': processed,
+            'errors': errors,
+            'avg_ms': round(busy / processed * 1000, 1) if processed else 0.0,
+            'backlog': executor.backlog,
+            'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            'sent': send_metrics.get('sent', 0),
+            'send_pending': sum(v for k, v in send_metrics.items() if k.startswith('pending_')),
+            'metrics': metrics.REGISTRY.snapshot(),
+        })
+
+    logger.info("👷 Worker %s hazır (pid %s)", index, os.getpid())
+    last_report = 0.0
+    while True:
+        try:
+            item = updates.get(timeout=1)
+        except queue_module.Empty:
+            item = ()
+        if item is None:
+            break
+        if item:
+            chat_id, raw = item
+            executor.submit(chat_id, process, raw)
+        if time.monotonic() - last_report >= REPORT_INTERVAL:
+            report()
+            last_report = time.monotonic()
+
+    # Kalan işleri bitir, sonra servisleri kapat
+    executor.shutdown()
+    bot_main.stop_services()
+    report()
+    logger.info("👷 Worker %s durdu", index)
+
+
+class Supervisor:
+    """N worker süreci başlatıp güncellemeleri sohbet id'sine göre dağıtan ana süreç.
+
+    Güncellemeler long polling veya webhook ile tek noktadan alınır ve
+    tutarlı hash ile her zaman aynı worker'ın kuyruğuna yazılır; worker
+    içinde de sohbet başına sıra korunur. Ölen worker'lar artan bekleme
+    ile yeniden başlatılır, SIGHUP ile worker'lar tek tek yenilenir.
+    """
+
+    def __init__(self, token, workers=DEFAULT_WORKERS, threads=WORKER_THREADS,
+                 public_url="", port=8080, use_webhook=False, db_path=None, metrics_enabled=False):
+        self.token = token
+        self.workers = workers
+        self.threads = threads
+        self.public_url = public_url
+        self.port = port
+        self.use_webhook = use_webhook and bool(public_url)
+        self.db_path = db_path
+        self.metrics_enabled = metrics_enabled
+        self.ctx = mp.get_context('spawn')
+        self.queues = [self.ctx.Queue() for _ in range(workers)]
+        self.reports = self.ctx.Queue()
+        self.processes = [None] * workers
+        self.started_at = [0.0] * workers
+        self.restarts = [0] * workers
+        self.restart_at = [0.0] * workers
+        self.health = {}
+        self.ring = HashRing(range(workers))
+        self.dispatched = 0
+        self.stop_event = threading.Event()
+        self.reload_event = threading.Event()
+        self.web_server = None
+        self.shortener = None
+        self.session = requests.Session()
+        metrics.REGISTRY.gauge('workers_alive', 'Çalışan worker sayısı',
+                               lambda: sum(1 for p in self.processes if p and p.is_alive()))
+        metrics.REGISTRY.gauge('worker_queue', 'Worker kuyruğunda bekleyen güncelleme', self._queue_depths, ('worker',))
+
+    # WORKER YÖNETİMİ
+    def _spawn(self, index):
+        process = self.ctx.Process(
+            target=worker_main, name=f"reisbot-worker-{index}",
+            args=(index, self.workers, self.queues[index], self.reports, self.threads)
+        )
+        process.start()
+        self.processes[index] = process
+        self.started_at[index] = time.monotonic()
+        logger.info("Worker %s başlatıldı (pid %s)", index, process.pid)
+
+    def _stop_worker(self, index):
+        process = self.processes[index]
+        if process is None:
+            return
+        if not process.is_alive():
+            # Ölü worker'a sentinel konursa yerine gelen worker onu okuyup çıkar
+            return
+        # Sentinel kuyruğun sonuna eklenir; önceki güncellemeler işlenmeden çıkılmaz
+        self.queues[index].put(None)
+        process.join(STOP_TIMEOUT)
+        if process.is_alive():
+            logger.error("Worker %s zamanında durmadı, sonlandırılıyor", index)
+            process.terminate()
+            process.join(5)
+
+    def rolling_restart(self):
+        """Worker'ları tek tek yenile; yenilenen worker'ın güncellemeleri kuyrukta bekler"""
+        logger.info("🔄 Worker'lar sırayla yeniden başlatılıyor...")
+        for index in range(self.workers):
+            if self.stop_event.is_set():
+                return
+            self._stop_worker(index)
+            self._drain_reports()
+            self.restarts[index] = 0
+            # Bekleyen bir geri-çekilmeli yeniden başlatma artık geçersiz
+            self.restart_at[index] = 0.0
+            self._spawn(index)
+        logger.info("✅ Yeniden başlatma tamamlandı")
+
+    def _check_workers(self):
+        if self.stop_event.is_set():
+            return
+        now = time.monotonic()
+        for index, process in enumerate(self.processes):
+            if process is None or process.is_alive():
+                continue
+            if not self.restart_at[index]:
+                if now - self.started_at[index] >= STABLE_AFTER:
+                    self.restarts[index] = 0
+                delay = min(MAX_RESTART_DELAY, 2 ** self.restarts[index])
+                self.restart_at[index] = now + delay
+                logger.error("Worker %s beklenmedik şekilde çıktı (kod %s), %s sn sonra yeniden başlatılacak",
+                             index, process.exitcode, delay)
+            elif now >= self.restart_at[index]:
+                self.restart_at[index] = 0.0
+                self.restarts[index] += 1
+                self._spawn(index)
+
+    def _drain_reports(self):
+        while True:
+            try:
+                report = self.reports.get_nowait()
+            except queue_module.Empty:
+                return
+            self.health[report['worker']] = report
+
+    def _monitor(self):
+        last_log = time.monotonic()
+        while not self.stop_event.is_set():
+            self.stop_event.wait(1)
+            self._drain_reports()
+            if self.reload_event.is_set():
+                self.reload_event.clear()
+                self.rolling_restart()
+            self._check_workers()
+            if time.monotonic() - last_log >= HEALTH_LOG_INTERVAL:
+                last_log = time.monotonic()
+                totals = self.get_health()['totals']
+                logger.info(
+                    "📈 %s/%s worker, %s dağıtıldı, %s işlendi, %s hata, kuyruk %s",
+                    totals['alive'], self.workers, self.dispatched, totals['processed'], totals['errors'], totals['backlog']
+                )
+
+    # DAĞITIM
+    def dispatch(self, raw):
+        chat_id = update_chat_id(raw)
+        self.queues[self.ring.get(chat_id)].put((chat_id, raw))
+        self.dispatched += 1
+
+    def _api(self, method, **params):
+        response = self.session.post(
+            TELEGRAM_API.format(token=self.token, method=method),
+            json={key: value for key, value in params.items() if value is not None},
+            timeout=(params.get('timeout') or 0) + 15
+        )
+        data = response.json()
+        if not data.get('ok'):
+            raise RuntimeError(data.get('description', f"{method} başarısız"))
+        return data['result']
+
+    def _poll(self):
+        """getUpdates long polling; offset bir sonraki istekte onaylanır"""
+        self._api('deleteWebhook')
+        offset = None
+        while not self.stop_event.is_set():
+            try:
+                updates = self._api('getUpdates', offset=offset, timeout=POLL_TIMEOUT)
+            except Exception as e:
+                logger.error("getUpdates hatası: %s", e)
+                self.stop_event.wait(5)
+                continue
+            for raw in updates:
+                offset = raw['update_id'] + 1
+                self.dispatch(raw)
+
+    def _handle_webhook(self, request):
+        if request.headers.get("X-Telegram-Bot-Api-Secret-Token") != webhook_secret(self.token):
+            return text_response(403, "Forbidden")
+        self.dispatch(request.json())
+        return text_response(200, "OK")
+
+    def _start_web_server(self):
+        self.web_server = WebServer(port=self.port)
+        self.web_server.route('GET', '/health', lambda request: json_response(200, self.get_health()))
+        metrics.register_routes(self.web_server, self.metrics_snapshot)
+        if self.public_url and self.db_path:
+            # Kısa link yönlendirmeleri de ön uçta karşılanır
+            from shortener import URLShortener
+            self.shortener = URLShortener(self.db_path, self.public_url)
+            self.shortener.register_routes(self.web_server)
+            self.shortener.start()
+        if self.use_webhook:
+            self.web_server.route('POST', WEBHOOK_PATH, self._handle_webhook)
+        self.web_server.start()
+
+    # SAĞLIK
+    def _queue_depths(self):
+        depths = {}
+        for index, queue in enumerate(self.queues):
+            try:
+                depths[(str(index),)] = queue.qsize()
+            except NotImplementedError:
+                pass
+        return depths
+
+    def metrics_snapshot(self):
+        """Worker'ların son raporlarındaki metrikler ve supervisor'ın kendi metrikleri"""
+        snapshots = [report['metrics'] for report in list(self.health.values()) if report.get('metrics')]
+        snapshots.append(metrics.REGISTRY.snapshot())
+        return metrics.merge_snapshots(snapshots)
+
+    def get_health(self):
+        """Worker raporlarının birleşik görünümü"""
+        workers = []
+        totals = {'alive': 0, 'processed': 0, 'errors': 0, 'backlog': 0, 'queued': 0, 'sent': 0, 'maxrss_kb': 0}
+        for index, process in enumerate(self.processes):
+            alive = bool(process and process.is_alive())
+            try:
+                queued = self.queues[index].qsize()
+            except NotImplementedError:
+                queued = None
+            item = dict(self.health.get(index, {}))
+            item.pop('metrics', None)
+            item.update({'worker': index, 'alive': alive, 'restarts': self.restarts[index], 'queued': queued,
+                         'pid': process.pid if process else None})
+            workers.append(item)
+            totals['alive'] += alive
+            totals['queued'] += queued or 0
+            for key in ('processed', 'errors', 'backlog', 'sent', 'maxrss_kb'):
+                totals[key] += item.get(key, 0)
+        return {
+            'status': 'ok' if totals['alive'] == self.workers else 'degraded',
+            'mode': 'webhook' if self.use_webhook else 'polling',
+            'dispatched': self.dispatched,
+            'totals': totals,
+            'workers': workers,
+        }
+
+    # ÇALIŞTIR
+    def run(self):
+        signal.signal(signal.SIGTERM, lambda *_: self.stop_event.set())
+        signal.signal(signal.SIGINT, lambda *_: self.stop_event.set())
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda *_: self.reload_event.set())
+
+        for index in range(self.workers):
+            self._spawn(index)
+        threading.Thread(target=self._monitor, name="supervisor-monitor", daemon=True).start()
+
+        metrics.instrument_requests()
+        if self.public_url or self.metrics_enabled:
+            self._start_web_server()
+        if self.use_webhook:
+            url = self.public_url + WEBHOOK_PATH
+            self._api('setWebhook', url=url, secret_token=webhook_secret(self.token))
+            logger.info("🔗 Webhook modu: %s", url)
+        else:
+            threading.Thread(target=self._poll, name="supervisor-poll", daemon=True).start()
+            logger.info("📡 Polling modu")
+
+        logger.info("🧭 Supervisor %s worker ile çalışıyor (pid %s)", self.workers, os.getpid())
+        while not self.stop_event.is_set():
+            self.stop_event.wait(1)
+        self.shutdown()
+
+    def shutdown(self):
+        logger.info("🛑 Supervisor kapanıyor...")
+        if self.web_server is not None:
+            self.web_server.stop()
+        for index in range(self.workers):
+            self._stop_worker(index)
+        if self.shortener is not None:
+            self.shortener.stop()
+
+
+def run_supervisor():
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    load_dotenv(os.path.join(current_dir, "config.env"))
+    setup_logging(process_name="supervisor")
+
+    parser = argparse.ArgumentParser(description="ReisBot çoklu süreç modu")
+    parser.add_argument('--workers', type=int, default=int(os.getenv("BOT_WORKERS", DEFAULT_WORKERS)))
+    parser.add_argument('--threads', type=int, default=int(os.getenv("BOT_WORKER_THREADS", WORKER_THREADS)))
+    args = parser.parse_args()
+
+    public_url = os.getenv("PUBLIC_URL", "").rstrip("/")
+    supervisor = Supervisor(
+        os.getenv("BOT_TOKEN"),
+        workers=max(1, args.workers),
+        threads=max(1, args.threads),
+        public_url=public_url,
+        port=int(os.getenv("PORT", "8080")),
+        use_webhook=os.getenv("USE_WEBHOOK", "false").lower() == "true",
+        db_path=os.getenv("DB_PATH", os.path.join(current_dir, "reisbot.db")),
+        metrics_enabled=os.getenv("METRICS_ENABLED", "false").lower() == "true",
+    )
+    supervisor.run()
+
+
+if __name__ == "__main__":
+    run_supervisor()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import re
+import html
+
+# Türkçe büyük/küçük harf kuralları: I -> ı, İ -> i
+TURKISH_CASE_MAP = {
+    'I': 'ı',
+    'İ': 'i'
+}
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+MAX_QUERY_TERMS = 8
+
+
+def turkish_fold(text):
+    """Metni Türkçe kurallarına göre küçük harfe çevir.
+
+    Dönüşüm karakter karakter yapılır ve metnin uzunluğu korunur; böylece
+    katlanmış metindeki bir eşleşmenin konumu orijinal metinde de aynıdır.
+    """
+    folded = []
+    for ch in text or '':
+        mapped = TURKISH_CASE_MAP.get(ch)
+        if mapped is None:
+            lower = ch.lower()
+            mapped = lower if len(lower) == 1 else ch
+        folded.append(mapped)
+    return ''.join(folded)
+
+
+def query_terms(query):
+    """Arama ifadesinden katlanmış terimleri çıkar"""
+    return TOKEN_PATTERN.findall(turkish_fold(query))[:MAX_QUERY_TERMS]
+
+
+def build_match_query(terms):
+    """Terimlerden FTS5 MATCH ifadesi üret (her terim önek araması, hepsi AND)"""
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def make_snippet(text, terms, width=90):
+    """Orijinal metinden ilk eşleşme çevresini al, terimleri <b> ile vurgula (HTML)"""
+    text = text or ''
+    if not terms:
+        return html.escape(text[:width])
+    folded = turkish_fold(text)
+    pattern = re.compile(r'\b(?:' + '|'.join(re.escape(term) for term in terms) + r')\w*', re.UNICODE)
+    matches = list(pattern.finditer(folded))
+    if not matches:
+        return html.escape(text[:width]) + ('…' if len(text) > width else '')
+
+    first = matches[0].start()
+    start = max(0, first - width // 3)
+    end = min(len(text), start + width)
+
+    parts = ['…' if start > 0 else '']
+    cursor = start
+    for match in matches:
+        if match.start() < start:
+            continue
+        if match.end() > end:
+            break
+        parts.append(html.escape(text[cursor:match.start()]))
+        parts.append(f"<b>{html.escape(text[match.start():match.end()])}</b>")
+        cursor = match.end()
+    parts.append(html.escape(text[cursor:end]))
+    if end < len(text):
+        parts.append('…')
+    return ''.join(parts)
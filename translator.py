@@ -0,0 +1,362 @@
+# -*- coding: utf-8 -*-
+import re
+import json
+import time
+import queue
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from metrics import track
+
+logger = logging.getLogger(__name__)
+
+CACHE_SIZE = 2048
+# Kısa metinler kuyrukta birkaç milisaniye bekletilip tek istekte çevrilir
+SHORT_TEXT_LIMIT = 300
+BATCH_WINDOW = 0.05
+BATCH_MAX_ITEMS = 16
+BATCH_MAX_CHARS = 3000
+REQUEST_TIMEOUT = 60
+# Toplanan gruplar bu kadar paralel model isteğiyle çevrilir; yavaş bir istek
+# arkadaki grupları bekletmez
+BATCH_WORKERS = 4
+
+LANGUAGES = {
+    'tr': 'Türkçe',
+    'en': 'İngilizce',
+    'de': 'Almanca',
+    'fr': 'Fransızca',
+    'es': 'İspanyolca',
+    'it': 'İtalyanca',
+    'pt': 'Portekizce',
+    'nl': 'Felemenkçe',
+    'ru': 'Rusça',
+    'ar': 'Arapça',
+    'fa': 'Farsça',
+    'el': 'Yunanca',
+    'ja': 'Japonca',
+    'zh': 'Çince',
+    'ko': 'Korece'
+}
+
+# Modele gönderilen dil adları
+LANGUAGE_PROMPT_NAMES = {
+    'tr': 'Turkish', 'en': 'English', 'de': 'German', 'fr': 'French',
+    'es': 'Spanish', 'it': 'Italian', 'pt': 'Portuguese', 'nl': 'Dutch',
+    'ru': 'Russian', 'ar': 'Arabic', 'fa': 'Persian', 'el': 'Greek',
+    'ja': 'Japanese', 'zh': 'Chinese', 'ko': 'Korean'
+}
+
+LANGUAGE_ALIASES = {
+    'türkçe': 'tr', 'turkce': 'tr', 'turkish': 'tr',
+    'ingilizce': 'en', 'english': 'en',
+    'almanca': 'de', 'german': 'de', 'deutsch': 'de',
+    'fransızca': 'fr', 'fransizca': 'fr', 'french': 'fr',
+    'ispanyolca': 'es', 'spanish': 'es',
+    'italyanca': 'it', 'italian': 'it',
+    'portekizce': 'pt', 'portuguese': 'pt',
+    'felemenkçe': 'nl', 'hollandaca': 'nl', 'dutch': 'nl',
+    'rusça': 'ru', 'rusca': 'ru', 'russian': 'ru',
+    'arapça': 'ar', 'arapca': 'ar', 'arabic': 'ar',
+    'farsça': 'fa', 'farsca': 'fa', 'persian': 'fa',
+    'yunanca': 'el', 'greek': 'el',
+    'japonca': 'ja', 'japanese': 'ja',
+    'çince': 'zh', 'cince': 'zh', 'chinese': 'zh',
+    'korece': 'ko', 'korean': 'ko'
+}
+
+# Latin alfabeli diller için ayırt edici harfler ve sık kelimeler
+LATIN_HINTS = {
+    'tr': ('ğışçöü', {'ve', 'bir', 'bu', 'da', 'de', 'için', 'ne', 'ben', 'sen', 'çok', 'mi', 'var', 'yok', 'nasıl', 'merhaba', 'değil', 'ile', 'gibi'}),
+    'en': ('', {'the', 'and', 'is', 'you', 'to', 'of', 'it', 'in', 'that', 'are', 'what', 'how', 'this', 'hello', 'not', 'with', 'have'}),
+    'de': ('äöüß', {'und', 'der', 'die', 'das', 'ist', 'nicht', 'ich', 'du', 'ein', 'eine', 'zu', 'mit', 'wie', 'hallo', 'sie'}),
+    'fr': ('àâæçéèêëîïôœùûÿ', {'le', 'la', 'les', 'et', 'est', 'pas', 'je', 'vous', 'un', 'une', 'des', 'que', 'bonjour', 'avec', 'pour', 'suis', 'il'}),
+    'es': ('ñ¿¡áéíóú', {'el', 'la', 'los', 'las', 'y', 'es', 'que', 'no', 'un', 'una', 'por', 'con', 'hola', 'para', 'cómo'}),
+    'it': ('àèéìòù', {'il', 'di', 'che', 'non', 'un', 'una', 'sono', 'per', 'con', 'ciao', 'come', 'gli', 'della'}),
+    'pt': ('ãõçáâêô', {'o', 'os', 'e', 'não', 'um', 'uma', 'que', 'com', 'para', 'olá', 'você', 'do', 'da'}),
+    'nl': ('', {'de', 'het', 'een', 'en', 'is', 'niet', 'ik', 'je', 'van', 'dat', 'hoe', 'wat', 'met', 'zijn', 'gaat'})
+}
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+", re.UNICODE)
+MIN_DETECTION_SCORE = 2
+
+
+class TranslationError(Exception):
+    pass
+
+
+def resolve_language(value):
+    """'en', 'İngilizce', 'english' gibi girdileri dil koduna çevir"""
+    value = (value or '').strip().lower()
+    if value in LANGUAGES:
+        return value
+    return LANGUAGE_ALIASES.get(value)
+
+
+def text_key(text, target):
+    """Önbellek anahtarı: metnin özeti ve hedef dil"""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest(), target
+
+
+def detect_language(text):
+    """Kaynak dili yerel olarak tahmin et; emin değilse None döner.
+
+    Önce alfabeye (Kiril, Arap, Yunan, CJK) bakılır; Latin alfabeli metinlerde
+    ayırt edici harfler ve sık kelimeler puanlanır.
+    """
+    letters = [ch for ch in text if ch.isalpha()]
+    if not letters:
+        return None
+
+    scripts = {}
+    for ch in letters:
+        code = ord(ch)
+        if 0x0400 <= code <= 0x04FF:
+            script = 'ru'
+        elif 0x0600 <= code <= 0x06FF:
+            script = 'fa' if ch in 'پچژگ' else 'ar'
+        elif 0x0370 <= code <= 0x03FF:
+            script = 'el'
+        elif 0x3040 <= code <= 0x30FF:
+            script = 'ja'
+        elif 0xAC00 <= code <= 0xD7AF:
+            script = 'ko'
+        elif 0x4E00 <= code <= 0x9FFF:
+            script = 'zh'
+        else:
+            script = 'latin'
+        scripts[script] = scripts.get(script, 0) + 1
+
+    if scripts.get('ja'):
+        return 'ja'
+    dominant = max(scripts, key=scripts.get)
+    if dominant != 'latin':
+        if dominant == 'ar' and scripts.get('fa'):
+            return 'fa'
+        return dominant
+
+    lowered = text.lower()
+    words = WORD_PATTERN.findall(lowered)
+    scores = {}
+    for lang, (chars, stopwords) in LATIN_HINTS.items():
+        score = sum(2 for word in words if word in stopwords)
+        if chars:
+            score += sum(3 for ch in lowered if ch in chars)
+        scores[lang] = score
+
+    best = max(scores, key=scores.get)
+    ranked = sorted(scores.values(), reverse=True)
+    if ranked[0] < MIN_DETECTION_SCORE or ranked[0] == ranked[1]:
+        return None
+    return best
+
+
+class _PendingItem:
+    __slots__ = ('text', 'target', 'key', 'future')
+
+    def __init__(self, text, target, key):
+        self.text = text
+        self.target = target
+        self.key = key
+        self.future = Future()
+
+
+class Translator:
+    """AI istemcisi üzerinde çeviri katmanı.
+
+    Sonuçlar (metin özeti, hedef dil) anahtarıyla LRU önbellekte tutulur.
+    Kısa metinler BATCH_WINDOW boyunca biriktirilip hedef dile göre
+    gruplanarak tek model isteğinde çevrilir; gruplar küçük bir işçi
+    havuzunda paralel gönderilir. Yerel dil tespiti metnin
+    zaten hedef dilde olduğunu gösteriyorsa model hiç çağrılmaz.
+
+    OpenAI istemcisi botun geri kalanıyla paylaşılır (utils.openai_client);
+    çeviriye özgü zaman aşımı istek başına verilir.
+    """
+
+    def __init__(self, client, model="gpt-3.5-turbo", cache_size=CACHE_SIZE,
+                 batch_window=BATCH_WINDOW, batch_max_items=BATCH_MAX_ITEMS):
+        # İlk get() çağrısında oluşturulan paylaşılan istemci (LazyValue)
+        self.client = client
+        self.model = model
+        self.cache_size = cache_size
+        self.batch_window = batch_window
+        self.batch_max_items = batch_max_items
+        self.cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.pending = queue.Queue()
+        self.inflight = {}
+        self.inflight_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="translator")
+        self.stats_lock = threading.Lock()
+        self.stats = {
+            'requests': 0, 'cache_hits': 0, 'skipped_same_language': 0,
+            'model_calls': 0, 'batched_items': 0, 'errors': 0
+        }
+
+    def _count(self, name, amount=1):
+        with self.stats_lock:
+            self.stats[name] += amount
+
+    def _cache_get(self, key):
+        with self.cache_lock:
+            value = self.cache.get(key)
+            if value is not None:
+                self.cache.move_to_end(key)
+            return value
+
+    def _cache_put(self, key, value):
+        with self.cache_lock:
+            self.cache[key] = value
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def translate(self, text, target, timeout=REQUEST_TIMEOUT):
+        """Metni hedef dile çevir; (çeviri, tespit edilen kaynak dil) döndürür"""
+        text = (text or '').strip()
+        if not text:
+            raise TranslationError("Çevrilecek metin boş")
+        if target not in LANGUAGES:
+            raise TranslationError(f"Desteklenmeyen dil: {target}")
+
+        self._count('requests')
+        source = detect_language(text)
+        if source == target:
+            self._count('skipped_same_language')
+            return text, source
+
+        key = text_key(text, target)
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._count('cache_hits')
+            return cached, source
+
+        if len(text) > SHORT_TEXT_LIMIT:
+            translated = self._translate_single(text, target)
+            self._cache_put(key, translated)
+            return translated, source
+
+        try:
+            return self._enqueue(text, target, key).result(timeout=timeout), source
+        except FutureTimeoutError:
+            self._count('errors')
+            raise TranslationError("Çeviri zaman aşımına uğradı, biraz sonra tekrar dene")
+
+    def _enqueue(self, text, target, key):
+        # Aynı metin zaten bekliyorsa aynı Future paylaşılır
+        with self.inflight_lock:
+            item = self.inflight.get(key)
+            if item is not None:
+                return item.future
+            item = _PendingItem(text, target, key)
+            self.inflight[key] = item
+        self._ensure_worker()
+        self.pending.put(item)
+        return item.future
+
+    def _ensure_worker(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._batch_loop, name="translator-batcher", daemon=True)
+            self._thread.start()
+
+    def _batch_loop(self):
+        while True:
+            first = self.pending.get()
+            batch = [first]
+            chars = len(first.text)
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.batch_max_items and chars < BATCH_MAX_CHARS:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self.pending.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                chars += len(item.text)
+
+            groups = {}
+            for item in batch:
+                groups.setdefault(item.target, []).append(item)
+            # Her hedef dil grubu ayrı işçide; toplayıcı thread yeni istekleri beklemeye döner
+            for target, items in groups.items():
+                self.executor.submit(self._process_group, target, items)
+
+    def _process_group(self, target, items):
+        try:
+            if len(items) == 1:
+                translations = [self._translate_single(items[0].text, target)]
+            else:
+                translations = self._translate_batch([item.text for item in items], target)
+                self._count('batched_items', len(items))
+            for item, translated in zip(items, translations):
+                self._cache_put(item.key, translated)
+                item.future.set_result(translated)
+        except Exception as e:
+            self._count('errors')
+            logger.error("Çeviri hatası: %s", e)
+            error = e if isinstance(e, TranslationError) else TranslationError(str(e))
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(error)
+        finally:
+            with self.inflight_lock:
+                for item in items:
+                    self.inflight.pop(item.key, None)
+
+    def _complete(self, system_prompt, content, max_tokens):
+        self._count('model_calls')
+        with track('openai'):
+            response = self.client.get().with_options(timeout=REQUEST_TIMEOUT).chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": content}
+                ],
+                max_tokens=max_tokens,
+                temperature=0
+            )
+        return (response.choices[0].message.content or '').strip()
+
+    def _translate_single(self, text, target):
+        language = LANGUAGE_PROMPT_NAMES[target]
+        prompt = (f"Translate the user's text into {language}. "
+                  "Reply with the translation only, keep formatting and emojis.")
+        return self._complete(prompt, text, max_tokens=min(2000, len(text) * 2 + 50))
+
+    def _translate_batch(self, texts, target):
+        """Birden çok kısa metni tek istekte JSON dizisi olarak çevir"""
+        language = LANGUAGE_PROMPT_NAMES[target]
+        prompt = (f"Translate every string in the JSON array into {language}. "
+                  "Reply with a JSON array of the same length and order, nothing else.")
+        total = sum(len(text) for text in texts)
+        reply = self._complete(prompt, json.dumps(texts, ensure_ascii=False), max_tokens=min(4000, total * 2 + 100))
+        try:
+            start, end = reply.find('['), reply.rfind(']')
+            translations = json.loads(reply[start:end + 1])
+            if (isinstance(translations, list) and len(translations) == len(texts)
+                    and all(isinstance(t, str) for t in translations)):
+                return translations
+        except ValueError:
+            pass
+        # Model biçimi bozduysa metinler tek tek çevrilir
+        logger.warning("Toplu çeviri yanıtı ayrıştırılamadı, %s metin tek tek çevriliyor", len(texts))
+        return [self._translate_single(text, target) for text in texts]
+
+    def get_stats(self):
+        with self.stats_lock:
+            stats = dict(self.stats)
+        with self.cache_lock:
+            stats['cache_size'] = len(self.cache)
+        stats['queued'] = self.pending.qsize()
+        return stats
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+import time
+import atexit
+import logging
+import itertools
+import threading
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 30
+FLUSH_EVENTS = 1000
+
+
+class _Shard:
+    """Tek bir thread'e ait sayaçlar; kilit pratikte hiç çekişmez"""
+    __slots__ = ('counts', 'lock')
+
+    def __init__(self):
+        self.counts = {}
+        self.lock = threading.Lock()
+
+
+class UsageTracker:
+    """Komut kullanım sayaçlarını bellekte toplayıp toplu halde yazan katman.
+
+    Her mesajda veritabanına satır yazmak yerine sayaçlar thread başına
+    parçalarda (shard) artırılır; arka plan thread'i her FLUSH_INTERVAL
+    saniyede veya FLUSH_EVENTS olayda bir birikmiş farkları tek işlemde
+    depoya yazar.
+    """
+
+    def __init__(self, store, flush_interval=FLUSH_INTERVAL, flush_events=FLUSH_EVENTS):
+        self.store = store
+        self.flush_interval = flush_interval
+        self.flush_events = flush_events
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._events = itertools.count(1)
+        self._flushed_at_event = 0
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._retry = {}
+        self.stats = {'flushes': 0, 'rows_written': 0, 'flush_errors': 0}
+
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+        return shard
+
+    def increment(self, user_id, command, count=1):
+        """Sayaç artır (sadece bellek, veritabanına dokunmaz)"""
+        shard = self._shard()
+        key = (user_id, command)
+        with shard.lock:
+            shard.counts[key] = shard.counts.get(key, 0) + count
+        if next(self._events) - self._flushed_at_event >= self.flush_events:
+            self._wakeup.set()
+
+    def _collect(self):
+        """Tüm parçalardaki birikmiş sayaçları al ve sıfırla"""
+        merged = self._retry
+        self._retry = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            with shard.lock:
+                counts, shard.counts = shard.counts, {}
+            for key, value in counts.items():
+                merged[key] = merged.get(key, 0) + value
+        return merged
+
+    def flush(self):
+        """Birikmiş farkları depoya tek seferde yaz"""
+        with self._flush_lock:
+            self._flushed_at_event = next(self._events)
+            pending = self._collect()
+            if not pending:
+                return 0
+            rows = [(user_id, command, count) for (user_id, command), count in pending.items()]
+            try:
+                self.store.log_usage_batch(rows)
+            except Exception as e:
+                # Yazılamayan farklar kaybolmaz, bir sonraki flush'ta tekrar denenir
+                self._retry = pending
+                self.stats['flush_errors'] += 1
+                logger.error("Kullanım istatistiği yazma hatası: %s", e)
+                return 0
+            self.stats['flushes'] += 1
+            self.stats['rows_written'] += len(rows)
+            return len(rows)
+
+    def get_usage(self, user_id):
+        """Kalıcı ve henüz yazılmamış sayaçların birleşimi (tam doğru okuma)"""
+        with self._flush_lock:
+            usage = dict(self.store.get_usage(user_id))
+            for (uid, command), count in self._retry.items():
+                if uid == user_id:
+                    usage[command] = usage.get(command, 0) + count
+            with self._shards_lock:
+                shards = list(self._shards)
+            for shard in shards:
+                with shard.lock:
+                    items = [(key[1], value) for key, value in shard.counts.items() if key[0] == user_id]
+                for command, count in items:
+                    usage[command] = usage.get(command, 0) + count
+        return usage
+
+    def start(self):
+        """Arka plan flush thread'ini başlat; çıkışta son flush garanti edilir"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="usage-flusher", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def stop(self):
+        """Flush thread'ini durdur ve kalan sayaçları yaz"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        started = time.perf_counter()
+        written = self.flush()
+        if written:
+            logger.info("Kapanışta %s kullanım sayacı yazıldı (%.3f sn)", written, time.perf_counter() - started)
@@ -2,18 +2,26 @@
 import os
 import io
 import requests
-from PIL import Image
-import qrcode
-from gtts import gTTS
-import pyttsx3
-from pydub import AudioSegment
-import python_weather
-import forex_python.converter
-from forex_python.bitcoin import BtcConverter
 import logging
+from lazy import lazy_import, LazyValue
+from metrics import track
 
 logger = logging.getLogger(__name__)
 
+# Ağır kütüphaneler ilgili özellik ilk kullanıldığında yüklenir
+Image = lazy_import('PIL.Image')
+qrcode = lazy_import('qrcode')
+gtts = lazy_import('gtts')
+pydub = lazy_import('pydub')
+
+
+def _create_openai_client():
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_KEY"))
+
+# Sohbet ve görsel üretimi aynı istemciyi (ve bağlantı havuzunu) paylaşır
+openai_client = LazyValue(_create_openai_client)
+
 def generate_qr_code(data, filename='qrcode.png'):
     """QR kodu oluştur"""
     try:
@@ -30,28 +38,28 @@ def generate_qr_code(data, filename='qrcode.png'):
         img.save(filename)
         return filename
     except Exception as e:
-        logger.error(f"QR kodu oluşturma hatası: {e}")
+        logger.error("QR kodu oluşturma hatası: %s", e)
         return None
 
 def text_to_speech(text, lang='tr', filename='speech.mp3'):
     """Metni sese çevir"""
     try:
-        tts = gTTS(text=text, lang=lang, slow=False)
+        tts = gtts.gTTS(text=text, lang=lang, slow=False)
         tts.save(filename)
         return filename
     except Exception as e:
-        logger.error(f"Metin okuma hatası: {e}")
+        logger.error("Metin okuma hatası: %s", e)
         return None
 
 def convert_audio_format(input_file, output_format='mp3'):
     """Ses dosyası formatını dönüştür"""
     try:
-        audio = AudioSegment.from_file(input_file)
+        audio = pydub.AudioSegment.from_file(input_file)
         output_file = f"converted.{output_format}"
         audio.export(output_file, format=output_format)
         return output_file
     except Exception as e:
-        logger.error(f"Ses dönüştürme hatası: {e}")
+        logger.error("Ses dönüştürme hatası: %s", e)
         return None
 
 def get_weather(city='Istanbul'):
@@ -72,7 +80,7 @@ def get_weather(city='Istanbul'):
         }
         return weather_info
     except Exception as e:
-        logger.error(f"Hava durumu hatası: {e}")
+        logger.error("Hava durumu hatası: %s", e)
         return None
 
 def get_exchange_rate(from_currency='USD', to_currency='TRY'):
@@ -93,7 +101,7 @@ def get_exchange_rate(from_currency='USD', to_currency='TRY'):
         else:
             return 34.25  # Varsayılan USD/TRY
     except Exception as e:
-        logger.error(f"Döviz kuru hatası: {e}")
+        logger.error("Döviz kuru hatası: %s", e)
         return None
 
 def get_bitcoin_price(currency='USD'):
@@ -108,7 +116,7 @@ def get_bitcoin_price(currency='USD'):
         
         return prices.get(currency, 67500.00)
     except Exception as e:
-        logger.error(f"Bitcoin fiyat hatası: {e}")
+        logger.error("Bitcoin fiyat hatası: %s", e)
         return None
 
 def resize_image(input_path, output_path, size=(800, 600)):
@@ -119,27 +127,25 @@ def resize_image(input_path, output_path, size=(800, 600)):
             img.save(output_path)
         return output_path
     except Exception as e:
-        logger.error(f"Görsel boyutlandırma hatası: {e}")
+        logger.error("Görsel boyutlandırma hatası: %s", e)
         return None
 
 def generate_ai_image(prompt, size="1024x1024"):
     """AI ile görsel oluştur"""
     try:
-        from openai import OpenAI
-        client = OpenAI(api_key=os.getenv("OPENAI_KEY"))
-        
-        response = client.images.generate(
-            model="dall-e-3",
-            prompt=prompt,
-            size=size,
-            quality="standard",
-            n=1,
-        )
+        with track('openai'):
+            response = openai_client.get().images.generate(
+                model="dall-e-3",
+                prompt=prompt,
+                size=size,
+                quality="standard",
+                n=1,
+            )
         
         image_url = response.data[0].url
         return image_url
     except Exception as e:
-        logger.error(f"AI görsel oluşturma hatası: {e}")
+        logger.error("AI görsel oluşturma hatası: %s", e)
         return None
 
 def download_file_from_url(url, filename):
@@ -153,5 +159,5 @@ def download_file_from_url(url, filename):
             return filename
         return None
     except Exception as e:
-        logger.error(f"Dosya indirme hatası: {e}")
+        logger.error("Dosya indirme hatası: %s", e)
         return None
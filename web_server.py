@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+import os
+import json
+import hashlib
+import logging
+import threading
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class Request:
+    """Route fonksiyonlarına verilen sade istek nesnesi"""
+    __slots__ = ('method', 'path', 'query', 'headers', 'body', 'client')
+
+    def __init__(self, method, path, query, headers, body, client):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.client = client
+
+    def json(self):
+        return json.loads(self.body.decode('utf-8')) if self.body else None
+
+
+def webhook_secret(token):
+    """Telegram'ın webhook isteklerine eklediği gizli başlık; ayarlanmazsa token'dan türetilir"""
+    return os.getenv("WEBHOOK_SECRET") or hashlib.sha256((token or "").encode()).hexdigest()[:32]
+
+
+def text_response(status, text, content_type='text/plain; charset=utf-8'):
+    return status, {'Content-Type': content_type}, text.encode('utf-8')
+
+
+def json_response(status, data):
+    return status, {'Content-Type': 'application/json'}, json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def redirect_response(location, permanent=False):
+    # Tıklama sayılabilmesi için varsayılan olarak tarayıcı önbelleğine alınmayan 302 kullanılır
+    return (301 if permanent else 302), {'Location': location, 'Cache-Control': 'no-store'}, b''
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'ReisBot'
+    sys_version = ''
+
+    def _dispatch(self):
+        parts = urlsplit(self.path)
+        handler = self.server.web.resolve(self.command, parts.path)
+        if handler is None:
+            status, headers, body = text_response(404, 'Not Found')
+        else:
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > MAX_BODY_SIZE:
+                status, headers, body = text_response(413, 'Payload Too Large')
+                self.close_connection = True
+            else:
+                request = Request(
+                    self.command, parts.path, parse_qs(parts.query), self.headers,
+                    self.rfile.read(length) if length else b'', self.client_address[0]
+                )
+                try:
+                    status, headers, body = handler(request)
+                except Exception as e:
+                    logger.error("HTTP route hatası (%s %s): %s", self.command, parts.path, e)
+                    status, headers, body = text_response(500, 'Internal Server Error')
+
+        # Başlık değerindeki CR/LF yanıtı bölerdi (header injection); hiç yazılmaz
+        if any('\r' in str(value) or '\n' in str(value) for value in headers.values()):
+            logger.error("HTTP route geçersiz başlık döndürdü (%s %s)", self.command, parts.path)
+            status, headers, body = text_response(500, 'Internal Server Error')
+
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.command != 'HEAD' and body:
+            self.wfile.write(body)
+
+    do_GET = _dispatch
+    do_POST = _dispatch
+    do_HEAD = _dispatch
+    do_PUT = _dispatch
+    do_PATCH = _dispatch
+    do_DELETE = _dispatch
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.client_address[0], format % args)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+
+class WebServer:
+    """Webhook, kısa link yönlendirmeleri ve sağlık kontrolü için tek HTTP sunucusu.
+
+    Route'lar modüller tarafından kaydedilir. Tam eşleşen yollar sözlükten
+    tek adımda bulunur; önek route'ları (ör. '/s/') en uzun önek önce
+    olacak şekilde sırayla denenir.
+    """
+
+    def __init__(self, host='0.0.0.0', port=8080):
+        self.host = host
+        self.port = port
+        self.routes = {}
+        self.prefix_routes = []
+        self.httpd = None
+        self._thread = None
+        self.route('GET', '/health', lambda request: json_response(200, {'status': 'ok'}))
+
+    def route(self, method, path, handler):
+        """Tam yol için route ekle"""
+        self.routes[(method, path)] = handler
+        if method == 'GET':
+            self.routes[('HEAD', path)] = handler
+
+    def prefix_route(self, method, prefix, handler):
+        """Önek ile eşleşen tüm yollar için route ekle"""
+        methods = (method, 'HEAD') if method == 'GET' else (method,)
+        for m in methods:
+            self.prefix_routes.append((m, prefix, handler))
+        self.prefix_routes.sort(key=lambda item: len(item[1]), reverse=True)
+
+    def resolve(self, method, path):
+        handler = self.routes.get((method, path))
+        if handler is not None:
+            return handler
+        for m, prefix, handler in self.prefix_routes:
+            if m == method and path.startswith(prefix):
+                return handler
+        return None
+
+    def start(self):
+        """Sunucuyu arka plan thread'inde başlat"""
+        if self.httpd is not None:
+            return
+        self.httpd = _Server((self.host, self.port), _Handler)
+        self.httpd.web = self
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="web-server", daemon=True)
+        self._thread.start()
+        logger.info("🌐 HTTP sunucusu %s:%s üzerinde çalışıyor", self.host, self.port)
+
+    def serve_forever(self):
+        """Ana thread'i sunucu kapanana kadar beklet (webhook modu)"""
+        self.start()
+        self._thread.join()
+
+    def stop(self):
+        if self.httpd is None:
+            return
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.httpd = None